@@ -0,0 +1,63 @@
+"""
+benchmarks.bench_checkpoint
+
+Checkpoint cost per crawled page, journal size and time to resume
+
+Every simulated page queues --fanout new URLs and completes one URL, as the
+Coordinator and the CrawlEngine record them.
+
+Usage: python -m benchmarks.bench_checkpoint [--pages N] [--fanout N]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from restr.crawler.checkpoint import Checkpoint
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200_000)
+    parser.add_argument("--fanout", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="restr-bench-") as directory:
+        path = Path(directory, "crawl.journal")
+        checkpoint = Checkpoint(path)
+        checkpoint.seed("https://example.com/")
+
+        queued = 0
+        start = time.perf_counter()
+        for page in range(args.pages):
+            for _ in range(args.fanout):
+                checkpoint.queue(f"https://example.com/page/{queued}", 1)
+                queued += 1
+            checkpoint.complete(f"https://example.com/page/{page}")
+        checkpoint.close()
+        elapsed = time.perf_counter() - start
+
+        results = {
+            "pages": args.pages,
+            "fanout": args.fanout,
+            "us_per_page": elapsed / args.pages * 1_000_000,
+            "journal_mb": path.stat().st_size / 2**20,
+            "journal_records": checkpoint.records,
+            "live_records": len(checkpoint),
+        }
+
+        start = time.perf_counter()
+        resumed = Checkpoint(path)
+        results["resume_sec"] = time.perf_counter() - start
+        assert len(resumed.done) == args.pages
+        resumed.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
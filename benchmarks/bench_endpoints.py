@@ -0,0 +1,77 @@
+"""
+benchmarks.bench_endpoints
+
+EndpointMap insert and lookup throughput and memory
+
+Usage: python -m benchmarks.bench_endpoints [--urls N]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from restr.crawler.endpoints import EndpointMap
+
+
+def generate_urls(count: int, seed: int = 0) -> list[str]:
+    """Generate URLs of a REST API with IDs, slugs and query strings"""
+
+    rng = random.Random(seed)
+    resources = ["users", "posts", "comments", "orders", "products", "files"]
+    actions = ["", "/edit", "/history", "/items"]
+
+    return [
+        (
+            f"https://api.example.com/v1/{rng.choice(resources)}/{rng.randrange(10**9)}"
+            f"{rng.choice(actions)}?page={i % 50}&sort=asc"
+            if i % 3
+            else f"https://api.example.com/blog/{rng.randrange(10**6):x}-post-{i}/"
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    urls = generate_urls(args.urls)
+
+    endpoints = EndpointMap()
+    start = time.perf_counter()
+    for url in urls:
+        endpoints.add(url)
+    elapsed = time.perf_counter() - start
+
+    # Measure memory in a separate pass, tracing slows down inserts
+    tracemalloc.start()
+    traced = EndpointMap()
+    for url in urls:
+        traced.add(url)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    sample = urls[: args.urls // 10]
+    start = time.perf_counter()
+    saturated = sum(endpoints.is_saturated(url) for url in sample)
+    lookup = time.perf_counter() - start
+
+    results = {
+        "urls": args.urls,
+        "endpoints": len(endpoints),
+        "insert_per_sec": args.urls / elapsed,
+        "lookup_per_sec": len(sample) / lookup,
+        "saturated_share": saturated / len(sample),
+        "memory_kb": memory / 1024,
+    }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
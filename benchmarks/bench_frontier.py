@@ -0,0 +1,79 @@
+"""
+benchmarks.bench_frontier
+
+Frontier insert and lookup throughput
+
+Usage: python -m benchmarks.bench_frontier [--urls N]
+"""
+
+import argparse
+import json
+import random
+import time
+
+import psutil
+
+from restr.crawler.frontier import Frontier
+
+
+def generate_urls(count: int, hosts: int = 100, seed: int = 0) -> list[str]:
+    """Generate distinct URLs with tracking parameters and mixed host case"""
+
+    rng = random.Random(seed)
+    return [
+        f"https://Host-{rng.randrange(hosts)}.example.com/section/{i}/page"
+        f"?b={i % 7}&a={i}&utm_source=bench"
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    process = psutil.Process()
+    urls = generate_urls(args.urls)
+    absent = generate_urls(args.urls // 10, seed=1)
+    absent = [url.replace("/page", "/missing") for url in absent]
+
+    rss_before = process.memory_info().rss
+    frontier = Frontier(capacity=args.urls)
+    results = {"urls": args.urls, "bloom_bytes": frontier.bloom.nbytes}
+
+    start = time.perf_counter()
+    frontier.add_many(urls)
+    frontier.flush()
+    results["insert_per_sec"] = args.urls / (time.perf_counter() - start)
+
+    # Duplicates are rejected by the Bloom filter and confirmed on disk
+    sample = urls[: args.urls // 10]
+    start = time.perf_counter()
+    duplicates = sum(url in frontier for url in sample)
+    results["lookup_hit_per_sec"] = len(sample) / (time.perf_counter() - start)
+
+    # Absent URLs are mostly rejected by the Bloom filter alone
+    start = time.perf_counter()
+    found = sum(url in frontier for url in absent)
+    results["lookup_miss_per_sec"] = len(absent) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    popped = 0
+    while batch := frontier.pop_many(10_000):
+        popped += len(batch)
+    results["pop_per_sec"] = popped / (time.perf_counter() - start)
+
+    results["rss_mb"] = (process.memory_info().rss - rss_before) / 2**20
+    results["database_mb"] = frontier.path.stat().st_size / 2**20
+    results["false_positives"] = frontier.false_positives
+
+    assert duplicates == len(sample) and found == 0 and popped == args.urls
+    frontier.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
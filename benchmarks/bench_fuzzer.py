@@ -0,0 +1,73 @@
+"""
+benchmarks.bench_fuzzer
+
+Fuzzer throughput and memory against a local keep-alive server
+
+The payloads are generated lazily, so the RSS growth between a short and a
+long run shows whether memory stays flat with the number of requests.
+
+Usage: python -m benchmarks.bench_fuzzer [--requests N] [--concurrency N]
+    [--batch-size N]
+"""
+
+import argparse
+import json
+from collections import deque
+from itertools import count, islice
+
+import psutil
+
+from restr.fuzzer.engine import Fuzzer, Target
+from tests.fixtures.server import LocalServer
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    server = LocalServer()
+    # Only the last request is kept so the server does not grow the process
+    server.requests = deque(maxlen=1)
+    url = server.route("/search", "<html><body>results</body></html>")
+
+    process = psutil.Process()
+    results = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "batch_size": args.batch_size,
+    }
+
+    try:
+        for run, requests in (("warmup", args.requests // 10), ("run", args.requests)):
+            fuzzer = Fuzzer(
+                payloads=lambda _value, _kind, n=requests: (
+                    f"word{i}" for i in islice(count(), n)
+                ),
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+            )
+            rss_before = process.memory_info().rss
+            stats = fuzzer.run(Target.from_url(f"{url}?q=restr"))
+            fuzzer.close()
+
+            results[f"{run}_requests_per_sec"] = stats.requests_per_sec
+            results[f"{run}_rss_growth_mb"] = (
+                process.memory_info().rss - rss_before
+            ) / 2**20
+            results[f"{run}_findings"] = stats.findings
+
+        results["connections"] = server.connections
+
+    finally:
+        server.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
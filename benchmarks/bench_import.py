@@ -0,0 +1,81 @@
+"""
+benchmarks.bench_import
+
+Import time of the packages, measured with python -X importtime in a new process
+
+Usage: python -m benchmarks.bench_import [--runs N]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Milliseconds each import may take, None only reports it
+BUDGETS_MS = {
+    "restr.browser": 10.0,
+    "restr.crawler": 10.0,
+    "restr.browser.http_browser": None,
+    "restr.crawler.sharded": None,
+    "restr.browser.browser": None,
+}
+
+# Dependencies that importing the lazy packages must not load
+DEFERRED = ("selenium", "webdriver_manager", "dotenv", "psutil")
+
+
+def import_time(module: str) -> tuple[float, list[str]]:
+    """Cumulative import time of a module in ms and the deferred modules it loaded"""
+
+    code = (
+        f"import sys, {module};"
+        f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Lines are "import time: self | cumulative | name", the module is reported last
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        _, cumulative_us, name = line.rsplit("|", 2)
+        if name.strip() == module:
+            cumulative = int(cumulative_us)
+
+    loaded = set(result.stdout.strip().split(","))
+    return cumulative / 1000, [name for name in DEFERRED if name in loaded]
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    over_budget = []
+    for module, budget in BUDGETS_MS.items():
+        # The fastest run is the least disturbed by the system
+        runs = [import_time(module) for _ in range(args.runs)]
+        milliseconds = min(run[0] for run in runs)
+
+        results[module] = {
+            "import_ms": milliseconds,
+            "budget_ms": budget,
+            "deferred_loaded": runs[0][1],
+        }
+        if budget is not None and (milliseconds > budget or runs[0][1]):
+            over_budget.append(module)
+
+    results["over_budget"] = over_budget
+    print(json.dumps(results, indent=2))
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
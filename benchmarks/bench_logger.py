@@ -0,0 +1,58 @@
+"""
+benchmarks.bench_logger
+
+Log call overhead on the calling thread, synchronous and queue-backed handlers
+
+Usage: python -m benchmarks.bench_logger [--records N]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from common import logger as logger_module
+from common.logger import Logger, stop_listeners
+
+
+def measure(name: str, records: int, **kwargs) -> dict[str, float]:
+    """Time log calls of a new logger, then the time until all are written"""
+
+    logger = Logger(name, stream_handler=False, **kwargs).get_logger()
+
+    start = time.perf_counter()
+    for index in range(records):
+        logger.info("page %d crawled in %.3f s", index, 0.25)
+    calls = time.perf_counter() - start
+
+    stop_listeners()
+    written = time.perf_counter() - start
+
+    return {
+        "call_us": calls / records * 1e6,
+        "written_per_sec": records / written,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        logger_module.LOG_DIR = Path(directory)
+
+        results = {
+            "records": args.records,
+            "sync": measure("bench_sync", args.records),
+            "queue": measure("bench_queue", args.records, use_queue=True),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+benchmarks.bench_profile
+
+Page-load latency and Firefox memory with the default and the lean profile
+
+Usage: python -m benchmarks.bench_profile [--pages N] [--images N] [--delay S]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import psutil
+
+from restr.browser import Browser
+from restr.browser.profile import BLOCKED_HOSTS, Profile
+from restr.browser.webdriver import find_processes
+from tests.fixtures.server import LocalServer
+from tests.fixtures.site import THIRD_PARTY_HOST, SyntheticSite
+
+
+def browser_rss(browser: Browser) -> int:
+    """Resident memory of all Firefox processes of a browser"""
+
+    parent = psutil.Process(browser.browser.service.process.pid)
+
+    total = 0
+    for process in find_processes(("firefox",), parent=parent):
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+
+    return total
+
+
+def run(profile: Profile, site: SyntheticSite) -> dict:
+    """Load every page of the site once and measure it"""
+
+    server = site.server
+    browser = Browser(headless=True, profile=profile)
+
+    try:
+        requests = len(server.requests)
+        latencies = []
+
+        for url in site.urls:
+            start = time.perf_counter()
+            browser.open(url)
+            latencies.append(time.perf_counter() - start)
+
+        return {
+            "pages": len(latencies),
+            "mean_load_ms": statistics.mean(latencies) * 1000,
+            "p95_load_ms": sorted(latencies)[int(len(latencies) * 0.95)] * 1000,
+            "requests_per_page": (len(server.requests) - requests) / len(latencies),
+            "rss_mb": browser_rss(browser) / 1024**2,
+        }
+
+    finally:
+        browser.close()
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = LocalServer()
+    site = SyntheticSite(server, args.pages, args.images, delay=args.delay)
+
+    try:
+        results = {
+            "default": run(Profile(), site),
+            "lean": run(
+                Profile.lean(blocked_hosts=BLOCKED_HOSTS + (THIRD_PARTY_HOST,)), site
+            ),
+        }
+    finally:
+        server.close()
+
+    results["speedup"] = (
+        results["default"]["mean_load_ms"] / results["lean"]["mean_load_ms"]
+    )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
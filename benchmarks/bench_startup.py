@@ -0,0 +1,119 @@
+"""
+benchmarks.bench_startup
+
+Time to the first Browser.open() with an empty and a populated driver manifest,
+and with a cloned profile template
+
+Every run starts a fresh interpreter so imports and driver resolution are measured.
+The cold run starts from an empty manifest, the warm runs reuse the manifest it populated.
+The template runs additionally start from a clone of a pre-built ProfileTemplate.
+
+Usage: python -m benchmarks.bench_startup [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def child(template: str | None = None) -> None:
+    """Start a browser, open a blank page and print the timings as JSON"""
+
+    start = time.perf_counter()
+
+    # pylint: disable=import-outside-toplevel
+    # Importing is part of the measured startup
+    from restr.browser import Browser
+    from restr.browser.template import ProfileTemplate
+
+    imported = time.perf_counter()
+    browser = Browser(
+        headless=True,
+        template=ProfileTemplate(directory=template) if template else None,
+    )
+    started = time.perf_counter()
+    browser.open()
+    opened = time.perf_counter()
+    browser.close()
+
+    print(
+        json.dumps(
+            {
+                "import_ms": (imported - start) * 1000,
+                "start_ms": (started - imported) * 1000,
+                "first_open_ms": (opened - start) * 1000,
+            }
+        )
+    )
+
+
+def measure(manifest: Path, template: Path | None = None) -> dict:
+    """Run child() in a fresh interpreter using the given manifest"""
+
+    env = dict(os.environ, RESTR_DRIVER_MANIFEST=str(manifest))
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--child"]
+    if template:
+        command += ["--template", str(template)]
+
+    output = subprocess.run(
+        command,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--template", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.template)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="restr-bench-") as directory:
+        manifest = Path(directory, "drivers.json")
+
+        cold = measure(manifest)
+        warm = [measure(manifest) for _ in range(args.runs)]
+
+        # Build the template outside of the measured runs
+        # pylint: disable=import-outside-toplevel
+        # Importing at the top would preload restr.browser in the children
+        from restr.browser.template import ProfileTemplate
+
+        templates = Path(directory, "profiles")
+        os.environ["RESTR_DRIVER_MANIFEST"] = str(manifest)
+        ProfileTemplate(directory=templates).build()
+        template = [measure(manifest, templates) for _ in range(args.runs)]
+
+    results = {
+        "cold": cold,
+        "warm": {
+            key: statistics.median(run[key] for run in warm) for key in cold.keys()
+        },
+        "template": {
+            key: statistics.median(run[key] for run in template) for key in cold.keys()
+        },
+        "runs": args.runs,
+    }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+benchmarks.bench_tracing
+
+Overhead per WebDriver command of an instrumented driver with tracing off,
+with histograms only and with every command exported as a span
+
+Usage: python -m benchmarks.bench_tracing [--commands N]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from restr.browser.tracing import Tracer
+
+
+class NullDriver:
+    """Driver whose commands return immediately"""
+
+    def execute(self, command: str, params: dict | None = None) -> dict:
+        """Answer a command"""
+        return {"value": None}
+
+
+def run(driver: NullDriver, commands: int) -> float:
+    """Microseconds per command inside a page span"""
+
+    start = time.perf_counter()
+    for _ in range(commands):
+        driver.execute("executeScript", {"script": "return 1"})
+    return (time.perf_counter() - start) / commands * 1_000_000
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=200_000)
+    args = parser.parse_args()
+
+    results = {
+        "commands": args.commands,
+        "baseline_us": run(NullDriver(), args.commands),
+    }
+
+    with tempfile.TemporaryDirectory(prefix="restr-bench-") as directory:
+        tracer = Tracer(Path(directory, "trace.jsonl"), enabled=False)
+        driver = tracer.instrument(NullDriver())
+        results["off_us"] = run(driver, args.commands)
+
+        tracer.commands = False
+        tracer.enable()
+        with tracer.span("page", url="http://example.com/"):
+            results["histograms_us"] = run(driver, args.commands)
+
+        tracer.commands = True
+        with tracer.span("page", url="http://example.com/"):
+            results["spans_us"] = run(driver, args.commands)
+
+        tracer.close()
+
+    for key in ("off", "histograms", "spans"):
+        results[f"{key}_overhead_us"] = results[f"{key}_us"] - results["baseline_us"]
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
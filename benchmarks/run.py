@@ -0,0 +1,350 @@
+"""
+benchmarks.run
+
+End-to-end throughput of every crawl path against the local SyntheticSite
+
+Measures cold and warm browser startup, and pages/sec, p50/p95/p99 navigation
+latency and peak RSS of the whole process tree for Browser.open(),
+Window.open(), CrawlEngine and HttpBrowser. Results are written as JSON with
+the commit they were measured on, --compare prints the ratios to an earlier
+result file.
+
+Usage: python -m benchmarks.run [--paths PATH ...] [--pages N] [--output FILE]
+       [--compare FILE]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import psutil
+
+from benchmarks.bench_startup import measure
+from tests.fixtures.server import LocalServer
+from tests.fixtures.site import SyntheticSite
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metrics compared by --compare, True if higher is better
+COMPARED = {
+    "pages_per_sec": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+class PeakRSS:
+    """
+    Samples the resident memory of this process and its children in a thread
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between samples, by default 0.05.
+        """
+
+        self.interval: float = interval
+        self.peak: int = 0
+
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+
+    def __enter__(self) -> "PeakRSS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _sample_loop(self) -> None:
+        """Sample until stopped"""
+
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        """Record the current RSS of the process tree"""
+
+        total = 0
+        for process in [self._process, *self._process.children(recursive=True)]:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+
+        self.peak = max(self.peak, total)
+
+
+def summarize(latencies: list[float], elapsed: float, rss: PeakRSS) -> dict:
+    """Throughput, latency percentiles in ms and peak RSS of a run"""
+
+    results = {
+        "pages": len(latencies),
+        "elapsed": elapsed,
+        "pages_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": rss.peak / 2**20,
+    }
+
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        for percent in (50, 95, 99):
+            results[f"p{percent}_ms"] = cuts[percent - 1] * 1000
+
+    return results
+
+
+def bench_browser(site: SyntheticSite, args: argparse.Namespace) -> dict:
+    """Open every page with Browser.open()"""
+
+    # pylint: disable=import-outside-toplevel
+    # Selenium is only imported by the paths that need it
+    from restr.browser import Browser
+
+    with PeakRSS() as rss:
+        browser = Browser(headless=True)
+        try:
+            latencies = []
+            start = time.perf_counter()
+            for url in site.urls:
+                opened = time.perf_counter()
+                browser.open(url)
+                latencies.append(time.perf_counter() - opened)
+            elapsed = time.perf_counter() - start
+        finally:
+            browser.close()
+
+    return summarize(latencies, elapsed, rss)
+
+
+def bench_window(site: SyntheticSite, args: argparse.Namespace) -> dict:
+    """Open every page in a reused tab with Window.open()"""
+
+    # pylint: disable=import-outside-toplevel
+    # Selenium is only imported by the paths that need it
+    from restr.browser import Browser
+
+    with PeakRSS() as rss:
+        browser = Browser(headless=True)
+        try:
+            tab = browser.tab()
+            latencies = []
+            start = time.perf_counter()
+            for url in site.urls:
+                opened = time.perf_counter()
+                tab.open(url)
+                latencies.append(time.perf_counter() - opened)
+            elapsed = time.perf_counter() - start
+            browser.release(tab)
+        finally:
+            browser.close()
+
+    return summarize(latencies, elapsed, rss)
+
+
+def bench_engine(site: SyntheticSite, args: argparse.Namespace) -> dict:
+    """Crawl the site from its first page with CrawlEngine"""
+
+    # pylint: disable=import-outside-toplevel
+    # Selenium is only imported by the paths that need it
+    from restr.browser import Browser
+    from restr.crawler import CrawlEngine
+
+    latencies = []
+
+    with PeakRSS() as rss:
+        browser = Browser(headless=True)
+        try:
+            engine = CrawlEngine(
+                browser,
+                tabs=args.tabs,
+                # Quiet for longer than the sections take to be rendered
+                network_idle=site.render_delay + 0.05 if site.rendered else None,
+                on_page=lambda result: latencies.append(result.elapsed),
+            )
+            stats = engine.crawl(site.urls[0])
+        finally:
+            browser.close()
+
+    results = summarize(latencies, stats.elapsed, rss)
+    results["errors"] = stats.errors
+    return results
+
+
+def bench_http(site: SyntheticSite, args: argparse.Namespace) -> dict:
+    """Fetch every page and JSON endpoint with HttpBrowser.open_many()"""
+
+    # pylint: disable=import-outside-toplevel
+    # Keeps the module importable without the browser dependencies
+    from restr.browser.http_browser import HttpBrowser
+
+    with PeakRSS() as rss:
+        browser = HttpBrowser(max_workers=args.tabs)
+        try:
+            start = time.perf_counter()
+            responses = browser.open_many(site.urls + site.api_urls)
+            elapsed = time.perf_counter() - start
+        finally:
+            browser.close()
+
+    results = summarize([response.elapsed for response in responses], elapsed, rss)
+    results["errors"] = sum(not response.ok for response in responses)
+    return results
+
+
+PATHS: dict[str, Callable[[SyntheticSite, argparse.Namespace], dict]] = {
+    "browser": bench_browser,
+    "window": bench_window,
+    "engine": bench_engine,
+    "http": bench_http,
+}
+
+
+def startup(runs: int) -> dict:
+    """Cold and median warm startup of bench_startup in fresh interpreters"""
+
+    with tempfile.TemporaryDirectory(prefix="restr-bench-") as directory:
+        manifest = Path(directory, "drivers.json")
+
+        cold = measure(manifest)
+        warm = [measure(manifest) for _ in range(runs)]
+
+    return {
+        "cold": cold,
+        "warm": {key: statistics.median(run[key] for run in warm) for key in cold},
+    }
+
+
+def commit() -> tuple[str | None, bool]:
+    """Current git commit and whether the tree has uncommitted changes"""
+
+    def git(*command: str) -> str | None:
+        try:
+            return subprocess.run(
+                ["git", *command],
+                cwd=Path(__file__).parent,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return git("rev-parse", "HEAD"), bool(git("status", "--porcelain", "--", "."))
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Ratios of every compared metric to the baseline, above 1 is better"""
+
+    ratios = {}
+    for path, current in results["paths"].items():
+        previous = baseline.get("paths", {}).get(path, {})
+        for metric, higher in COMPARED.items():
+            if current.get(metric) and previous.get(metric):
+                ratio = current[metric] / previous[metric]
+                ratios.setdefault(path, {})[metric] = ratio if higher else 1 / ratio
+
+    return ratios
+
+
+def main() -> None:
+    """Run the benchmarks, write the results file and print it as JSON"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--api", type=int, default=10)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--rendered", type=int, default=1)
+    parser.add_argument("--render-delay", type=float, default=0.0)
+    parser.add_argument("--tabs", type=int, default=4)
+    parser.add_argument("--startup-runs", type=int, default=3, help="0 to skip")
+    parser.add_argument("--output", type=Path, help="default results/<commit>.json")
+    parser.add_argument("--compare", type=Path, help="earlier results file")
+    args = parser.parse_args()
+
+    revision, dirty = commit()
+    results = {
+        "commit": revision,
+        "dirty": dirty,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "site": {
+            "pages": args.pages,
+            "fanout": args.fanout,
+            "api": args.api,
+            "images": args.images,
+            "latency": args.latency,
+            "rendered": args.rendered,
+            "render_delay": args.render_delay,
+        },
+        "paths": {},
+    }
+
+    if args.startup_runs:
+        try:
+            results["startup"] = startup(args.startup_runs)
+        except subprocess.CalledProcessError as error:
+            lines = (error.stderr or "").strip().splitlines()
+            results["startup"] = {
+                "error": lines[-1] if lines else f"exit status {error.returncode}"
+            }
+
+    server = LocalServer()
+    site = SyntheticSite(
+        server,
+        args.pages,
+        args.images,
+        fanout=args.fanout,
+        api=args.api,
+        latency=args.latency,
+        rendered=args.rendered,
+        render_delay=args.render_delay,
+    )
+
+    try:
+        for path in args.paths:
+            # A path failing, e.g. without Firefox, does not stop the others
+            try:
+                results["paths"][path] = PATHS[path](site, args)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                results["paths"][path] = {"error": f"{type(error).__name__}: {error}"}
+    finally:
+        server.close()
+
+    if args.compare:
+        results["compare"] = compare(results, json.loads(args.compare.read_text()))
+
+    output = args.output or RESULTS_DIR / f"{(revision or 'unknown')[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print(json.dumps(results, indent=2))
+
+    failed = [path for path, result in results["paths"].items() if "error" in result]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
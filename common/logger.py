@@ -4,10 +4,19 @@ common.logger
 Logger Class File
 """
 
+import atexit
+import gzip
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-
+from typing import Iterator
 
 # Define logs directory
 LOG_DIR = Path(__file__).resolve().parents[1].joinpath("logs")
@@ -15,6 +24,238 @@ LOG_DIR = Path(__file__).resolve().parents[1].joinpath("logs")
 # Cache all instantiated loggers
 loggers: dict[str, logging.Logger] = {}
 
+# Listeners of queue-backed loggers by logger name
+listeners: dict[str, "QueueListener"] = {}
+
+
+class _Batched:
+    """Handler mixin that defers flushing while a batch of records is written"""
+
+    _deferred: bool = False
+
+    def flush(self) -> None:
+        """Flush unless a batch is being written"""
+        if not self._deferred:
+            super().flush()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Write the records handled in this context with a single flush"""
+
+        self._deferred = True
+        try:
+            yield
+        finally:
+            self._deferred = False
+            self.flush()
+
+
+class StreamHandler(_Batched, logging.StreamHandler):
+    """StreamHandler that can write batches of records"""
+
+
+class RotatingFileHandler(_Batched, logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler Class
+
+    Rotates the log file once it reaches max_bytes or is older than interval
+    seconds, keeping backup_count rotated files, optionally gzip compressed.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        max_bytes: int = 0,
+        interval: float | None = None,
+        backup_count: int = 5,
+        compress: bool = False,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        filename : Path
+            Log file
+
+        max_bytes : int, optional
+            Size to rotate at, by default 0 (never by size).
+
+        interval : float, optional
+            Seconds to rotate after, by default None (never by age).
+
+        backup_count : int, optional
+            Number of rotated files to keep, by default 5.
+
+        compress : bool, optional
+            Gzip rotated files, by default False.
+        """
+
+        super().__init__(
+            filename,
+            maxBytes=max_bytes,
+            backupCount=max(backup_count, 1),
+            encoding="utf-8",
+            delay=True,
+        )
+
+        self.interval: float | None = interval
+        self.rollover_at: float = self._next_rollover(
+            os.stat(filename).st_mtime if os.path.exists(filename) else time.time()
+        )
+
+        if compress:
+            self.namer = lambda name: f"{name}.gz"
+            self.rotator = self._compress
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Rotate by age as well as by size"""
+
+        if self.interval is not None and time.time() >= self.rollover_at:
+            return True
+
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        """Rotate the file and schedule the next rotation by age"""
+
+        super().doRollover()
+        self.rollover_at = self._next_rollover(time.time())
+
+    def _next_rollover(self, start: float) -> float:
+        """Time of the next rotation by age"""
+        return start + self.interval if self.interval is not None else float("inf")
+
+    @staticmethod
+    def _compress(source: str, destination: str) -> None:
+        """Gzip the rotated file"""
+
+        with open(source, "rb") as file, gzip.open(destination, "wb") as archive:
+            shutil.copyfileobj(file, archive)
+        os.remove(source)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    Records never leave the process, so they are queued as they are instead of
+    being copied and formatted on the calling thread. Arguments are formatted
+    when the record is written and must not be mutated after the log call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class QueueListener:
+    """
+    QueueListener Class
+
+    Passes the records of a QueueHandler to handlers on a background thread.
+    Records that are waiting when the thread wakes up are written as one batch
+    with a single flush per handler.
+    """
+
+    _STOP = None
+
+    def __init__(
+        self,
+        records: queue.SimpleQueue,
+        *handlers: logging.Handler,
+        batch_size: int = 512,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        records : queue.SimpleQueue
+            Queue the QueueHandler puts records on
+
+        handlers : logging.Handler
+            Handlers to pass the records to
+
+        batch_size : int, optional
+            Maximum number of records per batch, by default 512.
+        """
+
+        self.queue: queue.SimpleQueue = records
+        self.handlers: tuple[logging.Handler, ...] = handlers
+        self.batch_size: int = batch_size
+
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the listener thread"""
+
+        self._thread = threading.Thread(
+            target=self._monitor, name="restr-logger", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write all queued records, stop the listener thread and close its handlers"""
+
+        if self._thread is None:
+            return
+
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+        for handler in self.handlers:
+            handler.close()
+
+    def _monitor(self) -> None:
+        """Listener thread loop"""
+
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._STOP in batch
+            self._handle([record for record in batch if record is not self._STOP])
+
+            if stop:
+                return
+
+    def _handle(self, records: list[logging.LogRecord]) -> None:
+        """Pass a batch of records to every handler"""
+
+        for handler in self.handlers:
+            with handler.batch() if isinstance(handler, _Batched) else nullcontext():
+                for record in records:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+
+@atexit.register
+def stop_listeners() -> None:
+    """
+    Write the queued records of all queue-backed loggers
+
+    Notes
+    -----
+    The loggers are detached from their queue and uncached, so records are
+    never queued without a listener. Getting the logger again starts a new one.
+    """
+
+    for name, listener in list(listeners.items()):
+        del listeners[name]
+
+        # Detach first, records logged meanwhile are still written
+        logger = loggers.pop(name, None) or logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+                logger.removeHandler(handler)
+
+        listener.stop()
+
 
 # pylint: disable = too-many-instance-attributes, too-many-arguments, too-few-public-methods
 # Logger Class needs to have many instance attributes for modularity
@@ -31,6 +272,11 @@ class Logger:
         level: int = logging.DEBUG,
         file_level: int = None,
         stream_level: int = None,
+        use_queue: bool = False,
+        max_bytes: int = 10 * 1024**2,
+        rotate_interval: float | None = None,
+        backup_count: int = 5,
+        compress: bool = False,
     ) -> None:
         """
         Logger Class Constructor
@@ -57,7 +303,28 @@ class Logger:
             Stream Handler Level, by default None.
             Inherits from Logger Level if None.
 
+        use_queue : bool, optional
+            Log through a queue, handlers write on a background thread, by default False.
+
+        max_bytes : int, optional
+            Rotate the log file at this size, by default 10 MiB. 0 disables it.
+
+        rotate_interval : float, optional
+            Rotate the log file after this many seconds, by default None (never).
+
+        backup_count : int, optional
+            Number of rotated log files to keep, by default 5.
+
+        compress : bool, optional
+            Gzip rotated log files, by default False.
+
         Returns None
+
+        Notes
+        -----
+        Queue-backed loggers only enqueue the record on the calling thread.
+        Queued records are written on exit, or by stop_listeners(), after which
+        the logger has no handlers until it is got again.
         """
 
         # Parameters
@@ -67,6 +334,11 @@ class Logger:
         self.file_level: int = file_level if file_level else level
         self.stream_level: int = stream_level if stream_level else level
         self.level: int = min(self.file_level, self.stream_level)
+        self.use_queue: bool = use_queue
+        self.max_bytes: int = max_bytes
+        self.rotate_interval: float | None = rotate_interval
+        self.backup_count: int = backup_count
+        self.compress: bool = compress
 
         # Get root name if name is child
         self.root_name = self.name.split(".")[0]
@@ -90,7 +362,6 @@ class Logger:
         # Check if logger already exists
         if self.name in loggers:
             logger = loggers[self.name]
-            logger.info(f"Getting logger: {self.name}")
 
         # Create logger
         else:
@@ -142,6 +413,21 @@ class Logger:
         :return None
         """
 
+        # Pass records through a queue to handlers on the listener thread
+        if self.use_queue:
+            if self.name not in listeners:
+                handlers = []
+                if self.add_file_handler:
+                    handlers.append(self.__create_file_handler())
+                if self.add_stream_handler:
+                    handlers.append(self.__create_stream_handler())
+
+                records = queue.SimpleQueue()
+                listeners[self.name] = QueueListener(records, *handlers)
+                listeners[self.name].start()
+                logger.addHandler(QueueHandler(records))
+            return
+
         # Get all handlers already added to logger
         _file_handlers = [
             handler
@@ -168,7 +454,13 @@ class Logger:
         :return: File Handler Object
         """
 
-        file_handler = logging.FileHandler(filename=self.filename)
+        file_handler = RotatingFileHandler(
+            filename=self.filename,
+            max_bytes=self.max_bytes,
+            interval=self.rotate_interval,
+            backup_count=self.backup_count,
+            compress=self.compress,
+        )
         file_handler.setLevel(self.file_level)
         file_handler.setFormatter(self.formatter)
 
@@ -180,7 +472,7 @@ class Logger:
         :return: Stream Handler Object
         """
 
-        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler = StreamHandler(sys.stdout)
         stream_handler.setLevel(self.stream_level)
         stream_handler.setFormatter(self.formatter)
 
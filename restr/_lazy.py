@@ -0,0 +1,49 @@
+"""
+restr._lazy
+
+Lazy attributes of packages, so importing a package does not import the
+dependencies of all of its modules
+"""
+
+import sys
+from importlib import import_module
+from typing import Any, Callable
+
+
+def lazy(
+    name: str, modules: dict[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Get the module __getattr__ and __dir__ of a package with lazy attributes
+
+    Parameters
+    ----------
+    name : str
+        Package name, i.e. __name__
+
+    modules : dict[str, str]
+        Module of every lazy attribute, relative to the package,
+        e.g. {"Browser": ".browser"}
+
+    Returns
+    -------
+    tuple[Callable, Callable] : __getattr__ and __dir__ of the package
+
+    Notes
+    -----
+    An attribute's module is imported on its first access and the attribute
+    is stored in the package, later accesses do not call __getattr__.
+    """
+
+    def __getattr__(attribute: str) -> Any:
+        if attribute not in modules:
+            raise AttributeError(f"module {name!r} has no attribute {attribute!r}")
+
+        value = getattr(import_module(modules[attribute], name), attribute)
+        setattr(sys.modules[name], attribute, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[name])) | set(modules))
+
+    return __getattr__, __dir__
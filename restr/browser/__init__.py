@@ -1,3 +1,23 @@
 """restr.browser"""
 
-from .browser import Browser
+from typing import TYPE_CHECKING
+
+from restr._lazy import lazy
+
+if TYPE_CHECKING:
+    from .browser import Browser
+    from .http_browser import HttpBrowser
+    from .pool import BrowserPool
+
+__all__ = ["Browser", "BrowserPool", "HttpBrowser"]
+
+# Modules of the public classes, imported on first access so importing
+# restr.browser does not import selenium
+__getattr__, __dir__ = lazy(
+    __name__,
+    {
+        "Browser": ".browser",
+        "BrowserPool": ".pool",
+        "HttpBrowser": ".http_browser",
+    },
+)
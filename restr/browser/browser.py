@@ -5,11 +5,21 @@ Browser Class File
 Handles browser window and tab instances
 """
 
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver import Firefox, FirefoxOptions
 
+from restr.browser.cache import ResponseCache
+from restr.browser.capture import CaptureLog, CaptureProxy, PageRecorder
+from restr.browser.extract import PageData, extract
+from restr.browser.profile import Profile
+from restr.browser.ready import READY_PREFERENCES, wait_until_ready
+from restr.browser.registry import WindowRegistry
+from restr.browser.template import ProfileTemplate
 from restr.browser.webdriver import WebDriver
 from restr.browser.window import Window
-from restr.browser.browser_base import BrowserBase
+from restr.browser.browser_base import USER_AGENT, BrowserBase
 
 
 class Browser(BrowserBase):
@@ -17,7 +27,18 @@ class Browser(BrowserBase):
     Browser Class
     """
 
-    def __init__(self, *args, headless: bool = False, **kwargs) -> None:
+    def __init__(
+        self,
+        *args,
+        headless: bool = False,
+        capture: str | Path | CaptureLog | None = None,
+        capture_bodies: bool = False,
+        profile: Profile | str | None = None,
+        template: ProfileTemplate | None = None,
+        max_windows: int = 8,
+        cache: ResponseCache | str | Path | None = None,
+        **kwargs,
+    ) -> None:
         """
         Constructor
 
@@ -26,13 +47,67 @@ class Browser(BrowserBase):
         headless : bool, optional
             Run browser in headless mode, by default False
 
+        capture : str | Path | CaptureLog, optional
+            Record every request of the browser to this log, by default None.
+
+        capture_bodies : bool, optional
+            Store response bodies in the capture log, by default False.
+
+        profile : Profile | str, optional
+            Profile or profile name, e.g. "lean", by default None (Firefox defaults).
+
+        template : ProfileTemplate, optional
+            Start from a clone of this template instead of a new profile, by default None.
+            The clone is removed on close().
+
+        max_windows : int, optional
+            Maximum number of open tabs, least recently used idle tabs are
+            closed beyond it, by default 8.
+
+        cache : ResponseCache | str | Path, optional
+            Cache or cache directory for plain http:// responses only, by
+            default None. Served through the local CaptureProxy. A cache
+            created from a directory is closed on close().
+
         Notes
         -----
         This method will open a new browser window with a blank page.
+        Capturing routes the browser through a local CaptureProxy. The proxy
+        records plain HTTP, the fetch and XMLHttpRequest calls of HTTPS are
+        recorded from inside the pages by a PageRecorder, see CaptureProxy.
+        Its extension records them from before the page scripts run. Firefox
+        before 128 cannot run it in the page, calls made during the page load
+        are then only backfilled from Resource Timing and marked as such.
+
+        The cache does not apply to https:// pages or their resources, the
+        proxy only tunnels HTTPS and never sees the responses. To cache
+        HTTPS, fetch the URLs with HttpBrowser(cache=) instead.
         """
 
         super().__init__(*args, **kwargs)
 
+        # Start the capture proxy before the browser so it is used from the start
+        self.capture: CaptureProxy | None = None
+        self._capture_log_owned: bool = False
+        if capture is not None and not isinstance(capture, CaptureLog):
+            capture = CaptureLog(capture)
+            self._capture_log_owned = True
+
+        self._cache_owned: bool = False
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache)
+            self._cache_owned = True
+        self.cache: ResponseCache | None = cache
+
+        if capture is not None or cache is not None:
+            self.capture = CaptureProxy(
+                capture, store_bodies=capture_bodies, cache=self.cache
+            )
+
+        # The proxy does not see inside HTTPS, record its requests in the pages
+        if self.recorder is None and capture is not None:
+            self.recorder = PageRecorder(self.capture)
+
         # Create WebDriver instance
         self.driver: WebDriver = WebDriver()
 
@@ -41,23 +116,82 @@ class Browser(BrowserBase):
         self.options.headless = headless
         self.options.add_argument("--disable-blink-features=AutomationControlled")
 
+        # Use the recorded Firefox binary instead of searching for it
+        if self.driver.firefox_path:
+            self.options.binary_location = self.driver.firefox_path
+
+        # Clone the profile template, Firefox uses the clone in place
+        self.profile_dir: Path | None = None
+        if template is not None:
+            self.profile_dir = template.clone()
+            self.options.add_argument("-profile")
+            self.options.add_argument(str(self.profile_dir))
+
         # Set User Agent to Firefox
-        self.options.set_preference(
-            "general.useragent.override",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:105.0) Gecko/20100101 Firefox/105.0",
+        self.options.set_preference("general.useragent.override", USER_AGENT)
+
+        # Keep readiness timers of background tabs precise
+        for name, value in READY_PREFERENCES.items():
+            self.options.set_preference(name, value)
+
+        # Route all traffic through the capture proxy
+        if self.capture is not None:
+            for name, value in self.capture.preferences.items():
+                self.options.set_preference(name, value)
+
+        # Apply the profile, its host blocking still routes through the capture proxy
+        self.profile: Profile = (
+            Profile.get(profile) if isinstance(profile, str) else profile or Profile()
+        )
+        self.profile.apply(
+            self.options, proxy=self.capture.address if self.capture else None
         )
 
+        # Number of times Firefox was restarted by restart()
+        self.restarts: int = 0
+
         # Create browser
-        self.browser: Firefox = Firefox(
-            service=self.driver.service, options=self.options
-        )
+        self.browser: Firefox
+        self.windows: WindowRegistry
+        self._launch(max_windows)
+
+    def _launch(self, max_windows: int) -> None:
+        """Start Firefox with the options and register its first window"""
+
+        with self._span("startup") as span:
+            self.browser = Firefox(service=self.driver.service, options=self.options)
+        if span is not None:
+            self.tracer.record("startup", span.duration)
+
+        # Time every command sent from here on
+        if self.tracer is not None:
+            self.tracer.instrument(self.browser)
+
+        self.profile.configure(self.browser)
+
+        # Record the requests of every page from before its scripts run
+        if self.recorder is not None:
+            self.recorder.install(self.browser)
 
         # Store Window instances
-        self.windows: dict[str, Window] = {
-            self.browser.current_window_handle: Window(
-                browser=self.browser, handle=self.browser.current_window_handle
+        self.windows = WindowRegistry(
+            self.browser,
+            max_windows,
+            endpoints=self.endpoints,
+            rate=self.rate,
+            tracer=self.tracer,
+            recorder=self.recorder,
+        )
+        self.windows.add(
+            Window(
+                browser=self.browser,
+                handle=self.browser.current_window_handle,
+                endpoints=self.endpoints,
+                rate=self.rate,
+                tracer=self.tracer,
+                recorder=self.recorder,
             )
-        }
+        )
 
     # pylint: disable=arguments-differ
     # Overriding method from BrowserBase
@@ -79,21 +213,232 @@ class Browser(BrowserBase):
         # Format url if provided. Set open blank page if not.
         url = self._format_url(url) if url else "about:blank"
 
+        # Record the requests of the page that is left
+        self._record(self.browser)
+
         # Open an empty browser
-        self.browser.get(url)
+        with self._span("page", url=url), self._limit(url):
+            self.browser.get(url)
+        self._observe(self.browser.current_url)
+        self._record(self.browser)
 
-        # Create Window instance
+        # Get or create the Window instance
         window_handle = self.browser.current_window_handle
-        window = Window(handle=window_handle, browser=self.browser)
+        window = self.windows.get(window_handle) or Window(
+            handle=window_handle,
+            browser=self.browser,
+            endpoints=self.endpoints,
+            rate=self.rate,
+            tracer=self.tracer,
+            recorder=self.recorder,
+        )
+
+        # Store Window instance as most recently used
+        self.windows.add(window)
+
+        return window_handle
+
+    def tab(self, url: str | None = None) -> Window:
+        """
+        Get a tab showing a URL
+
+        Parameters
+        ----------
+        url : str, optional
+            URL to open, by default None (blank page).
+
+        Returns
+        -------
+        Window : Tab, reused from an idle tab if possible
+
+        Notes
+        -----
+        The tab is not evicted until it is passed to release().
+        """
+
+        return self.windows.acquire(url)
+
+    def release(self, window: Window) -> None:
+        """
+        Release a tab returned by tab()
+
+        Parameters
+        ----------
+        window : Window
+            Tab to release
+        """
+
+        self.windows.release(window)
+
+    def memory(self) -> dict[str, int | None]:
+        """
+        Get the memory of every tab
+
+        Returns
+        -------
+        dict[str, int | None] : Resident bytes of each tab's content process
+            by handle, None where Firefox does not expose it
+        """
 
-        # Store Window instance
-        self.windows[window_handle] = window
+        return self.windows.memory()
+
+    def wait_until_ready(
+        self,
+        dom_stable: float | None = None,
+        network_idle: float | None = None,
+        predicate: str | None = None,
+        timeout: float = 30.0,
+    ) -> bool:
+        """
+        Wait until the current page is ready
+
+        Parameters
+        ----------
+        dom_stable : float, optional
+            Seconds without DOM mutations, by default None (not required).
+
+        network_idle : float, optional
+            Seconds without requests in flight, by default None (not required).
+
+        predicate : str, optional
+            JavaScript expression that must be truthy, by default None (not required).
+
+        timeout : float, optional
+            Seconds to wait, by default 30.
+
+        Returns
+        -------
+        bool : True if the page became ready, False on timeout
+
+        Notes
+        -----
+        open() already waits for the load event, use this to wait for pages
+        that keep rendering after it, e.g. browser.wait_until_ready(network_idle=0.5).
+        """
+
+        return wait_until_ready(
+            self.browser, dom_stable, network_idle, predicate, timeout
+        )
+
+    def extract(self) -> PageData:
+        """
+        Extract links, forms, frames and API hints of the current page
+
+        Returns
+        -------
+        PageData : Extracted data
+
+        Notes
+        -----
+        Uses a single WebDriver call regardless of the page size.
+        """
+
+        self._record(self.browser)
+        return extract(self.browser)
+
+    def reset(self) -> str:
+        """
+        Reset Browser state
+
+        Closes every window except one, clears cookies, local and session storage
+        and navigates the remaining window to a blank page.
+
+        Returns
+        -------
+        str: Remaining Window Handle
+
+        Notes
+        -----
+        Used by BrowserPool to hand out a clean browser between leases.
+        """
+
+        handles = self.browser.window_handles
+
+        # Close all extra windows
+        for handle in handles[1:]:
+            self.browser.switch_to.window(handle)
+            self.browser.close()
+
+        # Switch to the remaining window
+        window_handle = handles[0]
+        self.browser.switch_to.window(window_handle)
+
+        # Clear storage before leaving the page, storage is scoped to the origin
+        self.browser.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); }"
+            " catch (e) {}"
+        )
+        self.browser.delete_all_cookies()
+        self.browser.get("about:blank")
+
+        # Only keep the remaining Window instance
+        self.windows.sync()
+        self.windows.release(self.windows[window_handle])
 
         return window_handle
 
+    def restart(self) -> list[str]:
+        """
+        Restart Firefox and re-open the URLs of its windows
+
+        Returns
+        -------
+        list[str]: Re-opened URLs, the first in the first window
+
+        Notes
+        -----
+        Uses the same options, profile and capture proxy. Window instances of the
+        old session are replaced, get them from windows again. If the old session
+        is unresponsive no URLs are re-opened.
+        """
+
+        urls = []
+        try:
+            for handle in self.browser.window_handles:
+                self.browser.switch_to.window(handle)
+                urls.append(self.browser.current_url)
+        except WebDriverException:
+            urls = []
+
+        try:
+            self.browser.quit()
+        except WebDriverException:
+            pass
+
+        self._launch(self.windows.max_windows)
+        self.restarts += 1
+
+        for index, url in enumerate(urls):
+            if index == 0:
+                with self._span("page", url=url), self._limit(url):
+                    self.browser.get(url)
+            else:
+                window = Window(
+                    browser=self.browser,
+                    endpoints=self.endpoints,
+                    rate=self.rate,
+                    tracer=self.tracer,
+                    recorder=self.recorder,
+                )
+                window.open(url)
+                self.windows.add(window)
+
+        return urls
+
     # pylint: disable=arguments-differ
     # Overriding method from BrowserBase
     def close(self) -> None:
         """Close Browser"""
 
         self.browser.quit()
+
+        if self.capture is not None:
+            self.capture.close()
+            if self._capture_log_owned:
+                self.capture.log.close()
+
+        if self._cache_owned:
+            self.cache.close()
+
+        if self.profile_dir is not None:
+            ProfileTemplate.remove(self.profile_dir)
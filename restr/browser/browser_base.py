@@ -5,15 +5,63 @@ BrowserBase Class File
 """
 
 from abc import ABC
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, ContextManager, Iterator
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    from restr.browser.capture import PageRecorder
+    from restr.crawler.endpoints import EndpointMap
+    from restr.browser.tracing import Span, Tracer
+    from restr.crawler.ratelimit import RateController, Slot
+
+# Schemes of URLs that are opened without a network request
+LOCAL_SCHEMES = ("about:", "data:", "file:")
+
+# User-Agent sent by every browser backend
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:105.0) Gecko/20100101 Firefox/105.0"
+)
 
 
 class BrowserBase(ABC):
     """Browser Abstract Base Class"""
 
-    def __init__(self, *args, **kwargs) -> None:
-        """Constructor"""
+    def __init__(
+        self,
+        *args,
+        endpoints: "EndpointMap | None" = None,
+        rate: "RateController | None" = None,
+        tracer: "Tracer | None" = None,
+        recorder: "PageRecorder | None" = None,
+        **kwargs,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        endpoints : EndpointMap, optional
+            Records every opened URL, by default None.
+
+        rate : RateController, optional
+            Limits the requests in flight per host, by default None.
+
+        tracer : Tracer, optional
+            Times WebDriver commands and opened pages, by default None.
+
+        recorder : PageRecorder, optional
+            Records the HTTPS requests of opened pages, by default None.
+        """
+
         super().__init__(*args, **kwargs)
 
+        self.endpoints: "EndpointMap | None" = endpoints
+        self.rate: "RateController | None" = rate
+        self.tracer: "Tracer | None" = tracer
+        self.recorder: "PageRecorder | None" = recorder
+
     def open(self, *args, **kwargs):
         """Open"""
         raise NotImplementedError
@@ -22,11 +70,106 @@ class BrowserBase(ABC):
         """Close"""
         raise NotImplementedError
 
+    def _observe(
+        self, url: str, method: str = "GET", status: int | None = None
+    ) -> None:
+        """
+        Record an opened URL in the endpoint map
+
+        Parameters
+        ----------
+        url : str
+            Opened URL
+
+        method : str, optional
+            HTTP method, by default "GET".
+
+        status : int, optional
+            HTTP status code, by default None.
+
+        Notes
+        -----
+        This is a protected method.
+        """
+
+        if self.endpoints is not None:
+            self.endpoints.add(url, method, status)
+
+    def _record(self, driver: "WebDriver") -> None:
+        """
+        Write the requests the current page made since the last call
+
+        Parameters
+        ----------
+        driver : WebDriver
+            Selenium driver switched to the page
+
+        Notes
+        -----
+        This is a protected method.
+        """
+
+        if self.recorder is not None:
+            self.recorder.collect(driver)
+
+    @contextmanager
+    def _limit(self, url: str) -> Iterator["Slot | None"]:
+        """
+        Hold a slot of the rate controller while a URL is requested
+
+        Parameters
+        ----------
+        url : str
+            Requested URL
+
+        Yields
+        ------
+        Slot | None : Slot to report the response on, None without a controller
+
+        Notes
+        -----
+        This is a protected method.
+        """
+
+        if self.rate is None or not url.startswith("http"):
+            with nullcontext() as slot:
+                yield slot
+            return
+
+        with self.rate.slot(url) as slot:
+            yield slot
+
+    def _span(self, name: str, **attributes) -> ContextManager["Span | None"]:
+        """
+        Time a block as a span of the tracer
+
+        Parameters
+        ----------
+        name : str
+            Operation, e.g. "page"
+
+        **attributes
+            Span attributes
+
+        Returns
+        -------
+        ContextManager[Span | None] : Span, None without an enabled tracer
+
+        Notes
+        -----
+        This is a protected method.
+        """
+
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
     @staticmethod
     def _format_url(url: str) -> str:
         """
         Format URL
         If URL does not start with http:// or https://, then https:// will be added.
+        Local URLs, e.g. about:blank, are returned unchanged.
 
         Parameters
         ----------
@@ -42,7 +185,7 @@ class BrowserBase(ABC):
         This is a protected method.
         """
 
-        if not url.startswith("http"):
+        if not url.startswith(("http", *LOCAL_SCHEMES)):
             url = f"https://{url}"
 
         return url
@@ -0,0 +1,670 @@
+"""
+restr.browser.cache
+
+ResponseCache Class File
+Persistent HTTP response cache with content-addressed bodies and revalidation
+"""
+
+import email.utils
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from restr.urls import TRACKING_PARAMS, canonicalize
+
+CACHE_DIR = Path(
+    os.environ.get("RESTR_CACHE_DIR", Path.home().joinpath(".cache", "restr"))
+).joinpath("responses")
+
+# Request headers that select a different response by default
+VARY_HEADERS = ("accept", "accept-encoding", "accept-language", "authorization")
+
+# Statuses whose responses are stored
+CACHEABLE_STATUSES = (200, 203, 204, 300, 301, 308, 404, 410)
+
+# Headers of a 304 response that update the stored response
+_REVALIDATED_HEADERS = ("cache-control", "date", "etag", "expires", "last-modified")
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*\"?(\d+)", re.I)
+
+# Status, reason, headers and body
+Fetched = tuple[int, str, dict[str, str], bytes]
+
+
+class CacheEntry:
+    """
+    Stored response
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        key: str,
+        url: str,
+        status: int,
+        reason: str,
+        headers: dict[str, str],
+        digest: str,
+        size: int,
+        stored: float,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+
+        url : str
+            Requested URL
+
+        status : int
+            Response status code
+
+        reason : str
+            Response reason phrase
+
+        headers : dict[str, str]
+            Response headers with lowercase names
+
+        digest : str
+            SHA-256 of the body
+
+        size : int
+            Body size in bytes
+
+        stored : float
+            Time the response was stored or last revalidated
+        """
+
+        self.key: str = key
+        self.url: str = url
+        self.status: int = status
+        self.reason: str = reason
+        self.headers: dict[str, str] = headers
+        self.digest: str = digest
+        self.size: int = size
+        self.stored: float = stored
+
+        # Read from the blob store by ResponseCache.lookup()
+        self.body: bytes | None = None
+
+    def __repr__(self) -> str:
+        return f"<CacheEntry {self.status} {self.url} ({self.size} bytes)>"
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers that revalidate the entry"""
+
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def is_fresh(self, default_ttl: float | None = None) -> bool:
+        """
+        Check if the entry can be used without revalidation
+
+        Parameters
+        ----------
+        default_ttl : float, optional
+            Seconds a response without freshness headers is fresh, by default None.
+
+        Returns
+        -------
+        bool : True if max-age, Expires or the default TTL has not passed
+        """
+
+        control = self.headers.get("cache-control", "").lower()
+        if "no-cache" in control:
+            return False
+
+        age = time.time() - self.stored
+
+        if match := _MAX_AGE.search(control):
+            return age < int(match.group(1))
+
+        if "expires" in self.headers:
+            expires = _parse_date(self.headers["expires"])
+            date = _parse_date(self.headers.get("date", "")) or self.stored
+            return expires is not None and age < expires - date
+
+        return default_ttl is not None and age < default_ttl
+
+
+def _parse_date(value: str) -> float | None:
+    """Timestamp of an HTTP date, None if invalid"""
+
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+# pylint: disable=too-many-instance-attributes
+# ResponseCache tracks its database, blob store and counters
+class ResponseCache:
+    """
+    ResponseCache Class
+
+    Stores responses on disk by canonical URL and the request headers in `vary`.
+
+    Bodies are stored once per SHA-256 digest, identical pages and API
+    responses share a single file. Fresh entries are served without a request,
+    stale entries with an ETag or Last-Modified are revalidated with a
+    conditional request and served from the cache on 304 Not Modified.
+    Least recently (policy "lru") or least frequently (policy "lfu") used
+    entries are evicted once the bodies exceed max_bytes.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = 1024**3,
+        policy: str = "lru",
+        default_ttl: float | None = None,
+        vary: Iterable[str] = VARY_HEADERS,
+        drop_params: Iterable[str] = TRACKING_PARAMS,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        directory : str | Path, optional
+            Cache directory, by default ~/.cache/restr/responses or
+            $RESTR_CACHE_DIR/responses. Reopening it reuses the stored responses.
+
+        max_bytes : int, optional
+            Maximum size of the stored bodies, by default 1 GiB.
+
+        policy : str, optional
+            Eviction policy, "lru" or "lfu", by default "lru".
+
+        default_ttl : float, optional
+            Seconds a response without Cache-Control max-age or Expires is used
+            without revalidation, by default None (always revalidated).
+
+        vary : Iterable[str], optional
+            Request headers that are part of the key, by default VARY_HEADERS.
+
+        drop_params : Iterable[str], optional
+            Query parameters removed from the key, by default TRACKING_PARAMS.
+        """
+
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+
+        self.directory: Path = Path(directory) if directory else CACHE_DIR
+        self.blob_dir: Path = self.directory.joinpath("blobs")
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_bytes: int = max_bytes
+        self.policy: str = policy
+        self.default_ttl: float | None = default_ttl
+        self.vary: tuple[str, ...] = tuple(name.lower() for name in vary)
+        self.drop_params: tuple[str, ...] = tuple(drop_params)
+
+        # Responses served without a request, after a 304, and fetched
+        self.hits: int = 0
+        self.revalidations: int = 0
+        self.misses: int = 0
+
+        # Body bytes served from the cache instead of the network
+        self.bytes_saved: int = 0
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(
+            self.directory.joinpath("cache.db"), check_same_thread=False
+        )
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                stored REAL NOT NULL,
+                used REAL NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            """)
+
+        self._size: int = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        """Number of stored responses"""
+
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Bytes of the stored bodies"""
+        return self._size
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Counters of the cache"""
+
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self),
+            "size": self.size,
+        }
+
+    def key(self, method: str, url: str, headers: dict[str, str] | None = None) -> str:
+        """
+        Get the cache key of a request
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        url : str
+            Requested URL
+
+        headers : dict[str, str], optional
+            Request headers, by default None.
+
+        Returns
+        -------
+        str : Hex digest of the method, canonical URL and vary headers
+        """
+
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        parts = [method.upper(), canonicalize(url, self.drop_params)]
+        parts += [f"{name}:{headers.get(name, '')}" for name in self.vary]
+
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def lookup(
+        self, method: str, url: str, headers: dict[str, str] | None = None
+    ) -> CacheEntry | None:
+        """
+        Get the stored response of a request
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        url : str
+            Requested URL
+
+        headers : dict[str, str], optional
+            Request headers, by default None.
+
+        Returns
+        -------
+        CacheEntry | None : Stored response with its body, None if not stored
+        """
+
+        if method.upper() not in ("GET", "HEAD"):
+            return None
+
+        key = self.key(method, url, headers)
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT e.url, e.status, e.reason, e.headers, e.digest, b.size,"
+                " e.stored FROM entries e JOIN blobs b USING (digest) WHERE e.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            entry = CacheEntry(
+                key, row[0], row[1], row[2], json.loads(row[3]), *row[4:]
+            )
+
+            try:
+                entry.body = self._blob(entry.digest).read_bytes()
+            except FileNotFoundError:
+                # The blob was removed from outside, forget the entry
+                self._delete([key])
+                return None
+
+        return entry
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None,
+        status: int,
+        reason: str,
+        response_headers: dict[str, str],
+        body: bytes,
+    ) -> bool:
+        """
+        Store a response
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        url : str
+            Requested URL
+
+        headers : dict[str, str] | None
+            Request headers
+
+        status : int
+            Response status code
+
+        reason : str
+            Response reason phrase
+
+        response_headers : dict[str, str]
+            Response headers
+
+        body : bytes
+            Complete response body
+
+        Returns
+        -------
+        bool : True if the response was stored
+
+        Notes
+        -----
+        Responses to methods other than GET and HEAD, with an uncacheable status,
+        Cache-Control no-store or Vary: * are not stored.
+        """
+
+        response_headers = {
+            name.lower(): value for name, value in response_headers.items()
+        }
+
+        if (
+            method.upper() not in ("GET", "HEAD")
+            or status not in CACHEABLE_STATUSES
+            or "no-store" in response_headers.get("cache-control", "").lower()
+            or response_headers.get("vary", "").strip() == "*"
+            or len(body) > self.max_bytes
+        ):
+            return False
+
+        key = self.key(method, url, headers)
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            self._write_blob(digest, body)
+
+            previous = self._db.execute(
+                "SELECT digest FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (key, url, status, reason, headers, digest, stored, used, uses)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (
+                    key,
+                    url,
+                    status,
+                    reason,
+                    json.dumps(response_headers),
+                    digest,
+                    now,
+                    now,
+                ),
+            )
+            if previous and previous[0] != digest:
+                self._release_blobs([previous[0]])
+            self._db.commit()
+
+            if self._size > self.max_bytes:
+                self.evict()
+
+        return True
+
+    def touch(self, entry: CacheEntry, revalidated: bool = False) -> None:
+        """
+        Record that a stored response was served
+
+        Parameters
+        ----------
+        entry : CacheEntry
+            Served entry
+
+        revalidated : bool, optional
+            The entry was served after a 304 Not Modified, by default False.
+        """
+
+        now = time.time()
+
+        with self._lock:
+            if revalidated:
+                entry.stored = now
+                self.revalidations += 1
+            else:
+                self.hits += 1
+            self.bytes_saved += entry.size
+
+            self._db.execute(
+                "UPDATE entries SET used = ?, uses = uses + 1, stored = ?,"
+                " headers = ? WHERE key = ?",
+                (now, entry.stored, json.dumps(entry.headers), entry.key),
+            )
+            self._db.commit()
+
+    def miss(self) -> None:
+        """Count a response that was fetched instead of served from the cache"""
+
+        with self._lock:
+            self.misses += 1
+
+    def revalidated(self, entry: CacheEntry, headers: dict[str, str]) -> CacheEntry:
+        """
+        Update an entry with the headers of a 304 Not Modified response
+
+        Parameters
+        ----------
+        entry : CacheEntry
+            Revalidated entry
+
+        headers : dict[str, str]
+            Headers of the 304 response
+
+        Returns
+        -------
+        CacheEntry : The updated entry
+        """
+
+        for name, value in headers.items():
+            if name.lower() in _REVALIDATED_HEADERS:
+                entry.headers[name.lower()] = value
+
+        self.touch(entry, revalidated=True)
+        return entry
+
+    def fetch(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None,
+        send: Callable[[dict[str, str]], Fetched],
+    ) -> Fetched:
+        """
+        Serve a request from the cache, revalidating or fetching it if needed
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        url : str
+            Requested URL
+
+        headers : dict[str, str] | None
+            Request headers
+
+        send : Callable[[dict[str, str]], Fetched]
+            Sends the request with the given headers and returns the status,
+            reason, headers and body of the response
+
+        Returns
+        -------
+        Fetched : Status, reason, headers and body
+        """
+
+        headers = dict(headers or {})
+        if method.upper() not in ("GET", "HEAD"):
+            return send(headers)
+
+        entry = self.lookup(method, url, headers)
+
+        if entry is not None and entry.is_fresh(self.default_ttl):
+            self.touch(entry)
+            return entry.status, entry.reason, entry.headers, entry.body
+
+        request_headers = {**headers, **entry.validators} if entry else headers
+        status, reason, response_headers, body = send(request_headers)
+
+        if entry is not None and status == 304:
+            entry = self.revalidated(entry, response_headers)
+            return entry.status, entry.reason, entry.headers, entry.body
+
+        self.miss()
+        self.store(method, url, headers, status, reason, response_headers, body)
+
+        return status, reason, response_headers, body
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """
+        Remove entries by the eviction policy until the bodies fit
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Size to evict down to, by default max_bytes.
+
+        Returns
+        -------
+        int : Number of removed entries
+        """
+
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        order = "used" if self.policy == "lru" else "uses, used"
+
+        removed = 0
+        with self._lock:
+            while self._size > max_bytes:
+                keys = [
+                    key
+                    for (key,) in self._db.execute(
+                        f"SELECT key FROM entries ORDER BY {order} LIMIT 64"
+                    )
+                ]
+                if not keys:
+                    break
+
+                # Shared bodies are only freed with their last entry
+                for key in keys:
+                    self._delete([key])
+                    removed += 1
+                    if self._size <= max_bytes:
+                        break
+
+            self._db.commit()
+
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries"""
+
+        self.evict(0)
+
+    def close(self) -> None:
+        """Close the database"""
+
+        with self._lock:
+            self._db.close()
+
+    def _blob(self, digest: str) -> Path:
+        """Path of a body"""
+        return self.blob_dir.joinpath(digest[:2], digest)
+
+    def _write_blob(self, digest: str, body: bytes) -> None:
+        """Write a body unless an identical one is stored"""
+
+        if (
+            self._db.execute(
+                "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            and self._blob(digest).exists()
+        ):
+            return
+
+        path = self._blob(digest)
+        path.parent.mkdir(exist_ok=True)
+
+        # Write next to the final path and rename, readers never see a partial body
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(body)
+        os.replace(temporary, path)
+
+        if self._db.execute(
+            "INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?)",
+            (digest, len(body)),
+        ).rowcount:
+            self._size += len(body)
+
+    def _delete(self, keys: list[str]) -> None:
+        """Delete entries and the bodies no other entry uses"""
+
+        digests = []
+        for key in keys:
+            row = self._db.execute(
+                "SELECT digest FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                digests.append(row[0])
+
+        self._release_blobs(digests)
+
+    def _release_blobs(self, digests: list[str]) -> None:
+        """Delete the bodies of digests no entry refers to"""
+
+        for digest in set(digests):
+            if self._db.execute(
+                "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone():
+                continue
+
+            row = self._db.execute(
+                "SELECT size FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row:
+                self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self._size -= row[0]
+            self._blob(digest).unlink(missing_ok=True)
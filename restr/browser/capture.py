@@ -0,0 +1,922 @@
+"""
+restr.browser.capture
+
+Network capture
+Records the requests a page makes through a local proxy into an indexed log
+"""
+
+import base64
+import hashlib
+import http.client
+import json
+import select
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from restr.browser.cache import CacheEntry, ResponseCache
+from restr.browser.http_browser import STALE_CONNECTION_ERRORS, ConnectionPool
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Index record: data offset, data length, status, crc32 of host, crc32 of path
+INDEX_RECORD = struct.Struct("<QIHII")
+
+# Headers that apply to a single connection and are not forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# Bytes read from the upstream response at a time
+CHUNK_SIZE = 64 * 1024
+
+# Larger responses are streamed without being cached
+MAX_CACHED_BODY_SIZE = 32 * 1024 * 1024
+
+# Installs the recorder once per document and returns its records since the
+# last call. Arguments: maximum stored body bytes (0 for none), maximum records.
+# fetch and XMLHttpRequest calls to https:// URLs are recorded with method,
+# headers, status and a SHA-256 of the body, plain HTTP is left to the proxy.
+# Calls made before the recorder was installed are recorded from Resource
+# Timing, with URL, status and size only, and marked as backfilled.
+_RECORDER_SCRIPT = """
+const recorder = window.__restrCapture || (window.__restrCapture = ((maxBody, maxRecords) => {
+    const state = {records: [], dropped: 0};
+    const origin = performance.timeOrigin;
+    const push = (record) => {
+        if (state.records.length < maxRecords) state.records.push(record);
+        else state.dropped++;
+    };
+    const absolute = (url) => {
+        try { return new URL(url, document.baseURI).href; } catch (e) { return String(url); }
+    };
+    const secure = (url) => url.startsWith("https:");
+    const encode = (bytes) => {
+        let binary = "";
+        for (let index = 0; index < bytes.length; index += 0x8000) {
+            binary += String.fromCharCode.apply(null, bytes.subarray(index, index + 0x8000));
+        }
+        return btoa(binary);
+    };
+    const hex = (digest) => Array.from(
+        new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, "0")
+    ).join("");
+
+    const finish = (record, start, buffer) => {
+        record.duration = (performance.now() - start) / 1000;
+        record.body_size = buffer ? buffer.byteLength : 0;
+        record.body_sha256 = null;
+        if (buffer && maxBody) {
+            record.body = encode(new Uint8Array(buffer, 0, Math.min(buffer.byteLength, maxBody)));
+            record.body_truncated = buffer.byteLength > maxBody;
+        }
+        // crypto.subtle only exists in secure contexts
+        if (!buffer || !window.crypto || !crypto.subtle) return push(record);
+        crypto.subtle.digest("SHA-256", buffer)
+            .then((digest) => { record.body_sha256 = hex(digest); }, () => {})
+            .finally(() => push(record));
+    };
+
+    for (const entry of performance.getEntriesByType("resource")) {
+        if (!["fetch", "xmlhttprequest"].includes(entry.initiatorType)) continue;
+        if (!secure(entry.name)) continue;
+        push({
+            method: null,
+            url: entry.name,
+            status: entry.responseStatus || null,
+            started: (origin + entry.startTime) / 1000,
+            duration: entry.duration / 1000,
+            body_size: entry.encodedBodySize,
+            body_sha256: null,
+            backfilled: true,
+        });
+    }
+
+    const fetch = window.fetch;
+    window.fetch = function (input, init) {
+        const request = input instanceof Request ? input : null;
+        const url = absolute(request ? request.url : input);
+        if (!secure(url)) return fetch.apply(this, arguments);
+
+        let headers = {};
+        try {
+            headers = Object.fromEntries(
+                new Headers((init && init.headers) || (request && request.headers) || {})
+            );
+        } catch (e) {}
+
+        const start = performance.now();
+        const record = {
+            method: ((init && init.method) || (request && request.method) || "GET").toUpperCase(),
+            url: url,
+            status: null,
+            request_headers: headers,
+            response_headers: {},
+            started: (origin + start) / 1000,
+        };
+
+        return fetch.apply(this, arguments).then((response) => {
+            record.status = response.status;
+            record.response_headers = Object.fromEntries(response.headers);
+            response.clone().arrayBuffer().then(
+                (buffer) => finish(record, start, buffer),
+                () => finish(record, start, null)
+            );
+            return response;
+        }, (error) => {
+            record.error = String(error);
+            finish(record, start, null);
+            throw error;
+        });
+    };
+
+    const open = XMLHttpRequest.prototype.open;
+    const setRequestHeader = XMLHttpRequest.prototype.setRequestHeader;
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__restrRecord = {
+            method: String(method).toUpperCase(),
+            url: absolute(url),
+            status: null,
+            request_headers: {},
+            response_headers: {},
+        };
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.setRequestHeader = function (name, value) {
+        if (this.__restrRecord) this.__restrRecord.request_headers[name.toLowerCase()] = value;
+        return setRequestHeader.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        const record = this.__restrRecord;
+        if (record && secure(record.url)) {
+            const start = performance.now();
+            record.started = (origin + start) / 1000;
+            this.addEventListener("loadend", () => {
+                record.status = this.status || null;
+                for (const line of this.getAllResponseHeaders().split("\\r\\n")) {
+                    const colon = line.indexOf(":");
+                    if (colon > 0) {
+                        record.response_headers[line.slice(0, colon).trim().toLowerCase()] =
+                            line.slice(colon + 1).trim();
+                    }
+                }
+                // Text responses are hashed as UTF-8
+                let buffer = null;
+                try {
+                    if (this.responseType === "arraybuffer") buffer = this.response;
+                    else if (["", "text"].includes(this.responseType)) {
+                        buffer = new TextEncoder().encode(this.responseText).buffer;
+                    }
+                } catch (e) {}
+                finish(record, start, buffer);
+            }, {once: true});
+        }
+        return send.apply(this, arguments);
+    };
+
+    state.drain = () => {
+        const records = state.records;
+        state.records = [];
+        return records;
+    };
+    return state;
+})(arguments[0], arguments[1]));
+
+return recorder.drain();
+"""
+
+
+# Extension that runs the recorder in every HTTPS page before its own scripts
+_RECORDER_EXTENSION = {
+    "manifest_version": 2,
+    "name": "restr page recorder",
+    "version": "1.0",
+    "browser_specific_settings": {"gecko": {"id": "page-recorder@restr"}},
+    "content_scripts": [
+        {
+            "matches": ["https://*/*"],
+            "js": ["recorder.js"],
+            "run_at": "document_start",
+            "all_frames": True,
+            "world": "MAIN",
+        }
+    ],
+}
+
+
+def _crc(value: str) -> int:
+    """Hash used by the index"""
+    return zlib.crc32(value.encode())
+
+
+class CaptureLog:
+    """
+    CaptureLog Class
+
+    Append-only JSON Lines log of captured requests with a sidecar index.
+
+    Every record is one line of `path`. The index `path.idx` holds one fixed
+    size entry per record with its offset, status and hashes of its host and
+    path, so queries scan the small index and only read matching records.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path
+            Log file, created if it does not exist and appended to otherwise
+        """
+
+        self.path: Path = Path(path)
+        self.index_path: Path = self.path.with_name(self.path.name + ".idx")
+
+        self._lock = threading.Lock()
+        self._data = open(self.path, "ab")  # pylint: disable=consider-using-with
+        self._index = open(self.index_path, "ab")  # pylint: disable=consider-using-with
+
+    def __len__(self) -> int:
+        """Number of records"""
+
+        with self._lock:
+            self._index.flush()
+            return self.index_path.stat().st_size // INDEX_RECORD.size
+
+    def write(self, record: dict) -> None:
+        """
+        Append a record
+
+        Parameters
+        ----------
+        record : dict
+            Captured request, must have url and status keys
+        """
+
+        parts = urlsplit(record["url"])
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(line)
+            self._index.write(
+                INDEX_RECORD.pack(
+                    offset,
+                    len(line),
+                    record.get("status") or 0,
+                    _crc(parts.netloc.lower()),
+                    _crc(parts.path or "/"),
+                )
+            )
+
+    def query(
+        self,
+        host: str | None = None,
+        path: str | None = None,
+        status: int | None = None,
+    ) -> Iterator[dict]:
+        """
+        Iterate over the records matching all given filters
+
+        Parameters
+        ----------
+        host : str, optional
+            Host, with the port if it is not the default port, by default None.
+
+        path : str, optional
+            URL path without the query, by default None.
+
+        status : int, optional
+            HTTP status code, by default None.
+
+        Returns
+        -------
+        Iterator[dict] : Matching records in the order they were written
+        """
+
+        self.flush()
+
+        host_hash = _crc(host.lower()) if host is not None else None
+        path_hash = _crc(path) if path is not None else None
+
+        with open(self.index_path, "rb") as index, open(self.path, "rb") as data:
+            while block := index.read(INDEX_RECORD.size * 4096):
+                for (
+                    offset,
+                    length,
+                    code,
+                    host_crc,
+                    path_crc,
+                ) in INDEX_RECORD.iter_unpack(block):
+                    if status is not None and code != status:
+                        continue
+                    if host_hash is not None and host_crc != host_hash:
+                        continue
+                    if path_hash is not None and path_crc != path_hash:
+                        continue
+
+                    data.seek(offset)
+                    record = json.loads(data.read(length))
+
+                    # Rule out hash collisions
+                    parts = urlsplit(record["url"])
+                    if host is not None and parts.netloc.lower() != host.lower():
+                        continue
+                    if path is not None and (parts.path or "/") != path:
+                        continue
+
+                    yield record
+
+    def flush(self) -> None:
+        """Flush buffered records to disk"""
+
+        with self._lock:
+            self._data.flush()
+            self._index.flush()
+
+    def close(self) -> None:
+        """Flush and close the log"""
+
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Forwards proxied requests and records them in the CaptureLog"""
+
+    protocol_version = "HTTP/1.1"
+
+    # pylint: disable=invalid-name
+    # Method names are defined by BaseHTTPRequestHandler
+    def do_CONNECT(self) -> None:
+        """Tunnel HTTPS without inspecting it"""
+
+        start = time.time()
+        host, _, port = self.path.rpartition(":")
+        sent = received = 0
+
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=30)
+        except OSError:
+            self.send_error(502)
+            return
+
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 60)
+                if errored or not readable:
+                    break
+
+                for sock in readable:
+                    data = sock.recv(CHUNK_SIZE)
+                    if not data:
+                        raise ConnectionResetError
+                    if sock is upstream:
+                        self.connection.sendall(data)
+                        received += len(data)
+                    else:
+                        upstream.sendall(data)
+                        sent += len(data)
+
+        except OSError:
+            pass
+
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+        self.server.capture.write(
+            {
+                "method": "CONNECT",
+                "url": f"https://{self.path}/",
+                "status": 200,
+                "started": start,
+                "duration": time.time() - start,
+                "request_size": sent,
+                "response_size": received,
+            }
+        )
+
+    def do_GET(self) -> None:
+        """Forward GET"""
+        self._forward()
+
+    def do_HEAD(self) -> None:
+        """Forward HEAD"""
+        self._forward()
+
+    def do_POST(self) -> None:
+        """Forward POST"""
+        self._forward()
+
+    def do_PUT(self) -> None:
+        """Forward PUT"""
+        self._forward()
+
+    def do_PATCH(self) -> None:
+        """Forward PATCH"""
+        self._forward()
+
+    def do_DELETE(self) -> None:
+        """Forward DELETE"""
+        self._forward()
+
+    def do_OPTIONS(self) -> None:
+        """Forward OPTIONS"""
+        self._forward()
+
+    # pylint: disable=too-many-locals, too-many-branches, too-many-statements
+    def _forward(self) -> None:
+        """Forward the request upstream and stream the response back"""
+
+        capture = self.server.capture
+        cache = capture.cache
+        start = time.time()
+
+        parts = urlsplit(self.path)
+        if parts.scheme != "http" or not parts.hostname:
+            self.send_error(400, "Only absolute http:// URLs can be proxied")
+            return
+
+        try:
+            body = self._read_body()
+        except ValueError:
+            self.send_error(400, "Malformed chunked request body")
+            return
+
+        request_headers = {
+            name: value
+            for name, value in self.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+
+        # Serve fresh cached responses, revalidate stale ones
+        entry = None
+        if cache is not None and body is None:
+            entry = cache.lookup(self.command, self.path, request_headers)
+            if entry is not None and entry.is_fresh(cache.default_ttl):
+                cache.touch(entry)
+                self._respond_cached(entry, request_headers, start, "hit")
+                return
+
+        upstream_headers = (
+            {**request_headers, **entry.validators} if entry else request_headers
+        )
+
+        pool = capture.pool(parts.hostname, parts.port)
+        keep = False
+
+        while True:
+            connection, reused = pool.acquire()
+            try:
+                connection.request(
+                    self.command, target, body=body, headers=upstream_headers
+                )
+                response = connection.getresponse()
+                break
+            except (OSError, http.client.HTTPException) as error:
+                pool.release(connection, reuse=False)
+
+                # The server closed an idle keep-alive connection, retry on a new one
+                if reused and isinstance(error, STALE_CONNECTION_ERRORS):
+                    continue
+
+                self.send_error(502)
+                return
+
+        if entry is not None and response.status == 304:
+            response.read()
+            pool.release(connection, reuse=not response.will_close)
+
+            entry = cache.revalidated(entry, dict(response.getheaders()))
+            self._respond_cached(entry, request_headers, start, "revalidated")
+            return
+
+        try:
+            response_headers = [
+                (name, value)
+                for name, value in response.getheaders()
+                if name.lower() not in HOP_BY_HOP_HEADERS
+            ]
+            chunked = response.getheader("Content-Length") is None
+
+            self.send_response(response.status, response.reason)
+            for name, value in response_headers:
+                self.send_header(name, value)
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            # Stream the body, hashing it and keeping at most max_body_size bytes
+            digest = hashlib.sha256()
+            size = 0
+            kept = bytearray()
+            complete = bytearray() if cache is not None and body is None else None
+
+            while chunk := response.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                if capture.store_bodies and len(kept) < capture.max_body_size:
+                    kept += chunk[: capture.max_body_size - len(kept)]
+                if complete is not None:
+                    complete += chunk
+                    if len(complete) > MAX_CACHED_BODY_SIZE:
+                        complete = None
+
+                if self.command != "HEAD":
+                    self.wfile.write(
+                        b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk
+                    )
+
+            if chunked and self.command != "HEAD":
+                self.wfile.write(b"0\r\n\r\n")
+
+            keep = not response.will_close
+
+        finally:
+            pool.release(connection, reuse=keep)
+
+        # Every upstream fetch is a miss, even if it cannot be stored
+        if cache is not None:
+            cache.miss()
+
+        # The cache keys on the client's headers, not the added validators
+        if complete is not None:
+            cache.store(
+                self.command,
+                self.path,
+                request_headers,
+                response.status,
+                response.reason,
+                dict(response_headers),
+                bytes(complete),
+            )
+
+        record = {
+            "method": self.command,
+            "url": self.path,
+            "status": response.status,
+            "request_headers": request_headers,
+            "response_headers": dict(response_headers),
+            "started": start,
+            "duration": time.time() - start,
+            "body_size": size,
+            "body_sha256": digest.hexdigest(),
+        }
+        if capture.store_bodies:
+            record["body"] = base64.b64encode(bytes(kept)).decode()
+            record["body_truncated"] = size > len(kept)
+
+        capture.write(record)
+
+    def _read_body(self) -> bytes | None:
+        """
+        Read the request body
+
+        Returns
+        -------
+        bytes | None : Body, None if the request has none
+
+        Raises
+        ------
+        ValueError : If a chunk size is malformed
+        """
+
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            body = bytearray()
+            while True:
+                line = self.rfile.readline(65537)
+                size = int(line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline(3)
+
+            # Skip the trailers
+            while self.rfile.readline(65537) not in (b"\r\n", b"\n", b""):
+                pass
+
+            # Forwarded with a Content-Length, Transfer-Encoding is hop-by-hop
+            return bytes(body)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else None
+
+    def _respond_cached(
+        self,
+        entry: CacheEntry,
+        request_headers: dict[str, str],
+        start: float,
+        cache_status: str,
+    ) -> None:
+        """Send a response from the cache"""
+
+        capture = self.server.capture
+
+        self.send_response(entry.status, entry.reason)
+        for name, value in entry.headers.items():
+            if name != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(entry.size))
+        self.end_headers()
+
+        if self.command != "HEAD":
+            self.wfile.write(entry.body)
+
+        record = {
+            "method": self.command,
+            "url": self.path,
+            "status": entry.status,
+            "request_headers": request_headers,
+            "response_headers": entry.headers,
+            "started": start,
+            "duration": time.time() - start,
+            "body_size": entry.size,
+            "body_sha256": entry.digest,
+            "cache": cache_status,
+        }
+        if capture.store_bodies:
+            kept = entry.body[: capture.max_body_size]
+            record["body"] = base64.b64encode(kept).decode()
+            record["body_truncated"] = entry.size > len(kept)
+
+        capture.write(record)
+
+    def log_message(self, *args) -> None:
+        """Do not log requests to stderr"""
+
+
+class CaptureProxy:
+    """
+    CaptureProxy Class
+
+    Local forward proxy that records every request passing through it.
+
+    Plain HTTP requests are recorded with headers, status, timing and a body
+    hash. HTTPS is tunnelled with CONNECT and only recorded as a CONNECT record,
+    the proxy does not intercept TLS. The fetch and XMLHttpRequest calls of
+    HTTPS are recorded from inside the page by a PageRecorder instead. With a
+    ResponseCache, plain HTTP GET and HEAD requests are served from and stored
+    in the cache. HTTPS is never cached, the tunnelled bytes are encrypted.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        log: CaptureLog | None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        store_bodies: bool = False,
+        max_body_size: int = 1024 * 1024,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        log : CaptureLog | None
+            Log to write records to, nothing is recorded if None
+
+        host : str, optional
+            Listen address, by default "127.0.0.1".
+
+        port : int, optional
+            Listen port, by default 0 (any free port).
+
+        store_bodies : bool, optional
+            Store response bodies base64 encoded in the records, by default False.
+
+        max_body_size : int, optional
+            Maximum stored bytes per body, by default 1 MiB.
+
+        cache : ResponseCache, optional
+            Cache for plain HTTP responses, by default None.
+        """
+
+        self.log: CaptureLog | None = log
+        self.cache: ResponseCache | None = cache
+        self.store_bodies: bool = store_bodies
+        self.max_body_size: int = max_body_size
+
+        self._pools: dict[tuple[str, int | None], ConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), _ProxyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.capture = self
+
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, args=(0.1,), daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the proxy listens on"""
+        return self.httpd.server_address[:2]
+
+    @property
+    def preferences(self) -> dict[str, str | int | bool]:
+        """Firefox preferences that route all traffic through the proxy"""
+
+        host, port = self.address
+        return {
+            "network.proxy.type": 1,
+            "network.proxy.http": host,
+            "network.proxy.http_port": port,
+            "network.proxy.ssl": host,
+            "network.proxy.ssl_port": port,
+            "network.proxy.no_proxies_on": "",
+            "network.proxy.allow_hijacking_localhost": True,
+        }
+
+    def pool(self, host: str, port: int | None) -> ConnectionPool:
+        """
+        Get the upstream connection pool of an origin
+
+        Parameters
+        ----------
+        host : str
+            Upstream host
+
+        port : int | None
+            Upstream port
+
+        Returns
+        -------
+        ConnectionPool : Keep-alive connections to the origin
+        """
+
+        with self._pools_lock:
+            key = (host, port)
+            if key not in self._pools:
+                self._pools[key] = ConnectionPool("http", host, port, 16, 30.0)
+            return self._pools[key]
+
+    def write(self, record: dict) -> None:
+        """
+        Write a record to the log, if there is one
+
+        Parameters
+        ----------
+        record : dict
+            Captured request
+        """
+
+        if self.log is not None:
+            self.log.write(record)
+
+    def close(self) -> None:
+        """Stop the proxy and flush the log"""
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+
+        if self.log is not None:
+            self.log.flush()
+
+
+class PageRecorder:
+    """
+    PageRecorder Class
+
+    Records the HTTPS fetch and XMLHttpRequest calls of pages into the log of
+    a CaptureProxy. The proxy cannot see inside TLS, so install() adds a
+    temporary extension that runs the recorder script before the scripts of
+    every page, and collect() drains its records after the page loaded,
+    before it is left and when it is extracted.
+
+    Records have the keys of the proxy's records and "source": "page". Without
+    the extension collect() installs the recorder itself, calls made before
+    that only have URL, status and size and are marked "backfilled": true.
+    """
+
+    def __init__(self, capture: CaptureProxy, max_records: int = 10_000) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        capture : CaptureProxy
+            Proxy whose log, store_bodies and max_body_size are used
+
+        max_records : int, optional
+            Records buffered per page between two collect() calls,
+            by default 10,000.
+        """
+
+        self.capture: CaptureProxy = capture
+        self.max_records: int = max_records
+
+    def preload_script(self) -> str:
+        """
+        Get the recorder script run by the extension before the page scripts
+
+        Returns
+        -------
+        str : Script installing the recorder with this recorder's limits
+        """
+
+        max_body = self.capture.max_body_size if self.capture.store_bodies else 0
+        return (
+            f"(function () {{{_RECORDER_SCRIPT}}})"
+            f".call(window, {max_body}, {self.max_records});"
+        )
+
+    def install(self, driver: "WebDriver") -> bool:
+        """
+        Install the recorder extension in a Firefox session
+
+        Parameters
+        ----------
+        driver : WebDriver
+            Firefox driver, every session needs its own install
+
+        Returns
+        -------
+        bool : True if the extension was installed
+
+        Notes
+        -----
+        Running the recorder in the page's own scripting context needs Firefox
+        128 or later. Older versions run the extension in an isolated context
+        the page does not see, collect() then installs the recorder itself.
+        """
+
+        with tempfile.TemporaryDirectory(prefix="restr-recorder-") as directory:
+            path = Path(directory, "recorder.xpi")
+            with zipfile.ZipFile(path, "w") as extension:
+                extension.writestr("manifest.json", json.dumps(_RECORDER_EXTENSION))
+                extension.writestr("recorder.js", self.preload_script())
+
+            # The extension is sent to the driver, the file can be removed after
+            try:
+                driver.install_addon(str(path), temporary=True)
+            except WebDriverException:
+                return False
+
+        return True
+
+    def collect(self, driver: "WebDriver") -> int:
+        """
+        Write the records of the current page, installing the recorder if needed
+
+        Parameters
+        ----------
+        driver : WebDriver
+            Selenium driver switched to the page
+
+        Returns
+        -------
+        int : Number of records written
+        """
+
+        max_body = self.capture.max_body_size if self.capture.store_bodies else 0
+
+        try:
+            records = driver.execute_script(
+                _RECORDER_SCRIPT, max_body, self.max_records
+            )
+        except WebDriverException:
+            # The page is unloading or does not allow scripts
+            return 0
+
+        for record in records or []:
+            record["source"] = "page"
+            self.capture.write(record)
+
+        return len(records or [])
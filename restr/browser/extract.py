@@ -0,0 +1,336 @@
+"""
+restr.browser.extract
+
+Page extraction
+Collects links, forms, frames and API hints of a page in a single WebDriver call
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Endpoint string literals in scripts: fetch("/api"), axios.get('/x'),
+# xhr.open("GET", "/y"), $.post("/z"), url: "/w"
+CALL_PATTERN = (
+    r"(?:fetch|axios(?:\.[a-z]+)?|\.open|\$\.(?:get|post|ajax|getJSON)|url\s*:)"
+    r"\s*\(?\s*(?:[\"'][A-Z]+[\"']\s*,\s*)?[\"'`]([^\"'`\s]+)[\"'`]"
+)
+
+# Other string literals that look like API paths
+PATH_PATTERN = (
+    r"[\"'`]((?:https?:)?//[^\"'`\s]+/(?:api|v\d+|graphql|rest)\b[^\"'`\s]*"
+    r"|/(?:api|v\d+|graphql|rest)\b[^\"'`\s]*)[\"'`]"
+)
+
+# Attribute values that are URLs
+URL_PATTERN = r"^(?:https?:)?//|^/|^\.{1,2}/"
+
+# Injected with (CALL_PATTERN, PATH_PATTERN, URL_PATTERN) as arguments.
+# Returns a JSON string with short keys to keep the payload small.
+_SCRIPT = """
+const unique = (list) => Array.from(new Set(list.filter(Boolean)));
+const resolve = (url) => {
+    try { return new URL(url, document.baseURI).href; } catch (e) { return null; }
+};
+const matches = (pattern, text) =>
+    Array.from(text.matchAll(new RegExp(pattern, "g")), (match) => match[1]);
+const urlish = new RegExp(arguments[2]);
+
+const links = Array.from(
+    document.querySelectorAll("a[href], area[href]"), (a) => a.href
+);
+
+const forms = Array.from(document.forms, (form) => [
+    resolve(form.getAttribute("action") || document.URL),
+    (form.getAttribute("method") || "get").toLowerCase(),
+    Array.from(form.elements)
+        .filter((input) => input.name)
+        .map((input) => [input.name, (input.type || input.tagName).toLowerCase()]),
+]);
+
+const frames = Array.from(
+    document.querySelectorAll("iframe[src], frame[src]"),
+    (frame) => resolve(frame.getAttribute("src"))
+);
+
+const data = [];
+const attributes = document.evaluate(
+    "//@*[starts-with(name(), 'data-')]", document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+for (let index = 0; index < attributes.snapshotLength; index++) {
+    const value = attributes.snapshotItem(index).value.trim();
+    if (urlish.test(value)) data.push(resolve(value));
+}
+
+const code = Array.from(document.scripts, (script) => script.src ? "" : script.text)
+    .join("\\n");
+const literals = matches(arguments[0], code)
+    .concat(matches(arguments[1], code))
+    .map(resolve);
+
+const requests = performance.getEntriesByType("resource")
+    .filter((entry) => ["fetch", "xmlhttprequest"].includes(entry.initiatorType))
+    .map((entry) => entry.name);
+
+return JSON.stringify({
+    u: document.URL,
+    l: unique(links),
+    f: forms,
+    i: unique(frames),
+    d: unique(data),
+    e: unique(literals),
+    r: unique(requests),
+});
+"""
+
+
+def _minify(script: str) -> str:
+    """Strip indentation and blank lines so the script is sent compactly"""
+    return "\n".join(line.strip() for line in script.splitlines() if line.strip())
+
+
+# Minified once at import and sent as is with every extraction
+EXTRACT_SCRIPT = _minify(_SCRIPT)
+
+
+class Form:
+    """
+    HTML Form
+    """
+
+    def __init__(self, action: str, method: str, inputs: list[tuple[str, str]]) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        action : str
+            Absolute action URL
+
+        method : str
+            Lowercase HTTP method
+
+        inputs : list[tuple[str, str]]
+            Names and types of the named form inputs
+        """
+
+        self.action: str = action
+        self.method: str = method
+        self.inputs: list[tuple[str, str]] = inputs
+
+    def __repr__(self) -> str:
+        return f"<Form {self.method.upper()} {self.action}>"
+
+
+class PageData:
+    """
+    Data extracted from a page
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        url: str,
+        links: list[str] | None = None,
+        forms: list[Form] | None = None,
+        iframes: list[str] | None = None,
+        data_urls: list[str] | None = None,
+        endpoints: list[str] | None = None,
+        requests: list[str] | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        url : str
+            Page URL
+
+        links : list[str], optional
+            Anchor and area targets
+
+        forms : list[Form], optional
+            Forms
+
+        iframes : list[str], optional
+            Frame sources
+
+        data_urls : list[str], optional
+            URLs in data-* attributes
+
+        endpoints : list[str], optional
+            Endpoint string literals of inline scripts
+
+        requests : list[str], optional
+            URLs of fetch and XMLHttpRequest calls the page made
+        """
+
+        self.url: str = url
+        self.links: list[str] = links or []
+        self.forms: list[Form] = forms or []
+        self.iframes: list[str] = iframes or []
+        self.data_urls: list[str] = data_urls or []
+        self.endpoints: list[str] = endpoints or []
+        self.requests: list[str] = requests or []
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "PageData":
+        """
+        Parse the JSON payload returned by EXTRACT_SCRIPT
+
+        Parameters
+        ----------
+        payload : str
+            JSON string
+
+        Returns
+        -------
+        PageData : Extracted data
+        """
+
+        data = json.loads(payload)
+
+        return cls(
+            url=data["u"],
+            links=data["l"],
+            forms=[
+                Form(action, method, [tuple(field) for field in inputs])
+                for action, method, inputs in data["f"]
+            ],
+            iframes=data["i"],
+            data_urls=data["d"],
+            endpoints=data["e"],
+            requests=data["r"],
+        )
+
+    @property
+    def urls(self) -> list[str]:
+        """All discovered URLs in order without duplicates"""
+
+        return list(
+            dict.fromkeys(
+                self.links
+                + self.iframes
+                + self.data_urls
+                + self.endpoints
+                + self.requests
+                + [form.action for form in self.forms]
+            )
+        )
+
+
+def extract(driver: "WebDriver") -> PageData:
+    """
+    Extract the data of the current page in one WebDriver call
+
+    Parameters
+    ----------
+    driver : WebDriver
+        Selenium driver switched to the page
+
+    Returns
+    -------
+    PageData : Extracted data
+    """
+
+    payload = driver.execute_script(
+        EXTRACT_SCRIPT, CALL_PATTERN, PATH_PATTERN, URL_PATTERN
+    )
+    return PageData.from_payload(payload)
+
+
+class _PageParser(HTMLParser):
+    """Collects the same data as EXTRACT_SCRIPT from HTML source"""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(convert_charrefs=True)
+
+        self.base: str = url
+        self.data: PageData = PageData(url)
+        self._form: Form | None = None
+        self._script: list[str] | None = None
+        self._code: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = {name: value or "" for name, value in attrs}
+
+        if tag == "base" and attributes.get("href"):
+            self.base = urljoin(self.base, attributes["href"])
+        elif tag in ("a", "area") and "href" in attributes:
+            self.data.links.append(urljoin(self.base, attributes["href"]))
+        elif tag in ("iframe", "frame") and attributes.get("src"):
+            self.data.iframes.append(urljoin(self.base, attributes["src"]))
+        elif tag == "form":
+            self._form = Form(
+                urljoin(self.base, attributes.get("action") or self.data.url),
+                (attributes.get("method") or "get").lower(),
+                [],
+            )
+            self.data.forms.append(self._form)
+        elif tag in ("input", "select", "textarea", "button") and self._form:
+            if attributes.get("name"):
+                input_type = attributes.get("type") or (
+                    "text" if tag == "input" else tag
+                )
+                self._form.inputs.append((attributes["name"], input_type.lower()))
+        elif tag == "script" and "src" not in attributes:
+            self._script = []
+
+        for name, value in attributes.items():
+            if name.startswith("data-") and re.match(URL_PATTERN, value.strip()):
+                self.data.data_urls.append(urljoin(self.base, value.strip()))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "form":
+            self._form = None
+        elif tag == "script" and self._script is not None:
+            self._code.append("".join(self._script))
+            self._script = None
+
+    def handle_data(self, data: str) -> None:
+        if self._script is not None:
+            self._script.append(data)
+
+    def close(self) -> None:
+        super().close()
+
+        code = "\n".join(self._code)
+        literals = re.findall(CALL_PATTERN, code) + re.findall(PATH_PATTERN, code)
+
+        data = self.data
+        data.links = list(dict.fromkeys(data.links))
+        data.iframes = list(dict.fromkeys(data.iframes))
+        data.data_urls = list(dict.fromkeys(data.data_urls))
+        data.endpoints = list(
+            dict.fromkeys(urljoin(self.base, literal) for literal in literals)
+        )
+
+
+def parse_html(html: str, url: str) -> PageData:
+    """
+    Extract the data of a page from its HTML source
+
+    Parameters
+    ----------
+    html : str
+        Page source, e.g. the body of an HttpBrowser Response
+
+    url : str
+        Page URL that relative URLs are resolved against
+
+    Returns
+    -------
+    PageData : Extracted data, requests is always empty
+    """
+
+    parser = _PageParser(url)
+    parser.feed(html)
+    parser.close()
+
+    return parser.data
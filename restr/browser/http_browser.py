@@ -0,0 +1,528 @@
+"""
+restr.browser.http_browser
+
+HttpBrowser Class File
+Browserless backend that fetches URLs over pooled keep-alive HTTP connections
+"""
+
+import gzip
+import http.client
+import json
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import urljoin, urlsplit
+
+from restr.browser.browser_base import USER_AGENT, BrowserBase
+from restr.browser.cache import ResponseCache
+
+# Status codes that redirect to the Location header
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Errors raised when a reused keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class Response:
+    """
+    HTTP Response
+    """
+
+    # pylint: disable=too-many-arguments
+    # Response needs all of its parts
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        reason: str,
+        headers: dict[str, str],
+        body: bytes,
+        elapsed: float,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        url : str
+            Final URL after redirects
+
+        status : int
+            HTTP status code
+
+        reason : str
+            HTTP reason phrase
+
+        headers : dict[str, str]
+            Response headers with lowercase names
+
+        body : bytes
+            Decoded response body
+
+        elapsed : float
+            Seconds from request start to body read, including redirects
+        """
+
+        self.url: str = url
+        self.status: int = status
+        self.reason: str = reason
+        self.headers: dict[str, str] = headers
+        self.body: bytes = body
+        self.elapsed: float = elapsed
+
+    def __repr__(self) -> str:
+        return f"<Response [{self.status}] {self.url}>"
+
+    @property
+    def ok(self) -> bool:
+        """True if the status code is below 400"""
+        return self.status < 400
+
+    @property
+    def content_type(self) -> str:
+        """Media type without parameters, e.g. text/html"""
+        return self.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    @property
+    def encoding(self) -> str:
+        """Charset of the Content-Type header, by default utf-8"""
+
+        for param in self.headers.get("content-type", "").split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"')
+
+        return "utf-8"
+
+    @property
+    def text(self) -> str:
+        """Body decoded as text"""
+        return self.body.decode(self.encoding, errors="replace")
+
+    def json(self):
+        """
+        Parse the body as JSON
+
+        Returns
+        -------
+        Parsed JSON document
+        """
+
+        return json.loads(self.body)
+
+
+class ConnectionPool:
+    """
+    Keep-alive connections to a single origin
+
+    Idle connections are reused most recently used first. At most `maxsize`
+    connections are open at once, further requests wait for one to be released.
+    """
+
+    def __init__(
+        self, scheme: str, host: str, port: int | None, maxsize: int, timeout: float
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        scheme : str
+            http or https
+
+        host : str
+            Host name
+
+        port : int | None
+            Port, default port of the scheme if None
+
+        maxsize : int
+            Maximum number of open connections
+
+        timeout : float
+            Socket timeout in seconds
+        """
+
+        self.scheme: str = scheme
+        self.host: str = host
+        self.port: int | None = port
+        self.timeout: float = timeout
+
+        self.connections_opened: int = 0
+
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    def acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Get a connection
+
+        Returns
+        -------
+        tuple[http.client.HTTPConnection, bool] : Connection and whether it is reused
+        """
+
+        self._slots.acquire()  # pylint: disable=consider-using-with
+
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self.new_connection(), False
+
+    def release(self, connection: http.client.HTTPConnection, reuse: bool) -> None:
+        """
+        Return a connection
+
+        Parameters
+        ----------
+        connection : http.client.HTTPConnection
+            Connection from acquire()
+
+        reuse : bool
+            Keep the connection open for later requests
+        """
+
+        if reuse:
+            self._idle.put(connection)
+        else:
+            connection.close()
+
+        self._slots.release()
+
+    def new_connection(self) -> http.client.HTTPConnection:
+        """
+        Open a new connection
+
+        Returns
+        -------
+        http.client.HTTPConnection : Unconnected connection, connects on first request
+        """
+
+        self.connections_opened += 1
+
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def close(self) -> None:
+        """Close all idle connections"""
+
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# pylint: disable=too-many-instance-attributes
+# HttpBrowser is configured through many independent options
+class HttpBrowser(BrowserBase):
+    """
+    HttpBrowser Class
+
+    Drop-in replacement for Browser on endpoints that do not need rendering.
+    Connections are kept alive and reused per origin so consecutive requests to
+    the same host skip the TCP and TLS handshakes.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *args,
+        max_connections: int = 10,
+        max_workers: int = 16,
+        timeout: float = 30.0,
+        headers: dict[str, str] | None = None,
+        max_redirects: int = 5,
+        cache: ResponseCache | str | Path | None = None,
+        **kwargs,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        max_connections : int, optional
+            Maximum open connections per origin, by default 10.
+
+        max_workers : int, optional
+            Maximum concurrent requests of open_many(), by default 16.
+
+        timeout : float, optional
+            Socket timeout in seconds, by default 30.0.
+
+        headers : dict[str, str], optional
+            Headers sent with every request, by default None.
+
+        max_redirects : int, optional
+            Maximum redirects followed per request, by default 5.
+            Redirects are not followed if 0.
+
+        cache : ResponseCache | str | Path, optional
+            Cache or cache directory for GET and HEAD requests, by default None.
+            A cache created from a directory is closed on close().
+
+        Notes
+        -----
+        Bodies served through the cache are decoded and their responses do not
+        have Content-Encoding and Content-Length headers.
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.max_connections: int = max_connections
+        self.timeout: float = timeout
+        self.max_redirects: int = max_redirects
+        self.headers: dict[str, str] = {
+            "User-Agent": USER_AGENT,
+            "Accept": "*/*",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            **(headers or {}),
+        }
+
+        self._cache_owned: bool = False
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache)
+            self._cache_owned = True
+        self.cache: ResponseCache | None = cache
+
+        self.pools: dict[tuple[str, str, int | None], ConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="restr-http"
+        )
+
+    # pylint: disable=arguments-differ
+    # Overriding method from BrowserBase
+    def open(self, url: str) -> Response:
+        """
+        Fetch a URL
+
+        Parameters
+        ----------
+        url : str
+            URL to fetch
+
+        Returns
+        -------
+        Response : Response after redirects
+        """
+
+        return self.request("GET", url)
+
+    def open_many(self, urls: Iterable[str]) -> list[Response]:
+        """
+        Fetch URLs concurrently
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            URLs to fetch
+
+        Returns
+        -------
+        list[Response] : Responses in the order of urls
+        """
+
+        return list(self._executor.map(self.open, urls))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """
+        Send a request
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        url : str
+            URL to request
+
+        body : bytes, optional
+            Request body, by default None.
+
+        headers : dict[str, str], optional
+            Extra request headers, by default None.
+
+        Returns
+        -------
+        Response : Response after redirects
+        """
+
+        start = time.perf_counter()
+        url = self._format_url(url)
+
+        for _ in range(self.max_redirects + 1):
+            status, reason, response_headers, data = self._fetch(
+                method, url, body, headers
+            )
+
+            location = response_headers.get("location")
+            if status not in REDIRECT_STATUSES or not location:
+                break
+
+            url = urljoin(url, location)
+
+            # 303 and POST redirected by 301/302 are followed with GET
+            if status == 303 or (status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+
+        self._observe(url, method, status)
+
+        return Response(
+            url, status, reason, response_headers, data, time.perf_counter() - start
+        )
+
+    # pylint: disable=arguments-differ
+    # Overriding method from BrowserBase
+    def close(self) -> None:
+        """Close all connections"""
+
+        self._executor.shutdown(wait=True)
+
+        with self._pools_lock:
+            for pool in self.pools.values():
+                pool.close()
+            self.pools.clear()
+
+        if self._cache_owned:
+            self.cache.close()
+
+    def _pool(self, scheme: str, host: str, port: int | None) -> ConnectionPool:
+        """Get or create the connection pool of an origin"""
+
+        key = (scheme, host, port)
+        with self._pools_lock:
+            if key not in self.pools:
+                self.pools[key] = ConnectionPool(
+                    scheme, host, port, self.max_connections, self.timeout
+                )
+            return self.pools[key]
+
+    def _fetch(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str] | None,
+    ) -> tuple[int, str, dict[str, str], bytes]:
+        """Send a single request through the cache if there is one"""
+
+        if self.cache is None or body is not None:
+            return self._send(method, url, body, headers)
+
+        def send(
+            request_headers: dict[str, str],
+        ) -> tuple[int, str, dict[str, str], bytes]:
+            status, reason, response_headers, data = self._send(
+                method, url, None, request_headers
+            )
+
+            # The body is decoded, its encoding and length no longer apply
+            response_headers.pop("content-encoding", None)
+            response_headers.pop("content-length", None)
+            return status, reason, response_headers, data
+
+        return self.cache.fetch(method, url, {**self.headers, **(headers or {})}, send)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str] | None,
+    ) -> tuple[int, str, dict[str, str], bytes]:
+        """
+        Send a single request without following redirects
+
+        Returns
+        -------
+        tuple[int, str, dict[str, str], bytes] : Status, reason, headers and body
+        """
+
+        parts = urlsplit(url)
+        pool = self._pool(parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+
+        request_headers = {**self.headers, **(headers or {})}
+
+        with self._limit(url) as slot:
+            status, reason, response_headers, data = self._exchange(
+                pool, method, target, body, request_headers
+            )
+            if slot is not None:
+                slot.status = status
+                slot.retry_after = response_headers.get("retry-after")
+
+        return status, reason, response_headers, data
+
+    def _exchange(
+        self,
+        pool: ConnectionPool,
+        method: str,
+        target: str,
+        body: bytes | None,
+        request_headers: dict[str, str],
+    ) -> tuple[int, str, dict[str, str], bytes]:
+        """Send a request on a pooled connection and read the response"""
+
+        connection, reused = pool.acquire()
+        keep = False
+
+        try:
+            try:
+                connection.request(method, target, body=body, headers=request_headers)
+                response = connection.getresponse()
+
+            except STALE_CONNECTION_ERRORS:
+                # Server closed the idle keep-alive connection, retry on a new one
+                if not reused:
+                    raise
+                connection.close()
+                connection = pool.new_connection()
+                connection.request(method, target, body=body, headers=request_headers)
+                response = connection.getresponse()
+
+            data = self._decode(response.read(), response.getheader("content-encoding"))
+            keep = not response.will_close
+
+            response_headers = {
+                name.lower(): value for name, value in response.getheaders()
+            }
+            return response.status, response.reason, response_headers, data
+
+        finally:
+            pool.release(connection, reuse=keep)
+
+    @staticmethod
+    def _decode(data: bytes, encoding: str | None) -> bytes:
+        """Decode a gzip or deflate encoded body"""
+
+        encoding = (encoding or "").lower()
+
+        if encoding == "gzip":
+            return gzip.decompress(data)
+        if encoding == "deflate":
+            return zlib.decompress(data)
+
+        return data
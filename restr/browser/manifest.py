@@ -0,0 +1,244 @@
+"""
+restr.browser.manifest
+
+DriverManifest Class File
+Local record of resolved geckodriver and Firefox binaries
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+# Default manifest location, overridden by the RESTR_DRIVER_MANIFEST environment variable
+MANIFEST_PATH = Path.home().joinpath(".cache", "restr", "drivers.json")
+
+# Binaries tracked by the manifest
+BINARIES = ("geckodriver", "firefox")
+
+_VERSION_PATTERN = re.compile(r"(\d+(?:\.\d+)+)")
+
+
+def binary_version(path: str | Path, timeout: float = 10.0) -> str | None:
+    """
+    Get the version of a local binary
+
+    Parameters
+    ----------
+    path : str | Path
+        Binary that supports --version, e.g. geckodriver or firefox
+
+    timeout : float, optional
+        Seconds to wait for the binary, by default 10.
+
+    Returns
+    -------
+    str | None : Version, e.g. "0.33.0", None if it could not be determined
+    """
+
+    try:
+        output = subprocess.run(
+            [str(path), "--version"],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    match = _VERSION_PATTERN.search(output.splitlines()[0] if output else "")
+    return match.group(1) if match else None
+
+
+class DriverManifest:
+    """
+    DriverManifest Class
+
+    JSON file mapping binary name and version to a local path.
+
+    Lookups only read the file and stat the recorded path, so once populated a
+    driver can be started without webdriver_manager or network access.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path, optional
+            Manifest file, by default $RESTR_DRIVER_MANIFEST or MANIFEST_PATH.
+        """
+
+        self.path: Path = Path(
+            path or os.environ.get("RESTR_DRIVER_MANIFEST") or MANIFEST_PATH
+        )
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """
+        Read the manifest
+
+        Returns
+        -------
+        dict : {"default": {name: version}, name: {version: {"path": str, "size": int}},
+            "missing": {name: PATH searched}}
+        """
+
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {"default": {}}
+
+        return data if isinstance(data, dict) else {"default": {}}
+
+    def get(self, name: str = "geckodriver", version: str | None = None) -> str | None:
+        """
+        Get the path of a recorded binary
+
+        Parameters
+        ----------
+        name : str, optional
+            "geckodriver" or "firefox", by default "geckodriver".
+
+        version : str, optional
+            Version, by default None (the last recorded version).
+
+        Returns
+        -------
+        str | None : Path, None if not recorded or the file changed since
+        """
+
+        data = self.load()
+
+        version = version or data.get("default", {}).get(name)
+        entry = data.get(name, {}).get(version) if version else None
+        if not entry:
+            return None
+
+        # Ignore entries whose binary was removed or replaced
+        try:
+            if os.stat(entry["path"]).st_size != entry.get("size"):
+                return None
+        except OSError:
+            return None
+
+        return entry["path"]
+
+    def record(
+        self, name: str, path: str | Path, version: str | None = None
+    ) -> str | None:
+        """
+        Record a binary and make it the default of its name
+
+        Parameters
+        ----------
+        name : str
+            "geckodriver" or "firefox"
+
+        path : str | Path
+            Path of the binary
+
+        version : str, optional
+            Version, by default None (read from the binary).
+
+        Returns
+        -------
+        str | None : Recorded version, None if it could not be determined
+        """
+
+        if name not in BINARIES:
+            raise ValueError(f"Unknown binary: {name}")
+
+        path = Path(path).resolve()
+        version = version or binary_version(path)
+        if version is None:
+            return None
+
+        with self._lock:
+            data = self.load()
+            data.setdefault(name, {})[version] = {
+                "path": str(path),
+                "size": path.stat().st_size,
+            }
+            data.setdefault("default", {})[name] = version
+            data.get("missing", {}).pop(name, None)
+            self._save(data)
+
+        return version
+
+    def missing(self, name: str) -> bool:
+        """
+        Check if discover() found no usable binary on the current PATH
+
+        Parameters
+        ----------
+        name : str
+            "geckodriver" or "firefox"
+
+        Returns
+        -------
+        bool : True if the binary was missing, or its version unreadable, the
+            last time this PATH was searched
+        """
+
+        return self.load().get("missing", {}).get(name) == os.environ.get("PATH", "")
+
+    def discover(self, versions: dict[str, str] | None = None) -> dict[str, str]:
+        """
+        Record the binaries found on PATH that are not recorded yet
+
+        Parameters
+        ----------
+        versions : dict[str, str], optional
+            Required version by name, by default None (any version).
+            A binary on PATH of another version is recorded but not returned.
+
+        Returns
+        -------
+        dict[str, str] : Names and paths of the binaries now in the manifest
+        """
+
+        versions = versions or {}
+
+        found = {}
+        for name in BINARIES:
+            version = versions.get(name)
+            path = self.get(name, version)
+
+            # A binary missing from this PATH is not searched for again
+            if path is None and not self.missing(name):
+                located = shutil.which(name)
+                recorded = self.record(name, located) if located else None
+                if recorded is None:
+                    self._record_missing(name)
+                elif version in (None, recorded):
+                    path = self.get(name, recorded)
+
+            if path:
+                found[name] = path
+
+        return found
+
+    def _record_missing(self, name: str) -> None:
+        """Record that no usable binary was found on the current PATH"""
+
+        with self._lock:
+            data = self.load()
+            data.setdefault("missing", {})[name] = os.environ.get("PATH", "")
+            self._save(data)
+
+    def _save(self, data: dict) -> None:
+        """Write the manifest atomically, readers never see a partial file"""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp, self.path)
@@ -0,0 +1,493 @@
+"""
+restr.browser.pool
+
+BrowserPool Class File
+Keeps warm Browser instances and leases them out across jobs
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable
+
+from selenium.common.exceptions import WebDriverException
+
+from restr.browser.browser import Browser
+
+
+class PoolMetrics:
+    """
+    BrowserPool Metrics
+
+    Counters are cumulative over the lifetime of the pool.
+    Browsers closed after max_uses or by close() are counted as recycled,
+    those whose driver died or failed to reset as unhealthy.
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.checkouts: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.waits: int = 0
+        self.wait_time: float = 0.0
+        self.spawns: int = 0
+        self.spawn_time: float = 0.0
+        self.recycled: int = 0
+        self.unhealthy: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of checkouts served by an already warm Browser"""
+        return self.hits / self.checkouts if self.checkouts else 0.0
+
+    @property
+    def mean_wait_time(self) -> float:
+        """Mean seconds a checkout waited for a Browser to be checked in"""
+        return self.wait_time / self.checkouts if self.checkouts else 0.0
+
+    @property
+    def mean_spawn_time(self) -> float:
+        """Mean seconds to launch a new Browser"""
+        return self.spawn_time / self.spawns if self.spawns else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        """
+        Get metrics as a dictionary
+
+        Returns
+        -------
+        dict[str, float] : Counters and derived metrics
+        """
+
+        return {
+            "checkouts": self.checkouts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "waits": self.waits,
+            "wait_time": self.wait_time,
+            "spawns": self.spawns,
+            "spawn_time": self.spawn_time,
+            "recycled": self.recycled,
+            "unhealthy": self.unhealthy,
+            "hit_rate": self.hit_rate,
+            "mean_wait_time": self.mean_wait_time,
+            "mean_spawn_time": self.mean_spawn_time,
+        }
+
+
+# pylint: disable=too-many-instance-attributes
+# Pool needs to track idle, leased and usage state
+class BrowserPool:
+    """
+    BrowserPool Class
+
+    Keeps up to `size` Browser instances alive and hands them out with checkout().
+    Browsers are reset between leases and recycled after `max_uses` leases.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 50,
+        headless: bool = True,
+        prewarm: bool = True,
+        factory: Callable[[], Browser] | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        size : int, optional
+            Maximum number of Browser instances, by default 2.
+
+        max_uses : int, optional
+            Number of leases before a Browser is recycled, by default 50.
+
+        headless : bool, optional
+            Run browsers in headless mode, by default True.
+            Ignored if factory is provided.
+
+        prewarm : bool, optional
+            Launch all browsers in the constructor, by default True.
+
+        factory : Callable[[], Browser], optional
+            Creates a new Browser, by default Browser(headless=headless).
+        """
+
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.size: int = size
+        self.max_uses: int = max_uses
+        self.factory: Callable[[], Browser] = factory or (
+            lambda: Browser(headless=headless)
+        )
+        self.metrics: PoolMetrics = PoolMetrics()
+
+        # Idle browsers, most recently checked in last
+        self._idle: deque[Browser] = deque()
+
+        # Number of leases per browser, keyed by id(browser)
+        self._uses: dict[int, int] = {}
+
+        # Browsers currently checked out, keyed by id(browser)
+        self._leased: dict[int, Browser] = {}
+
+        # Number of browsers being launched
+        self._spawning: int = 0
+
+        self._closed: bool = False
+        self._condition = threading.Condition()
+
+        if prewarm:
+            self.prewarm()
+
+    def __len__(self) -> int:
+        """Number of live browsers (idle, leased and launching)"""
+
+        with self._condition:
+            return len(self._idle) + len(self._leased) + self._spawning
+
+    def prewarm(self) -> None:
+        """Launch browsers until the pool is full"""
+
+        while True:
+            with self._condition:
+                if self._closed or len(self) >= self.size:
+                    return
+                self._spawning += 1
+
+            browser = self._spawn()
+
+            with self._condition:
+                self._spawning -= 1
+                closed = self._closed
+                if not closed:
+                    self._idle.append(browser)
+                self._condition.notify()
+
+            # Pool was closed while the browser was launching
+            if closed:
+                self._retire(browser)
+                return
+
+    def checkout(self, timeout: float | None = None) -> Browser:
+        """
+        Checkout a Browser
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for a Browser if all are leased, by default None.
+            Waits forever if None.
+
+        Returns
+        -------
+        Browser : Healthy Browser with a single blank window
+
+        Raises
+        ------
+        TimeoutError : If no Browser became available within timeout
+        RuntimeError : If the pool is closed
+        """
+
+        start = time.perf_counter()
+        waited = False
+
+        # Unhealthy idle browsers, closed once the lock is released
+        dead: list[Browser] = []
+
+        try:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("BrowserPool is closed")
+
+                    # Use a warm browser if one is idle
+                    browser = self._take_idle(dead)
+                    if browser is not None:
+                        self._lease(browser, hit=True, start=start, waited=waited)
+                        return browser
+
+                    # Launch a new browser if there is capacity
+                    if len(self) < self.size:
+                        self._spawning += 1
+                        break
+
+                    # Wait for a checkin
+                    waited = True
+                    remaining = (
+                        None
+                        if timeout is None
+                        else timeout - (time.perf_counter() - start)
+                    )
+                    if remaining is not None and remaining <= 0:
+                        self.metrics.waits += 1
+                        self.metrics.wait_time += time.perf_counter() - start
+                        raise TimeoutError("Timed out waiting for a Browser")
+                    self._condition.wait(remaining)
+
+        finally:
+            for unhealthy in dead:
+                self._close(unhealthy)
+
+        # Launch outside the lock so other checkouts are not blocked
+        browser = self._spawn()
+
+        with self._condition:
+            self._spawning -= 1
+            self._lease(browser, hit=False, start=start, waited=waited)
+
+        return browser
+
+    def checkin(self, browser: Browser) -> None:
+        """
+        Checkin a Browser
+
+        Parameters
+        ----------
+        browser : Browser
+            Browser returned by checkout()
+
+        Notes
+        -----
+        The browser is reset before it is made available again.
+        It is closed instead if it reached max_uses or is unhealthy.
+        """
+
+        with self._condition:
+            if id(browser) not in self._leased:
+                raise ValueError("Browser was not checked out from this pool")
+
+            retire = self._closed or self._uses[id(browser)] >= self.max_uses
+
+        # Keep the browser counted as leased while it is reset
+        unhealthy = False
+        if not retire:
+            try:
+                browser.reset()
+            except WebDriverException:
+                unhealthy = True
+
+        unhealthy = unhealthy or not self.is_healthy(browser)
+        retire = retire or unhealthy
+        if retire:
+            self._retire(browser, unhealthy=unhealthy)
+
+        with self._condition:
+            del self._leased[id(browser)]
+            closed = self._closed
+            if not retire and not closed:
+                self._idle.append(browser)
+            self._condition.notify()
+
+        # Pool was closed while the browser was being reset
+        if not retire and closed:
+            self._retire(browser)
+
+    async def acheckout(self, timeout: float | None = None) -> Browser:
+        """
+        Checkout a Browser without blocking the event loop
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for a Browser if all are leased, by default None.
+
+        Returns
+        -------
+        Browser : Healthy Browser with a single blank window
+        """
+
+        return await asyncio.to_thread(self.checkout, timeout)
+
+    async def acheckin(self, browser: Browser) -> None:
+        """
+        Checkin a Browser without blocking the event loop
+
+        Parameters
+        ----------
+        browser : Browser
+            Browser returned by acheckout()
+        """
+
+        await asyncio.to_thread(self.checkin, browser)
+
+    @contextmanager
+    def lease(self, timeout: float | None = None):
+        """
+        Checkout a Browser for the duration of a with block
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for a Browser if all are leased, by default None.
+        """
+
+        browser = self.checkout(timeout)
+        try:
+            yield browser
+        finally:
+            self.checkin(browser)
+
+    @asynccontextmanager
+    async def alease(self, timeout: float | None = None):
+        """
+        Checkout a Browser for the duration of an async with block
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for a Browser if all are leased, by default None.
+        """
+
+        browser = await self.acheckout(timeout)
+        try:
+            yield browser
+        finally:
+            await self.acheckin(browser)
+
+    @staticmethod
+    def is_healthy(browser: Browser) -> bool:
+        """
+        Check if the Browser process is alive
+
+        Parameters
+        ----------
+        browser : Browser
+            Browser to check
+
+        Returns
+        -------
+        bool : True if the driver service process is running
+        """
+
+        process = browser.browser.service.process
+        return process is not None and process.poll() is None
+
+    def close(self) -> None:
+        """
+        Close the pool
+
+        Idle browsers are closed immediately.
+        Leased browsers are closed when they are checked in.
+        """
+
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for browser in idle:
+            self._retire(browser)
+
+    def _take_idle(self, dead: list[Browser]) -> Browser | None:
+        """
+        Take a healthy idle Browser
+
+        Parameters
+        ----------
+        dead : list[Browser]
+            Unhealthy browsers are removed from the pool and appended to it,
+            the caller closes them once the condition is released.
+
+        Returns
+        -------
+        Browser | None : Idle Browser or None if there are no idle browsers
+
+        Notes
+        -----
+        Must be called with the condition held.
+        """
+
+        while self._idle:
+            browser = self._idle.pop()
+            if self.is_healthy(browser):
+                return browser
+
+            self.metrics.unhealthy += 1
+            self._uses.pop(id(browser), None)
+            dead.append(browser)
+
+        return None
+
+    def _lease(self, browser: Browser, hit: bool, start: float, waited: bool) -> None:
+        """
+        Mark a Browser as leased and update the metrics
+
+        Notes
+        -----
+        Must be called with the condition held.
+        """
+
+        self._leased[id(browser)] = browser
+        self._uses[id(browser)] = self._uses.get(id(browser), 0) + 1
+
+        self.metrics.checkouts += 1
+        self.metrics.hits += int(hit)
+        self.metrics.misses += int(not hit)
+        self.metrics.waits += int(waited)
+        self.metrics.wait_time += time.perf_counter() - start
+
+    def _spawn(self) -> Browser:
+        """
+        Launch a new Browser
+
+        Notes
+        -----
+        The caller must have incremented _spawning and decrements it on success.
+        """
+
+        start = time.perf_counter()
+        try:
+            browser = self.factory()
+        except Exception:
+            with self._condition:
+                self._spawning -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._uses[id(browser)] = 0
+            self.metrics.spawns += 1
+            self.metrics.spawn_time += time.perf_counter() - start
+
+        return browser
+
+    def _retire(self, browser: Browser, unhealthy: bool = False) -> None:
+        """
+        Close a Browser and forget its usage
+
+        Parameters
+        ----------
+        browser : Browser
+            Browser to close
+
+        unhealthy : bool, optional
+            Browser failed its reset or health check, counted as unhealthy
+            instead of recycled, by default False.
+        """
+
+        with self._condition:
+            self._uses.pop(id(browser), None)
+            if unhealthy:
+                self.metrics.unhealthy += 1
+            else:
+                self.metrics.recycled += 1
+
+        self._close(browser)
+
+    @staticmethod
+    def _close(browser: Browser) -> None:
+        """Close a Browser, ignoring errors of a driver that already died"""
+
+        try:
+            browser.close()
+        except (WebDriverException, OSError):
+            pass
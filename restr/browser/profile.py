@@ -0,0 +1,293 @@
+"""
+restr.browser.profile
+
+Profile Class File
+Firefox preference sets that control what a page load fetches
+"""
+
+import base64
+import json
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from selenium.webdriver import Firefox, FirefoxOptions
+
+# Skip the assets a mapping crawl never looks at
+ASSET_PREFERENCES = {
+    # Images, 2 = block
+    "permissions.default.image": 2,
+    # Stylesheets, 2 = block
+    "permissions.default.stylesheet": 2,
+    # Web fonts
+    "browser.display.use_document_fonts": 0,
+    "gfx.downloadable_fonts.enabled": False,
+    # Audio and video, 5 = block all autoplay
+    "media.autoplay.default": 5,
+    "media.preload.default": 0,
+    "media.preload.auto": 0,
+    "media.mediasource.enabled": False,
+    "media.webspeech.synth.enabled": False,
+}
+
+# Stop requests the page did not ask for
+BACKGROUND_PREFERENCES = {
+    # Prefetch and speculative connections
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.dns.disablePrefetchFromHTTPS": True,
+    "network.predictor.enabled": False,
+    "network.predictor.enable-prefetch": False,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.urlbar.speculativeConnect.enabled": False,
+    "browser.places.speculativeConnect.enabled": False,
+    # Telemetry and studies
+    "toolkit.telemetry.enabled": False,
+    "toolkit.telemetry.unified": False,
+    "toolkit.telemetry.archive.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "app.shield.optoutstudies.enabled": False,
+    "app.normandy.enabled": False,
+    "browser.ping-centre.telemetry": False,
+    # Background services
+    "app.update.auto": False,
+    "extensions.update.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "browser.safebrowsing.downloads.enabled": False,
+    "network.captive-portal-service.enabled": False,
+    "network.connectivity-service.enabled": False,
+    "browser.newtabpage.enabled": False,
+    "browser.startup.page": 0,
+}
+
+# Advertising and analytics hosts blocked by the lean profile
+BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "newrelic.com",
+    "nr-data.net",
+    "sentry.io",
+    "fullstory.com",
+    "optimizely.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "adnxs.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+)
+
+# Unroutable proxy, requests sent to it fail immediately
+BLACKHOLE = "PROXY 127.0.0.1:9"
+
+_PAC_SCRIPT = """function FindProxyForURL(url, host) {
+    var matches = function (domains) {
+        for (var i = 0; i < domains.length; i++) {
+            if (host === domains[i] || dnsDomainIs(host, "." + domains[i])) return true;
+        }
+        return false;
+    };
+    if (%(allowed)s !== null && !matches(%(allowed)s)) return "%(blackhole)s";
+    if (matches(%(blocked)s)) return "%(blackhole)s";
+    return "%(route)s";
+}"""
+
+
+class Profile:
+    """
+    Profile Class
+
+    Preferences, blocked hosts and timeouts applied to a Browser.
+
+    Hosts are blocked with a proxy auto-config script that sends their requests
+    to an unroutable proxy, so they fail before any connection is made.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        preferences: dict[str, str | int | bool] | None = None,
+        blocked_hosts: Iterable[str] = (),
+        allowed_hosts: Iterable[str] | None = None,
+        page_load_timeout: float | None = None,
+        script_timeout: float | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        preferences : dict[str, str | int | bool], optional
+            Firefox preferences, by default None.
+
+        blocked_hosts : Iterable[str], optional
+            Domains whose requests are blocked, including subdomains, by default ().
+
+        allowed_hosts : Iterable[str], optional
+            Only allow requests to these domains and their subdomains, by default None.
+            All hosts are allowed if None.
+
+        page_load_timeout : float, optional
+            Seconds before a page load is aborted, by default None (WebDriver default).
+
+        script_timeout : float, optional
+            Seconds before an async script is aborted, by default None (WebDriver default).
+        """
+
+        self.preferences: dict[str, str | int | bool] = dict(preferences or {})
+        self.blocked_hosts: tuple[str, ...] = tuple(
+            host.lower().lstrip(".") for host in blocked_hosts
+        )
+        self.allowed_hosts: tuple[str, ...] | None = (
+            tuple(host.lower().lstrip(".") for host in allowed_hosts)
+            if allowed_hosts is not None
+            else None
+        )
+        self.page_load_timeout: float | None = page_load_timeout
+        self.script_timeout: float | None = script_timeout
+
+    @classmethod
+    def lean(
+        cls,
+        blocked_hosts: Iterable[str] = BLOCKED_HOSTS,
+        allowed_hosts: Iterable[str] | None = None,
+        page_load_timeout: float = 15.0,
+        script_timeout: float = 10.0,
+    ) -> "Profile":
+        """
+        Create the lean profile
+
+        Blocks images, stylesheets, fonts, media and advertising hosts and turns
+        off prefetching, speculative connections and telemetry.
+
+        Parameters
+        ----------
+        blocked_hosts : Iterable[str], optional
+            Domains whose requests are blocked, by default BLOCKED_HOSTS.
+
+        allowed_hosts : Iterable[str], optional
+            Only allow requests to these domains, by default None.
+
+        page_load_timeout : float, optional
+            Seconds before a page load is aborted, by default 15.
+
+        script_timeout : float, optional
+            Seconds before an async script is aborted, by default 10.
+
+        Returns
+        -------
+        Profile : Lean profile
+        """
+
+        return cls(
+            {**ASSET_PREFERENCES, **BACKGROUND_PREFERENCES},
+            blocked_hosts=blocked_hosts,
+            allowed_hosts=allowed_hosts,
+            page_load_timeout=page_load_timeout,
+            script_timeout=script_timeout,
+        )
+
+    @classmethod
+    def get(cls, name: str) -> "Profile":
+        """
+        Get a profile by name
+
+        Parameters
+        ----------
+        name : str
+            "default" or "lean"
+
+        Returns
+        -------
+        Profile : Profile with default settings
+        """
+
+        if name == "default":
+            return cls()
+        if name == "lean":
+            return cls.lean()
+
+        raise ValueError(f"Unknown profile: {name}")
+
+    def pac(self, proxy: tuple[str, int] | None = None) -> str | None:
+        """
+        Get the proxy auto-config script that blocks hosts
+
+        Parameters
+        ----------
+        proxy : tuple[str, int], optional
+            Host and port of a proxy that allowed requests are sent to, by default None.
+            Allowed requests connect directly if None.
+
+        Returns
+        -------
+        str | None : PAC script, None if no host is blocked
+        """
+
+        if not self.blocked_hosts and self.allowed_hosts is None:
+            return None
+
+        return _PAC_SCRIPT % {
+            "allowed": json.dumps(
+                list(self.allowed_hosts) if self.allowed_hosts is not None else None
+            ),
+            "blocked": json.dumps(list(self.blocked_hosts)),
+            "blackhole": BLACKHOLE,
+            "route": f"PROXY {proxy[0]}:{proxy[1]}" if proxy else "DIRECT",
+        }
+
+    def apply(
+        self, options: "FirefoxOptions", proxy: tuple[str, int] | None = None
+    ) -> None:
+        """
+        Set the preferences on Firefox options
+
+        Parameters
+        ----------
+        options : FirefoxOptions
+            Options the browser is created with
+
+        proxy : tuple[str, int], optional
+            Host and port of a proxy the browser must use, by default None.
+            Replaces manual proxy preferences when hosts are blocked.
+        """
+
+        for name, value in self.preferences.items():
+            options.set_preference(name, value)
+
+        pac = self.pac(proxy)
+        if pac is not None:
+            encoded = base64.b64encode(pac.encode()).decode()
+            options.set_preference("network.proxy.type", 2)
+            options.set_preference(
+                "network.proxy.autoconfig_url",
+                f"data:application/x-ns-proxy-autoconfig;base64,{encoded}",
+            )
+            options.set_preference("network.proxy.allow_hijacking_localhost", True)
+
+    def configure(self, browser: "Firefox") -> None:
+        """
+        Set the timeouts on a running browser
+
+        Parameters
+        ----------
+        browser : Firefox
+            Selenium Firefox driver
+        """
+
+        if self.page_load_timeout is not None:
+            browser.set_page_load_timeout(self.page_load_timeout)
+        if self.script_timeout is not None:
+            browser.set_script_timeout(self.script_timeout)
@@ -0,0 +1,281 @@
+"""
+restr.browser.ready
+
+Page readiness
+Waits for a page to load, its DOM to settle and its network to go idle
+with an observer injected into the page
+"""
+
+import time
+from typing import TYPE_CHECKING
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    TimeoutException,
+    WebDriverException,
+)
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Firefox delays timers of background tabs to 1s, the observer relies on timers
+READY_PREFERENCES = {
+    "dom.min_background_timeout_value": 10,
+    "dom.timeout.enable_budget_timer_throttling": False,
+}
+
+# Seconds each wait leaves before the driver's script timeout
+SCRIPT_TIMEOUT_MARGIN = 0.5
+
+# Script timeout of WebDriver sessions that do not report theirs
+DEFAULT_SCRIPT_TIMEOUT = 30.0
+
+# Installs the observer once per document and returns it.
+# It records the last DOM mutation, the last finished request and the number
+# of fetch and XMLHttpRequest calls in flight.
+_OBSERVER = """
+const observer = window.__restrReady || (window.__restrReady = (() => {
+    const state = {
+        inflight: 0,
+        lastMutation: performance.now(),
+        lastNetwork: performance.now(),
+        listeners: new Set(),
+    };
+    const notify = () => state.listeners.forEach((listener) => listener());
+
+    new MutationObserver(() => {
+        state.lastMutation = performance.now();
+        notify();
+    }).observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true,
+    });
+
+    try {
+        new PerformanceObserver(() => {
+            state.lastNetwork = performance.now();
+            notify();
+        }).observe({type: "resource"});
+    } catch (e) {}
+
+    const begin = () => {
+        state.inflight++;
+        state.lastNetwork = performance.now();
+    };
+    const end = () => {
+        state.inflight = Math.max(0, state.inflight - 1);
+        state.lastNetwork = performance.now();
+        notify();
+    };
+
+    const fetch = window.fetch;
+    window.fetch = function () {
+        begin();
+        return fetch.apply(this, arguments).finally(end);
+    };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener("loadend", end, {once: true});
+        return send.apply(this, arguments);
+    };
+
+    window.addEventListener("load", notify);
+    return state;
+})());
+
+// Milliseconds until the page is ready, 0 if it is ready now
+const remaining = (domStable, networkIdle, predicate) => {
+    if (document.__restrStale) return -1;
+    if (document.readyState !== "complete") return 50;
+
+    const now = performance.now();
+    let wait = 0;
+    if (domStable !== null) {
+        wait = Math.max(wait, domStable - (now - observer.lastMutation));
+    }
+    if (networkIdle !== null) {
+        wait = Math.max(
+            wait,
+            observer.inflight ? networkIdle : networkIdle - (now - observer.lastNetwork)
+        );
+    }
+    if (wait <= 0 && predicate !== null && !new Function("return (" + predicate + ");")()) {
+        wait = 50;
+    }
+    return wait;
+};
+"""
+
+# Arguments: domStable, networkIdle, predicate, timeout (ms or null), callback.
+# Resolves with [ready, stale] once, re-checking on timers and page events.
+_WAIT_SCRIPT = _OBSERVER + """
+const [domStable, networkIdle, predicate, timeout, done] = arguments;
+const start = performance.now();
+let timer = null;
+
+const finish = (ready, stale) => {
+    observer.listeners.delete(check);
+    clearTimeout(timer);
+    done([ready, stale]);
+};
+
+function check() {
+    const wait = remaining(domStable, networkIdle, predicate);
+    if (wait < 0) return finish(false, true);
+    if (wait === 0) return finish(true, false);
+
+    const left = timeout - (performance.now() - start);
+    if (left <= 0) return finish(false, false);
+
+    clearTimeout(timer);
+    timer = setTimeout(check, Math.min(wait, left));
+}
+
+observer.listeners.add(check);
+check();
+"""
+
+# Arguments: domStable, networkIdle, predicate. Returns true if ready now.
+_CHECK_SCRIPT = _OBSERVER + """
+return remaining(arguments[0], arguments[1], arguments[2]) === 0;
+"""
+
+
+def _ms(seconds: float | None) -> int | None:
+    """Convert seconds to milliseconds"""
+    return None if seconds is None else int(seconds * 1000)
+
+
+def script_timeout(driver: "WebDriver") -> float | None:
+    """
+    Get the script timeout of a WebDriver session
+
+    Parameters
+    ----------
+    driver : WebDriver
+        Selenium driver
+
+    Returns
+    -------
+    float | None : Seconds an asynchronous script may run, None if unlimited
+    """
+
+    try:
+        return driver.timeouts.script
+    except TypeError:
+        # The session reports null, scripts never time out
+        return None
+    except WebDriverException:
+        return DEFAULT_SCRIPT_TIMEOUT
+
+
+def wait_until_ready(
+    driver: "WebDriver",
+    dom_stable: float | None = None,
+    network_idle: float | None = None,
+    predicate: str | None = None,
+    timeout: float = 30.0,
+) -> bool:
+    """
+    Wait until the current page is ready
+
+    Parameters
+    ----------
+    driver : WebDriver
+        Selenium driver switched to the page
+
+    dom_stable : float, optional
+        Seconds without DOM mutations, by default None (not required).
+
+    network_idle : float, optional
+        Seconds without fetch or XMLHttpRequest calls in flight and without
+        finished requests, by default None (not required).
+
+    predicate : str, optional
+        JavaScript expression that must be truthy, by default None (not required).
+
+    timeout : float, optional
+        Seconds to wait, by default 30.
+
+    Returns
+    -------
+    bool : True if the page became ready, False on timeout
+
+    Notes
+    -----
+    The page must have finished loading (document.readyState is "complete") in
+    any case. Every wait is an asynchronous script call resolved by the page,
+    bounded by the driver's script timeout less SCRIPT_TIMEOUT_MARGIN, and is
+    repeated until the timeout or when the document is replaced by a navigation.
+    """
+
+    deadline = time.monotonic() + timeout
+
+    # Longest wait a single script call may take
+    limit = script_timeout(driver)
+    if limit is not None:
+        limit = max(limit - SCRIPT_TIMEOUT_MARGIN, limit / 2)
+
+    while (left := deadline - time.monotonic()) > 0:
+        try:
+            ready, stale = driver.execute_async_script(
+                _WAIT_SCRIPT,
+                _ms(dom_stable),
+                _ms(network_idle),
+                predicate,
+                _ms(left if limit is None else min(left, limit)),
+            )
+        except TimeoutException:
+            # The page blocked its event loop past the script timeout
+            continue
+        except JavascriptException as error:
+            # The document navigated away while waiting, wait on the new one
+            if "unloaded" not in str(error).lower():
+                raise
+            continue
+
+        if ready:
+            return True
+
+        # The navigation started by Window.navigate() has not replaced the document yet
+        if stale:
+            time.sleep(0.01)
+
+    return False
+
+
+def is_ready(
+    driver: "WebDriver",
+    dom_stable: float | None = None,
+    network_idle: float | None = None,
+    predicate: str | None = None,
+) -> bool:
+    """
+    Check once if the current page is ready
+
+    Parameters
+    ----------
+    driver : WebDriver
+        Selenium driver switched to the page
+
+    dom_stable : float, optional
+        Seconds without DOM mutations, by default None (not required).
+
+    network_idle : float, optional
+        Seconds without requests in flight, by default None (not required).
+
+    predicate : str, optional
+        JavaScript expression that must be truthy, by default None (not required).
+
+    Returns
+    -------
+    bool : True if the page is ready
+
+    Notes
+    -----
+    Does not block the driver, for callers that multiplex tabs over one driver.
+    """
+
+    return driver.execute_script(
+        _CHECK_SCRIPT, _ms(dom_stable), _ms(network_idle), predicate
+    )
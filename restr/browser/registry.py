@@ -0,0 +1,321 @@
+"""
+restr.browser.registry
+
+WindowRegistry Class File
+Bounded set of open browser tabs with least-recently-used eviction
+"""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterator
+
+import psutil
+from selenium.common.exceptions import WebDriverException
+
+from restr.browser.window import Window
+
+if TYPE_CHECKING:
+    from selenium.webdriver import Firefox
+
+    from restr.browser.capture import PageRecorder
+    from restr.crawler.endpoints import EndpointMap
+    from restr.browser.tracing import Tracer
+    from restr.crawler.ratelimit import RateController
+
+# Maps the WebDriver handle of every tab to the pid of its content process
+_CONTENT_PIDS_SCRIPT = """
+const pids = {};
+for (const win of Services.wm.getEnumerator("navigator:browser")) {
+    for (const tab of win.gBrowser.tabs) {
+        const browser = tab.linkedBrowser;
+        const global = browser.browsingContext
+            && browser.browsingContext.currentWindowGlobal;
+        pids[String(browser.browserId)] = global ? global.osPid : null;
+    }
+}
+return pids;
+"""
+
+
+class WindowRegistry:
+    """
+    WindowRegistry Class
+
+    Windows of a browser by handle, least recently used first.
+
+    At most `max_windows` tabs are kept open. Adding a window beyond the cap
+    closes the least recently used idle windows. Windows handed out by
+    acquire() are busy until release() and are never evicted.
+    """
+
+    def __init__(
+        self,
+        browser: "Firefox",
+        max_windows: int = 8,
+        endpoints: "EndpointMap | None" = None,
+        rate: "RateController | None" = None,
+        tracer: "Tracer | None" = None,
+        recorder: "PageRecorder | None" = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        browser : Firefox
+            Browser instance
+
+        max_windows : int, optional
+            Maximum number of open tabs, by default 8.
+
+        endpoints : EndpointMap, optional
+            Passed to the Windows the registry creates, by default None.
+
+        rate : RateController, optional
+            Passed to the Windows the registry creates, by default None.
+
+        tracer : Tracer, optional
+            Passed to the Windows the registry creates, by default None.
+
+        recorder : PageRecorder, optional
+            Passed to the Windows the registry creates, by default None.
+        """
+
+        if max_windows < 1:
+            raise ValueError("max_windows must be at least 1")
+
+        self.browser: "Firefox" = browser
+        self.max_windows: int = max_windows
+        self.endpoints: "EndpointMap | None" = endpoints
+        self.rate: "RateController | None" = rate
+        self.tracer: "Tracer | None" = tracer
+        self.recorder: "PageRecorder | None" = recorder
+
+        self._windows: OrderedDict[str, Window] = OrderedDict()
+        self._busy: set[str] = set()
+
+        self.evictions: int = 0
+        self.reuses: int = 0
+
+    def __contains__(self, handle: str) -> bool:
+        return handle in self._windows
+
+    def __getitem__(self, handle: str) -> Window:
+        """Get a Window and mark it as recently used"""
+
+        window = self._windows[handle]
+        self._windows.move_to_end(handle)
+        return window
+
+    def __setitem__(self, handle: str, window: Window) -> None:
+        window.handle = handle
+        self.add(window)
+
+    def __delitem__(self, handle: str) -> None:
+        del self._windows[handle]
+        self._busy.discard(handle)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._windows))
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def get(self, handle: str, default: Window | None = None) -> Window | None:
+        """Get a Window and mark it as recently used, default if unknown"""
+        return self[handle] if handle in self._windows else default
+
+    def keys(self) -> list[str]:
+        """Handles, least recently used first"""
+        return list(self._windows)
+
+    def values(self) -> list[Window]:
+        """Windows, least recently used first"""
+        return list(self._windows.values())
+
+    def items(self) -> list[tuple[str, Window]]:
+        """Handles and Windows, least recently used first"""
+        return list(self._windows.items())
+
+    def add(self, window: Window, busy: bool = False) -> Window:
+        """
+        Register an open Window as most recently used
+
+        Parameters
+        ----------
+        window : Window
+            Window with a handle
+
+        busy : bool, optional
+            Protect the Window from eviction until release(), by default False.
+
+        Returns
+        -------
+        Window : The registered Window
+        """
+
+        window.registry = self
+        self._windows[window.handle] = window
+        self._windows.move_to_end(window.handle)
+
+        if busy:
+            self._busy.add(window.handle)
+
+        if len(self._windows) > self.max_windows:
+            self.evict()
+
+        return window
+
+    def discard(self, handle: str) -> None:
+        """
+        Forget a Window without closing it
+
+        Parameters
+        ----------
+        handle : str
+            Window handle
+        """
+
+        self._windows.pop(handle, None)
+        self._busy.discard(handle)
+
+    def acquire(self, url: str | None = None) -> Window:
+        """
+        Get a Window for a page, reusing an idle tab if there is one
+
+        Parameters
+        ----------
+        url : str, optional
+            URL to open, by default None (blank page).
+
+        Returns
+        -------
+        Window : Busy Window switched to and showing the URL, release() it when done
+        """
+
+        idle = [handle for handle in self._windows if handle not in self._busy]
+
+        if idle:
+            # Navigate the most recently used idle tab instead of opening one
+            window = self[idle[-1]]
+            self.reuses += 1
+        else:
+            window = Window(
+                browser=self.browser,
+                endpoints=self.endpoints,
+                rate=self.rate,
+                tracer=self.tracer,
+                recorder=self.recorder,
+            )
+
+        window.open(url)
+
+        return self.add(window, busy=True)
+
+    def release(self, window: Window) -> None:
+        """
+        Mark a Window idle so it can be reused or evicted
+
+        Parameters
+        ----------
+        window : Window
+            Window returned by acquire()
+        """
+
+        self._busy.discard(window.handle)
+
+        if len(self._windows) > self.max_windows:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Close least recently used idle tabs until the cap is met
+
+        Returns
+        -------
+        int : Number of closed tabs
+
+        Notes
+        -----
+        The last open tab is never closed, closing it would end the session.
+        The browser stays switched to the tab it was on, unless that tab
+        was closed.
+        """
+
+        self.sync()
+
+        try:
+            current = self.browser.current_window_handle
+        except WebDriverException:
+            current = None
+
+        closed = set()
+        for handle in list(self._windows):
+            if len(self._windows) <= self.max_windows:
+                break
+            if handle in self._busy:
+                continue
+
+            self._windows[handle].close()
+            self.discard(handle)
+            closed.add(handle)
+
+        # Closing a tab switches to it first
+        if closed and current is not None and current not in closed:
+            self.browser.switch_to.window(current)
+
+        self.evictions += len(closed)
+        return len(closed)
+
+    def sync(self) -> None:
+        """Drop Windows whose tab was closed and add tabs opened elsewhere"""
+
+        handles = self.browser.window_handles
+
+        for handle in set(self._windows) - set(handles):
+            self.discard(handle)
+
+        for handle in handles:
+            if handle not in self._windows:
+                window = Window(
+                    browser=self.browser,
+                    handle=handle,
+                    endpoints=self.endpoints,
+                    rate=self.rate,
+                    tracer=self.tracer,
+                    recorder=self.recorder,
+                )
+                window.registry = self
+                self._windows[handle] = window
+                self._windows.move_to_end(handle, last=False)
+
+    def memory(self) -> dict[str, int | None]:
+        """
+        Get the memory of the content process of every tab
+
+        Returns
+        -------
+        dict[str, int | None] : Resident bytes by handle, None if unavailable
+
+        Notes
+        -----
+        Firefox does not report memory per tab. Each tab's content process is
+        read from the chrome context and measured, tabs of the same site can
+        share a process and then report the same value. Returns None for all
+        tabs if the chrome context is not available.
+        """
+
+        try:
+            with self.browser.context(self.browser.CONTEXT_CHROME):
+                pids = self.browser.execute_script(_CONTENT_PIDS_SCRIPT)
+        except WebDriverException:
+            pids = {}
+
+        memory = {}
+        for handle in self._windows:
+            pid = pids.get(handle)
+            try:
+                memory[handle] = psutil.Process(pid).memory_info().rss if pid else None
+            except psutil.Error:
+                memory[handle] = None
+
+        return memory
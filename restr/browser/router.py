@@ -0,0 +1,332 @@
+"""
+restr.browser.router
+
+RenderRouter Class File
+Fetches URLs with HttpBrowser and only escalates to Firefox when rendering is needed
+"""
+
+import re
+import time
+from typing import Callable
+
+from restr.browser.browser_base import BrowserBase
+from restr.browser.http_browser import HttpBrowser, Response
+from restr.urls import host_template
+
+# Content types that a browser renders
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+# Visible text below this many characters counts as an empty body
+MIN_TEXT_LENGTH = 200
+
+_SCRIPT_SRC = re.compile(rb"<script[^>]+src\s*=", re.I)
+_LINK = re.compile(rb"<a\s[^>]*href\s*=", re.I)
+_INVISIBLE = re.compile(rb"<(script|style|noscript|template)\b.*?</\1\s*>", re.I | re.S)
+_TAG = re.compile(rb"<[^>]+>")
+_SPA_ROOT = re.compile(
+    rb"<(div|main)[^>]+id\s*=\s*[\"']?(root|app|__next|__nuxt|svelte)[\"']?[^>]*>\s*</\1>"
+    rb"|<app-root[^>]*>\s*</app-root>"
+    rb"|\sng-app\b|\sdata-reactroot\b",
+    re.I,
+)
+
+
+def needs_render(response: Response) -> bool:
+    """
+    Check if a response looks like a JavaScript-rendered shell
+
+    Parameters
+    ----------
+    response : Response
+        Response fetched without a browser
+
+    Returns
+    -------
+    bool : True if the page needs a browser to show its content
+
+    Notes
+    -----
+    Only HTML responses can need rendering. An HTML page needs rendering if it
+    has an empty SPA root element, if its visible text is nearly empty and it
+    loads script bundles, or if it has no links.
+    """
+
+    if response.content_type not in HTML_TYPES or not response.ok:
+        return False
+
+    body = response.body
+
+    if _SPA_ROOT.search(body):
+        return True
+
+    text = _TAG.sub(b" ", _INVISIBLE.sub(b" ", body))
+    if len(b" ".join(text.split())) < MIN_TEXT_LENGTH and _SCRIPT_SRC.search(body):
+        return True
+
+    return not _LINK.search(body)
+
+
+class RoutedPage:
+    """
+    Page opened by RenderRouter
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        url: str,
+        html: str,
+        rendered: bool,
+        elapsed: float,
+        response: Response | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        url : str
+            Final URL
+
+        html : str
+            Page source, rendered by Firefox if rendered is True
+
+        rendered : bool
+            True if the page was opened in Firefox
+
+        elapsed : float
+            Seconds to open the page, including the probe fetch
+
+        response : Response, optional
+            Probe response, by default None.
+            None if the probe was skipped.
+        """
+
+        self.url: str = url
+        self.html: str = html
+        self.rendered: bool = rendered
+        self.elapsed: float = elapsed
+        self.response: Response | None = response
+
+
+class RouterStats:
+    """
+    RenderRouter statistics
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.pages: int = 0
+        self.probes: int = 0
+        self.escalations: int = 0
+        self.skipped_probes: int = 0
+        self.fetch_time: float = 0.0
+        self.render_time: float = 0.0
+        self.fetched_pages: int = 0
+
+        # Probe fetches of pages that were escalated anyway
+        self.wasted_probe_time: float = 0.0
+
+    @property
+    def escalation_rate(self) -> float:
+        """Share of pages opened in Firefox"""
+        return self.escalations / self.pages if self.pages else 0.0
+
+    @property
+    def mean_render_time(self) -> float:
+        """Mean seconds to open a page in Firefox"""
+        return self.render_time / self.escalations if self.escalations else 0.0
+
+    @property
+    def mean_fetch_time(self) -> float:
+        """Mean seconds to fetch a page without a browser"""
+        return self.fetch_time / self.probes if self.probes else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        """
+        Estimated seconds saved compared to opening every page in Firefox
+
+        Fetched pages save the mean render time minus their fetch time.
+        Escalations decided from the cache save the probe fetch, escalations
+        that were probed first lost it. Negative if the probes cost more than
+        the renders they avoided.
+        """
+
+        if not self.escalations:
+            return 0.0
+
+        fetched = self.fetched_pages * self.mean_render_time - (
+            self.fetched_pages * self.mean_fetch_time
+        )
+        return (
+            fetched
+            + self.skipped_probes * self.mean_fetch_time
+            - self.wasted_probe_time
+        )
+
+    def as_dict(self) -> dict[str, float]:
+        """
+        Get statistics as a dictionary
+
+        Returns
+        -------
+        dict[str, float] : Counters and derived statistics
+        """
+
+        return {
+            "pages": self.pages,
+            "probes": self.probes,
+            "escalations": self.escalations,
+            "skipped_probes": self.skipped_probes,
+            "wasted_probe_time": self.wasted_probe_time,
+            "escalation_rate": self.escalation_rate,
+            "time_saved": self.time_saved,
+        }
+
+
+class RenderRouter(BrowserBase):
+    """
+    RenderRouter Class
+
+    Opens every URL with HttpBrowser first and escalates to Firefox only if the
+    response looks like a JavaScript-rendered shell. The decision is remembered
+    per host and path template, so later URLs of the same endpoint skip the probe.
+    """
+
+    def __init__(
+        self,
+        *args,
+        fetcher: HttpBrowser | None = None,
+        browser: BrowserBase | None = None,
+        browser_factory: Callable[[], BrowserBase] | None = None,
+        **kwargs,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        fetcher : HttpBrowser, optional
+            Browserless backend, by default a new HttpBrowser.
+
+        browser : Browser, optional
+            Firefox backend, by default created on the first escalation.
+
+        browser_factory : Callable[[], Browser], optional
+            Creates the Firefox backend, by default Browser(headless=True).
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.fetcher: HttpBrowser = fetcher or HttpBrowser()
+        self.browser: BrowserBase | None = browser
+        self.browser_factory: Callable[[], BrowserBase] = (
+            browser_factory or _headless_browser
+        )
+
+        # Render decision per (host, path template)
+        self.decisions: dict[tuple[str, str], bool] = {}
+
+        self.stats: RouterStats = RouterStats()
+
+    # pylint: disable=arguments-differ
+    # Overriding method from BrowserBase
+    def open(self, url: str) -> RoutedPage:
+        """
+        Open a URL with the cheapest backend that shows its content
+
+        Parameters
+        ----------
+        url : str
+            URL to open
+
+        Returns
+        -------
+        RoutedPage : Opened page
+        """
+
+        start = time.perf_counter()
+        url = self._format_url(url)
+        key = host_template(url)
+        self.stats.pages += 1
+
+        response = None
+        decision = self.decisions.get(key)
+
+        if decision is None:
+            response = self.fetcher.open(url)
+            self.stats.probes += 1
+            self.stats.fetch_time += response.elapsed
+
+            decision = needs_render(response)
+
+            # Error and throttled responses say nothing about the endpoint
+            if response.ok and response.content_type in HTML_TYPES:
+                self.decisions[key] = decision
+
+        elif decision:
+            self.stats.skipped_probes += 1
+
+        # Serve from the browserless backend
+        if not decision:
+            if response is None:
+                response = self.fetcher.open(url)
+                self.stats.probes += 1
+                self.stats.fetch_time += response.elapsed
+
+            self.stats.fetched_pages += 1
+            return RoutedPage(
+                response.url,
+                response.text,
+                False,
+                time.perf_counter() - start,
+                response,
+            )
+
+        # Escalate to Firefox, the probe fetch was wasted
+        if response is not None:
+            self.stats.wasted_probe_time += response.elapsed
+
+        render_start = time.perf_counter()
+        browser = self._browser()
+        browser.open(url)
+        html = browser.browser.page_source
+        self.stats.escalations += 1
+        self.stats.render_time += time.perf_counter() - render_start
+
+        return RoutedPage(
+            browser.browser.current_url,
+            html,
+            True,
+            time.perf_counter() - start,
+            response,
+        )
+
+    # pylint: disable=arguments-differ
+    # Overriding method from BrowserBase
+    def close(self) -> None:
+        """Close both backends"""
+
+        self.fetcher.close()
+        if self.browser is not None:
+            self.browser.close()
+
+    def _browser(self) -> BrowserBase:
+        """Get the Firefox backend, launching it on first use"""
+
+        if self.browser is None:
+            self.browser = self.browser_factory()
+
+        return self.browser
+
+
+def _headless_browser() -> BrowserBase:
+    """Create a headless Browser"""
+
+    # pylint: disable=import-outside-toplevel
+    # Firefox is only imported if a page needs rendering
+    from restr.browser.browser import Browser
+
+    return Browser(headless=True)
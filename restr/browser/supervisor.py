@@ -0,0 +1,351 @@
+"""
+restr.browser.supervisor
+
+Supervisor Class File
+Tracks the processes of Browser instances, recycles them and reaps their orphans
+"""
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import psutil
+
+from restr.browser.webdriver import is_alive, kill_processes
+
+if TYPE_CHECKING:
+    from restr.browser.browser import Browser
+
+
+class ProcessSample:
+    """
+    Resource usage of a Browser's process tree
+    """
+
+    def __init__(self, rss: int, cpu_percent: float, processes: int) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        rss : int
+            Resident bytes of all processes
+
+        cpu_percent : float
+            CPU usage of all processes since the previous sample, 100 per core
+
+        processes : int
+            Number of running processes
+        """
+
+        self.rss: int = rss
+        self.cpu_percent: float = cpu_percent
+        self.processes: int = processes
+        self.time: float = time.time()
+
+    def __repr__(self) -> str:
+        return (
+            f"<ProcessSample {self.rss / 1024**2:.0f} MiB "
+            f"{self.cpu_percent:.0f}% ({self.processes} processes)>"
+        )
+
+
+class _Tracked:
+    """Supervision state of one Browser"""
+
+    def __init__(self, browser: "Browser") -> None:
+        self.browser: "Browser" = browser
+        self.root: psutil.Process | None = None
+        self.processes: dict[int, psutil.Process] = {}
+        self.pages: int = 0
+        self.sample: ProcessSample | None = None
+        self.restart_reason: str | None = None
+
+
+class Supervisor:
+    """
+    Supervisor Class
+
+    Tracks the exact process tree of every registered Browser, geckodriver and
+    all of its descendants, including processes Firefox starts later.
+
+    A Browser is restarted after max_pages pages or once a sample exceeds
+    max_rss. Restarts happen in page(), between pages, so the Browser is
+    never restarted while it is being used. Only processes of tracked trees
+    are ever killed, e.g. Firefox processes left behind by a crashed geckodriver.
+    """
+
+    def __init__(
+        self,
+        max_rss: int | None = 2 * 1024**3,
+        max_pages: int | None = 1000,
+        interval: float = 5.0,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        max_rss : int, optional
+            Resident bytes of a Browser's processes before it is restarted,
+            by default 2 GiB. Never restarts on memory if None.
+
+        max_pages : int, optional
+            Pages before a Browser is restarted, by default 1000.
+            Never restarts on pages if None.
+
+        interval : float, optional
+            Seconds between samples of the monitor thread, by default 5.
+        """
+
+        self.max_rss: int | None = max_rss
+        self.max_pages: int | None = max_pages
+        self.interval: float = interval
+
+        self.restarts: int = 0
+        self.reaped: int = 0
+
+        self._lock = threading.RLock()
+        self._tracked: dict[int, _Tracked] = {}
+
+        # Processes of restarted and unregistered browsers
+        self._retired: list[psutil.Process] = []
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        """Number of registered browsers"""
+        return len(self._tracked)
+
+    def register(self, browser: "Browser") -> "Browser":
+        """
+        Supervise a Browser
+
+        Parameters
+        ----------
+        browser : Browser
+            Running browser
+
+        Returns
+        -------
+        Browser : The registered browser
+        """
+
+        with self._lock:
+            tracked = self._tracked[id(browser)] = _Tracked(browser)
+            self._refresh(tracked)
+
+        return browser
+
+    def unregister(self, browser: "Browser") -> None:
+        """
+        Stop supervising a Browser
+
+        Parameters
+        ----------
+        browser : Browser
+            Registered browser
+
+        Notes
+        -----
+        Its processes still running after it is closed are reaped by reap().
+        """
+
+        with self._lock:
+            tracked = self._tracked.pop(id(browser), None)
+            if tracked is not None:
+                self._retired.extend(tracked.processes.values())
+
+    def sample(self, browser: "Browser") -> ProcessSample:
+        """
+        Sample the resource usage of a Browser
+
+        Parameters
+        ----------
+        browser : Browser
+            Registered browser
+
+        Returns
+        -------
+        ProcessSample : Usage of its process tree
+        """
+
+        with self._lock:
+            tracked = self._tracked[id(browser)]
+            self._refresh(tracked)
+
+            rss = 0
+            cpu = 0.0
+            running = 0
+            for process in tracked.processes.values():
+                try:
+                    with process.oneshot():
+                        rss += process.memory_info().rss
+                        cpu += process.cpu_percent()
+                    running += 1
+                except psutil.Error:
+                    continue
+
+            tracked.sample = ProcessSample(rss, cpu, running)
+            if self.max_rss is not None and rss > self.max_rss:
+                tracked.restart_reason = "rss"
+
+            return tracked.sample
+
+    def page(self, browser: "Browser") -> bool:
+        """
+        Count a crawled page and restart the Browser if it is due
+
+        Parameters
+        ----------
+        browser : Browser
+            Registered browser, not in use while this is called
+
+        Returns
+        -------
+        bool : True if the browser was restarted
+        """
+
+        with self._lock:
+            tracked = self._tracked[id(browser)]
+            tracked.pages += 1
+
+            if self.max_pages is not None and tracked.pages >= self.max_pages:
+                tracked.restart_reason = "pages"
+
+            if tracked.restart_reason is None:
+                return False
+
+        self.restart(browser)
+        return True
+
+    def restart(self, browser: "Browser") -> list[str]:
+        """
+        Restart a Browser and kill what is left of its old process tree
+
+        Parameters
+        ----------
+        browser : Browser
+            Registered browser, not in use while this is called
+
+        Returns
+        -------
+        list[str] : URLs re-opened in the new session
+        """
+
+        with self._lock:
+            self._refresh(self._tracked[id(browser)])
+            old = list(self._tracked[id(browser)].processes.values())
+
+        # Other browsers keep being sampled while this one restarts
+        urls = browser.restart()
+
+        with self._lock:
+            self.reaped += kill_processes(old)
+            self.restarts += 1
+
+            tracked = self._tracked[id(browser)] = _Tracked(browser)
+            self._refresh(tracked)
+
+        return urls
+
+    def reap(self) -> int:
+        """
+        Kill orphaned processes of supervised browsers
+
+        Returns
+        -------
+        int : Number of killed processes
+
+        Notes
+        -----
+        Orphans are the tracked processes of browsers whose geckodriver exited,
+        e.g. after a crash, and of unregistered browsers. A geckodriver that
+        crashed and was never waited on is a zombie and counts as exited. Processes that were
+        not part of a tracked tree are never touched.
+        """
+
+        with self._lock:
+            orphans, self._retired = self._retired, []
+
+            for tracked in self._tracked.values():
+                if tracked.root is not None and not is_alive(tracked.root):
+                    orphans.extend(tracked.processes.values())
+                    tracked.processes = {}
+
+            killed = kill_processes(orphans)
+            self.reaped += killed
+
+        return killed
+
+    def start(self) -> None:
+        """Start the monitor thread that samples every browser and reaps orphans"""
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._monitor, name="restr-supervisor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the monitor thread"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        """Stop monitoring and reap the orphans of all browsers"""
+
+        self.stop()
+
+        with self._lock:
+            for tracked in list(self._tracked.values()):
+                self.unregister(tracked.browser)
+
+        self.reap()
+
+    def _monitor(self) -> None:
+        """Monitor thread loop"""
+
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                browsers = [tracked.browser for tracked in self._tracked.values()]
+
+            for browser in browsers:
+                try:
+                    self.sample(browser)
+                except KeyError:
+                    # Unregistered meanwhile
+                    continue
+
+            self.reap()
+
+    @staticmethod
+    def _refresh(tracked: _Tracked) -> None:
+        """Add processes that joined the tree since the last refresh"""
+
+        process = getattr(tracked.browser.browser.service, "process", None)
+        if process is None:
+            return
+
+        try:
+            if tracked.root is None or tracked.root.pid != process.pid:
+                tracked.root = psutil.Process(process.pid)
+                tracked.processes.setdefault(tracked.root.pid, tracked.root)
+
+            for child in tracked.root.children(recursive=True):
+                tracked.processes.setdefault(child.pid, child)
+
+        except psutil.NoSuchProcess:
+            pass
+
+        # Forget processes that exited, keeps the tree bounded over restarts
+        tracked.processes = {
+            pid: child for pid, child in tracked.processes.items() if is_alive(child)
+        }
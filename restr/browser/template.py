@@ -0,0 +1,272 @@
+"""
+restr.browser.template
+
+ProfileTemplate Class File
+Firefox profile built once and cloned for every Browser
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+from restr.browser.browser_base import USER_AGENT
+from restr.browser.profile import Profile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Default directory of built templates
+TEMPLATE_DIR = Path.home().joinpath(".cache", "restr", "profiles")
+
+# Linux ioctl that makes dst share the extents of src (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+# Files of a running Firefox that must not be cloned
+RUNTIME_FILES = ("lock", ".parentlock", "parent.lock", "MarionetteActivePort")
+
+# Marker file holding the key of a built template
+MARKER = ".restr-template"
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Clone a file copy-on-write, False if the filesystem does not support it"""
+
+    if fcntl is None:
+        return False
+
+    try:
+        with open(src, "rb") as source, open(dst, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        return True
+    except OSError:
+        return False
+
+
+def _clone_file(src: str, dst: str) -> str:
+    """
+    Clone a single profile file
+
+    Extensions are never written to and are hardlinked. Everything else is
+    modified in place by Firefox, e.g. SQLite databases, so it is cloned
+    copy-on-write where supported and copied otherwise.
+    """
+
+    if src.endswith(".xpi"):
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+
+    if not _reflink(src, dst):
+        shutil.copy2(src, dst)
+
+    return dst
+
+
+def _user_pref(name: str, value: str | int | bool) -> str:
+    """user.js line setting a preference"""
+    return f"user_pref({json.dumps(name)}, {json.dumps(value)});\n"
+
+
+class ProfileTemplate:
+    """
+    ProfileTemplate Class
+
+    Firefox profile with preferences, extensions and first-run state created
+    once. Every Browser gets a clone, which avoids Firefox creating a fresh
+    profile on every start.
+
+    Templates are keyed by their contents, a template with different
+    preferences or extensions is built in its own directory.
+    """
+
+    def __init__(
+        self,
+        profile: Profile | None = None,
+        preferences: dict[str, str | int | bool] | None = None,
+        extensions: Iterable[str | Path] = (),
+        seed_urls: Iterable[str] = (),
+        directory: str | Path = TEMPLATE_DIR,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        profile : Profile, optional
+            Profile whose preferences are written to the template, by default None.
+
+        preferences : dict[str, str | int | bool], optional
+            Additional preferences, by default None.
+
+        extensions : Iterable[str | Path], optional
+            Extension files named <addon id>.xpi, by default ().
+
+        seed_urls : Iterable[str], optional
+            URLs opened while building to pre-seed the caches, by default ().
+
+        directory : str | Path, optional
+            Directory templates are built in, by default TEMPLATE_DIR.
+        """
+
+        self.preferences: dict[str, str | int | bool] = {
+            "general.useragent.override": USER_AGENT,
+            # Skip first-run pages and checks
+            "browser.shell.checkDefaultBrowser": False,
+            "browser.aboutwelcome.enabled": False,
+            "startup.homepage_welcome_url": "about:blank",
+            "browser.startup.homepage_override.mstone": "ignore",
+            "datareporting.policy.firstRunURL": "",
+            **(profile.preferences if profile else {}),
+            **(preferences or {}),
+        }
+        self.extensions: list[Path] = [Path(extension) for extension in extensions]
+        self.seed_urls: list[str] = list(seed_urls)
+
+        self.path: Path = Path(directory).joinpath(self.key)
+
+    @property
+    def key(self) -> str:
+        """Digest of the template contents"""
+
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(json.dumps(self.preferences, sort_keys=True).encode())
+        for extension in self.extensions:
+            digest.update(extension.name.encode())
+            digest.update(extension.read_bytes())
+        digest.update(json.dumps(self.seed_urls).encode())
+
+        return digest.hexdigest()
+
+    @property
+    def is_built(self) -> bool:
+        """True if the template was built"""
+        return self.path.joinpath(MARKER).exists()
+
+    def build(self, force: bool = False, launch: bool = True) -> Path:
+        """
+        Build the template if it was not built yet
+
+        Parameters
+        ----------
+        force : bool, optional
+            Rebuild an existing template, by default False.
+
+        launch : bool, optional
+            Start Firefox once on the template so its first-run files and caches
+            exist, by default True.
+
+        Returns
+        -------
+        Path : Template directory
+        """
+
+        if self.is_built and not force:
+            return self.path
+
+        # Build next to the final directory and move it into place when complete
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        building = Path(tempfile.mkdtemp(prefix=".build-", dir=self.path.parent))
+
+        try:
+            with open(building.joinpath("user.js"), "w", encoding="utf-8") as file:
+                for name, value in self.preferences.items():
+                    file.write(_user_pref(name, value))
+
+            if self.extensions:
+                building.joinpath("extensions").mkdir()
+                for extension in self.extensions:
+                    shutil.copy2(
+                        extension, building.joinpath("extensions", extension.name)
+                    )
+
+            if launch:
+                self._launch(building)
+
+            for name in RUNTIME_FILES:
+                building.joinpath(name).unlink(missing_ok=True)
+
+            building.joinpath(MARKER).write_text(self.key, encoding="utf-8")
+
+            # Replace a previous or partially built template
+            if force or not self.is_built:
+                shutil.rmtree(self.path, ignore_errors=True)
+
+            try:
+                os.replace(building, self.path)
+            except OSError:
+                # Another process finished building the same template first
+                if not self.is_built:
+                    raise
+
+        finally:
+            shutil.rmtree(building, ignore_errors=True)
+
+        return self.path
+
+    def clone(self) -> Path:
+        """
+        Clone the template, building it first if needed
+
+        Returns
+        -------
+        Path : Clone directory, remove it with remove() when the browser closed
+        """
+
+        self.build()
+
+        target = Path(tempfile.mkdtemp(prefix="restr-profile-"))
+        shutil.copytree(
+            self.path,
+            target,
+            ignore=shutil.ignore_patterns(MARKER, *RUNTIME_FILES),
+            copy_function=_clone_file,
+            dirs_exist_ok=True,
+        )
+
+        return target
+
+    @staticmethod
+    def remove(clone: str | Path) -> None:
+        """
+        Remove a clone
+
+        Parameters
+        ----------
+        clone : str | Path
+            Directory returned by clone()
+        """
+
+        shutil.rmtree(clone, ignore_errors=True)
+
+    def _launch(self, path: Path) -> None:
+        """Start Firefox on a profile directory, open the seed URLs and quit"""
+
+        # pylint: disable=import-outside-toplevel
+        # Firefox is only needed while building
+        from selenium.webdriver import Firefox, FirefoxOptions
+
+        from restr.browser.webdriver import WebDriver
+
+        driver = WebDriver()
+
+        options = FirefoxOptions()
+        options.add_argument("-headless")
+        options.add_argument("-profile")
+        options.add_argument(str(path))
+        if driver.firefox_path:
+            options.binary_location = driver.firefox_path
+
+        browser = Firefox(service=driver.service, options=options)
+        try:
+            for url in self.seed_urls:
+                browser.get(url)
+        finally:
+            browser.quit()
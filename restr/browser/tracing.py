@@ -0,0 +1,456 @@
+"""
+restr.browser.tracing
+
+Tracer Class File
+Times WebDriver commands into latency histograms and exports nested spans
+"""
+
+import contextvars
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+# Sub-buckets per power of two, relative error of recorded values below 1 / 128
+SUB_BUCKET_BITS = 7
+
+
+class Histogram:
+    """
+    Histogram Class
+
+    Log-linear latency histogram in the style of HdrHistogram. Values are
+    recorded in microseconds into buckets of 1 / 128 of their power of two,
+    so recording is an integer computation and a dictionary update.
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.counts: dict[int, int] = {}
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = float("inf")
+        self.max: float = 0.0
+
+    @staticmethod
+    def _index(micros: int) -> int:
+        """Bucket of a value in microseconds"""
+
+        shift = max(0, micros.bit_length() - SUB_BUCKET_BITS - 1)
+        return (shift << SUB_BUCKET_BITS) + (micros >> shift)
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Lowest value in microseconds of a bucket"""
+
+        shift = max(0, (index >> SUB_BUCKET_BITS) - 1)
+        return (index - (shift << SUB_BUCKET_BITS)) << shift
+
+    def record(self, seconds: float) -> None:
+        """
+        Record a latency
+
+        Parameters
+        ----------
+        seconds : float
+            Latency in seconds
+        """
+
+        index = self._index(int(seconds * 1_000_000))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Add the values of another histogram
+
+        Parameters
+        ----------
+        other : Histogram
+            Histogram to add
+        """
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get a latency percentile
+
+        Parameters
+        ----------
+        percent : float
+            Percentile in [0, 100]
+
+        Returns
+        -------
+        float : Seconds, 0.0 if nothing was recorded
+        """
+
+        if not self.count:
+            return 0.0
+
+        rank = max(1, round(self.count * percent / 100))
+        if rank >= self.count:
+            return self.max
+
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value = self._value(index) / 1_000_000
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    def as_dict(self) -> dict:
+        """
+        Get the histogram summary as a dictionary
+
+        Returns
+        -------
+        dict : Count, total seconds and mean, percentiles and max in ms
+        """
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Span:
+    """
+    A timed operation, nested under the span that was current when it started
+    """
+
+    def __init__(
+        self, name: str, parent: "Span | None", attributes: dict[str, Any]
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        name : str
+            Operation, e.g. "job", "page" or a WebDriver command
+
+        parent : Span | None
+            Enclosing span
+
+        attributes : dict[str, Any]
+            JSON serializable attributes
+        """
+
+        self.name: str = name
+        self.parent: Span | None = parent
+        self.attributes: dict[str, Any] = attributes
+        self.span_id: str = f"{random.getrandbits(64):016x}"
+        self.trace_id: str = (
+            parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        )
+        self.start: int = time.time_ns()
+        self.duration: float = 0.0
+
+        # Host of the nearest span with a url attribute
+        url = attributes.get("url")
+        self.host: str | None = (
+            urlsplit(url).netloc or None if url else parent.host if parent else None
+        )
+
+    def as_dict(self) -> dict:
+        """
+        Get the span as a dictionary
+
+        Returns
+        -------
+        dict : Exported fields of the span
+        """
+
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start": self.start,
+            "duration_ms": self.duration * 1000,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """
+    Writes finished spans to a JSON lines file
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path
+            File to append the spans to
+        """
+
+        self.path: Path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """
+        Write a finished span
+
+        Parameters
+        ----------
+        span : Span
+            Span to write
+        """
+
+        line = json.dumps(span.as_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self) -> None:
+        """Flush written spans to the file"""
+
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file"""
+
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Tracer Class
+
+    Times the WebDriver commands of instrumented drivers into histograms per
+    command and host, and exports spans nested as job -> page -> command.
+
+    Tracing is switched with `enabled` at any time. While disabled an
+    instrumented command costs one attribute check and spans are not created.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | SpanExporter | None = None,
+        enabled: bool = True,
+        commands: bool = True,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path | SpanExporter, optional
+            Exporter or file to export spans to, by default None (histograms only).
+            An exporter created from a path is closed on close().
+
+        enabled : bool, optional
+            Start tracing, by default True.
+
+        commands : bool, optional
+            Export a span for every WebDriver command, by default True.
+            Commands are always recorded in the histograms.
+        """
+
+        self._exporter_owned: bool = False
+        if path is not None and not isinstance(path, SpanExporter):
+            path = SpanExporter(path)
+            self._exporter_owned = True
+        self.exporter: SpanExporter | None = path
+
+        self.enabled: bool = enabled
+        self.commands: bool = commands
+
+        # Histograms by (command, host)
+        self.histograms: dict[tuple[str, str | None], Histogram] = {}
+
+        self._current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+            "restr_span", default=None
+        )
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start tracing"""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop tracing"""
+        self.enabled = False
+
+    @property
+    def current(self) -> Span | None:
+        """Span of the calling thread or task"""
+        return self._current.get()
+
+    def span(self, name: str, **attributes):
+        """
+        Time a block as a span nested under the current span
+
+        Parameters
+        ----------
+        name : str
+            Operation, e.g. "job" or "page"
+
+        **attributes
+            JSON serializable attributes, `url` sets the host of nested commands
+
+        Returns
+        -------
+        ContextManager[Span | None] : Span, None while tracing is disabled
+        """
+
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, attributes)
+
+    @contextmanager
+    def _span(
+        self, name: str, attributes: dict[str, Any], record: bool = False
+    ) -> Iterator[Span]:
+        """Create, time and export a span, recording its latency if record"""
+
+        span = Span(name, self._current.get(), attributes)
+        token = self._current.set(span)
+        start = time.perf_counter()
+
+        try:
+            yield span
+        except BaseException as error:
+            span.attributes["error"] = type(error).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            self._current.reset(token)
+            if record:
+                self.record(name, span.duration, span.host)
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+    def record(self, name: str, seconds: float, host: str | None = None) -> None:
+        """
+        Record a latency in the histogram of a command and host
+
+        Parameters
+        ----------
+        name : str
+            Command or operation
+
+        seconds : float
+            Latency in seconds
+
+        host : str, optional
+            Host the command acted on, by default None.
+        """
+
+        key = (name, host)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.record(seconds)
+
+    def instrument(self, driver: Any) -> Any:
+        """
+        Time every command a WebDriver sends
+
+        Parameters
+        ----------
+        driver : WebDriver
+            Driver to instrument, its execute() is wrapped in place
+
+        Returns
+        -------
+        WebDriver : The driver
+        """
+
+        execute = driver.execute
+
+        def traced(command: str, params: dict | None = None):
+            if not self.enabled:
+                return execute(command, params)
+            return self._command(execute, command, params)
+
+        driver.execute = traced
+        driver.execute.__wrapped__ = execute
+        return driver
+
+    def summary(self) -> dict:
+        """
+        Get the histograms per command and per host
+
+        Returns
+        -------
+        dict : {"commands": {command: summary}, "hosts": {host: {command: summary}}}
+        """
+
+        commands: dict[str, Histogram] = {}
+        hosts: dict[str, dict[str, dict]] = {}
+
+        with self._lock:
+            for (name, host), histogram in sorted(
+                self.histograms.items(), key=lambda item: (item[0][0], item[0][1] or "")
+            ):
+                commands.setdefault(name, Histogram()).merge(histogram)
+                if host is not None:
+                    hosts.setdefault(host, {})[name] = histogram.as_dict()
+
+        return {
+            "commands": {name: value.as_dict() for name, value in commands.items()},
+            "hosts": hosts,
+        }
+
+    def reset(self) -> None:
+        """Clear the histograms"""
+
+        with self._lock:
+            self.histograms.clear()
+
+    def close(self) -> None:
+        """Flush the exporter, closing it if it was created from a path"""
+
+        if self.exporter is not None:
+            if self._exporter_owned:
+                self.exporter.close()
+            else:
+                self.exporter.flush()
+
+    def _command(self, execute, command: str, params: dict | None):
+        """Send a command, timing it and exporting its span"""
+
+        url = params.get("url") if command == "get" and params else None
+
+        if self.commands and self.exporter is not None:
+            with self._span(command, {"url": url} if url else {}, record=True):
+                return execute(command, params)
+
+        parent = self._current.get()
+        host = urlsplit(url).netloc if url else parent.host if parent else None
+        start = time.perf_counter()
+        try:
+            return execute(command, params)
+        finally:
+            self.record(command, time.perf_counter() - start, host)
@@ -5,36 +5,163 @@ WebDriver Class File
 """
 
 import logging
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
 
-import dotenv
 import psutil
-from selenium.webdriver.firefox.service import Service
-from webdriver_manager.core import logger as webdriver_manager_logger
-from webdriver_manager.firefox import GeckoDriverManager
 
-from common.logger import Logger, LOG_DIR
+from common.logger import LOG_DIR
+from restr.browser.manifest import DriverManifest
 
-# Load environment variables
-dotenv.load_dotenv()
-
-# Create logger
-wdm_logger = Logger(
-    "webdriver_manager",
-    file_handler=True,
-    stream_handler=True,
-    level=logging.NOTSET,
-    file_level=logging.DEBUG,
-    stream_level=logging.ERROR,
-)
+if TYPE_CHECKING:
+    from selenium.webdriver.firefox.service import Service
+    from webdriver_manager.firefox import GeckoDriverManager
 
 wdm_log_path: Path = LOG_DIR.joinpath("webdriver_manager.log")
 
-# Bind logger to webdriver_manager
-# pylint: disable=protected-access
-# No other way to set custom logger
-# https://github.com/SergeyPirogov/webdriver_manager/pull/439
-webdriver_manager_logger.__logger = wdm_logger.get_logger()
+
+@cache
+def setup() -> None:
+    """
+    Load environment variables and bind the logger of webdriver_manager
+
+    Notes
+    -----
+    Runs once, on the first WebDriver, so importing restr.browser has no side
+    effects and does not import webdriver_manager.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    # Deferred until a browser is actually started
+    import dotenv
+    from webdriver_manager.core import logger as webdriver_manager_logger
+
+    from common.logger import Logger
+
+    # Load environment variables
+    dotenv.load_dotenv()
+
+    # Create logger
+    wdm_logger = Logger(
+        "webdriver_manager",
+        file_handler=True,
+        stream_handler=True,
+        level=logging.NOTSET,
+        file_level=logging.DEBUG,
+        stream_level=logging.ERROR,
+    )
+
+    # Bind logger to webdriver_manager
+    # pylint: disable=protected-access
+    # No other way to set custom logger
+    # https://github.com/SergeyPirogov/webdriver_manager/pull/439
+    webdriver_manager_logger.__logger = wdm_logger.get_logger()
+
+    # Create webdriver.log if it doesn't exist
+    if not WebDriver.webdriver_log_path.exists():
+        WebDriver.webdriver_log_path.touch()
+
+
+def find_processes(
+    names: Iterable[str] = ("geckodriver",), parent: psutil.Process | None = None
+) -> list[psutil.Process]:
+    """
+    Find processes by name
+
+    Parameters
+    ----------
+    names : Iterable[str], optional
+        Case-insensitive substrings of the process name, by default ("geckodriver",).
+
+    parent : psutil.Process, optional
+        Only search the descendants of this process, by default None.
+        Searches all processes if None.
+
+    Returns
+    -------
+    list[psutil.Process] : Matching processes
+    """
+
+    names = [name.lower() for name in names]
+
+    try:
+        processes = (
+            parent.children(recursive=True) if parent else psutil.process_iter()
+        )
+    except psutil.NoSuchProcess:
+        return []
+
+    matches = []
+    for process in processes:
+        try:
+            if any(name in str(process.name()).lower() for name in names):
+                matches.append(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    return matches
+
+
+def is_alive(process: psutil.Process) -> bool:
+    """
+    Check if a process is running and has not exited
+
+    Parameters
+    ----------
+    process : psutil.Process
+        Process to check
+
+    Returns
+    -------
+    bool : False if the process is gone or a zombie
+
+    Notes
+    -----
+    A crashed child stays a zombie until its parent waits on it, Selenium
+    never waits on geckodriver. psutil reports zombies as running.
+    """
+
+    try:
+        return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+def kill_processes(processes: Iterable[psutil.Process], timeout: float = 3) -> int:
+    """
+    Kill processes and wait for them to exit
+
+    Parameters
+    ----------
+    processes : Iterable[psutil.Process]
+        Processes to kill
+
+    timeout : float, optional
+        Seconds to wait for the processes to exit, by default 3.
+
+    Returns
+    -------
+    int : Number of processes killed
+
+    Notes
+    -----
+    Processes that already exited, including zombies, are skipped.
+    psutil.Process guards against the pid having been reused by another process.
+    """
+
+    killed = []
+    for process in processes:
+        try:
+            if is_alive(process):
+                process.kill()
+                killed.append(process)
+        except psutil.NoSuchProcess:
+            continue
+
+    psutil.wait_procs(killed, timeout=timeout)
+
+    return len(killed)
 
 
 class WebDriver:
@@ -44,36 +171,74 @@ class WebDriver:
 
     webdriver_log_path: Path = LOG_DIR.joinpath("webdriver.log")
 
-    # Create webdriver.log if it doesn't exist
-    if not webdriver_log_path.exists():
-        webdriver_log_path.touch()
-
-    def __init__(self, install: bool = True) -> None:
+    def __init__(
+        self,
+        install: bool = True,
+        manifest: DriverManifest | None = None,
+        version: str | None = None,
+    ) -> None:
         """
         Constructor
 
         Parameters
         ----------
         install : bool, optional
-            Install Gecko Driver, by default True.
+            Install Gecko Driver if it is not in the manifest, by default True.
+
+        manifest : DriverManifest, optional
+            Manifest of local binaries, by default DriverManifest().
+
+        version : str, optional
+            Gecko Driver version, e.g. "0.33.0", by default None (the last
+            recorded version, or the latest release if none is recorded).
+
+        Notes
+        -----
+        A driver recorded in the manifest is used without webdriver_manager,
+        network access or subprocesses, with the recorded Firefox if there is
+        one, Selenium finds Firefox otherwise. Without a recorded driver,
+        geckodriver and firefox on PATH are recorded, and only then the driver
+        is installed with webdriver_manager. Binaries missing from PATH are
+        recorded as missing and not searched for again. A driver of another
+        version than `version` is never used.
         """
 
-        self.driver_manager: GeckoDriverManager = GeckoDriverManager()
-        self.driver_path: str | None = None
+        setup()
+
+        self.manifest: DriverManifest = manifest or DriverManifest()
+        self.version: str | None = version.lstrip("v") if version else None
+        self._driver_manager: "GeckoDriverManager | None" = None
+
+        # Fast path, only reads the manifest
+        self.driver_path: str | None = self.manifest.get("geckodriver", self.version)
+        self.firefox_path: str | None = self.manifest.get("firefox")
 
-        if install:
+        if self.driver_path is None:
+            versions = {"geckodriver": self.version} if self.version else None
+            found = self.manifest.discover(versions)
+            self.driver_path = found.get("geckodriver")
+            self.firefox_path = self.firefox_path or found.get("firefox")
+
+        if self.driver_path is None and install:
             self.install()
-        else:
-            # pylint: disable=protected-access
-            # Accessing private method is the only way to get the path without installing
-            # NOTE: this assumes the driver install path is cached
-            # If it is not, the driver will be installed
-            self.driver_path = self.driver_manager._get_driver_path(
-                driver=self.driver_manager.driver
+
+    @property
+    def driver_manager(self) -> "GeckoDriverManager":
+        """GeckoDriverManager, created on first use"""
+
+        if self._driver_manager is None:
+            # pylint: disable=import-outside-toplevel
+            from webdriver_manager.firefox import GeckoDriverManager
+
+            # Release tags of geckodriver start with "v"
+            self._driver_manager = GeckoDriverManager(
+                version=f"v{self.version}" if self.version else None
             )
 
+        return self._driver_manager
+
     @property
-    def service(self):
+    def service(self) -> "Service":
         """
         Get Service Object
 
@@ -82,6 +247,9 @@ class WebDriver:
         selenium.webdriver.firefox.service.Service : Firefox Service Object
         """
 
+        # pylint: disable=import-outside-toplevel
+        from selenium.webdriver.firefox.service import Service
+
         return Service(self.driver_path, log_path=str(self.webdriver_log_path))
 
     def install(self) -> str:
@@ -99,8 +267,9 @@ class WebDriver:
 
         install_path = self.driver_manager.install()
 
-        # Update cached driver path
+        # Update cached driver path and record it for the next start
         self.driver_path = install_path
+        self.manifest.record("geckodriver", install_path, self.version)
 
         return install_path
 
@@ -128,9 +297,7 @@ class WebDriver:
             try:
                 if force:
                     # Kill all processes locking the driver file
-                    for process in psutil.process_iter():
-                        if "geckodriver" in str(process.name()).lower():
-                            process.kill()
+                    kill_processes(find_processes(("geckodriver",)))
 
                 # Uninstall driver
                 driver_path.unlink()
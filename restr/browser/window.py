@@ -4,8 +4,17 @@ restr.browser.window
 Window Class File
 """
 
-from selenium.webdriver import Firefox
+from typing import TYPE_CHECKING
+
+from selenium.common.exceptions import WebDriverException
 from restr.browser.browser_base import BrowserBase
+from restr.browser.extract import PageData, extract
+from restr.browser.ready import is_ready, wait_until_ready
+
+if TYPE_CHECKING:
+    from selenium.webdriver import Firefox
+
+    from restr.browser.registry import WindowRegistry
 
 
 class Window(BrowserBase):
@@ -14,7 +23,7 @@ class Window(BrowserBase):
     """
 
     def __init__(
-        self, *args, browser: Firefox, handle: str | None = None, **kwargs
+        self, *args, browser: "Firefox", handle: str | None = None, **kwargs
     ) -> None:
         """
         Constructor
@@ -31,12 +40,15 @@ class Window(BrowserBase):
         super().__init__(*args, **kwargs)
 
         # Parameters
-        self.browser: Firefox = browser
+        self.browser: "Firefox" = browser
         self.handle: str | None = handle
 
+        # Set when the Window is added to a WindowRegistry
+        self.registry: "WindowRegistry | None" = None
+
     # pylint: disable=arguments-differ
     # Overriding method from BrowserBase
-    def open(self, url: str) -> str:
+    def open(self, url: str, wait: bool = True) -> str:
         """
         Open new Window
 
@@ -45,6 +57,9 @@ class Window(BrowserBase):
         url : str
             URL to open
 
+        wait : bool, optional
+            Wait for the page to load, by default True.
+
         Returns
         -------
         str: Window Handle
@@ -52,26 +67,205 @@ class Window(BrowserBase):
         Notes
         -----
         This method will open a new window within the browser.
+        If this Window is still open, its tab is navigated instead.
         It will save and return the window handle.
         """
 
         # Format url if provided. Set open blank page if not.
         url = self._format_url(url) if url else "about:blank"
 
-        # Open new window
-        self.browser.execute_script(f"window.open('{url}');")
+        # The slot is held until the page has loaded if wait is True
+        with self._span("page", url=url), self._limit(url):
+            if self.handle is not None and self.handle in self.browser.window_handles:
+                # Reuse the open tab
+                self.switch()
+                if wait:
+                    self._record(self.browser)
+                    self.browser.get(url)
+                else:
+                    self.navigate(url)
 
-        # Get window handle
-        self.handle = self.browser.window_handles[-1]
+            else:
+                # Open new window
+                self.browser.execute_script(f"window.open('{url}');")
 
-        # Switch to new window
-        self.browser.switch_to.window(self.handle)
+                # Get window handle
+                self.handle = self.browser.window_handles[-1]
+
+                # Switch to new window
+                self.browser.switch_to.window(self.handle)
+
+                # The new window starts on about:blank before it loads the URL
+                if wait:
+                    self.wait_until_ready(
+                        predicate=(
+                            None
+                            if url == "about:blank"
+                            else "document.URL !== 'about:blank'"
+                        )
+                    )
+
+        self._observe(url)
+        if wait:
+            self._record(self.browser)
+
+        # Mark as recently used
+        if self.registry is not None:
+            self.registry.add(self)
 
         return self.handle
 
+    def switch(self) -> None:
+        """Switch the browser to this Window"""
+
+        self.browser.switch_to.window(self.handle)
+
+    def navigate(self, url: str) -> None:
+        """
+        Start loading a URL in this Window
+
+        Parameters
+        ----------
+        url : str
+            URL to load
+
+        Notes
+        -----
+        The browser must already be switched to this Window.
+        Returns without waiting for the page to load, see is_loaded().
+        """
+
+        url = self._format_url(url) if url else "about:blank"
+
+        # Record the requests of the page that is left
+        self._record(self.browser)
+
+        # Mark the current document so it is not mistaken for the new one
+        self.browser.execute_script(
+            "document.__restrStale = true; window.location.assign(arguments[0]);",
+            url,
+        )
+
+    def is_loaded(self) -> bool:
+        """
+        Check if the page started by navigate() has loaded
+
+        Returns
+        -------
+        bool : True if the new document finished loading
+
+        Notes
+        -----
+        The browser must already be switched to this Window.
+        """
+
+        return self.browser.execute_script(
+            "return !document.__restrStale && document.readyState === 'complete';"
+        )
+
+    def wait_until_ready(
+        self,
+        dom_stable: float | None = None,
+        network_idle: float | None = None,
+        predicate: str | None = None,
+        timeout: float = 30.0,
+    ) -> bool:
+        """
+        Wait until the page is ready
+
+        Parameters
+        ----------
+        dom_stable : float, optional
+            Seconds without DOM mutations, by default None (not required).
+
+        network_idle : float, optional
+            Seconds without requests in flight, by default None (not required).
+
+        predicate : str, optional
+            JavaScript expression that must be truthy, by default None (not required).
+
+        timeout : float, optional
+            Seconds to wait, by default 30.
+
+        Returns
+        -------
+        bool : True if the page became ready, False on timeout
+
+        Notes
+        -----
+        The browser must already be switched to this Window.
+        Blocks the driver until the page resolves a single asynchronous script.
+        """
+
+        return wait_until_ready(
+            self.browser, dom_stable, network_idle, predicate, timeout
+        )
+
+    def is_ready(
+        self,
+        dom_stable: float | None = None,
+        network_idle: float | None = None,
+        predicate: str | None = None,
+    ) -> bool:
+        """
+        Check once if the page started by navigate() is ready
+
+        Parameters
+        ----------
+        dom_stable : float, optional
+            Seconds without DOM mutations, by default None (not required).
+
+        network_idle : float, optional
+            Seconds without requests in flight, by default None (not required).
+
+        predicate : str, optional
+            JavaScript expression that must be truthy, by default None (not required).
+
+        Returns
+        -------
+        bool : True if the page is ready
+
+        Notes
+        -----
+        The browser must already be switched to this Window.
+        Unlike wait_until_ready() the driver stays free for other Windows.
+        """
+
+        return is_ready(self.browser, dom_stable, network_idle, predicate)
+
+    def extract(self) -> PageData:
+        """
+        Extract links, forms, frames and API hints of the page
+
+        Returns
+        -------
+        PageData : Extracted data
+
+        Notes
+        -----
+        The browser must already be switched to this Window.
+        Uses a single WebDriver call regardless of the page size.
+        """
+
+        self._record(self.browser)
+        return extract(self.browser)
+
     # pylint: disable=arguments-differ
     # Overriding method from BrowserBase
     def close(self) -> None:
         """Close Window"""
 
+        self.switch()
+        self._record(self.browser)
         self.browser.close()
+
+        if self.registry is not None:
+            self.registry.discard(self.handle)
+
+        # Switch to a remaining window so the browser can still be used
+        try:
+            handles = self.browser.window_handles
+            if handles:
+                self.browser.switch_to.window(handles[-1])
+        except WebDriverException:
+            pass
@@ -0,0 +1,18 @@
+"""restr.crawler"""
+
+from typing import TYPE_CHECKING
+
+from restr._lazy import lazy
+
+if TYPE_CHECKING:
+    from .engine import CrawlEngine
+
+__all__ = ["CrawlEngine"]
+
+# Modules of the public classes, imported on first access
+__getattr__, __dir__ = lazy(
+    __name__,
+    {
+        "CrawlEngine": ".engine",
+    },
+)
@@ -0,0 +1,268 @@
+"""
+restr.crawler.checkpoint
+
+Checkpoint Class File
+Append-only journal of crawl progress with compaction, for resuming crashed crawls
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+
+class Checkpoint:
+    """
+    Checkpoint Class
+
+    Journal of the seeds, the queued URLs and the completed URLs of a crawl.
+
+    Every change is appended to a JSON lines journal, buffered and written
+    every `interval` seconds, so a checkpoint is incremental and costs one
+    write per interval. A URL is pending from the moment it is queued until
+    it is completed, so URLs that were leased or loading when the crawl died
+    are pending again on resume. Once the journal holds `compact_ratio` times
+    more records than the live state, it is rewritten with the live state only
+    and atomically replaces the old journal.
+
+    Records are JSON arrays:
+        ["s", url]          Seed URL
+        ["q", url, depth]   Queued URL
+        ["d", url, ok]      Completed URL, ok is False if it failed
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: float = 1.0,
+        compact_ratio: float = 1.5,
+        min_compact: int = 10_000,
+        fsync: bool = True,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path
+            Journal file, loaded if it exists
+
+        interval : float, optional
+            Seconds between writes of the buffered records, by default 1.0.
+
+        compact_ratio : float, optional
+            Journal records per live record above which the journal is
+            compacted, by default 1.5. A crawled URL leaves a queued and a
+            completed record, so the journal is compacted about every time
+            the number of crawled URLs grows by half.
+
+        min_compact : int, optional
+            Journal records below which the journal is never compacted,
+            by default 10,000.
+
+        fsync : bool, optional
+            Sync every write to disk, by default True.
+        """
+
+        self.path: Path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.interval: float = interval
+        self.compact_ratio: float = compact_ratio
+        self.min_compact: int = min_compact
+        self.fsync: bool = fsync
+
+        self.seeds: list[str] = []
+        self.pending: dict[str, int] = {}
+        self.done: dict[str, bool] = {}
+
+        # Records in the journal, including the buffered ones
+        self.records: int = 0
+        self._buffer: list[str] = []
+        self._flushed: float = time.monotonic()
+        self._lock = threading.RLock()
+
+        if self.path.exists():
+            self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        """Number of live records"""
+        return len(self.seeds) + len(self.pending) + len(self.done)
+
+    @property
+    def resumed(self) -> bool:
+        """True if state was loaded from an existing journal"""
+        return bool(self.pending or self.done)
+
+    def seed(self, url: str) -> None:
+        """
+        Record a seed URL
+
+        Parameters
+        ----------
+        url : str
+            Seed URL, seeds define the hosts of same-host crawls
+        """
+
+        with self._lock:
+            if url not in self.seeds:
+                self.seeds.append(url)
+                self._append(["s", url])
+
+    def queue(self, url: str, depth: int = 0) -> None:
+        """
+        Record a queued URL
+
+        Parameters
+        ----------
+        url : str
+            Queued URL
+
+        depth : int, optional
+            Link depth from the seed URLs, by default 0.
+        """
+
+        with self._lock:
+            self.pending[url] = depth
+            self._append(["q", url, depth])
+
+    def queue_many(self, urls: Iterable[tuple[str, int]]) -> None:
+        """
+        Record queued URLs
+
+        Parameters
+        ----------
+        urls : Iterable[tuple[str, int]]
+            Queued URLs and their depths
+        """
+
+        with self._lock:
+            for url, depth in urls:
+                self.pending[url] = depth
+                self._buffer.append(json.dumps(["q", url, depth]))
+                self.records += 1
+            self.maybe_flush()
+
+    def complete(self, url: str, ok: bool = True) -> None:
+        """
+        Record a completed URL
+
+        Parameters
+        ----------
+        url : str
+            Crawled URL
+
+        ok : bool, optional
+            False if the crawl of the URL failed, by default True.
+        """
+
+        with self._lock:
+            self.pending.pop(url, None)
+            self.done[url] = ok
+            self._append(["d", url, ok])
+
+    def flush(self) -> None:
+        """Write the buffered records, compacting the journal if it grew too large"""
+
+        with self._lock:
+            if self._buffer:
+                self._file.write("\n".join(self._buffer) + "\n")
+                self._buffer.clear()
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+
+            self._flushed = time.monotonic()
+
+            live = len(self)
+            if self.records > max(self.min_compact, live * self.compact_ratio):
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the journal with the live state only"""
+
+        with self._lock:
+            self._file.close()
+
+            temporary = self.path.with_name(self.path.name + ".tmp")
+            with open(temporary, "w", encoding="utf-8") as file:
+                for url in self.seeds:
+                    file.write(json.dumps(["s", url]) + "\n")
+                for url, ok in self.done.items():
+                    file.write(json.dumps(["d", url, ok]) + "\n")
+                for url, depth in self.pending.items():
+                    file.write(json.dumps(["q", url, depth]) + "\n")
+
+                file.flush()
+                if self.fsync:
+                    os.fsync(file.fileno())
+
+            # Buffered records are already part of the live state
+            self._buffer.clear()
+
+            os.replace(temporary, self.path)
+            self.records = len(self)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        """Write the buffered records and close the journal"""
+
+        with self._lock:
+            if self._file.closed:
+                return
+            self.flush()
+            self._file.close()
+
+    def _append(self, record: list) -> None:
+        """Buffer a record, writing the buffer once the interval passed"""
+
+        self._buffer.append(json.dumps(record))
+        self.records += 1
+        self.maybe_flush()
+
+    def maybe_flush(self) -> None:
+        """
+        Write the buffered records if the interval passed since the last write
+
+        Notes
+        -----
+        Adding a record calls this. Callers that may stop adding records for a
+        while, e.g. when every URL is loading, call it periodically so the
+        buffered records are not held back until the next one.
+        """
+
+        with self._lock:
+            if self._buffer and time.monotonic() - self._flushed >= self.interval:
+                self.flush()
+
+    def _load(self) -> None:
+        """Replay the journal"""
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Partial record written when the crawl died
+                    continue
+
+                self.records += 1
+                kind, url = record[0], record[1]
+                if kind == "q":
+                    if url not in self.done:
+                        self.pending[url] = record[2]
+                elif kind == "d":
+                    self.pending.pop(url, None)
+                    self.done[url] = record[2]
+                elif kind == "s" and url not in self.seeds:
+                    self.seeds.append(url)
+
+        # The journal must end with a newline before records are appended
+        with open(self.path, "rb+") as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell():
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
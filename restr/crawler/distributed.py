@@ -0,0 +1,857 @@
+"""
+restr.crawler.distributed
+
+Coordinator and Worker Class File
+Crawls with workers on any number of machines leasing URL batches over HTTP
+
+The Coordinator owns the Frontier and the EndpointMap and serves a JSON API:
+
+    POST /lease     {"worker": str, "count": int}
+                    -> {"lease": str | None, "urls": [[url, depth], ...],
+                        "lease_timeout": float, "retry_after": float,
+                        "done": bool}
+    POST /renew     {"lease": str} -> {"renewed": bool}
+    POST /complete  {"lease": str, "results": [{"url", "links", "elapsed", "error"}]}
+                    -> {"accepted": int}
+    GET  /status    -> Coordinator.status()
+
+Usage:
+    python -m restr.crawler.distributed coordinator SEED [SEED ...] [--port N]
+    python -m restr.crawler.distributed worker http://HOST:PORT [--browsers N]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterable
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from restr.browser.browser_base import BrowserBase
+from restr.browser.http_browser import HttpBrowser
+from restr.crawler.checkpoint import Checkpoint
+from restr.crawler.endpoints import EndpointMap
+from restr.crawler.engine import CrawlStats, PageResult, TabStats
+from restr.crawler.frontier import Frontier
+from restr.crawler.sharded import _browser, visit
+
+# Errors of a call to the Coordinator that are retried
+COORDINATOR_ERRORS = (RuntimeError, OSError, http.client.HTTPException)
+
+# Maximum seconds between retries of a call to the Coordinator
+MAX_BACKOFF = 30.0
+
+
+class _Lease:
+    """
+    URLs handed to a worker until it returns their results or the lease expires
+    """
+
+    def __init__(self, worker: str, urls: dict[str, int], deadline: float) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        worker : str
+            Worker the URLs were leased to
+
+        urls : dict[str, int]
+            Leased URLs and their depths
+
+        deadline : float
+            time.monotonic() the lease expires at
+        """
+
+        self.id: str = uuid.uuid4().hex
+        self.worker: str = worker
+        self.urls: dict[str, int] = urls
+        self.deadline: float = deadline
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the JSON API of the Coordinator"""
+
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately, Nagle would delay the body
+    disable_nagle_algorithm = True
+
+    # pylint: disable=invalid-name
+    # Method names are defined by BaseHTTPRequestHandler
+    def do_GET(self) -> None:
+        """Serve GET"""
+
+        if self.path == "/status":
+            self._reply(200, self.server.coordinator.status())
+        else:
+            self._reply(404, {"error": "Not Found"})
+
+    def do_POST(self) -> None:
+        """Serve POST"""
+
+        coordinator = self.server.coordinator
+        routes = {
+            "/lease": lambda body: coordinator.lease(body["worker"], body.get("count")),
+            "/renew": lambda body: {"renewed": coordinator.renew(body["lease"])},
+            "/complete": lambda body: {
+                "accepted": coordinator.complete(body["lease"], body["results"])
+            },
+        }
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "Invalid JSON"})
+            return
+
+        if self.path not in routes:
+            self._reply(404, {"error": "Not Found"})
+            return
+
+        try:
+            self._reply(200, routes[self.path](body))
+        except (KeyError, TypeError) as error:
+            self._reply(400, {"error": f"Invalid request: {error}"})
+
+    def _reply(self, status: int, document: dict) -> None:
+        """Send a JSON response"""
+
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """Do not log requests to stderr"""
+
+
+# pylint: disable=too-many-instance-attributes, too-many-arguments
+# Coordinator is configured through many independent options
+class Coordinator:
+    """
+    Coordinator Class
+
+    Owns the frontier and the endpoint map of a crawl and leases URL batches
+    to Workers over HTTP.
+
+    A lease expires `lease_timeout` seconds after it was handed out or last
+    renewed, its unfinished URLs are then dispatched again. A URL whose leases
+    expired `max_attempts` times is recorded as failed. At most `max_leased`
+    URLs are out at once, beyond that workers are told to retry later.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        frontier: Frontier | None = None,
+        endpoints: EndpointMap | None = None,
+        batch_size: int = 16,
+        lease_timeout: float = 120.0,
+        max_leased: int = 1024,
+        max_attempts: int = 3,
+        max_pages: int | None = None,
+        same_host: bool = True,
+        retry_after: float = 0.5,
+        checkpoint: Checkpoint | str | Path | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        host : str, optional
+            Address to listen on, by default "127.0.0.1".
+            Use "0.0.0.0" to accept workers from other machines.
+
+        port : int, optional
+            Port to listen on, by default 0 (a free port).
+
+        frontier : Frontier, optional
+            Frontier to crawl from, by default a temporary Frontier closed on close().
+
+        endpoints : EndpointMap, optional
+            Records crawled pages, links to saturated endpoints are skipped,
+            by default None.
+
+        batch_size : int, optional
+            Maximum URLs per lease, by default 16.
+
+        lease_timeout : float, optional
+            Seconds a lease is held without renewal, by default 120.0.
+
+        max_leased : int, optional
+            Maximum URLs leased at once, by default 1024.
+
+        max_attempts : int, optional
+            Leases of a URL that may expire before it is failed, by default 3.
+
+        max_pages : int, optional
+            Maximum number of pages to crawl, by default None (no limit).
+
+        same_host : bool, optional
+            Only follow links to the hosts of the seed URLs, by default True.
+
+        retry_after : float, optional
+            Seconds workers wait when no URL can be leased, by default 0.5.
+
+        checkpoint : Checkpoint | str | Path, optional
+            Checkpoint or journal file to record the crawl to and resume it
+            from, by default None. A checkpoint created from a path is closed
+            on close().
+
+        Notes
+        -----
+        When resuming, crawled URLs are never leased again and queued or
+        leased URLs are queued again. The endpoint map is rebuilt from the
+        crawled URLs.
+        """
+
+        self._frontier_owned: bool = frontier is None
+        self.frontier: Frontier = (
+            frontier if frontier is not None else Frontier(capacity=1_000_000)
+        )
+        self.endpoints: EndpointMap | None = endpoints
+        self.batch_size: int = batch_size
+        self.lease_timeout: float = lease_timeout
+        self.max_leased: int = max_leased
+        self.max_attempts: int = max_attempts
+        self.max_pages: int | None = max_pages
+        self.same_host: bool = same_host
+        self.retry_after: float = retry_after
+
+        self.stats: CrawlStats = CrawlStats()
+        self.redispatched: int = 0
+        self.on_page: Callable[[PageResult], None] | None = None
+
+        self._leases: dict[str, _Lease] = {}
+        self._attempts: dict[str, int] = {}
+        self._hosts: set[str] = set()
+        self._lock = threading.RLock()
+        self._done = threading.Event()
+        self._start: float = time.perf_counter()
+
+        self._checkpoint_owned: bool = False
+        if checkpoint is not None and not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+            self._checkpoint_owned = True
+        self.checkpoint: Checkpoint | None = checkpoint
+        if checkpoint is not None and checkpoint.resumed:
+            self._resume()
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.coordinator = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL workers connect to"""
+
+        host, port = self._httpd.server_address[:2]
+        if host in ("0.0.0.0", ""):
+            host = socket.gethostname()
+        return f"http://{host}:{port}"
+
+    @property
+    def leased(self) -> int:
+        """Number of URLs currently leased"""
+
+        with self._lock:
+            return sum(len(lease.urls) for lease in self._leases.values())
+
+    def seed(self, seeds: str | Iterable[str]) -> int:
+        """
+        Queue the seed URLs, their hosts are in scope with same_host
+
+        Parameters
+        ----------
+        seeds : str | Iterable[str]
+            URLs to start from
+
+        Returns
+        -------
+        int : Number of URLs queued
+        """
+
+        queued = 0
+        with self._lock:
+            for url in [seeds] if isinstance(seeds, str) else seeds:
+                # pylint: disable=protected-access
+                url = self.frontier.canonicalize(BrowserBase._format_url(url))
+                self._hosts.add(urlsplit(url).netloc)
+                if self.checkpoint is not None:
+                    self.checkpoint.seed(url)
+                queued += self._add(url, 0)
+            self._done.clear()
+
+        return queued
+
+    def start(self) -> "Coordinator":
+        """
+        Serve the API on a background thread
+
+        Returns
+        -------
+        Coordinator : self
+        """
+
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            args=(0.1,),
+            name="restr-coordinator",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Wait until every queued URL has been crawled
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait, by default None (no limit).
+
+        Returns
+        -------
+        bool : True if the crawl is done
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        # Expired leases are also collected here in case every worker died
+        while not self._done.wait(min(1.0, self.lease_timeout / 2)):
+            with self._lock:
+                self._expire()
+                self._check_done()
+            if self.checkpoint is not None:
+                self.checkpoint.maybe_flush()
+            if deadline is not None and time.monotonic() >= deadline:
+                return self._done.is_set()
+
+        return True
+
+    def run(
+        self,
+        seeds: str | Iterable[str],
+        on_page: Callable[[PageResult], None] | None = None,
+        timeout: float | None = None,
+    ) -> CrawlStats:
+        """
+        Seed, serve until the crawl is done and close
+
+        Parameters
+        ----------
+        seeds : str | Iterable[str]
+            URLs to start from
+
+        on_page : Callable[[PageResult], None], optional
+            Called with every crawled page, by default None.
+
+        timeout : float, optional
+            Seconds to wait for the crawl, by default None (no limit).
+
+        Returns
+        -------
+        CrawlStats : Crawl statistics, tabs are keyed by worker
+        """
+
+        self.on_page = on_page
+        self.seed(seeds)
+        self.start()
+
+        try:
+            self.wait(timeout)
+        finally:
+            self.close()
+
+        return self.stats
+
+    def lease(self, worker: str, count: int | None = None) -> dict:
+        """
+        Lease a batch of URLs to a worker
+
+        Parameters
+        ----------
+        worker : str
+            Worker ID
+
+        count : int, optional
+            Maximum URLs, by default batch_size.
+
+        Returns
+        -------
+        dict : Lease ID, URLs with their depths, seconds to wait before the
+            next lease if no URL was leased, and whether the crawl is done
+        """
+
+        with self._lock:
+            self._expire()
+
+            count = min(count or self.batch_size, self.batch_size)
+            count = min(count, self.max_leased - self.leased)
+
+            popped = self.frontier.pop_many(count) if count > 0 else []
+            if not popped:
+                self._check_done()
+                return {
+                    "lease": None,
+                    "urls": [],
+                    "lease_timeout": self.lease_timeout,
+                    "retry_after": self.retry_after,
+                    "done": self._done.is_set(),
+                }
+
+            lease = _Lease(worker, dict(popped), time.monotonic() + self.lease_timeout)
+            self._leases[lease.id] = lease
+
+            return {
+                "lease": lease.id,
+                "urls": popped,
+                "lease_timeout": self.lease_timeout,
+                "retry_after": 0.0,
+                "done": False,
+            }
+
+    def renew(self, lease_id: str) -> bool:
+        """
+        Extend a lease by lease_timeout
+
+        Parameters
+        ----------
+        lease_id : str
+            Lease ID
+
+        Returns
+        -------
+        bool : False if the lease already expired or is unknown
+        """
+
+        with self._lock:
+            lease = self._leases.get(lease_id)
+            if lease is None:
+                return False
+            lease.deadline = time.monotonic() + self.lease_timeout
+            return True
+
+    def complete(self, lease_id: str, results: list[dict]) -> int:
+        """
+        Record the results of leased URLs
+
+        Parameters
+        ----------
+        lease_id : str
+            Lease ID
+
+        results : list[dict]
+            Results with url, links, elapsed and error keys
+
+        Returns
+        -------
+        int : Number of results accepted
+
+        Notes
+        -----
+        Results of an expired lease are ignored, its URLs were dispatched again.
+        The lease is renewed while it has URLs left and released after.
+        """
+
+        pages = []
+
+        with self._lock:
+            lease = self._leases.get(lease_id)
+
+            if lease is None:
+                return 0
+
+            for result in results:
+                url = result["url"]
+                if url not in lease.urls:
+                    continue
+
+                depth = lease.urls.pop(url)
+                self._attempts.pop(url, None)
+                page = PageResult(
+                    url, result["links"], result["elapsed"], result["error"]
+                )
+                self._record(page, lease.worker, depth)
+                pages.append(page)
+
+            if lease.urls:
+                lease.deadline = time.monotonic() + self.lease_timeout
+            else:
+                del self._leases[lease_id]
+
+            self._check_done()
+
+        if self.on_page:
+            for page in pages:
+                self.on_page(page)
+
+        return len(pages)
+
+    def status(self) -> dict:
+        """
+        Get the crawl progress
+
+        Returns
+        -------
+        dict : Crawl statistics, queued and leased URLs and workers
+        """
+
+        with self._lock:
+            self.stats.elapsed = time.perf_counter() - self._start
+            return {
+                **self.stats.as_dict(),
+                "queued": len(self.frontier),
+                "leased": self.leased,
+                "leases": len(self._leases),
+                "workers": sorted({lease.worker for lease in self._leases.values()}),
+                "redispatched": self.redispatched,
+                "done": self._done.is_set(),
+            }
+
+    def close(self) -> None:
+        """
+        Stop serving and write the checkpoint
+
+        Notes
+        -----
+        The frontier and the checkpoint are closed if they were created by
+        the Coordinator.
+        """
+
+        self.stats.elapsed = time.perf_counter() - self._start
+
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+        if self._frontier_owned:
+            self.frontier.close()
+
+        if self._checkpoint_owned:
+            self.checkpoint.close()
+        elif self.checkpoint is not None:
+            self.checkpoint.flush()
+
+    def _add(self, url: str, depth: int) -> bool:
+        """Queue a URL if it is new, in scope and under max_pages"""
+
+        url = self.frontier.canonicalize(url)
+        if self.max_pages is not None and self.frontier.seen >= self.max_pages:
+            return False
+        if self.same_host and urlsplit(url).netloc not in self._hosts:
+            return False
+        if self.endpoints is not None and self.endpoints.is_saturated(url):
+            return False
+
+        if not self.frontier.add(url, depth):
+            return False
+
+        if self.checkpoint is not None:
+            self.checkpoint.queue(url, depth)
+        return True
+
+    def _record(self, page: PageResult, worker: str, depth: int) -> None:
+        """Update the statistics and the frontier with a crawled page"""
+
+        tab = self.stats.tabs.setdefault(worker, TabStats())
+        tab.pages += 1
+        tab.busy += page.elapsed
+        self.stats.pages += 1
+        self.stats.errors += int(not page.ok)
+
+        if self.checkpoint is not None:
+            self.checkpoint.complete(page.url, page.ok)
+
+        if page.ok:
+            if self.endpoints is not None:
+                self.endpoints.add(page.url)
+            for link in page.links:
+                if link.startswith("http"):
+                    self._add(link, depth + 1)
+
+    def _resume(self) -> None:
+        """Restore the frontier, scope and endpoints from the checkpoint"""
+
+        checkpoint = self.checkpoint
+
+        self._hosts.update(urlsplit(url).netloc for url in checkpoint.seeds)
+        self.frontier.mark_seen(checkpoint.done)
+        for url, depth in checkpoint.pending.items():
+            self.frontier.add(url, depth)
+
+        if self.endpoints is not None:
+            for url, ok in checkpoint.done.items():
+                if ok:
+                    self.endpoints.add(url)
+
+    def _expire(self) -> None:
+        """Dispatch the URLs of expired leases again"""
+
+        now = time.monotonic()
+        for lease_id, lease in list(self._leases.items()):
+            if lease.deadline > now:
+                continue
+
+            del self._leases[lease_id]
+            for url, depth in lease.urls.items():
+                attempts = self._attempts.get(url, 0) + 1
+                self._attempts[url] = attempts
+
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(url)
+                    self._record(
+                        PageResult(url, error=f"Lease expired {attempts} times"),
+                        lease.worker,
+                        depth,
+                    )
+                else:
+                    self.frontier.requeue(url, depth)
+                    self.redispatched += 1
+
+    def _check_done(self) -> None:
+        """Set done when nothing is queued or leased"""
+
+        if not self._leases and not len(self.frontier):
+            self._done.set()
+
+
+class Worker:
+    """
+    Worker Class
+
+    Leases URL batches from a Coordinator, visits them with local browsers
+    and returns the results of every batch in one request.
+    """
+
+    def __init__(
+        self,
+        coordinator: str,
+        factory: Callable[[], BrowserBase] | None = None,
+        browsers: int = 1,
+        batch_size: int = 8,
+        headless: bool = True,
+        name: str | None = None,
+        retries: int = 8,
+        backoff: float = 0.5,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        coordinator : str
+            Base URL of the Coordinator
+
+        factory : Callable[[], BrowserBase], optional
+            Creates a browser, by default Browser(headless=headless).
+
+        browsers : int, optional
+            Browsers crawling in parallel, each on its own thread, by default 1.
+
+        batch_size : int, optional
+            URLs leased at once per browser, by default 8.
+
+        headless : bool, optional
+            Run browsers in headless mode, by default True.
+            Ignored if factory is provided.
+
+        name : str, optional
+            Worker ID, by default hostname-pid.
+
+        retries : int, optional
+            Retries of a failed call to the Coordinator, by default 8.
+
+        backoff : float, optional
+            Seconds before the first retry, doubled after every retry up to
+            MAX_BACKOFF, by default 0.5.
+        """
+
+        self.coordinator: str = coordinator.rstrip("/")
+        self.factory: Callable[[], BrowserBase] = factory or partial(
+            _browser, headless=headless
+        )
+        self.browsers: int = browsers
+        self.batch_size: int = batch_size
+        self.name: str = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.retries: int = retries
+        self.backoff: float = backoff
+
+        self.pages: int = 0
+        self._client = HttpBrowser(max_connections=browsers, timeout=60.0)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self) -> int:
+        """
+        Crawl until the Coordinator is done or stop() is called
+
+        Returns
+        -------
+        int : Number of pages crawled
+        """
+
+        threads = [
+            threading.Thread(target=self._crawl, args=(f"{self.name}/{index}",))
+            for index in range(self.browsers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._client.close()
+        return self.pages
+
+    def stop(self) -> None:
+        """Stop leasing, batches in progress are finished and returned"""
+        self._stop.set()
+
+    def _crawl(self, name: str) -> None:
+        """Lease, visit and complete batches with one browser"""
+
+        browser = self.factory()
+
+        try:
+            while not self._stop.is_set():
+                lease = self._call("/lease", {"worker": name, "count": self.batch_size})
+                if lease["done"]:
+                    return
+                if not lease["urls"]:
+                    self._stop.wait(lease["retry_after"])
+                    continue
+
+                results = []
+                renewed = time.monotonic()
+                for url, _ in lease["urls"]:
+                    # Keep the lease while the batch takes longer than its timeout
+                    if time.monotonic() - renewed > lease["lease_timeout"] / 2:
+                        try:
+                            self._call("/renew", {"lease": lease["lease"]})
+                        except COORDINATOR_ERRORS:
+                            # The batch is still completed, if the lease expired
+                            # its URLs were dispatched again
+                            pass
+                        renewed = time.monotonic()
+
+                    start = time.perf_counter()
+                    try:
+                        links, error = visit(browser, url), None
+                    except (
+                        WebDriverException,
+                        OSError,
+                        http.client.HTTPException,
+                    ) as exception:
+                        links, error = [], str(exception)
+                    results.append(
+                        {
+                            "url": url,
+                            "links": links,
+                            "elapsed": time.perf_counter() - start,
+                            "error": error,
+                        }
+                    )
+
+                self._call("/complete", {"lease": lease["lease"], "results": results})
+                with self._lock:
+                    self.pages += len(results)
+
+        finally:
+            browser.close()
+
+    def _call(self, path: str, document: dict) -> dict:
+        """
+        POST a JSON document to the Coordinator
+
+        Notes
+        -----
+        Failed calls are retried with exponential backoff, so a Coordinator
+        that restarts or drops a connection does not end the worker. The error
+        of the last retry is raised.
+        """
+
+        for retry in range(self.retries):
+            try:
+                return self._post(path, document)
+            except COORDINATOR_ERRORS:
+                time.sleep(min(self.backoff * 2**retry, MAX_BACKOFF))
+
+        return self._post(path, document)
+
+    def _post(self, path: str, document: dict) -> dict:
+        """POST a JSON document to the Coordinator once"""
+
+        response = self._client.request(
+            "POST",
+            self.coordinator + path,
+            json.dumps(document).encode(),
+            {"Content-Type": "application/json"},
+        )
+        if not response.ok:
+            raise RuntimeError(
+                f"Coordinator returned {response.status} for {path}: {response.text}"
+            )
+        return response.json()
+
+
+def main() -> None:
+    """Run a Coordinator or a Worker from the command line"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator")
+    coordinator.add_argument("seeds", nargs="+")
+    coordinator.add_argument("--host", default="0.0.0.0")
+    coordinator.add_argument("--port", type=int, default=8750)
+    coordinator.add_argument("--max-pages", type=int)
+    coordinator.add_argument("--lease-timeout", type=float, default=120.0)
+    coordinator.add_argument("--checkpoint", help="journal file to resume from")
+
+    worker = commands.add_parser("worker")
+    worker.add_argument("coordinator")
+    worker.add_argument("--browsers", type=int, default=1)
+    worker.add_argument("--batch-size", type=int, default=8)
+
+    args = parser.parse_args()
+
+    if args.command == "coordinator":
+        instance = Coordinator(
+            args.host,
+            args.port,
+            max_pages=args.max_pages,
+            lease_timeout=args.lease_timeout,
+            checkpoint=args.checkpoint,
+        )
+        print(f"Coordinator listening on {instance.url}", flush=True)
+        stats = instance.run(args.seeds)
+        print(json.dumps(stats.as_dict(), indent=2))
+    else:
+        pages = Worker(
+            args.coordinator, browsers=args.browsers, batch_size=args.batch_size
+        ).run()
+        print(json.dumps({"pages": pages}))
+
+
+if __name__ == "__main__":
+    main()
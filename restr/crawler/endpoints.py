@@ -0,0 +1,404 @@
+"""
+restr.crawler.endpoints
+
+EndpointMap Class File
+Path-template trie of the API surface observed while crawling
+"""
+
+import sys
+import threading
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from restr.urls import PARAM, is_param_segment
+
+# Bit of each HTTP method in EndpointNode.methods
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+_METHOD_BITS = {method: 1 << index for index, method in enumerate(METHODS)}
+
+# Query keys stored per node, further keys are ignored
+MAX_QUERY_KEYS = 64
+
+
+class EndpointNode:
+    """
+    Node of the EndpointMap trie, one per path segment
+    """
+
+    __slots__ = (
+        "children",
+        "param",
+        "collapsed",
+        "count",
+        "methods",
+        "query_keys",
+        "statuses",
+    )
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        # Literal child segments and the {param} child
+        self.children: dict[str, EndpointNode] | None = None
+        self.param: EndpointNode | None = None
+
+        # True once all literal children were merged into the {param} child
+        self.collapsed: bool = False
+
+        # Observations of the endpoint ending at this node
+        self.count: int = 0
+        self.methods: int = 0
+        self.query_keys: set[str] | None = None
+        self.statuses: dict[int, int] | None = None
+
+    def observe(self, method: str, query_keys: list[str], status: int | None) -> None:
+        """
+        Record an observation of the endpoint
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        query_keys : list[str]
+            Query parameter names
+
+        status : int | None
+            HTTP status code, None if unknown
+        """
+
+        self.count += 1
+        self.methods |= _METHOD_BITS.get(method.upper(), 0)
+
+        if query_keys:
+            if self.query_keys is None:
+                self.query_keys = set()
+            for key in query_keys:
+                if len(self.query_keys) >= MAX_QUERY_KEYS:
+                    break
+                self.query_keys.add(sys.intern(key))
+
+        if status is not None:
+            if self.statuses is None:
+                self.statuses = {}
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def merge(self, other: "EndpointNode") -> None:
+        """
+        Merge another node and its subtree into this node
+
+        Parameters
+        ----------
+        other : EndpointNode
+            Node to merge
+        """
+
+        self.count += other.count
+        self.methods |= other.methods
+
+        if other.query_keys:
+            self.query_keys = (self.query_keys or set()) | other.query_keys
+        if other.statuses:
+            self.statuses = self.statuses or {}
+            for status, count in other.statuses.items():
+                self.statuses[status] = self.statuses.get(status, 0) + count
+
+        if other.param is not None:
+            if self.param is None:
+                self.param = EndpointNode()
+            self.param.merge(other.param)
+
+        for segment, child in (other.children or {}).items():
+            if self.collapsed:
+                self._param().merge(child)
+            else:
+                self._children().setdefault(segment, EndpointNode()).merge(child)
+
+    @property
+    def method_names(self) -> list[str]:
+        """Names of the observed HTTP methods"""
+        return [method for method in METHODS if self.methods & _METHOD_BITS[method]]
+
+    def _children(self) -> dict[str, "EndpointNode"]:
+        """Get the literal children, creating the dict on first use"""
+
+        if self.children is None:
+            self.children = {}
+        return self.children
+
+    def _param(self) -> "EndpointNode":
+        """Get the {param} child, creating it on first use"""
+
+        if self.param is None:
+            self.param = EndpointNode()
+        return self.param
+
+
+class Endpoint:
+    """
+    Endpoint summary returned by EndpointMap.endpoints()
+    """
+
+    def __init__(self, host: str, template: str, node: EndpointNode) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        host : str
+            Host of the endpoint
+
+        template : str
+            Path template, e.g. /users/{param}
+
+        node : EndpointNode
+            Trie node of the endpoint
+        """
+
+        self.host: str = host
+        self.template: str = template
+        self.count: int = node.count
+        self.methods: list[str] = node.method_names
+        self.query_keys: list[str] = sorted(node.query_keys or ())
+        self.statuses: dict[int, int] = dict(sorted((node.statuses or {}).items()))
+
+    def __repr__(self) -> str:
+        return f"<Endpoint {self.host}{self.template} ({self.count})>"
+
+    def as_dict(self) -> dict:
+        """
+        Get the endpoint as a dictionary
+
+        Returns
+        -------
+        dict : Endpoint fields
+        """
+
+        return {
+            "host": self.host,
+            "template": self.template,
+            "count": self.count,
+            "methods": self.methods,
+            "query_keys": self.query_keys,
+            "statuses": self.statuses,
+        }
+
+
+class EndpointMap:
+    """
+    EndpointMap Class
+
+    Trie over the path segments of every observed URL, one root per host.
+    Segments that look like IDs, UUIDs, hashes or tokens are collapsed into a
+    {param} child as they arrive. A node whose literal children exceed
+    max_children is collapsed as well, merging their subtrees into {param}.
+    Insert and lookup walk one node per path segment.
+    """
+
+    def __init__(self, max_children: int = 64, saturation: int = 20) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        max_children : int, optional
+            Literal children of a node before they are collapsed, by default 64.
+
+        saturation : int, optional
+            Observations after which an endpoint is saturated, by default 20.
+        """
+
+        self.max_children: int = max_children
+        self.saturation: int = saturation
+        self.roots: dict[str, EndpointNode] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of distinct endpoints"""
+        return sum(1 for _ in self.endpoints())
+
+    def add(self, url: str, method: str = "GET", status: int | None = None) -> str:
+        """
+        Record an observed URL
+
+        Parameters
+        ----------
+        url : str
+            Absolute URL
+
+        method : str, optional
+            HTTP method, by default "GET".
+
+        status : int, optional
+            HTTP status code, by default None.
+
+        Returns
+        -------
+        str : Path template the URL was recorded under
+        """
+
+        host, segments, query_keys = self._split(url)
+
+        with self._lock:
+            node = self.roots.get(host)
+            if node is None:
+                node = self.roots[sys.intern(host)] = EndpointNode()
+
+            template = []
+            for segment in segments:
+                node, segment = self._child(node, segment)
+                template.append(segment)
+
+            node.observe(method, query_keys, status)
+
+        return "/" + "/".join(template)
+
+    def match(self, url: str) -> str | None:
+        """
+        Get the path template of a URL
+
+        Parameters
+        ----------
+        url : str
+            Absolute URL
+
+        Returns
+        -------
+        str | None : Path template, None if no URL of the endpoint was observed
+        """
+
+        found = self._find(url)
+        return found[1] if found else None
+
+    def node(self, url: str) -> EndpointNode | None:
+        """
+        Get the trie node of a URL
+
+        Parameters
+        ----------
+        url : str
+            Absolute URL
+
+        Returns
+        -------
+        EndpointNode | None : Node, None if no URL of the endpoint was observed
+        """
+
+        found = self._find(url)
+        return found[0] if found else None
+
+    def is_saturated(self, url: str) -> bool:
+        """
+        Check if the endpoint of a URL was observed often enough
+
+        Parameters
+        ----------
+        url : str
+            Absolute URL
+
+        Returns
+        -------
+        bool : True if crawling the URL is unlikely to find a new endpoint
+        """
+
+        node = self.node(url)
+        return node is not None and node.count >= self.saturation
+
+    def endpoints(self) -> Iterator[Endpoint]:
+        """
+        Iterate over the observed endpoints
+
+        Returns
+        -------
+        Iterator[Endpoint] : Endpoints in depth-first order
+        """
+
+        for host, root in self.roots.items():
+            stack = [(root, "")]
+            while stack:
+                node, path = stack.pop()
+
+                if node.count:
+                    yield Endpoint(host, path or "/", node)
+
+                if node.param is not None:
+                    stack.append((node.param, f"{path}/{PARAM}"))
+                for segment, child in sorted(
+                    (node.children or {}).items(), reverse=True
+                ):
+                    stack.append((child, f"{path}/{segment}"))
+
+    def as_dict(self) -> list[dict]:
+        """
+        Get the endpoints as dictionaries
+
+        Returns
+        -------
+        list[dict] : Endpoint fields
+        """
+
+        return [endpoint.as_dict() for endpoint in self.endpoints()]
+
+    def _child(self, node: EndpointNode, segment: str) -> tuple[EndpointNode, str]:
+        """Get or create the child of a segment, collapsing as needed"""
+
+        if node.collapsed or is_param_segment(segment):
+            return node._param(), PARAM  # pylint: disable=protected-access
+
+        children = node._children()  # pylint: disable=protected-access
+        child = children.get(segment)
+        if child is not None:
+            return child, segment
+
+        # Too many distinct literals, the segment is a parameter
+        if len(children) >= self.max_children:
+            self._collapse(node)
+            return node.param, PARAM
+
+        child = children[sys.intern(segment)] = EndpointNode()
+        return child, segment
+
+    @staticmethod
+    def _collapse(node: EndpointNode) -> None:
+        """Merge all literal children of a node into its {param} child"""
+
+        param = node._param()  # pylint: disable=protected-access
+        node.collapsed = True
+
+        children, node.children = node.children or {}, None
+        for child in children.values():
+            param.merge(child)
+
+    def _find(self, url: str) -> tuple[EndpointNode, str] | None:
+        """Walk the trie without modifying it"""
+
+        host, segments, _ = self._split(url)
+
+        node = self.roots.get(host)
+        template = []
+
+        for segment in segments:
+            if node is None:
+                return None
+
+            if node.collapsed or is_param_segment(segment):
+                node = node.param
+                template.append(PARAM)
+            else:
+                node = (node.children or {}).get(segment)
+                template.append(segment)
+
+        if node is None or not node.count:
+            return None
+
+        return node, "/" + "/".join(template)
+
+    @staticmethod
+    def _split(url: str) -> tuple[str, list[str], list[str]]:
+        """Split a URL into host, path segments and query keys"""
+
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        query_keys = [pair.split("=", 1)[0] for pair in parts.query.split("&") if pair]
+
+        return parts.netloc.lower(), segments, query_keys
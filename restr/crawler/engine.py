@@ -0,0 +1,576 @@
+"""
+restr.crawler.engine
+
+CrawlEngine Class File
+Crawls with many tabs in flight per Browser on an asyncio event loop
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable, ContextManager, Iterable
+from urllib.parse import urldefrag, urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from restr.browser.browser_base import BrowserBase
+from restr.browser.extract import PageData
+from restr.browser.window import Window
+from restr.crawler.checkpoint import Checkpoint
+from restr.crawler.endpoints import EndpointMap
+from restr.crawler.ratelimit import RateController, Slot
+
+if TYPE_CHECKING:
+    from restr.browser.browser import Browser
+    from restr.browser.tracing import Span, Tracer
+
+
+class PageResult:
+    """
+    Result of crawling a single page
+    """
+
+    def __init__(
+        self,
+        url: str,
+        links: list[str] | None = None,
+        elapsed: float = 0.0,
+        error: str | None = None,
+        data: PageData | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        url : str
+            Crawled URL
+
+        links : list[str], optional
+            Links found on the page, by default None.
+
+        elapsed : float, optional
+            Seconds from navigation start to links extracted, by default 0.0.
+
+        error : str, optional
+            Error message if the page failed, by default None.
+
+        data : PageData, optional
+            Data extracted from the page, by default None.
+        """
+
+        self.url: str = url
+        self.links: list[str] = links or []
+        self.elapsed: float = elapsed
+        self.error: str | None = error
+        self.data: PageData | None = data
+
+    @property
+    def ok(self) -> bool:
+        """True if the page was crawled without errors"""
+        return self.error is None
+
+
+class TabStats:
+    """
+    Per-tab crawl statistics
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.pages: int = 0
+        self.busy: float = 0.0
+
+
+class CrawlStats:
+    """
+    Crawl statistics
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.pages: int = 0
+        self.errors: int = 0
+        self.elapsed: float = 0.0
+        self.tabs: dict[str, TabStats] = {}
+
+    @property
+    def pages_per_sec(self) -> float:
+        """Crawled pages per second"""
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def utilization(self) -> dict[str, float]:
+        """Share of the crawl time each tab spent loading or extracting a page"""
+        return {
+            handle: (tab.busy / self.elapsed if self.elapsed else 0.0)
+            for handle, tab in self.tabs.items()
+        }
+
+    def as_dict(self) -> dict:
+        """
+        Get statistics as a dictionary
+
+        Returns
+        -------
+        dict : Counters and derived statistics
+        """
+
+        return {
+            "pages": self.pages,
+            "errors": self.errors,
+            "elapsed": self.elapsed,
+            "pages_per_sec": self.pages_per_sec,
+            "utilization": self.utilization,
+        }
+
+
+class _BrowserWorker:
+    """
+    Runs the blocking WebDriver calls of one Browser on a single thread
+
+    A WebDriver session handles one command at a time and window switches are
+    global to the session, so every call for a browser goes through one thread.
+    """
+
+    def __init__(self, browser: "Browser") -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        browser : Browser
+            Browser to drive
+        """
+
+        self.browser: "Browser" = browser
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="restr-crawl"
+        )
+
+        # Handle the WebDriver session is currently switched to
+        self._current: str | None = None
+
+        # Tabs held busy in the browser's WindowRegistry
+        self._tabs: list[Window] = []
+
+    async def call(self, window: Window, func: Callable, *args):
+        """
+        Run a Window method on the browser thread
+
+        Parameters
+        ----------
+        window : Window
+            Window to switch to before calling func
+
+        func : Callable
+            Blocking function to run
+
+        Returns
+        -------
+        Return value of func
+
+        Notes
+        -----
+        Runs in a copy of the calling task's context, the commands are nested
+        under its current span.
+        """
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor, context.run, self._switch_and_call, window, func, *args
+        )
+
+    def _switch_and_call(self, window: Window, func: Callable, *args):
+        """Switch to window if needed and call func"""
+
+        if self._current != window.handle:
+            window.switch()
+            self._current = window.handle
+
+        return func(*args)
+
+    async def open_tabs(self, count: int) -> list[Window]:
+        """
+        Open tabs up to count
+
+        Parameters
+        ----------
+        count : int
+            Number of tabs
+
+        Returns
+        -------
+        list[Window] : Tab windows, the existing window first
+        """
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor, context.run, self._open_tabs, count
+        )
+
+    def _open_tabs(self, count: int) -> list[Window]:
+        """Open blank tabs next to the current window"""
+
+        driver = self.browser.browser
+        handles = list(driver.window_handles)
+
+        while len(handles) < count:
+            driver.switch_to.new_window("tab")
+            handles.append(driver.current_window_handle)
+
+        # Tabs stay busy for the whole crawl, they must fit in the registry
+        registry = self.browser.windows
+        registry.max_windows = max(registry.max_windows, count)
+
+        tabs = []
+        for handle in handles[:count]:
+            window = registry.get(handle) or Window(browser=driver, handle=handle)
+            tabs.append(registry.add(window, busy=True))
+
+        self._tabs = tabs
+
+        self._current = driver.current_window_handle
+        return tabs
+
+    def shutdown(self) -> None:
+        """Stop the browser thread and release the tabs"""
+
+        self.executor.shutdown(wait=True)
+
+        for tab in self._tabs:
+            self.browser.windows.release(tab)
+        self._tabs = []
+
+
+# pylint: disable=too-many-instance-attributes, too-many-arguments
+# Engine is configured through many independent options
+class CrawlEngine:
+    """
+    CrawlEngine Class
+
+    Keeps `tabs` pages in flight per Browser. Navigation is started in one tab
+    and, while it loads, the other tabs of the same browser are serviced, so
+    page load latency overlaps across tabs.
+    """
+
+    def __init__(
+        self,
+        browsers: "Browser | list[Browser]",
+        tabs: int = 4,
+        max_pages: int | None = None,
+        page_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+        same_host: bool = True,
+        on_page: Callable[[PageResult], None] | None = None,
+        endpoints: EndpointMap | None = None,
+        network_idle: float | None = None,
+        rate: RateController | None = None,
+        checkpoint: Checkpoint | None = None,
+        tracer: "Tracer | None" = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        browsers : Browser | list[Browser]
+            Browsers to crawl with
+
+        tabs : int, optional
+            Pages in flight per browser, by default 4.
+
+        max_pages : int, optional
+            Maximum number of pages to crawl, by default None (no limit).
+
+        page_timeout : float, optional
+            Seconds to wait for a page to load, by default 30.0.
+
+        poll_interval : float, optional
+            Seconds between load checks of a tab, by default 0.05.
+
+        same_host : bool, optional
+            Only follow links to the hosts of the seed URLs, by default True.
+
+        on_page : Callable[[PageResult], None], optional
+            Called with every crawled page, by default None.
+
+        endpoints : EndpointMap, optional
+            Records crawled pages, links to saturated endpoints are skipped,
+            by default None.
+
+        network_idle : float, optional
+            Also wait for this many seconds without requests in flight before
+            extracting, for pages that render after the load event,
+            by default None (extract on load).
+
+        rate : RateController, optional
+            Limits the pages loading per host, by default None (the controller
+            of each browser, if any).
+
+        checkpoint : Checkpoint, optional
+            Records the crawl, a crawl resumed from it skips crawled URLs and
+            crawls the URLs that were queued or loading, by default None.
+
+        tracer : Tracer, optional
+            Exports a span for the crawl and one per page, the WebDriver
+            commands of a page are nested under it, by default None (the
+            tracer of the first browser, if any).
+        """
+
+        if tabs < 1:
+            raise ValueError("tabs must be at least 1")
+
+        self.browsers: list[Browser] = (
+            browsers if isinstance(browsers, list) else [browsers]
+        )
+        self.tabs: int = tabs
+        self.max_pages: int | None = max_pages
+        self.page_timeout: float = page_timeout
+        self.poll_interval: float = poll_interval
+        self.same_host: bool = same_host
+        self.on_page: Callable[[PageResult], None] | None = on_page
+        self.endpoints: EndpointMap | None = endpoints
+        self.network_idle: float | None = network_idle
+        self.rate: RateController | None = rate
+        self.checkpoint: Checkpoint | None = checkpoint
+        self.tracer: "Tracer | None" = (
+            tracer if tracer is not None else self.browsers[0].tracer
+        )
+
+        self.stats: CrawlStats = CrawlStats()
+
+        self._seen: set[str] = set()
+        self._hosts: set[str] = set()
+        self._queue: asyncio.Queue | None = None
+
+    async def run(self, seeds: str | Iterable[str]) -> CrawlStats:
+        """
+        Crawl starting from the seed URLs
+
+        Parameters
+        ----------
+        seeds : str | Iterable[str]
+            URLs to start from
+
+        Returns
+        -------
+        CrawlStats : Crawl statistics
+        """
+
+        self._queue = asyncio.Queue()
+        self._seen = set()
+        self._hosts = set()
+        self.stats = CrawlStats()
+
+        if self.checkpoint is not None:
+            self._resume()
+
+        urls = []
+        for url in [seeds] if isinstance(seeds, str) else seeds:
+            url = BrowserBase._format_url(url)  # pylint: disable=protected-access
+            urls.append(url)
+            self._hosts.add(urlsplit(url).netloc)
+            if self.checkpoint is not None:
+                self.checkpoint.seed(url)
+            self._enqueue(url)
+
+        workers = [_BrowserWorker(browser) for browser in self.browsers]
+        start = time.perf_counter()
+
+        # The tab tasks are created inside the job span, their pages nest under it
+        with self._span("job", seeds=urls) as span:
+            try:
+                tab_lists = await asyncio.gather(
+                    *(worker.open_tabs(self.tabs) for worker in workers)
+                )
+
+                tasks = [
+                    asyncio.create_task(self._tab_loop(worker, tab))
+                    for worker, tabs in zip(workers, tab_lists)
+                    for tab in tabs
+                ]
+
+                # Wait until every queued URL has been crawled or a tab fails
+                joined = asyncio.create_task(self._queue.join())
+                await asyncio.wait(
+                    [joined, *tasks], return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in [joined, *tasks]:
+                    task.cancel()
+                results = await asyncio.gather(joined, *tasks, return_exceptions=True)
+
+                # Surface errors raised by on_page
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
+
+            finally:
+                self.stats.elapsed = time.perf_counter() - start
+                for worker in workers:
+                    worker.shutdown()
+                if self.checkpoint is not None:
+                    self.checkpoint.flush()
+                if span is not None:
+                    span.attributes.update(
+                        pages=self.stats.pages, errors=self.stats.errors
+                    )
+
+        return self.stats
+
+    def crawl(self, seeds: str | Iterable[str]) -> CrawlStats:
+        """
+        Crawl starting from the seed URLs, blocking until done
+
+        Parameters
+        ----------
+        seeds : str | Iterable[str]
+            URLs to start from
+
+        Returns
+        -------
+        CrawlStats : Crawl statistics
+        """
+
+        return asyncio.run(self.run(seeds))
+
+    def _enqueue(self, url: str) -> None:
+        """Queue a URL if it is new, in scope and under max_pages"""
+
+        url = urldefrag(url).url
+
+        if url in self._seen:
+            return
+        if self.max_pages is not None and len(self._seen) >= self.max_pages:
+            return
+        if self.same_host and urlsplit(url).netloc not in self._hosts:
+            return
+        if self.endpoints is not None and self.endpoints.is_saturated(url):
+            return
+
+        self._seen.add(url)
+        self._queue.put_nowait(url)
+
+        if self.checkpoint is not None:
+            self.checkpoint.queue(url)
+
+    def _resume(self) -> None:
+        """Queue the pending URLs of the checkpoint and skip its crawled URLs"""
+
+        self._hosts.update(urlsplit(url).netloc for url in self.checkpoint.seeds)
+        self._seen.update(self.checkpoint.done)
+
+        for url in self.checkpoint.pending:
+            if url not in self._seen:
+                self._seen.add(url)
+                self._queue.put_nowait(url)
+
+    async def _tab_loop(self, worker: _BrowserWorker, tab: Window) -> None:
+        """Crawl queued URLs in one tab until cancelled"""
+
+        tab_stats = self.stats.tabs.setdefault(tab.handle, TabStats())
+
+        while True:
+            url = await self._queue.get()
+            try:
+                result = await self._crawl_page(worker, tab, url)
+
+                tab_stats.pages += 1
+                tab_stats.busy += result.elapsed
+                self.stats.pages += 1
+                self.stats.errors += int(not result.ok)
+
+                if self.checkpoint is not None:
+                    self.checkpoint.complete(url, result.ok)
+
+                if self.endpoints is not None and result.ok:
+                    self._observe(result)
+
+                for link in result.links:
+                    if link.startswith("http"):
+                        self._enqueue(link)
+
+                if self.on_page:
+                    self.on_page(result)
+
+            finally:
+                self._queue.task_done()
+
+    def _observe(self, result: PageResult) -> None:
+        """Record a page and the API calls and forms found on it"""
+
+        self.endpoints.add(result.url)
+
+        if result.data is not None:
+            for url in result.data.requests:
+                self.endpoints.add(url)
+            for form in result.data.forms:
+                self.endpoints.add(form.action, method=form.method)
+
+    async def _crawl_page(
+        self, worker: _BrowserWorker, tab: Window, url: str
+    ) -> PageResult:
+        """Load url in tab and extract its links"""
+
+        rate = self.rate or worker.browser.rate
+        slot = await self._acquire(rate, url) if rate is not None else None
+
+        start = time.perf_counter()
+
+        try:
+            with self._span("page", url=url):
+                try:
+                    await worker.call(tab, tab.navigate, url)
+
+                    # Yield to other tabs while this page loads
+                    while not await worker.call(
+                        tab, tab.is_ready, None, self.network_idle
+                    ):
+                        if time.perf_counter() - start > self.page_timeout:
+                            await worker.call(
+                                tab, tab.browser.execute_script, "window.stop();"
+                            )
+                            raise TimeoutError(f"Timed out loading {url}")
+                        if self.checkpoint is not None:
+                            self.checkpoint.maybe_flush()
+                        await asyncio.sleep(self.poll_interval)
+
+                except (WebDriverException, TimeoutError):
+                    if slot is not None:
+                        slot.error = True
+                    raise
+
+                finally:
+                    # The host is done with the page once it has loaded
+                    if slot is not None:
+                        rate.release(slot)
+
+                data = await worker.call(tab, tab.extract)
+
+            links = data.links + data.iframes
+            return PageResult(url, links, time.perf_counter() - start, data=data)
+
+        except (WebDriverException, TimeoutError) as error:
+            return PageResult(url, elapsed=time.perf_counter() - start, error=str(error))
+
+    def _span(self, name: str, **attributes) -> ContextManager["Span | None"]:
+        """Time a block as a span of the tracer, if there is one"""
+
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    async def _acquire(self, rate: RateController, url: str) -> Slot:
+        """Wait for a slot of the host of url without blocking other tabs"""
+
+        while (slot := rate.try_acquire(url)) is None:
+            await asyncio.sleep(max(self.poll_interval, rate.wait_time(url)))
+
+        return slot
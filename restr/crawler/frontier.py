@@ -0,0 +1,463 @@
+"""
+restr.crawler.frontier
+
+Frontier Class File
+Disk-backed URL frontier with canonicalization and Bloom filter deduplication
+"""
+
+import hashlib
+import math
+import shutil
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from restr.urls import TRACKING_PARAMS, canonicalize
+
+
+class BloomFilter:
+    """
+    Bloom Filter
+
+    Answers "possibly seen" or "definitely not seen" with a fixed bit array.
+    Items are 16 byte digests, the k bit positions are derived from the two
+    halves of the digest by double hashing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        capacity : int
+            Expected number of items
+
+        error_rate : float, optional
+            False positive rate at capacity, by default 0.01.
+        """
+
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+
+        self.capacity: int = capacity
+        self.error_rate: float = error_rate
+
+        # Optimal number of bits and hash functions
+        self.size: int = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes: int = max(1, round(self.size / capacity * math.log(2)))
+
+        self.bits: bytearray = bytearray((self.size + 7) // 8)
+        self.count: int = 0
+
+    def __contains__(self, digest: bytes) -> bool:
+        """Check if a digest was possibly added"""
+
+        bits = self.bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(digest)
+        )
+
+    def __len__(self) -> int:
+        """Number of added digests"""
+        return self.count
+
+    def add(self, digest: bytes) -> bool:
+        """
+        Add a digest
+
+        Parameters
+        ----------
+        digest : bytes
+            16 byte digest of the item
+
+        Returns
+        -------
+        bool : True if the digest was definitely not added before
+        """
+
+        bits = self.bits
+        new = False
+
+        for position in self._positions(digest):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+
+        self.count += int(new)
+        return new
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the bit array"""
+        return len(self.bits)
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+        """Bit positions of a digest"""
+
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        size = self.size
+
+        return [(first + index * second) % size for index in range(self.hashes)]
+
+
+# pylint: disable=too-many-instance-attributes
+# Frontier needs to track filter, buffer and database state
+class Frontier:
+    """
+    Frontier Class
+
+    Queue of URLs to crawl that accepts every URL at most once.
+
+    URLs are canonicalized and deduplicated by a 16 byte digest. The in-memory
+    Bloom filter rejects most duplicates without touching the disk, possible
+    duplicates are confirmed against the exact on-disk set. Queued URLs are
+    stored on disk and popped shallowest first, interleaving hosts so that no
+    single host is crawled in a burst.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        capacity: int = 10_000_000,
+        error_rate: float = 0.01,
+        drop_params: Iterable[str] = TRACKING_PARAMS,
+        batch_size: int = 10_000,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path, optional
+            SQLite database file, by default a temporary file removed on close().
+
+        capacity : int, optional
+            Expected number of URLs, sizes the Bloom filter, by default 10,000,000.
+
+        error_rate : float, optional
+            Bloom filter false positive rate, by default 0.01.
+
+        drop_params : Iterable[str], optional
+            Query parameters removed by canonicalize(), by default TRACKING_PARAMS.
+
+        batch_size : int, optional
+            Number of added URLs buffered before they are written, by default 10,000.
+
+        Notes
+        -----
+        The Bloom filter and the per-host turns are rebuilt from the database
+        when an existing path is opened.
+        """
+
+        self._tempdir: str | None = None
+        if path is None:
+            self._tempdir = tempfile.mkdtemp(prefix="restr-frontier-")
+            path = Path(self._tempdir, "frontier.db")
+
+        self.path: Path = Path(path)
+        self.drop_params: tuple[str, ...] = tuple(drop_params)
+        self.batch_size: int = batch_size
+        self.bloom: BloomFilter = BloomFilter(capacity, error_rate)
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA cache_size = -65536;
+            CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS queue (
+                id INTEGER PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                turn INTEGER NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS queue_order ON queue (depth, turn, id);
+            """)
+
+        # Added URLs not yet written to the database
+        self._buffer_keys: set[bytes] = set()
+        self._buffer_queue: list[tuple[int, int, str]] = []
+
+        # Number of URLs queued per host, interleaves hosts within a depth
+        self._host_turns: dict[str, int] = {}
+        for url, turn in self._db.execute("SELECT url, turn FROM queue"):
+            host = self._host(url)
+            self._host_turns[host] = max(self._host_turns.get(host, 0), turn + 1)
+
+        self._size: int = self._db.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+        self._seen: int = 0
+        for (key,) in self._db.execute("SELECT key FROM seen"):
+            self.bloom.add(key)
+            self._seen += 1
+
+        self.false_positives: int = 0
+
+    def __len__(self) -> int:
+        """Number of queued URLs"""
+        return self._size
+
+    def __contains__(self, url: str) -> bool:
+        """Check if a URL was ever added"""
+
+        with self._lock:
+            return self._is_seen(self.key(self.canonicalize(url)))
+
+    @property
+    def seen(self) -> int:
+        """Number of distinct URLs ever added"""
+        return self._seen
+
+    def canonicalize(self, url: str) -> str:
+        """
+        Canonicalize a URL with the frontier's dropped parameters
+
+        Parameters
+        ----------
+        url : str
+            URL to canonicalize
+
+        Returns
+        -------
+        str : Canonical URL
+        """
+
+        return canonicalize(url, self.drop_params)
+
+    @staticmethod
+    def key(url: str) -> bytes:
+        """
+        Get the deduplication key of a canonical URL
+
+        Parameters
+        ----------
+        url : str
+            Canonical URL
+
+        Returns
+        -------
+        bytes : 16 byte BLAKE2b digest
+        """
+
+        return hashlib.blake2b(url.encode(), digest_size=16).digest()
+
+    def add(self, url: str, depth: int = 0) -> bool:
+        """
+        Queue a URL if it was never added before
+
+        Parameters
+        ----------
+        url : str
+            URL to queue
+
+        depth : int, optional
+            Link depth from the seed URLs, by default 0.
+
+        Returns
+        -------
+        bool : True if the URL was queued
+        """
+
+        url = self.canonicalize(url)
+        key = self.key(url)
+
+        with self._lock:
+            # Confirm possible duplicates against the exact set
+            if not self.bloom.add(key):
+                if self._in_exact_set(key):
+                    return False
+                self.false_positives += 1
+
+            self._seen += 1
+            self._enqueue(key, url, depth)
+
+            if len(self._buffer_queue) >= self.batch_size:
+                self.flush()
+
+        return True
+
+    def add_many(self, urls: Iterable[str], depth: int = 0) -> int:
+        """
+        Queue many URLs
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            URLs to queue
+
+        depth : int, optional
+            Link depth from the seed URLs, by default 0.
+
+        Returns
+        -------
+        int : Number of URLs queued
+        """
+
+        return sum(self.add(url, depth) for url in urls)
+
+    def mark_seen(self, urls: Iterable[str]) -> int:
+        """
+        Record URLs as added without queueing them
+
+        Parameters
+        ----------
+        urls : Iterable[str]
+            URLs that must not be queued, e.g. URLs crawled before a resume
+
+        Returns
+        -------
+        int : Number of URLs that were not seen before
+        """
+
+        marked = 0
+
+        with self._lock:
+            for url in urls:
+                key = self.key(self.canonicalize(url))
+                if not self.bloom.add(key) and self._in_exact_set(key):
+                    continue
+
+                self._seen += 1
+                self._buffer_keys.add(key)
+                marked += 1
+
+                if len(self._buffer_keys) >= self.batch_size:
+                    self.flush()
+
+        return marked
+
+    def requeue(self, url: str, depth: int = 0) -> None:
+        """
+        Queue a URL again even though it was added before
+
+        Parameters
+        ----------
+        url : str
+            URL to queue, e.g. a URL whose crawl failed
+
+        depth : int, optional
+            Link depth from the seed URLs, by default 0.
+        """
+
+        url = self.canonicalize(url)
+        key = self.key(url)
+
+        with self._lock:
+            if not self._is_seen(key):
+                self.bloom.add(key)
+                self._seen += 1
+            self._enqueue(key, url, depth)
+
+    def pop(self) -> tuple[str, int] | None:
+        """
+        Pop the next URL
+
+        Returns
+        -------
+        tuple[str, int] | None : URL and its depth, None if the frontier is empty
+        """
+
+        popped = self.pop_many(1)
+        return popped[0] if popped else None
+
+    def pop_many(self, count: int) -> list[tuple[str, int]]:
+        """
+        Pop up to count URLs
+
+        Parameters
+        ----------
+        count : int
+            Maximum number of URLs
+
+        Returns
+        -------
+        list[tuple[str, int]] : URLs and their depths, shallowest first
+        """
+
+        with self._lock:
+            self.flush()
+
+            rows = self._db.execute(
+                "SELECT id, url, depth FROM queue ORDER BY depth, turn, id LIMIT ?",
+                (count,),
+            ).fetchall()
+
+            if rows:
+                self._db.executemany(
+                    "DELETE FROM queue WHERE id = ?", [(row[0],) for row in rows]
+                )
+                self._db.commit()
+                self._size -= len(rows)
+
+            return [(url, depth) for _, url, depth in rows]
+
+    def flush(self) -> None:
+        """Write buffered URLs to the database"""
+
+        with self._lock:
+            if not self._buffer_queue and not self._buffer_keys:
+                return
+
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen (key) VALUES (?)",
+                [(key,) for key in self._buffer_keys],
+            )
+            self._db.executemany(
+                "INSERT INTO queue (depth, turn, url) VALUES (?, ?, ?)",
+                self._buffer_queue,
+            )
+            self._db.commit()
+
+            self._buffer_keys.clear()
+            self._buffer_queue.clear()
+
+    def close(self) -> None:
+        """Flush and close the database, removing it if it is temporary"""
+
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+        if self._tempdir:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+
+    def _is_seen(self, key: bytes) -> bool:
+        """Check the exact set for a key"""
+
+        return key in self.bloom and self._in_exact_set(key)
+
+    def _in_exact_set(self, key: bytes) -> bool:
+        """Check the buffered and on-disk keys"""
+
+        if key in self._buffer_keys:
+            return True
+
+        return (
+            self._db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone()
+            is not None
+        )
+
+    def _enqueue(self, key: bytes, url: str, depth: int) -> None:
+        """Buffer a URL for the queue"""
+
+        host = self._host(url)
+        turn = self._host_turns.get(host, 0)
+        self._host_turns[host] = turn + 1
+
+        self._buffer_keys.add(key)
+        self._buffer_queue.append((depth, turn, url))
+        self._size += 1
+
+    @staticmethod
+    def _host(url: str) -> str:
+        """Host of a canonical URL"""
+
+        # Canonical URLs always have a scheme://host prefix
+        return url.split("/", 3)[2]
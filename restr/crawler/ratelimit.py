@@ -0,0 +1,425 @@
+"""
+restr.crawler.ratelimit
+
+RateController Class File
+Per-host adaptive concurrency with additive increase and multiplicative decrease
+"""
+
+import email.utils
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+from urllib.parse import urlsplit
+
+# Statuses that ask the client to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """
+    Parse a Retry-After header
+
+    Parameters
+    ----------
+    value : str | None
+        Header value, seconds or an HTTP date
+
+    now : float, optional
+        Current time, by default time.time().
+
+    Returns
+    -------
+    float | None : Seconds to wait, None if missing or invalid
+    """
+
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        date = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    return max(0.0, date - (time.time() if now is None else now))
+
+
+class Slot:
+    """
+    A request in flight to a host
+
+    Set `status` or `error`, and `retry_after` if the response has the header,
+    before the slot is released.
+    """
+
+    def __init__(self, host: str) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        host : str
+            Host the request is sent to
+        """
+
+        self.host: str = host
+        self.start: float = time.perf_counter()
+        self.status: int | None = None
+        self.error: bool = False
+        self.retry_after: str | None = None
+
+
+# pylint: disable=too-many-instance-attributes
+# HostLimit tracks the limit, the latency window and the counters of a host
+class HostLimit:
+    """
+    Concurrency limit and health of one host
+    """
+
+    def __init__(self, limit: float, window: int) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        limit : float
+            Initial number of concurrent requests
+
+        window : int
+            Number of recent requests the latency and error rates are computed over
+        """
+
+        self.limit: float = limit
+        self.inflight: int = 0
+        self.blocked_until: float = 0.0
+
+        # perf_counter() of the last decrease, one decrease per round trip
+        self.decreased: float = float("-inf")
+
+        self.requests: int = 0
+        self.errors: int = 0
+        self.throttled: int = 0
+
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[int] = deque(maxlen=window)
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        Latency percentile of the recent requests
+
+        Parameters
+        ----------
+        percent : float
+            Percentile in [0, 100]
+
+        Returns
+        -------
+        float | None : Seconds, None before the first request
+        """
+
+        if not self.latencies:
+            return None
+
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def as_dict(self) -> dict:
+        """
+        Get the state of the host as a dictionary
+
+        Returns
+        -------
+        dict : Limit, requests in flight, latency percentiles and rates
+        """
+
+        recent = len(self.outcomes) or 1
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "error_rate": sum(o == 1 for o in self.outcomes) / recent,
+            "throttle_rate": sum(o == 2 for o in self.outcomes) / recent,
+            "blocked_for": max(0.0, self.blocked_until - time.time()),
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+        }
+
+
+# pylint: disable=too-many-instance-attributes
+# RateController is configured through many independent options
+class RateController:
+    """
+    RateController Class
+
+    Limits the requests in flight to every host and adapts the limit (AIMD).
+
+    Each successful request adds 1 / limit, about one more request in flight
+    per round trip of the whole window. An error, timeout or 429 / 503 response
+    multiplies the limit by `decrease`, once per round trip: failures of
+    requests sent before the last decrease do not decrease it again. A Retry-After
+    header blocks the host until it has passed. Optionally, requests slower than
+    `latency_target` count as congestion too.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease: float = 0.5,
+        latency_target: float | None = None,
+        window: int = 200,
+        max_retry_after: float = 300.0,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        initial : int, optional
+            Initial concurrency of a host, by default 2.
+
+        min_limit : int, optional
+            Minimum concurrency, by default 1.
+
+        max_limit : int, optional
+            Maximum concurrency, by default 32.
+
+        decrease : float, optional
+            Factor the limit is multiplied by on errors, by default 0.5.
+
+        latency_target : float, optional
+            Seconds above which a request counts as congestion, by default None.
+
+        window : int, optional
+            Recent requests per host used for percentiles and rates, by default 200.
+
+        max_retry_after : float, optional
+            Longest Retry-After honored in seconds, by default 300.
+        """
+
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError(
+                "Limits must satisfy 1 <= min_limit <= initial <= max_limit"
+            )
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be in (0, 1)")
+
+        self.initial: int = initial
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.decrease: float = decrease
+        self.latency_target: float | None = latency_target
+        self.window: int = window
+        self.max_retry_after: float = max_retry_after
+
+        self.hosts: dict[str, HostLimit] = {}
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def host(url: str) -> str:
+        """
+        Get the host a URL is limited by
+
+        Parameters
+        ----------
+        url : str
+            URL
+
+        Returns
+        -------
+        str : Lowercase host and port
+        """
+
+        return urlsplit(url).netloc.lower()
+
+    def limits(self) -> dict[str, dict]:
+        """
+        Get the current state of every host
+
+        Returns
+        -------
+        dict[str, dict] : HostLimit.as_dict() by host
+        """
+
+        with self._condition:
+            return {host: state.as_dict() for host, state in self.hosts.items()}
+
+    def try_acquire(self, url: str) -> Slot | None:
+        """
+        Take a slot of a URL's host without waiting
+
+        Parameters
+        ----------
+        url : str
+            URL to request
+
+        Returns
+        -------
+        Slot | None : Slot to release after the request, None if the host is full
+        """
+
+        return self._take(self.host(url))
+
+    def wait_time(self, url: str) -> float:
+        """
+        Get the seconds until a URL's host may be free
+
+        Parameters
+        ----------
+        url : str
+            URL to request
+
+        Returns
+        -------
+        float : Seconds a Retry-After blocks the host, 0 if it is not blocked
+        """
+
+        with self._condition:
+            state = self.hosts.get(self.host(url))
+            return max(0.0, state.blocked_until - time.time()) if state else 0.0
+
+    def acquire(self, url: str, timeout: float | None = None) -> Slot | None:
+        """
+        Take a slot of a URL's host, waiting until one is free
+
+        Parameters
+        ----------
+        url : str
+            URL to request
+
+        timeout : float, optional
+            Seconds to wait, by default None (no limit).
+
+        Returns
+        -------
+        Slot | None : Slot to release after the request, None on timeout
+        """
+
+        host = self.host(url)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while (slot := self._take(host)) is None:
+                wait = self.wait_time(url) or None
+                if deadline is not None:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        return None
+                    wait = min(wait or left, left)
+                self._condition.wait(wait)
+
+        return slot
+
+    def release(self, slot: Slot) -> None:
+        """
+        Return a slot and adapt the limit of its host to the outcome
+
+        Parameters
+        ----------
+        slot : Slot
+            Slot of a finished request
+        """
+
+        latency = time.perf_counter() - slot.start
+        now = time.time()
+
+        with self._condition:
+            state = self.hosts[slot.host]
+            state.inflight -= 1
+            state.requests += 1
+            state.latencies.append(latency)
+
+            throttled = slot.status in THROTTLE_STATUSES
+            failed = slot.error or (slot.status is not None and slot.status >= 500)
+            slow = self.latency_target is not None and latency > self.latency_target
+
+            if throttled:
+                state.throttled += 1
+                state.outcomes.append(2)
+            elif failed:
+                state.errors += 1
+                state.outcomes.append(1)
+            else:
+                state.outcomes.append(0)
+
+            retry_after = parse_retry_after(slot.retry_after, now)
+            if retry_after is not None and (throttled or failed):
+                state.blocked_until = max(
+                    state.blocked_until, now + min(retry_after, self.max_retry_after)
+                )
+
+            if throttled or failed or slow:
+                # Back off once per round trip, requests sent before the last
+                # decrease were sent under the old limit
+                if slot.start > state.decreased:
+                    state.limit = max(self.min_limit, state.limit * self.decrease)
+                    state.decreased = time.perf_counter()
+            else:
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, url: str, timeout: float | None = None) -> Iterator[Slot]:
+        """
+        Hold a slot of a URL's host for the duration of a request
+
+        Parameters
+        ----------
+        url : str
+            URL to request
+
+        timeout : float, optional
+            Seconds to wait for a slot, by default None (no limit).
+
+        Yields
+        ------
+        Slot : Slot to set the status and Retry-After of the response on
+
+        Raises
+        ------
+        TimeoutError : No slot became free within timeout
+
+        Notes
+        -----
+        An exception raised by the request counts as an error.
+        """
+
+        slot = self.acquire(url, timeout)
+        if slot is None:
+            raise TimeoutError(f"No free slot for {self.host(url)}")
+
+        try:
+            yield slot
+        except BaseException:
+            slot.error = True
+            raise
+        finally:
+            self.release(slot)
+
+    def _take(self, host: str) -> Slot | None:
+        """Take a slot if the host has one free"""
+
+        with self._condition:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = HostLimit(self.initial, self.window)
+
+            if time.time() < state.blocked_until:
+                return None
+            if state.inflight >= max(self.min_limit, int(state.limit)):
+                return None
+
+            state.inflight += 1
+            return Slot(host)
@@ -0,0 +1,561 @@
+"""
+restr.crawler.recrawl
+
+Recrawler Class File
+Incremental recrawls that only visit new, changed and due pages
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+from urllib.parse import urldefrag, urlsplit
+
+from restr.browser.browser_base import BrowserBase
+from restr.browser.extract import parse_html
+from restr.browser.http_browser import HttpBrowser
+from restr.urls import canonicalize
+
+# Statuses after which a page is forgotten
+GONE_STATUSES = (404, 410)
+
+
+class PageState:
+    """
+    Stored state of a page
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+    def __init__(
+        self,
+        url: str,
+        digest: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        outlinks: list[str] | None = None,
+        checked: float = 0.0,
+        changed: float = 0.0,
+        checks: int = 0,
+        changes: int = 0,
+        observed: float = 0.0,
+        last_interval: float = 0.0,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        url : str
+            Canonical URL
+
+        digest : str
+            SHA-256 of the normalized content
+
+        etag : str, optional
+            ETag of the last response, by default None.
+
+        last_modified : str, optional
+            Last-Modified of the last response, by default None.
+
+        outlinks : list[str], optional
+            Links found on the page, by default None.
+
+        checked : float, optional
+            Time of the last check, by default 0.
+
+        changed : float, optional
+            Time the last change was detected, by default 0.
+
+        checks : int, optional
+            Number of checks after the first visit, by default 0.
+
+        changes : int, optional
+            Number of checks that found a change, by default 0.
+
+        observed : float, optional
+            Seconds covered by the checks, by default 0.
+
+        last_interval : float, optional
+            Seconds between the last two checks, by default 0.
+        """
+
+        self.url: str = url
+        self.digest: str = digest
+        self.etag: str | None = etag
+        self.last_modified: str | None = last_modified
+        self.outlinks: list[str] = outlinks or []
+        self.checked: float = checked
+        self.changed: float = changed
+        self.checks: int = checks
+        self.changes: int = changes
+        self.observed: float = observed
+        self.last_interval: float = last_interval
+
+    def __repr__(self) -> str:
+        return f"<PageState {self.url} {self.changes}/{self.checks} changes>"
+
+    @property
+    def change_rate(self) -> float:
+        """
+        Estimated changes per second
+
+        Notes
+        -----
+        Changes are assumed to follow a Poisson process. A check only reveals
+        whether the page changed at least once since the previous check, the
+        estimator -log((n - X + 0.5) / (n + 0.5)) / I of Cho and Garcia-Molina
+        corrects for the changes this misses, with n checks finding X changes
+        at an average interval I. The 0.5 terms keep it finite for X = n.
+        """
+
+        if not self.checks or not self.observed:
+            return 0.0
+
+        interval = self.observed / self.checks
+        return (
+            -math.log((self.checks - self.changes + 0.5) / (self.checks + 0.5))
+            / interval
+        )
+
+
+class RecrawlStats:
+    """
+    Recrawl statistics
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.new: int = 0
+        self.changed: int = 0
+        self.unchanged: int = 0
+        self.gone: int = 0
+        self.skipped: int = 0
+        self.errors: int = 0
+        self.elapsed: float = 0.0
+
+    @property
+    def visited(self) -> int:
+        """Number of requested pages"""
+        return self.new + self.changed + self.unchanged + self.gone + self.errors
+
+    def as_dict(self) -> dict:
+        """
+        Get statistics as a dictionary
+
+        Returns
+        -------
+        dict : Counters
+        """
+
+        return {
+            "visited": self.visited,
+            "new": self.new,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "gone": self.gone,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "elapsed": self.elapsed,
+        }
+
+
+class _Check:
+    """Result of visiting a page"""
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        digest: str | None = None,
+        headers: dict[str, str] | None = None,
+        links: list[str] | None = None,
+        error: str | None = None,
+    ) -> None:
+        self.url: str = url
+        self.status: int = status
+        self.digest: str | None = digest
+        self.headers: dict[str, str] = headers or {}
+        self.links: list[str] = links or []
+        self.error: str | None = error
+
+
+# pylint: disable=too-many-instance-attributes
+# Recrawler is configured through many independent options
+class Recrawler:
+    """
+    Recrawler Class
+
+    Crawls a site once, then on every later run only visits pages that are new,
+    changed or due.
+
+    The state of every page is stored: its content hash, validators, outlinks
+    and how often checks found it changed. A run visits the seeds and the pages
+    whose estimated probability of having changed since the last check reaches
+    `threshold`. Pages with an ETag or Last-Modified are checked with a
+    conditional GET, 304 Not Modified costs no body. Only changed pages are
+    parsed for links, links that are not stored yet are the new pages.
+    The work of a run therefore scales with the rate of change of the site.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        path: str | Path,
+        browser: BrowserBase | None = None,
+        threshold: float = 0.5,
+        min_interval: float = 3600.0,
+        max_interval: float = 30 * 86400.0,
+        workers: int = 8,
+        normalize: Callable[[bytes], bytes] | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        path : str | Path
+            SQLite database of the page states, kept between runs
+
+        browser : BrowserBase, optional
+            Browser to visit pages with, by default HttpBrowser().
+            Browsers other than HttpBrowser hash the rendered page source and
+            visit one page at a time.
+
+        threshold : float, optional
+            Probability of a change at which a page is due, by default 0.5.
+
+        min_interval : float, optional
+            Minimum seconds between checks of a page, by default 1 hour.
+
+        max_interval : float, optional
+            Maximum seconds between checks of a page, by default 30 days.
+
+        workers : int, optional
+            Concurrent requests of an HttpBrowser, by default 8.
+
+        normalize : Callable[[bytes], bytes], optional
+            Removes volatile parts, e.g. timestamps or CSRF tokens, from the
+            content before it is hashed, by default None.
+        """
+
+        if not 0 < threshold < 1:
+            raise ValueError("threshold must be in (0, 1)")
+
+        self.path: Path = Path(path)
+        self._browser_owned: bool = browser is None
+        self.browser: BrowserBase = browser or HttpBrowser()
+        self.threshold: float = threshold
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.workers: int = workers if isinstance(self.browser, HttpBrowser) else 1
+        self.normalize: Callable[[bytes], bytes] | None = normalize
+
+        self.stats: RecrawlStats = RecrawlStats()
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                outlinks TEXT NOT NULL,
+                checked REAL NOT NULL,
+                changed REAL NOT NULL,
+                checks INTEGER NOT NULL,
+                changes INTEGER NOT NULL,
+                observed REAL NOT NULL,
+                last_interval REAL NOT NULL,
+                due REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pages_due ON pages (due);
+            """)
+
+    def __len__(self) -> int:
+        """Number of stored pages"""
+
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def __contains__(self, url: str) -> bool:
+        """Check if a page is stored"""
+        return self.get(url) is not None
+
+    def get(self, url: str) -> PageState | None:
+        """
+        Get the stored state of a page
+
+        Parameters
+        ----------
+        url : str
+            Page URL
+
+        Returns
+        -------
+        PageState | None : Stored state, None if the page is not stored
+        """
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, digest, etag, last_modified, outlinks, checked, changed,"
+                " checks, changes, observed, last_interval FROM pages WHERE url = ?",
+                (canonicalize(url),),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return PageState(*row[:4], json.loads(row[4]), *row[5:])
+
+    def interval(self, state: PageState) -> float:
+        """
+        Get the seconds after its last check at which a page is due
+
+        Parameters
+        ----------
+        state : PageState
+            Page state
+
+        Returns
+        -------
+        float : Seconds until the probability of a change reaches threshold
+        """
+
+        if not state.checks:
+            # Check new pages soon to learn their rate
+            seconds = self.min_interval
+        elif rate := state.change_rate:
+            # 1 - exp(-rate * t) = threshold
+            seconds = -math.log(1 - self.threshold) / rate
+        else:
+            # No change seen yet, back off exponentially
+            seconds = 2 * state.last_interval
+
+        return min(self.max_interval, max(self.min_interval, seconds))
+
+    def due(self, now: float | None = None) -> list[str]:
+        """
+        Get the stored pages that are due
+
+        Parameters
+        ----------
+        now : float, optional
+            Time to check against, by default time.time().
+
+        Returns
+        -------
+        list[str] : URLs, the longest overdue first
+        """
+
+        now = time.time() if now is None else now
+
+        with self._lock:
+            return [
+                url
+                for (url,) in self._db.execute(
+                    "SELECT url FROM pages WHERE due <= ? ORDER BY due", (now,)
+                )
+            ]
+
+    def run(
+        self,
+        seeds: str | Iterable[str],
+        max_pages: int | None = None,
+        same_host: bool = True,
+        now: float | None = None,
+    ) -> RecrawlStats:
+        """
+        Visit the seeds, the due pages and the new pages linked from changed pages
+
+        Parameters
+        ----------
+        seeds : str | Iterable[str]
+            URLs that are always visited
+
+        max_pages : int, optional
+            Maximum number of pages to visit, by default None (no limit).
+
+        same_host : bool, optional
+            Only follow links to the hosts of the seed URLs, by default True.
+
+        now : float, optional
+            Time of the run, by default time.time().
+
+        Returns
+        -------
+        RecrawlStats : Statistics of the run
+        """
+
+        self.stats = RecrawlStats()
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+
+        # pylint: disable=protected-access
+        seeds = [
+            canonicalize(BrowserBase._format_url(url))
+            for url in ([seeds] if isinstance(seeds, str) else seeds)
+        ]
+        hosts = {urlsplit(url).netloc for url in seeds}
+
+        queued: set[str] = set()
+        batch: list[str] = []
+
+        def enqueue(url: str) -> None:
+            if url in queued or (max_pages is not None and len(queued) >= max_pages):
+                return
+            queued.add(url)
+            batch.append(url)
+
+        for url in seeds + self.due(now):
+            enqueue(url)
+
+        # Stored pages that are neither seeds nor due are not visited
+        self.stats.skipped = len(self) - sum(
+            self.get(url) is not None for url in queued
+        )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while batch:
+                urls, batch[:] = list(batch), []
+                states = {url: self.get(url) for url in urls}
+
+                for check in executor.map(self._check, urls, states.values()):
+                    for link in self._record(check, states[check.url], now):
+                        link = canonicalize(urldefrag(link).url)
+                        if not link.startswith("http"):
+                            continue
+                        if same_host and urlsplit(link).netloc not in hosts:
+                            continue
+                        if link not in queued and self.get(link) is None:
+                            enqueue(link)
+
+        self.stats.elapsed = time.perf_counter() - start
+        return self.stats
+
+    def close(self) -> None:
+        """Close the database and the browser if it was created by the Recrawler"""
+
+        with self._lock:
+            self._db.close()
+
+        if self._browser_owned:
+            self.browser.close()
+
+    def _check(self, url: str, state: PageState | None) -> _Check:
+        """Visit a page, conditionally if its validators are known"""
+
+        try:
+            if isinstance(self.browser, HttpBrowser):
+                headers = {}
+                if state is not None and state.etag:
+                    headers["If-None-Match"] = state.etag
+                if state is not None and state.last_modified:
+                    headers["If-Modified-Since"] = state.last_modified
+
+                response = self.browser.request("GET", url, headers=headers)
+                if response.status == 304:
+                    return _Check(url, 304, headers=response.headers)
+
+                body = response.body
+                data = parse_html(response.text, response.url)
+                status, headers = response.status, response.headers
+
+            else:
+                self.browser.open(url)
+                body = self.browser.browser.page_source.encode()
+                data = self.browser.extract()
+                status, headers = 200, {}
+
+        # pylint: disable=broad-except
+        # A failed page must not end the run, it is recorded as an error
+        except Exception as error:
+            return _Check(url, 0, error=str(error))
+
+        if self.normalize is not None:
+            body = self.normalize(body)
+
+        return _Check(
+            url,
+            status,
+            hashlib.sha256(body).hexdigest(),
+            headers,
+            data.links + data.iframes,
+        )
+
+    def _record(self, check: _Check, state: PageState | None, now: float) -> list[str]:
+        """Update the state of a visited page and return the links to follow"""
+
+        if check.error is not None:
+            self.stats.errors += 1
+            return []
+
+        if check.status in GONE_STATUSES:
+            self.stats.gone += int(state is not None)
+            with self._lock:
+                self._db.execute("DELETE FROM pages WHERE url = ?", (check.url,))
+                self._db.commit()
+            return []
+
+        # Error pages say nothing about the content, the page stays due
+        if check.status != 304 and not 200 <= check.status < 300:
+            self.stats.errors += 1
+            return []
+
+        if state is None:
+            self.stats.new += 1
+            state = PageState(check.url, check.digest, checked=now, changed=now)
+            changed = True
+
+        else:
+            changed = check.status != 304 and check.digest != state.digest
+            state.checks += 1
+            state.last_interval = max(0.0, now - state.checked)
+            state.observed += state.last_interval
+            state.checked = now
+            if changed:
+                state.changes += 1
+                state.changed = now
+                state.digest = check.digest
+                self.stats.changed += 1
+            else:
+                self.stats.unchanged += 1
+
+        state.etag = check.headers.get("etag", state.etag)
+        state.last_modified = check.headers.get("last-modified", state.last_modified)
+        if changed:
+            state.outlinks = sorted(set(check.links))
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, digest, etag, last_modified,"
+                " outlinks, checked, changed, checks, changes, observed,"
+                " last_interval, due)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    state.url,
+                    state.digest,
+                    state.etag,
+                    state.last_modified,
+                    json.dumps(state.outlinks),
+                    state.checked,
+                    state.changed,
+                    state.checks,
+                    state.changes,
+                    state.observed,
+                    state.last_interval,
+                    state.checked + self.interval(state),
+                ),
+            )
+            self._db.commit()
+
+        # Links of unchanged pages were followed when they were stored
+        return check.links if changed else []
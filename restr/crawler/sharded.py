@@ -0,0 +1,414 @@
+"""
+restr.crawler.sharded
+
+ShardedCrawler Class File
+Crawls with one Browser process group per CPU core, sharded by host
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zlib
+from functools import partial
+from typing import Callable, Iterable
+from urllib.parse import urldefrag, urlsplit
+
+import psutil
+
+from restr.browser.browser_base import BrowserBase
+from restr.browser.extract import parse_html
+from restr.browser.http_browser import Response
+from restr.browser.webdriver import find_processes, kill_processes
+from restr.crawler.endpoints import EndpointMap
+from restr.crawler.engine import CrawlStats, PageResult, TabStats
+
+# Names of the browser processes reaped on shutdown
+BROWSER_PROCESS_NAMES = ("geckodriver", "firefox")
+
+
+def shard_for(url: str, shards: int) -> int:
+    """
+    Get the shard of a URL
+
+    Parameters
+    ----------
+    url : str
+        URL to shard
+
+    shards : int
+        Number of shards
+
+    Returns
+    -------
+    int : Shard index in [0, shards)
+
+    Notes
+    -----
+    URLs are sharded by host so each host is crawled by a single worker.
+    crc32 is used because the built-in hash() is salted per process.
+    """
+
+    host = urlsplit(url).netloc.lower()
+    return zlib.crc32(host.encode()) % shards
+
+
+def visit(browser: BrowserBase, url: str) -> list[str]:
+    """
+    Open a URL and collect its links
+
+    Parameters
+    ----------
+    browser : BrowserBase
+        Browser to open the URL with
+
+    url : str
+        URL to open
+
+    Returns
+    -------
+    list[str] : Absolute links and frame sources found on the page
+    """
+
+    page = browser.open(url)
+
+    # Browserless backends return the response, parse its source
+    if isinstance(page, Response):
+        data = parse_html(page.text, page.url)
+    else:
+        data = browser.extract()
+
+    return data.links + data.iframes
+
+
+def _browser(headless: bool) -> BrowserBase:
+    """Default factory, imports Browser only in the worker processes"""
+
+    # pylint: disable=import-outside-toplevel
+    from restr.browser.browser import Browser
+
+    return Browser(headless=headless)
+
+
+def _worker_main(
+    factory: Callable[[], BrowserBase],
+    browsers: int,
+    inbox: multiprocessing.Queue,
+    outbox: multiprocessing.Queue,
+    recycle_rss: int | None = None,
+    recycle_pages: int | None = None,
+) -> None:
+    """
+    Worker process entry point
+
+    Starts `browsers` browsers, each on its own thread, that crawl URLs from inbox
+    and put (url, links, elapsed, error) tuples on outbox until a None is received.
+    Browsers are recycled by a Supervisor if recycle_rss or recycle_pages is set.
+    A thread that fails puts (None, [], 0.0, error), its URLs would never finish.
+    """
+
+    supervisor = None
+    if recycle_rss is not None or recycle_pages is not None:
+        # pylint: disable=import-outside-toplevel
+        from restr.browser.browser import Browser
+        from restr.browser.supervisor import Supervisor
+
+        supervisor = Supervisor(max_rss=recycle_rss, max_pages=recycle_pages)
+        supervisor.start()
+
+    def crawl() -> None:
+        browser = factory()
+        supervised = supervisor is not None and isinstance(browser, Browser)
+        if supervised:
+            supervisor.register(browser)
+
+        try:
+            while (url := inbox.get()) is not None:
+                start = time.perf_counter()
+                try:
+                    links = visit(browser, url)
+                    outbox.put((url, links, time.perf_counter() - start, None))
+
+                # pylint: disable=broad-except
+                # A failed page must not end the thread, it is reported as an error
+                except Exception as error:
+                    outbox.put((url, [], time.perf_counter() - start, str(error)))
+
+                # Restart between pages, never during one
+                if supervised:
+                    supervisor.page(browser)
+
+            # Pass the sentinel on to the next browser thread
+            inbox.put(None)
+
+        finally:
+            browser.close()
+            if supervised:
+                supervisor.unregister(browser)
+
+    def guarded() -> None:
+        try:
+            crawl()
+
+        # pylint: disable=broad-except
+        # Reported so the parent does not wait for URLs that never finish
+        except Exception as error:
+            outbox.put((None, [], 0.0, f"{type(error).__name__}: {error}"))
+
+    threads = [threading.Thread(target=guarded) for _ in range(browsers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if supervisor is not None:
+        supervisor.close()
+
+
+# pylint: disable=too-many-instance-attributes, too-many-arguments
+# Runner is configured through many independent options
+class ShardedCrawler:
+    """
+    ShardedCrawler Class
+
+    Starts one worker process per shard, each driving its own browsers.
+    The parent owns the visited set and routes every URL to the shard of its host.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        browsers_per_worker: int = 1,
+        max_pages: int | None = None,
+        same_host: bool = True,
+        headless: bool = True,
+        factory: Callable[[], BrowserBase] | None = None,
+        shutdown_timeout: float = 10.0,
+        endpoints: EndpointMap | None = None,
+        recycle_rss: int | None = None,
+        recycle_pages: int | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes, by default os.cpu_count().
+
+        browsers_per_worker : int, optional
+            Browsers per worker process, by default 1.
+
+        max_pages : int, optional
+            Maximum number of pages to crawl, by default None (no limit).
+
+        same_host : bool, optional
+            Only follow links to the hosts of the seed URLs, by default True.
+
+        headless : bool, optional
+            Run browsers in headless mode, by default True.
+            Ignored if factory is provided.
+
+        factory : Callable[[], BrowserBase], optional
+            Creates a browser in a worker process, by default Browser(headless=headless).
+            Must be picklable.
+
+        shutdown_timeout : float, optional
+            Seconds to wait for workers to exit before they are killed, by default 10.0.
+
+        endpoints : EndpointMap, optional
+            Records crawled pages, links to saturated endpoints are skipped,
+            by default None.
+
+        recycle_rss : int, optional
+            Restart a Browser once its processes use more resident bytes,
+            by default None (never).
+
+        recycle_pages : int, optional
+            Restart a Browser after this many pages, by default None (never).
+        """
+
+        self.workers: int = workers or os.cpu_count() or 1
+        self.browsers_per_worker: int = browsers_per_worker
+        self.max_pages: int | None = max_pages
+        self.same_host: bool = same_host
+        self.factory: Callable[[], BrowserBase] = factory or partial(
+            _browser, headless=headless
+        )
+        self.shutdown_timeout: float = shutdown_timeout
+        self.endpoints: EndpointMap | None = endpoints
+        self.recycle_rss: int | None = recycle_rss
+        self.recycle_pages: int | None = recycle_pages
+
+        self.stats: CrawlStats = CrawlStats()
+
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[multiprocessing.Process] = []
+        self._inboxes: list[multiprocessing.Queue] = []
+
+    def run(
+        self,
+        seeds: str | Iterable[str],
+        on_page: Callable[[PageResult], None] | None = None,
+    ) -> CrawlStats:
+        """
+        Crawl starting from the seed URLs
+
+        Parameters
+        ----------
+        seeds : str | Iterable[str]
+            URLs to start from
+
+        on_page : Callable[[PageResult], None], optional
+            Called in the parent process with every crawled page, by default None.
+
+        Returns
+        -------
+        CrawlStats : Crawl statistics, tabs are keyed by shard
+
+        Raises
+        ------
+        RuntimeError : If a worker or one of its browser threads failed
+        """
+
+        self.stats = CrawlStats()
+        seen: set[str] = set()
+        hosts: set[str] = set()
+
+        # URLs sent to each worker and not yet returned
+        pending = [0] * self.workers
+
+        # Route URLs to the worker of their host
+        def route(url: str) -> None:
+            url = urldefrag(url).url
+            if url in seen:
+                return
+            if self.max_pages is not None and len(seen) >= self.max_pages:
+                return
+            if self.same_host and urlsplit(url).netloc not in hosts:
+                return
+            if self.endpoints is not None and self.endpoints.is_saturated(url):
+                return
+
+            seen.add(url)
+            shard = shard_for(url, self.workers)
+            pending[shard] += 1
+            self._inboxes[shard].put(url)
+
+        outbox = self._context.Queue()
+        start = time.perf_counter()
+
+        try:
+            self._start(outbox)
+
+            for url in [seeds] if isinstance(seeds, str) else seeds:
+                url = BrowserBase._format_url(url)  # pylint: disable=protected-access
+                hosts.add(urlsplit(url).netloc)
+                route(url)
+
+            while any(pending):
+                try:
+                    url, links, elapsed, error = outbox.get(timeout=1)
+                except queue.Empty:
+                    self._check_workers(pending)
+                    continue
+
+                if url is None:
+                    raise RuntimeError(f"Crawl worker thread failed: {error}")
+
+                pending[shard_for(url, self.workers)] -= 1
+                self._record(url, elapsed, error)
+                if self.endpoints is not None and error is None:
+                    self.endpoints.add(url)
+
+                for link in links:
+                    if link.startswith("http"):
+                        route(link)
+
+                if on_page:
+                    on_page(PageResult(url, links, elapsed, error))
+
+        finally:
+            self.stats.elapsed = time.perf_counter() - start
+            self.shutdown()
+
+        return self.stats
+
+    def shutdown(self) -> int:
+        """
+        Stop the workers and reap their browser processes
+
+        Returns
+        -------
+        int : Number of orphaned browser processes killed
+        """
+
+        # Snapshot browser processes while their worker is still their parent
+        orphans: list[psutil.Process] = []
+        for process in self._processes:
+            if process.pid is not None:
+                try:
+                    orphans += find_processes(
+                        BROWSER_PROCESS_NAMES, parent=psutil.Process(process.pid)
+                    )
+                except psutil.NoSuchProcess:
+                    pass
+
+        for inbox in self._inboxes:
+            inbox.put(None)
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+        self._processes = []
+        self._inboxes = []
+
+        return kill_processes(orphans)
+
+    def _start(self, outbox: multiprocessing.Queue) -> None:
+        """Start the worker processes"""
+
+        for _ in range(self.workers):
+            inbox = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    self.factory,
+                    self.browsers_per_worker,
+                    inbox,
+                    outbox,
+                    self.recycle_rss,
+                    self.recycle_pages,
+                ),
+                daemon=True,
+            )
+            process.start()
+
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+    def _check_workers(self, pending: list[int]) -> None:
+        """Raise if a worker with pending URLs has exited"""
+
+        for shard, process in enumerate(self._processes):
+            if pending[shard] and not process.is_alive():
+                raise RuntimeError(
+                    f"Crawl worker {shard} exited with code {process.exitcode}"
+                )
+
+    def _record(self, url: str, elapsed: float, error: str | None) -> None:
+        """Update the statistics with a crawled page"""
+
+        shard = self.stats.tabs.setdefault(
+            f"shard-{shard_for(url, self.workers)}", TabStats()
+        )
+        shard.pages += 1
+        shard.busy += elapsed
+
+        self.stats.pages += 1
+        self.stats.errors += int(error is not None)
@@ -0,0 +1,20 @@
+"""restr.fuzzer"""
+
+from typing import TYPE_CHECKING
+
+from restr._lazy import lazy
+
+if TYPE_CHECKING:
+    from .engine import Finding, Fuzzer, Target
+
+__all__ = ["Finding", "Fuzzer", "Target"]
+
+# Modules of the public classes, imported on first access
+__getattr__, __dir__ = lazy(
+    __name__,
+    {
+        "Finding": ".engine",
+        "Fuzzer": ".engine",
+        "Target": ".engine",
+    },
+)
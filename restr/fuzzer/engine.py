@@ -0,0 +1,677 @@
+"""
+restr.fuzzer.engine
+
+Fuzzer Class File
+Streams mutated requests to discovered endpoints and records deviating responses
+"""
+
+import http.client
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+from restr.browser.http_browser import HttpBrowser, Response
+from restr.fuzzer.payloads import default, infer_type
+from restr.urls import PARAM
+
+if TYPE_CHECKING:
+    from restr.browser.extract import Form
+    from restr.crawler.endpoints import EndpointMap
+
+# Error messages of frameworks, databases and interpreters
+ERROR_PATTERNS = re.compile(
+    rb"Traceback \(most recent call last\)|SQL syntax|SQLSTATE|ORA-\d{5}"
+    rb"|sqlite3?\.|psycopg2|Unclosed quotation mark|syntax error"
+    rb"|Exception in thread|at [\w.$]+\([\w]+\.java:\d+\)|Fatal error"
+    rb"|Warning</b>:|Stack trace|Internal Server Error|root:x:0:0|\[fonts\]",
+    re.I,
+)
+
+# Sample values of form inputs by parameter type
+SAMPLES = {
+    "number": "1",
+    "boolean": "on",
+    "email": "restr@example.com",
+    "url": "https://example.com/",
+    "date": "2024-01-01",
+    "string": "restr",
+}
+
+# Characters that must be escaped when a payload is reflected into HTML
+_MARKUP = set("<>\"'")
+
+# Exceptions of a request that did not get a response
+REQUEST_ERRORS = (OSError, http.client.HTTPException)
+
+
+class Parameter:
+    """
+    Fuzzable parameter of a Target
+    """
+
+    def __init__(
+        self,
+        name: str,
+        value: str = "",
+        kind: str | None = None,
+        location: str = "query",
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        name : str
+            Parameter name
+
+        value : str, optional
+            Sample value, sent while other parameters are fuzzed, by default "".
+
+        kind : str, optional
+            Type of the parameter, by default inferred from value.
+
+        location : str, optional
+            "query", "path" or "form", by default "query".
+        """
+
+        self.name: str = name
+        self.value: str = value
+        self.kind: str = kind or infer_type(value)
+        self.location: str = location
+
+    def __repr__(self) -> str:
+        return f"<Parameter {self.location}:{self.name} ({self.kind})>"
+
+
+class Target:
+    """
+    Endpoint and parameters to fuzz
+    """
+
+    def __init__(self, method: str, url: str, params: list[Parameter]) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+
+        url : str
+            URL without query, {param} segments are path parameters
+
+        params : list[Parameter]
+            Parameters, path parameters in the order of their segments
+        """
+
+        self.method: str = method.upper()
+        self.url: str = url
+        self.params: list[Parameter] = params
+
+    def __repr__(self) -> str:
+        return f"<Target {self.method} {self.url} ({len(self.params)} params)>"
+
+    @classmethod
+    def from_url(cls, url: str, method: str = "GET") -> "Target":
+        """
+        Create a Target from a URL and its query
+
+        Parameters
+        ----------
+        url : str
+            Absolute URL, its query values are the sample values
+
+        method : str, optional
+            HTTP method, by default "GET".
+
+        Returns
+        -------
+        Target : Target with the query parameters and {param} segments
+        """
+
+        parts = urlsplit(url)
+        base = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+        params = [
+            Parameter(f"path{index}", "1", location="path")
+            for index in range(parts.path.count(PARAM))
+        ]
+        params += [
+            Parameter(name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        ]
+
+        return cls(method, base, params)
+
+    @classmethod
+    def from_form(cls, form: "Form") -> "Target":
+        """
+        Create a Target from an HTML form
+
+        Parameters
+        ----------
+        form : Form
+            Form extracted by Browser.extract() or parse_html()
+
+        Returns
+        -------
+        Target : Target sending the inputs as query (GET) or form body
+        """
+
+        location = "query" if form.method.upper() == "GET" else "form"
+        params = [
+            Parameter(
+                name,
+                value := SAMPLES.get(infer_type(None, input_type), ""),
+                infer_type(value, input_type),
+                location,
+            )
+            for name, input_type in form.inputs
+            if input_type not in ("submit", "button", "image", "reset", "file")
+        ]
+
+        return cls(form.method, form.action, params)
+
+    @classmethod
+    def from_endpoints(
+        cls, endpoints: "EndpointMap", scheme: str = "https"
+    ) -> Iterator["Target"]:
+        """
+        Create a Target per method of every endpoint
+
+        Parameters
+        ----------
+        endpoints : EndpointMap
+            Endpoints observed by Browser, Window or a crawler
+
+        scheme : str, optional
+            Scheme of the endpoints, by default "https".
+
+        Returns
+        -------
+        Iterator[Target] : Targets with the path parameters and query keys
+        """
+
+        for endpoint in endpoints.endpoints():
+            query = urlencode([(key, "") for key in endpoint.query_keys])
+            url = f"{scheme}://{endpoint.host}{endpoint.template}"
+            for method in endpoint.methods or ["GET"]:
+                yield cls.from_url(f"{url}?{query}" if query else url, method)
+
+    def request(
+        self, name: str | None = None, payload: str | None = None
+    ) -> tuple[str, str, bytes | None, dict[str, str]]:
+        """
+        Build a request with one parameter replaced by a payload
+
+        Parameters
+        ----------
+        name : str, optional
+            Parameter to replace, by default None (sample values only).
+
+        payload : str, optional
+            Value of the parameter, by default None.
+
+        Returns
+        -------
+        tuple[str, str, bytes | None, dict[str, str]] : Method, URL, body and headers
+        """
+
+        url = self.url
+        query, form = [], []
+
+        for param in self.params:
+            value = payload if param.name == name else param.value
+            if param.location == "path":
+                url = url.replace(PARAM, quote(value, safe=""), 1)
+            elif param.location == "form":
+                form.append((param.name, value))
+            else:
+                query.append((param.name, value))
+
+        if query:
+            url = f"{url}?{urlencode(query)}"
+
+        if form:
+            body = urlencode(form).encode()
+            return (
+                self.method,
+                url,
+                body,
+                {"Content-Type": "application/x-www-form-urlencoded"},
+            )
+
+        return self.method, url, None, {}
+
+
+class Baseline:
+    """
+    Responses of a Target with its sample values
+    """
+
+    def __init__(self, responses: list[Response]) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        responses : list[Response]
+            Responses to the unmodified request
+        """
+
+        self.statuses: set[int] = {response.status for response in responses}
+        self.min_length: int = min((len(r.body) for r in responses), default=0)
+        self.max_length: int = max((len(r.body) for r in responses), default=0)
+        self.max_elapsed: float = max((r.elapsed for r in responses), default=0.0)
+        self.errors: set[bytes] = {
+            match.lower()
+            for response in responses
+            for match in ERROR_PATTERNS.findall(response.body)
+        }
+
+
+class Finding:
+    """
+    Response that deviated from the baseline of its Target
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        target: Target,
+        param: str,
+        payload: str,
+        reasons: list[str],
+        status: int | None,
+        length: int,
+        elapsed: float,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        target : Target
+            Fuzzed target
+
+        param : str
+            Fuzzed parameter
+
+        payload : str
+            Value that caused the deviation
+
+        reasons : list[str]
+            Deviations, e.g. "status", "error", "reflection"
+
+        status : int | None
+            Response status, None if the request failed
+
+        length : int
+            Response body length
+
+        elapsed : float
+            Response time in seconds
+        """
+
+        self.target: Target = target
+        self.param: str = param
+        self.payload: str = payload
+        self.reasons: list[str] = reasons
+        self.status: int | None = status
+        self.length: int = length
+        self.elapsed: float = elapsed
+
+        # Further payloads with the same deviation
+        self.count: int = 1
+
+    def __repr__(self) -> str:
+        return (
+            f"<Finding {self.target.method} {self.target.url} {self.param}="
+            f"{self.payload[:32]!r} {','.join(self.reasons)}>"
+        )
+
+    def as_dict(self) -> dict:
+        """
+        Get the finding as a dictionary
+
+        Returns
+        -------
+        dict : Finding fields
+        """
+
+        return {
+            "method": self.target.method,
+            "url": self.target.url,
+            "param": self.param,
+            "payload": self.payload,
+            "reasons": self.reasons,
+            "status": self.status,
+            "length": self.length,
+            "elapsed": self.elapsed,
+            "count": self.count,
+        }
+
+
+class FuzzStats:
+    """
+    Fuzzing statistics
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+
+        self.requests: int = 0
+        self.errors: int = 0
+        self.findings: int = 0
+        self.elapsed: float = 0.0
+
+    @property
+    def requests_per_sec(self) -> float:
+        """Sent requests per second"""
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        """
+        Get statistics as a dictionary
+
+        Returns
+        -------
+        dict : Counters and derived statistics
+        """
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "findings": self.findings,
+            "elapsed": self.elapsed,
+            "requests_per_sec": self.requests_per_sec,
+        }
+
+
+# pylint: disable=too-many-instance-attributes, too-many-arguments
+# Fuzzer is configured through many independent options
+class Fuzzer:
+    """
+    Fuzzer Class
+
+    Streams (target, parameter, payload) cases from the payload generators and
+    sends them in batches of `batch_size` over the pooled keep-alive
+    connections of an HttpBrowser, with at most `concurrency` batches in
+    flight. Only cases are held in memory, never the payload lists, so memory
+    stays flat however many payloads are generated.
+
+    Every target is first requested `baseline` times with its sample values.
+    A response is recorded as a Finding if it deviates from that baseline:
+    a new status class or server error, a body length outside the baseline
+    beyond the payload's own length, an error message the baseline did not
+    contain, a payload with markup reflected unescaped, a response much
+    slower than the baseline, or no response at all. Findings with the same
+    target, parameter, reasons and status are counted on the first one.
+    """
+
+    def __init__(
+        self,
+        browser: HttpBrowser | None = None,
+        payloads: Callable[[str | None, str], Iterable[str]] = default,
+        concurrency: int = 16,
+        batch_size: int = 32,
+        baseline: int = 2,
+        length_tolerance: float = 0.1,
+        time_factor: float = 5.0,
+        time_slack: float = 1.0,
+        max_findings: int = 10_000,
+        on_finding: Callable[[Finding], None] | None = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        browser : HttpBrowser, optional
+            Browser to send with, by default an HttpBrowser with `concurrency`
+            connections per origin that does not follow redirects.
+
+        payloads : Callable[[str | None, str], Iterable[str]], optional
+            Generator of the payloads of a parameter from its sample value and
+            type, by default payloads.default.
+
+        concurrency : int, optional
+            Batches in flight, by default 16.
+
+        batch_size : int, optional
+            Requests per batch, by default 32.
+
+        baseline : int, optional
+            Baseline requests per target, by default 2.
+
+        length_tolerance : float, optional
+            Relative body length difference that is a deviation, by default 0.1.
+
+        time_factor : float, optional
+            Factor of the slowest baseline response, by default 5.0.
+
+        time_slack : float, optional
+            Seconds added to the time threshold, by default 1.0.
+
+        max_findings : int, optional
+            Distinct findings kept, further ones are only counted, by default 10,000.
+
+        on_finding : Callable[[Finding], None], optional
+            Called with every new distinct finding, by default None.
+        """
+
+        self._browser_owned: bool = browser is None
+        self.browser: HttpBrowser = browser or HttpBrowser(
+            max_connections=concurrency, max_workers=1, max_redirects=0
+        )
+        self.payloads: Callable[[str | None, str], Iterable[str]] = payloads
+        self.concurrency: int = concurrency
+        self.batch_size: int = batch_size
+        self.baseline: int = baseline
+        self.length_tolerance: float = length_tolerance
+        self.time_factor: float = time_factor
+        self.time_slack: float = time_slack
+        self.max_findings: int = max_findings
+        self.on_finding: Callable[[Finding], None] | None = on_finding
+
+        self.stats: FuzzStats = FuzzStats()
+        self.findings: dict[tuple, Finding] = {}
+        self._lock = threading.Lock()
+
+    def run(self, targets: Target | Iterable[Target]) -> FuzzStats:
+        """
+        Fuzz every parameter of the targets
+
+        Parameters
+        ----------
+        targets : Target | Iterable[Target]
+            Targets to fuzz, consumed lazily
+
+        Returns
+        -------
+        FuzzStats : Fuzzing statistics
+        """
+
+        targets = [targets] if isinstance(targets, Target) else targets
+        cases = self._cases(targets)
+        start = time.perf_counter()
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="restr-fuzz"
+            ) as executor:
+                in_flight = set()
+                exhausted = False
+
+                while True:
+                    while not exhausted and len(in_flight) < self.concurrency:
+                        batch = list(islice(cases, self.batch_size))
+                        if not batch:
+                            exhausted = True
+                            break
+                        in_flight.add(executor.submit(self._send_batch, batch))
+
+                    if not in_flight:
+                        break
+
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+        finally:
+            self.stats.elapsed += time.perf_counter() - start
+
+        return self.stats
+
+    def close(self) -> None:
+        """Close the browser if it was created by the Fuzzer"""
+
+        if self._browser_owned:
+            self.browser.close()
+
+    def _cases(
+        self, targets: Iterable[Target]
+    ) -> Iterator[tuple[Target, Baseline, str, str]]:
+        """Yield (target, baseline, parameter, payload) cases lazily"""
+
+        for target in targets:
+            if not target.params:
+                continue
+
+            responses = []
+            for _ in range(self.baseline):
+                try:
+                    responses.append(self._send(*target.request()))
+                except REQUEST_ERRORS:
+                    pass
+
+            # Targets that do not answer are not fuzzed
+            if self.baseline and not responses:
+                continue
+            baseline = Baseline(responses)
+
+            for param in target.params:
+                for payload in self.payloads(param.value, param.kind):
+                    yield target, baseline, param.name, payload
+
+    def _send(
+        self, method: str, url: str, body: bytes | None, headers: dict[str, str]
+    ) -> Response:
+        """Send a request and count it"""
+
+        try:
+            return self.browser.request(method, url, body, headers)
+        finally:
+            with self._lock:
+                self.stats.requests += 1
+
+    def _send_batch(self, batch: list[tuple[Target, Baseline, str, str]]) -> None:
+        """Send the cases of a batch one after another on a pooled connection"""
+
+        for target, baseline, name, payload in batch:
+            start = time.perf_counter()
+            try:
+                response = self._send(*target.request(name, payload))
+            except REQUEST_ERRORS:
+                with self._lock:
+                    self.stats.errors += 1
+                self._record(
+                    Finding(
+                        target,
+                        name,
+                        payload,
+                        ["no response"],
+                        None,
+                        0,
+                        time.perf_counter() - start,
+                    )
+                )
+                continue
+
+            reasons = self._deviations(baseline, payload, response)
+            if reasons:
+                self._record(
+                    Finding(
+                        target,
+                        name,
+                        payload,
+                        reasons,
+                        response.status,
+                        len(response.body),
+                        response.elapsed,
+                    )
+                )
+
+    def _deviations(
+        self, baseline: Baseline, payload: str, response: Response
+    ) -> list[str]:
+        """Reasons a response deviates from the baseline"""
+
+        reasons = []
+        status = response.status
+        body = response.body
+
+        if status not in baseline.statuses:
+            if status >= 500:
+                reasons.append("server error")
+            elif status // 100 not in {code // 100 for code in baseline.statuses}:
+                reasons.append("status")
+
+        if baseline.statuses:
+            # Reflected payloads change the length by their own length
+            encoded = payload.encode()
+            length = (
+                len(body) - body.count(encoded) * len(encoded) if encoded else len(body)
+            )
+            tolerance = max(64, baseline.max_length * self.length_tolerance)
+            if (
+                length < baseline.min_length - tolerance
+                or length > baseline.max_length + tolerance
+            ):
+                reasons.append("length")
+
+            threshold = baseline.max_elapsed * self.time_factor + self.time_slack
+            if response.elapsed > threshold:
+                reasons.append("time")
+
+        errors = {match.lower() for match in ERROR_PATTERNS.findall(body)}
+        if errors - baseline.errors:
+            reasons.append("error")
+
+        if (
+            _MARKUP.intersection(payload)
+            and "html" in response.content_type
+            and payload.encode() in body
+        ):
+            reasons.append("reflection")
+
+        return reasons
+
+    def _record(self, finding: Finding) -> None:
+        """Keep the first finding of a deviation and count the others"""
+
+        key = (
+            finding.target.method,
+            finding.target.url,
+            finding.param,
+            tuple(finding.reasons),
+            finding.status,
+        )
+
+        with self._lock:
+            existing = self.findings.get(key)
+            if existing is not None:
+                existing.count += 1
+                return
+            if len(self.findings) >= self.max_findings:
+                return
+
+            self.findings[key] = finding
+            self.stats.findings += 1
+
+        if self.on_finding:
+            self.on_finding(finding)
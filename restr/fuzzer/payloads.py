@@ -0,0 +1,290 @@
+"""
+restr.fuzzer.payloads
+
+Payload generators
+Lazily yield the values substituted into fuzzed parameters
+"""
+
+import re
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+# Parameter types mutate() knows values for
+TYPES = ("number", "boolean", "email", "url", "date", "string")
+
+# Values at the edges of common parsers and column types
+BOUNDARY_VALUES = (
+    "",
+    " ",
+    "0",
+    "-1",
+    "1.0",
+    "-0",
+    "2147483647",
+    "2147483648",
+    "-2147483649",
+    "9223372036854775808",
+    "1e309",
+    "NaN",
+    "Infinity",
+    "null",
+    "undefined",
+    "true",
+    "[]",
+    "{}",
+    "\x00",
+    "%00",
+    "\r\n",
+    "A" * 256,
+    "A" * 65536,
+    "‮﻿\U0001f600",
+)
+
+# Probes for injection and template flaws, their responses are checked for
+# error messages and unescaped reflection
+PROBES = (
+    "'",
+    '"',
+    "`",
+    "\\",
+    "' OR '1'='1",
+    "1;SELECT 1--",
+    "<restr>\"'",
+    "{{7*7}}",
+    "${7*7}",
+    "%s%s%s%n",
+    "../../../../etc/passwd",
+    "..\\..\\..\\windows\\win.ini",
+    "|id",
+    "$(id)",
+)
+
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+# Input types of HTML forms by parameter type
+_INPUT_TYPES = {
+    "number": "number",
+    "range": "number",
+    "checkbox": "boolean",
+    "email": "email",
+    "url": "url",
+    "date": "date",
+    "datetime-local": "date",
+    "month": "date",
+    "week": "date",
+}
+
+
+def infer_type(value: str | None, input_type: str | None = None) -> str:
+    """
+    Infer the type of a parameter
+
+    Parameters
+    ----------
+    value : str | None
+        Sample value of the parameter
+
+    input_type : str, optional
+        Type attribute of the form input, by default None.
+
+    Returns
+    -------
+    str : One of TYPES
+    """
+
+    if input_type in _INPUT_TYPES:
+        return _INPUT_TYPES[input_type]
+    if not value:
+        return "string"
+    if _NUMBER.match(value):
+        return "number"
+    if value.lower() in ("true", "false", "on", "off", "yes", "no"):
+        return "boolean"
+    if _EMAIL.match(value):
+        return "email"
+    if value.startswith(("http://", "https://", "/")):
+        return "url"
+    if _DATE.match(value):
+        return "date"
+    return "string"
+
+
+def wordlist(source: str | Path | Iterable[str]) -> Iterator[str]:
+    """
+    Yield the words of a wordlist
+
+    Parameters
+    ----------
+    source : str | Path | Iterable[str]
+        Wordlist file, read line by line, or words
+
+    Returns
+    -------
+    Iterator[str] : Words, empty lines and # comments skipped
+    """
+
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8", errors="replace") as file:
+            for line in file:
+                line = line.rstrip("\r\n")
+                if line and not line.startswith("#"):
+                    yield line
+    else:
+        yield from source
+
+
+def boundary() -> Iterator[str]:
+    """
+    Yield the boundary values
+
+    Returns
+    -------
+    Iterator[str] : BOUNDARY_VALUES
+    """
+
+    return iter(BOUNDARY_VALUES)
+
+
+def mutate(value: str | None, kind: str = "string") -> Iterator[str]:
+    """
+    Yield type-aware mutations of a value
+
+    Parameters
+    ----------
+    value : str | None
+        Sample value of the parameter
+
+    kind : str, optional
+        Parameter type, one of TYPES, by default "string".
+
+    Returns
+    -------
+    Iterator[str] : Mutated values, then PROBES
+    """
+
+    value = value or ""
+
+    if kind == "number":
+        number = float(value) if _NUMBER.match(value) else 1.0
+        integer = int(number)
+        yield from (
+            str(integer - 1),
+            str(integer + 1),
+            str(-integer),
+            str(integer * 2**32),
+            f"{number}e308",
+            f"{value}.5",
+            f"0x{abs(integer):x}",
+            f"{value}abc",
+        )
+    elif kind == "boolean":
+        yield from ("true", "false", "1", "0", "2", "-1", "TRUE", "yes", "on")
+    elif kind == "email":
+        local, _, domain = value.partition("@")
+        yield from (
+            f"{local}@",
+            f"@{domain or 'example.com'}",
+            f"{local}@{domain}@{domain}",
+            f"{local}+restr@{domain}",
+            f'"{local}"@{domain}',
+            f"{local}@localhost",
+            f"{'a' * 256}@{domain}",
+        )
+    elif kind == "url":
+        yield from (
+            "http://127.0.0.1/",
+            "http://169.254.169.254/latest/meta-data/",
+            "file:///etc/passwd",
+            "//example.org/",
+            "javascript:alert(1)",
+            f"{value}@example.org",
+        )
+    elif kind == "date":
+        yield from (
+            "0000-00-00",
+            "9999-12-31",
+            "1970-01-01T00:00:00Z",
+            "2024-02-30",
+            "2024-13-01",
+            "-0001-01-01",
+        )
+    else:
+        yield from (
+            value * 2,
+            value.upper(),
+            value + "\x00",
+            value + "%",
+            value + "*",
+            value * 1000,
+        )
+
+    yield from PROBES
+
+
+def chain(*generators: Callable[[str | None, str], Iterable[str]]) -> Callable:
+    """
+    Combine payload generators
+
+    Parameters
+    ----------
+    *generators : Callable[[str | None, str], Iterable[str]]
+        Generators taking the sample value and type of a parameter
+
+    Returns
+    -------
+    Callable[[str | None, str], Iterator[str]] : Generator yielding the
+        payloads of every generator in order
+    """
+
+    def payloads(value: str | None, kind: str) -> Iterator[str]:
+        for generator in generators:
+            yield from generator(value, kind)
+
+    return payloads
+
+
+def words(source: str | Path | Iterable[str], limit: int | None = None) -> Callable:
+    """
+    Payload generator of a wordlist, re-read for every parameter
+
+    Parameters
+    ----------
+    source : str | Path | Iterable[str]
+        Wordlist file or words, words must be re-iterable (e.g. a list)
+
+    limit : int, optional
+        Words per parameter, by default None (all).
+
+    Returns
+    -------
+    Callable[[str | None, str], Iterator[str]] : Generator for chain() or Fuzzer
+    """
+
+    def payloads(_value: str | None, _kind: str) -> Iterator[str]:
+        return islice(wordlist(source), limit)
+
+    return payloads
+
+
+def default(value: str | None, kind: str) -> Iterator[str]:
+    """
+    Default payload generator
+
+    Parameters
+    ----------
+    value : str | None
+        Sample value of the parameter
+
+    kind : str
+        Parameter type, one of TYPES
+
+    Returns
+    -------
+    Iterator[str] : Type-aware mutations, probes and boundary values
+    """
+
+    yield from mutate(value, kind)
+    yield from boundary()
@@ -0,0 +1,196 @@
+"""
+restr.urls
+
+URL helpers shared by the browser backends and the crawler
+"""
+
+import re
+from fnmatch import translate
+from functools import lru_cache
+from typing import Iterable
+from urllib.parse import urlsplit
+
+# Query parameters that only track the visitor, * matches any suffix
+TRACKING_PARAMS = (
+    "utm_*",
+    "gclid",
+    "dclid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref_src",
+)
+
+# Ports that are implied by the scheme
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Placeholder of collapsed path segments
+PARAM = "{param}"
+
+# Path segments that identify a resource rather than an endpoint
+_NUMERIC = re.compile(r"^\d+$")
+_UUID = re.compile(
+    r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$", re.I
+)
+_HEX = re.compile(r"^[0-9a-f]{16,}$", re.I)
+_TOKEN = re.compile(r"^(?=.*\d)(?=.*[a-z])[\w\-=.~]{20,}$", re.I)
+
+
+def is_param_segment(segment: str) -> bool:
+    """
+    Check if a path segment looks like a parameter value
+
+    Parameters
+    ----------
+    segment : str
+        Single path segment without slashes
+
+    Returns
+    -------
+    bool : True for numeric IDs, UUIDs, hex hashes and long random tokens
+    """
+
+    return bool(
+        _NUMERIC.match(segment)
+        or _UUID.match(segment)
+        or _HEX.match(segment)
+        or _TOKEN.match(segment)
+    )
+
+
+def path_template(path: str) -> str:
+    """
+    Collapse parameter-like path segments
+
+    Parameters
+    ----------
+    path : str
+        URL path, e.g. /users/42/posts
+
+    Returns
+    -------
+    str : Path template, e.g. /users/{param}/posts
+    """
+
+    return "/".join(
+        PARAM if is_param_segment(segment) else segment for segment in path.split("/")
+    )
+
+
+def host_template(url: str) -> tuple[str, str]:
+    """
+    Get the host and path template of a URL
+
+    Parameters
+    ----------
+    url : str
+        Absolute URL
+
+    Returns
+    -------
+    tuple[str, str] : Lowercase host and path template
+    """
+
+    parts = urlsplit(url)
+    return parts.netloc.lower(), path_template(parts.path or "/")
+
+
+def canonicalize(url: str, drop_params: Iterable[str] = TRACKING_PARAMS) -> str:
+    """
+    Canonicalize a URL
+
+    Parameters
+    ----------
+    url : str
+        URL, https:// is assumed if it has no scheme
+
+    drop_params : Iterable[str], optional
+        Query parameter names to remove, by default TRACKING_PARAMS.
+        Names may end with * to match a prefix.
+
+    Returns
+    -------
+    str : Canonical URL
+
+    Notes
+    -----
+    Lowercases the scheme and host, removes default ports, dot segments and
+    the fragment, and sorts the query parameters.
+    """
+
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+
+    scheme, netloc, path, query, _ = urlsplit(url)
+    scheme = scheme.lower()
+    netloc = _canonical_netloc(scheme, netloc)
+    path = _remove_dot_segments(path) or "/"
+
+    # Query without tracking parameters, pairs are kept percent-encoded as is
+    if query:
+        drop = _drop_pattern(tuple(drop_params))
+        query = "&".join(
+            sorted(
+                pair
+                for pair in query.split("&")
+                if pair and not (drop and drop.match(pair.split("=", 1)[0].lower()))
+            )
+        )
+
+    return (
+        f"{scheme}://{netloc}{path}?{query}" if query else f"{scheme}://{netloc}{path}"
+    )
+
+
+def _canonical_netloc(scheme: str, netloc: str) -> str:
+    """Lowercase the host and remove the default port of the scheme"""
+
+    userinfo, _, hostport = netloc.rpartition("@")
+
+    # Split the port, IPv6 hosts are enclosed in brackets
+    host, port = hostport, ""
+    if hostport.rfind(":") > hostport.rfind("]"):
+        host, _, port = hostport.rpartition(":")
+
+    host = host.lower().rstrip(".")
+    if port and port.isdigit() and int(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{int(port)}"
+
+    return f"{userinfo}@{host}" if userinfo else host
+
+
+@lru_cache(maxsize=32)
+def _drop_pattern(drop_params: tuple[str, ...]) -> re.Pattern | None:
+    """Compile query parameter names to drop into a single pattern"""
+
+    if not drop_params:
+        return None
+
+    return re.compile("|".join(translate(param.lower()) for param in drop_params))
+
+
+def _remove_dot_segments(path: str) -> str:
+    """Resolve . and .. path segments as in RFC 3986 5.2.4"""
+
+    if "." not in path:
+        return path
+
+    segments = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+
+    # Keep the trailing slash of paths ending in a dot segment
+    if path.endswith(("/.", "/..")):
+        segments.append("")
+
+    return "/".join(segments)
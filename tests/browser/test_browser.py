@@ -23,6 +23,10 @@ class TestBrowserBase:
         # Testing protected method
         assert BrowserBase._format_url("icann.org/") == "https://icann.org/"
 
+        # Local URLs are not sent to the network
+        for url in ("about:blank", "data:text/html,<p>", "file:///tmp/page.html"):
+            assert BrowserBase._format_url(url) == url
+
 
 class TestBrowser:
     """
@@ -73,3 +77,24 @@ class TestBrowser:
 
         # Verify browser is closed
         assert browser.browser.service.process is None
+
+    def test_restart_blank(self, browser, server):
+        """Test restart() re-opens blank tabs as blank tabs"""
+
+        url = server.route("/restarted", "<p>restarted</p>")
+        browser.open(url)
+
+        blank = Window(browser=browser.browser)
+        blank.open("about:blank")
+        browser.windows.add(blank)
+
+        assert browser.restart() == [url, "about:blank"]
+        assert len(browser.browser.window_handles) == 2
+
+        urls = []
+        for handle in browser.browser.window_handles:
+            browser.browser.switch_to.window(handle)
+            urls.append(browser.browser.current_url)
+        assert sorted(urls) == sorted([url, "about:blank"])
+
+        browser.close()
@@ -0,0 +1,138 @@
+"""tests.browser.test_cache.py"""
+
+import urllib.request
+
+from restr.browser.cache import ResponseCache
+from restr.browser.capture import CaptureLog, CaptureProxy
+from restr.browser.http_browser import HttpBrowser
+
+
+def etag_route(body: bytes, etag: str = '"v1"'):
+    """Route answering conditional requests with 304 Not Modified"""
+
+    def route(handler):
+        headers = {"Content-Type": "text/html", "ETag": etag}
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, headers, b""
+        return 200, headers, body
+
+    return route
+
+
+class TestResponseCache:
+    """Test ResponseCache"""
+
+    def test_revalidate(self, server, tmp_path):
+        """Test stale responses are revalidated with their ETag"""
+
+        body = b"<html>" + b"x" * 1000 + b"</html>"
+        url = server.route("/page", etag_route(body))
+
+        browser = HttpBrowser(cache=tmp_path / "cache")
+        assert browser.open(url).body == body
+
+        response = browser.open(url)
+        assert response.status == 200
+        assert response.body == body
+
+        cache = browser.cache
+        assert cache.misses == 1
+        assert cache.revalidations == 1
+        assert cache.bytes_saved == len(body)
+        assert len(server.requests) == 2
+        browser.close()
+
+        # A new run reuses the stored responses
+        browser = HttpBrowser(cache=tmp_path / "cache")
+        assert browser.open(url).body == body
+        assert browser.cache.revalidations == 1
+        assert browser.cache.misses == 0
+        browser.close()
+
+    def test_fresh(self, server, tmp_path):
+        """Test fresh responses are served without a request"""
+
+        url = server.route("/fresh", "fresh", headers={"Cache-Control": "max-age=60"})
+        uncached = server.route(
+            "/uncached", "uncached", headers={"Cache-Control": "no-store"}
+        )
+
+        cache = ResponseCache(tmp_path)
+        browser = HttpBrowser(cache=cache)
+        for _ in range(3):
+            assert browser.open(url).body == b"fresh"
+            assert browser.open(uncached).body == b"uncached"
+
+        assert cache.hits == 2
+        assert server.requests.count(("GET", "/fresh")) == 1
+        assert server.requests.count(("GET", "/uncached")) == 3
+
+        # Requests with other vary headers are stored separately
+        browser.request("GET", url, headers={"Accept": "application/json"})
+        assert server.requests.count(("GET", "/fresh")) == 2
+
+        browser.close()
+        cache.close()
+
+    def test_dedup_evict(self, tmp_path):
+        """Test identical bodies are stored once and eviction by policy"""
+
+        cache = ResponseCache(tmp_path, max_bytes=250, policy="lfu")
+        for path in ("/a", "/b"):
+            cache.store("GET", f"http://a.com{path}", None, 200, "OK", {}, b"1" * 100)
+
+        assert len(cache) == 2
+        assert cache.size == 100
+        assert len(list(cache.blob_dir.rglob("*"))) == 2  # Directory and blob
+
+        # The frequently used entry survives
+        cache.touch(cache.lookup("GET", "http://a.com/b?utm_source=x"))
+        cache.store("GET", "http://a.com/c", None, 200, "OK", {}, b"2" * 100)
+        cache.store("GET", "http://a.com/d", None, 200, "OK", {}, b"3" * 100)
+
+        assert cache.size <= 250
+        assert cache.lookup("GET", "http://a.com/b") is not None
+        assert cache.lookup("GET", "http://a.com/d") is not None
+        assert cache.lookup("GET", "http://a.com/a") is None
+
+        cache.clear()
+        assert cache.size == 0
+        assert not list(cache.blob_dir.rglob("*.*"))
+        cache.close()
+
+    def test_proxy(self, server, tmp_path):
+        """Test the capture proxy serves revalidated responses from the cache"""
+
+        body = b"proxied" * 100
+        url = server.route("/proxied", etag_route(body))
+
+        cache = ResponseCache(tmp_path / "cache")
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        proxy = CaptureProxy(log, cache=cache)
+
+        host, port = proxy.address
+        opener = urllib.request.build_opener(
+            urllib.request.ProxyHandler({"http": f"http://{host}:{port}"})
+        )
+        for _ in range(2):
+            with opener.open(url) as response:
+                assert response.status == 200
+                assert response.read() == body
+
+        # Requests that cannot be cached are still fetched upstream
+        with opener.open(url, data=b"posted") as response:
+            assert response.read() == body
+
+        proxy.close()
+
+        assert [record.get("cache") for record in log.query()] == [
+            None,
+            "revalidated",
+            None,
+        ]
+        assert cache.stats["revalidations"] == 1
+        assert cache.stats["misses"] == 2
+        assert cache.stats["bytes_saved"] == len(body)
+
+        log.close()
+        cache.close()
@@ -0,0 +1,223 @@
+"""tests.browser.test_capture.py"""
+
+import base64
+import hashlib
+import http.client
+import json
+import urllib.request
+import zipfile
+
+from selenium.common.exceptions import JavascriptException, WebDriverException
+
+from restr.browser.capture import (
+    INDEX_RECORD,
+    CaptureLog,
+    CaptureProxy,
+    PageRecorder,
+)
+
+
+class TestCaptureLog:
+    """Test CaptureLog"""
+
+    def test_write_query(self, tmp_path):
+        """Test write() and query()"""
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        log.write({"url": "http://a.com/api/users", "status": 200})
+        log.write({"url": "http://a.com/api/users?page=2", "status": 500})
+        log.write({"url": "http://b.com:8080/api/users", "status": 200})
+        log.write({"url": "http://b.com:8080/", "status": 404})
+
+        assert len(log) == 4
+        assert log.index_path.stat().st_size == 4 * INDEX_RECORD.size
+
+        assert len(list(log.query())) == 4
+        assert [r["status"] for r in log.query(host="a.com")] == [200, 500]
+        assert [r["url"] for r in log.query(host="B.com:8080", path="/")] == [
+            "http://b.com:8080/"
+        ]
+        assert len(list(log.query(path="/api/users"))) == 3
+        assert [r["url"] for r in log.query(path="/api/users", status=200)] == [
+            "http://a.com/api/users",
+            "http://b.com:8080/api/users",
+        ]
+        assert not list(log.query(host="c.com"))
+
+        log.close()
+
+    def test_reopen(self, tmp_path):
+        """Test appending to an existing log"""
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        log.write({"url": "http://a.com/1", "status": 200})
+        log.close()
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        log.write({"url": "http://a.com/2", "status": 200})
+
+        assert [r["url"] for r in log.query(host="a.com")] == [
+            "http://a.com/1",
+            "http://a.com/2",
+        ]
+        log.close()
+
+
+class TestCaptureProxy:
+    """Test CaptureProxy"""
+
+    def test_forward(self, server, tmp_path):
+        """Test requests are forwarded and recorded"""
+
+        url = server.route(
+            "/api/items",
+            json.dumps({"items": [1, 2]}),
+            headers={"Content-Type": "application/json"},
+        )
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        proxy = CaptureProxy(log, store_bodies=True)
+
+        host, port = proxy.address
+        opener = urllib.request.build_opener(
+            urllib.request.ProxyHandler({"http": f"http://{host}:{port}"})
+        )
+
+        with opener.open(url) as response:
+            body = response.read()
+        assert json.loads(body) == {"items": [1, 2]}
+
+        with opener.open(urllib.request.Request(url + "?q=1", data=b"x=1")) as response:
+            assert response.status == 200
+
+        proxy.close()
+
+        records = list(log.query(path="/api/items"))
+        assert [record["method"] for record in records] == ["GET", "POST"]
+
+        record = records[0]
+        assert record["url"] == url
+        assert record["status"] == 200
+        assert record["response_headers"]["Content-Type"] == "application/json"
+        assert record["body_size"] == len(body)
+        assert record["body_sha256"] == hashlib.sha256(body).hexdigest()
+        assert base64.b64decode(record["body"]) == body
+        assert record["duration"] >= 0
+
+        assert server.requests == [("GET", "/api/items"), ("POST", "/api/items?q=1")]
+        log.close()
+
+    def test_chunked_request(self, server, tmp_path):
+        """Test chunked request bodies are forwarded"""
+
+        url = server.route(
+            "/echo", lambda handler: (200, {"Content-Type": "text/plain"}, handler.body)
+        )
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        proxy = CaptureProxy(log)
+
+        connection = http.client.HTTPConnection(*proxy.address)
+        connection.request(
+            "POST", url, body=iter([b"a=1", b"&b=2"]), encode_chunked=True
+        )
+        response = connection.getresponse()
+        assert response.read() == b"a=1&b=2"
+        connection.close()
+
+        proxy.close()
+        assert [record["method"] for record in log.query(path="/echo")] == ["POST"]
+        log.close()
+
+    def test_preferences(self, tmp_path):
+        """Test preferences"""
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        proxy = CaptureProxy(log)
+
+        host, port = proxy.address
+        assert proxy.preferences["network.proxy.type"] == 1
+        assert proxy.preferences["network.proxy.http"] == host
+        assert proxy.preferences["network.proxy.http_port"] == port
+
+        proxy.close()
+        log.close()
+
+
+class TestPageRecorder:
+    """Test PageRecorder"""
+
+    def test_collect(self, tmp_path):
+        """Test records drained from the page are written to the log"""
+
+        class Driver:
+            """Driver returning the records of the page recorder"""
+
+            def __init__(self, records):
+                self.records = records
+                self.arguments = None
+
+            def execute_script(self, _script, *arguments):
+                """Return the records or fail like an unloading page"""
+                self.arguments = arguments
+                if self.records is None:
+                    raise JavascriptException("Document was unloaded")
+                return self.records
+
+        record = {"method": "POST", "url": "https://a.test/api", "status": 201}
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        proxy = CaptureProxy(log, store_bodies=True, max_body_size=10)
+        recorder = PageRecorder(proxy)
+
+        driver = Driver([record])
+        assert recorder.collect(driver) == 1
+        assert driver.arguments == (10, recorder.max_records)
+        assert recorder.collect(Driver(None)) == 0
+
+        proxy.close()
+        assert list(log.query(host="a.test")) == [{**record, "source": "page"}]
+        log.close()
+
+    def test_install(self, tmp_path):
+        """Test the recorder extension runs before the page scripts"""
+
+        class Driver:
+            """Driver reading the installed extension"""
+
+            def __init__(self, error=None):
+                self.error = error
+                self.files = {}
+
+            def install_addon(self, path, temporary=False):
+                """Read the extension or fail like a driver without add-ons"""
+                assert temporary
+                if self.error is not None:
+                    raise self.error
+                with zipfile.ZipFile(path) as extension:
+                    self.files = {
+                        name: extension.read(name).decode()
+                        for name in extension.namelist()
+                    }
+                return "page-recorder@restr"
+
+        log = CaptureLog(tmp_path / "capture.jsonl")
+        proxy = CaptureProxy(log, store_bodies=True, max_body_size=10)
+        recorder = PageRecorder(proxy, max_records=5)
+
+        driver = Driver()
+        assert recorder.install(driver)
+
+        (script,) = json.loads(driver.files["manifest.json"])["content_scripts"]
+        assert script["run_at"] == "document_start"
+        assert script["world"] == "MAIN"
+        assert driver.files["recorder.js"] == recorder.preload_script()
+        assert recorder.preload_script().endswith(".call(window, 10, 5);")
+
+        # Records made without the extension are marked
+        assert "backfilled: true" in recorder.preload_script()
+
+        assert not recorder.install(Driver(WebDriverException("no add-ons")))
+
+        proxy.close()
+        log.close()
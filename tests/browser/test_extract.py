@@ -0,0 +1,96 @@
+"""tests.browser.test_extract.py"""
+
+from restr.browser.extract import EXTRACT_SCRIPT, PageData, parse_html
+
+PAGE = """
+<html>
+<body>
+    <a href="/users/1">User</a>
+    <a href="https://other.test/">Other</a>
+    <a href="/users/1">Duplicate</a>
+    <form action="/login" method="POST">
+        <input name="user" type="email">
+        <input name="password" type="password">
+        <input type="submit">
+        <select name="role"></select>
+    </form>
+    <iframe src="/embed/widget"></iframe>
+    <div data-endpoint="/api/v1/stats" data-label="Stats"></div>
+    <script src="/bundle.js"></script>
+    <script>
+        fetch("/api/items?page=1");
+        xhr.open("GET", "/v2/orders");
+        const query = "/graphql";
+    </script>
+</body>
+</html>
+"""
+
+
+def assert_page_data(data: PageData, base: str) -> None:
+    """Check the data extracted from PAGE"""
+
+    assert data.links == [f"{base}/users/1", "https://other.test/"]
+    assert data.iframes == [f"{base}/embed/widget"]
+    assert data.data_urls == [f"{base}/api/v1/stats"]
+    assert set(data.endpoints) == {
+        f"{base}/api/items?page=1",
+        f"{base}/v2/orders",
+        f"{base}/graphql",
+    }
+
+    (form,) = data.forms
+    assert form.action == f"{base}/login"
+    assert form.method == "post"
+    assert form.inputs[:2] == [
+        ("user", "email"),
+        ("password", "password"),
+    ]
+    assert len(form.inputs) == 3
+
+
+class TestExtract:
+    """Test page extraction"""
+
+    def test_script(self):
+        """The script is minified once"""
+
+        assert "\n    " not in EXTRACT_SCRIPT
+        assert EXTRACT_SCRIPT.startswith("const unique")
+
+    def test_from_payload(self):
+        """Test PageData.from_payload()"""
+
+        data = PageData.from_payload(
+            '{"u": "https://a.test/", "l": ["https://a.test/x"],'
+            ' "f": [["https://a.test/f", "get", [["q", "text"]]]],'
+            ' "i": [], "d": [], "e": ["https://a.test/api"],'
+            ' "r": ["https://a.test/api"]}'
+        )
+
+        assert data.forms[0].inputs == [("q", "text")]
+        assert data.urls == [
+            "https://a.test/x",
+            "https://a.test/api",
+            "https://a.test/f",
+        ]
+
+    def test_parse_html(self):
+        """Test parse_html()"""
+
+        data = parse_html(PAGE, "https://site.test/index.html")
+        assert_page_data(data, "https://site.test")
+        assert data.forms[0].inputs[-1] == ("role", "select")
+
+    def test_extract(self, server, browser):
+        """Test Browser.extract() and Window.extract() use the same script"""
+
+        url = server.route("/", PAGE)
+        browser.open(url)
+
+        data = browser.extract()
+        assert_page_data(data, server.url)
+        assert data.forms[0].inputs[-1] == ("role", "select-one")
+
+        window = browser.windows[browser.browser.current_window_handle]
+        assert window.extract().links == data.links
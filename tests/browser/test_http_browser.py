@@ -0,0 +1,105 @@
+"""tests.browser.test_http_browser.py"""
+
+import gzip
+import json
+
+from restr.browser.browser_base import BrowserBase
+from restr.browser.http_browser import HttpBrowser, Response
+
+
+class TestHttpBrowser:
+    """Test HttpBrowser"""
+
+    def test_init(self):
+        """Test __init__()"""
+
+        browser = HttpBrowser()
+        assert isinstance(browser, BrowserBase)
+        assert "User-Agent" in browser.headers
+        browser.close()
+
+    def test_open_close(self, server):
+        """Test open() and close()"""
+
+        url = server.route(
+            "/api/items",
+            json.dumps({"items": [1, 2]}),
+            headers={"Content-Type": "application/json"},
+        )
+
+        browser = HttpBrowser()
+        response = browser.open(url)
+
+        assert isinstance(response, Response)
+        assert response.ok
+        assert response.status == 200
+        assert response.content_type == "application/json"
+        assert response.json() == {"items": [1, 2]}
+
+        # _format_url() adds a scheme
+        # pylint: disable=protected-access
+        assert browser._format_url("127.0.0.1") == "https://127.0.0.1"
+
+        browser.close()
+        assert not browser.pools
+
+    def test_connection_reuse(self, server):
+        """Test keep-alive connections are reused"""
+
+        url = server.route("/", "<html></html>")
+
+        browser = HttpBrowser(max_connections=2)
+        for _ in range(10):
+            assert browser.open(url).status == 200
+
+        assert server.connections == 1
+        browser.close()
+
+    def test_open_many(self, server):
+        """Test open_many() runs concurrently with bounded connections"""
+
+        urls = [server.route(f"/page/{i}", f"page {i}") for i in range(20)]
+
+        browser = HttpBrowser(max_connections=4, max_workers=8)
+        responses = browser.open_many(urls)
+
+        assert [response.text for response in responses] == [
+            f"page {i}" for i in range(20)
+        ]
+        assert server.connections <= 4
+        browser.close()
+
+    def test_redirect_and_gzip(self, server):
+        """Test redirects are followed and gzip bodies decoded"""
+
+        target = server.route(
+            "/target",
+            gzip.compress(b"decoded"),
+            headers={"Content-Type": "text/plain", "Content-Encoding": "gzip"},
+        )
+        url = server.route("/start", status=302, headers={"Location": "/target"})
+
+        browser = HttpBrowser()
+        response = browser.open(url)
+
+        assert response.url == target
+        assert response.text == "decoded"
+
+        # Redirects are returned as is when disabled
+        browser.max_redirects = 0
+        assert browser.open(url).status == 302
+
+        browser.close()
+
+    def test_request(self, server):
+        """Test request() with a body"""
+
+        server.route("/echo", lambda handler: (201, {}, handler.body))
+
+        browser = HttpBrowser()
+        response = browser.request("POST", server.url + "/echo", body=b"payload")
+
+        assert response.status == 201
+        assert response.body == b"payload"
+        assert server.requests[-1] == ("POST", "/echo")
+        browser.close()
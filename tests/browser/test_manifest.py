@@ -0,0 +1,150 @@
+"""tests.browser.test_manifest.py"""
+
+import os
+import shutil
+from pathlib import Path
+
+from restr.browser import manifest as manifest_module
+from restr.browser.manifest import DriverManifest, binary_version
+from restr.browser.webdriver import WebDriver
+
+
+def fake_binary(directory: Path, name: str, output: str) -> Path:
+    """Create an executable that prints output for --version"""
+
+    path = directory.joinpath(name)
+    path.write_text(f'#!/bin/sh\necho "{output}"\n')
+    path.chmod(0o755)
+
+    return path
+
+
+class TestDriverManifest:
+    """Test DriverManifest"""
+
+    def test_record_get(self, tmp_path):
+        """Test record() and get()"""
+
+        gecko = fake_binary(
+            tmp_path, "geckodriver", "geckodriver 0.33.0 (a80e5fd61076)"
+        )
+        assert binary_version(gecko) == "0.33.0"
+
+        manifest = DriverManifest(tmp_path / "cache" / "drivers.json")
+        assert manifest.get() is None
+
+        assert manifest.record("geckodriver", gecko) == "0.33.0"
+        assert manifest.get() == str(gecko)
+        assert manifest.get("geckodriver", "0.33.0") == str(gecko)
+        assert manifest.get("geckodriver", "0.32.0") is None
+        assert manifest.load()["default"] == {"geckodriver": "0.33.0"}
+
+        # A newer version becomes the default, the old one stays available
+        newer = fake_binary(tmp_path, "geckodriver-new", "geckodriver 0.34.0")
+        manifest.record("geckodriver", newer)
+        assert manifest.get() == str(newer)
+        assert manifest.get("geckodriver", "0.33.0") == str(gecko)
+
+        # Replaced and removed binaries are ignored
+        fake_binary(tmp_path, "geckodriver-new", "geckodriver 0.34.0 replaced")
+        assert manifest.get() is None
+        gecko.unlink()
+        assert manifest.get("geckodriver", "0.33.0") is None
+
+    def test_discover(self, tmp_path, monkeypatch):
+        """Test discover() and the environment variable"""
+
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        gecko = fake_binary(bin_dir, "geckodriver", "geckodriver 0.33.0")
+        firefox = fake_binary(bin_dir, "firefox", "Mozilla Firefox 118.0.1")
+
+        monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+        monkeypatch.setenv("RESTR_DRIVER_MANIFEST", str(tmp_path / "drivers.json"))
+
+        manifest = DriverManifest()
+        assert manifest.path == tmp_path / "drivers.json"
+        assert manifest.discover() == {
+            "geckodriver": str(gecko),
+            "firefox": str(firefox),
+        }
+        assert manifest.load()["default"] == {
+            "geckodriver": "0.33.0",
+            "firefox": "118.0.1",
+        }
+
+    def test_missing(self, tmp_path, monkeypatch):
+        """Test binaries missing from PATH are only searched for once per PATH"""
+
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        gecko = fake_binary(bin_dir, "geckodriver", "geckodriver 0.33.0")
+        monkeypatch.setenv("PATH", str(bin_dir))
+
+        searched = []
+        original = shutil.which
+
+        def which(name):
+            searched.append(name)
+            return original(name)
+
+        monkeypatch.setattr(manifest_module.shutil, "which", which)
+
+        manifest = DriverManifest(tmp_path / "drivers.json")
+        assert manifest.discover() == {"geckodriver": str(gecko)}
+        assert manifest.missing("firefox")
+        assert manifest.discover() == {"geckodriver": str(gecko)}
+        assert searched == ["geckodriver", "firefox"]
+
+        # Another PATH is searched again, a binary found there is recorded
+        other = tmp_path / "other"
+        other.mkdir()
+        firefox = fake_binary(other, "firefox", "Mozilla Firefox 118.0")
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{other}")
+        assert manifest.discover()["firefox"] == str(firefox)
+        assert not manifest.missing("firefox")
+
+    def test_webdriver_fast_path(self, tmp_path, monkeypatch):
+        """Test WebDriver resolves recorded binaries without webdriver_manager"""
+
+        manifest = DriverManifest(tmp_path / "drivers.json")
+        gecko = fake_binary(tmp_path, "geckodriver", "geckodriver 0.33.0")
+        firefox = fake_binary(tmp_path, "firefox", "Mozilla Firefox 118.0")
+        manifest.record("geckodriver", gecko)
+        manifest.record("firefox", firefox)
+
+        driver = WebDriver(manifest=manifest)
+        assert driver.driver_path == str(gecko)
+        assert driver.firefox_path == str(firefox)
+        assert driver._driver_manager is None  # pylint: disable=protected-access
+
+        # A recorded driver is enough, PATH is not searched for Firefox
+        manifest = DriverManifest(tmp_path / "gecko-only.json")
+        manifest.record("geckodriver", gecko)
+        monkeypatch.setattr(manifest, "discover", None)
+
+        driver = WebDriver(manifest=manifest)
+        assert driver.driver_path == str(gecko)
+        assert driver.firefox_path is None
+
+    def test_webdriver_version(self, tmp_path, monkeypatch):
+        """Test WebDriver only uses a driver of the requested version"""
+
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        fake_binary(bin_dir, "geckodriver", "geckodriver 0.33.0")
+        firefox = fake_binary(bin_dir, "firefox", "Mozilla Firefox 118.0")
+        monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+
+        manifest = DriverManifest(tmp_path / "drivers.json")
+        driver = WebDriver(manifest=manifest, version="v0.34.0", install=False)
+        assert driver.version == "0.34.0"
+        assert driver.driver_path is None
+        assert driver.firefox_path == str(firefox)
+        assert (
+            driver.driver_manager.driver.get_driver_version_to_download() == "v0.34.0"
+        )
+
+        # The driver on PATH is used if it has the requested version
+        driver = WebDriver(manifest=manifest, version="0.33.0", install=False)
+        assert driver.driver_path == str(bin_dir / "geckodriver")
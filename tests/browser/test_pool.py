@@ -0,0 +1,150 @@
+"""tests.browser.test_pool.py"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from restr.browser import Browser, BrowserPool
+from restr.browser.window import Window
+
+
+class FakeBrowser:
+    """Browser whose driver process can be killed"""
+
+    def __init__(self):
+        process = SimpleNamespace(poll=lambda: None)
+        self.browser = SimpleNamespace(service=SimpleNamespace(process=process))
+        self.closed = False
+
+    def reset(self):
+        """Reset the browser state"""
+
+    def close(self):
+        """Close the browser"""
+        self.closed = True
+
+    def kill(self):
+        """Make the driver process exit"""
+        self.browser.service.process.poll = lambda: 1
+
+
+class TestBrowserPool:
+    """Test BrowserPool"""
+
+    def test_checkout_checkin(self):
+        """Test checkout() and checkin()"""
+
+        pool = BrowserPool(size=1, max_uses=2)
+        assert len(pool) == 1
+
+        # First lease is served by the prewarmed browser
+        browser = pool.checkout()
+        assert isinstance(browser, Browser)
+        assert pool.is_healthy(browser)
+
+        # Dirty the browser state
+        browser.open("https://www.icann.org/")
+        Window(browser=browser.browser).open("https://www.icann.org/")
+        pool.checkin(browser)
+
+        # Second lease reuses the same browser after a reset
+        assert pool.checkout() is browser
+        assert len(browser.browser.window_handles) == 1
+        assert browser.browser.current_url == "about:blank"
+        assert browser.browser.get_cookies() == []
+
+        # Browser is recycled after max_uses
+        pool.checkin(browser)
+        assert browser.browser.service.process is None
+        assert len(pool) == 0
+
+        assert pool.metrics.checkouts == 2
+        assert pool.metrics.hits == 2
+        assert pool.metrics.recycled == 1
+        assert pool.metrics.hit_rate == 1.0
+
+        pool.close()
+
+    def test_timeout(self):
+        """Test checkout() timeout when all browsers are leased"""
+
+        pool = BrowserPool(size=1)
+
+        with pool.lease():
+            with pytest.raises(TimeoutError):
+                pool.checkout(timeout=0.1)
+
+        # The timed out checkout waited
+        assert pool.metrics.waits == 1
+        assert pool.metrics.wait_time >= 0.1
+        pool.close()
+
+        # Closed pool does not hand out browsers
+        with pytest.raises(RuntimeError):
+            pool.checkout()
+
+    def test_async_lease(self):
+        """Test alease()"""
+
+        pool = BrowserPool(size=1, prewarm=False)
+
+        async def lease():
+            async with pool.alease() as browser:
+                return pool.is_healthy(browser)
+
+        assert asyncio.run(lease())
+        assert pool.metrics.misses == 1
+        assert pool.metrics.spawns == 1
+        assert pool.metrics.spawn_time > 0
+
+        pool.close()
+
+    def test_unhealthy(self):
+        """Test idle browsers whose driver died are closed, not dropped"""
+
+        pool = BrowserPool(size=1, factory=FakeBrowser)
+        dead = pool.checkout()
+        pool.checkin(dead)
+        dead.kill()
+
+        browser = pool.checkout()
+        assert browser is not dead
+        assert dead.closed
+        assert pool.metrics.unhealthy == 1
+
+        pool.checkin(browser)
+        pool.close()
+
+    def test_checkin_unhealthy(self):
+        """Test browsers that die while leased are not counted as recycled"""
+
+        pool = BrowserPool(size=1, factory=FakeBrowser)
+        dead = pool.checkout()
+        dead.kill()
+        pool.checkin(dead)
+
+        assert dead.closed
+        assert len(pool) == 0
+        assert pool.metrics.unhealthy == 1
+        assert pool.metrics.recycled == 0
+
+        pool.close()
+
+    def test_prewarm_closed(self):
+        """Test a browser launched while the pool closes is closed, not kept"""
+
+        launched = []
+
+        def factory():
+            # close() runs while the browser is starting
+            pool.close()
+            launched.append(FakeBrowser())
+            return launched[-1]
+
+        pool = BrowserPool(size=1, prewarm=False, factory=factory)
+        pool.prewarm()
+
+        assert launched[0].closed
+        assert len(pool) == 0
+        assert pool.metrics.recycled == 1
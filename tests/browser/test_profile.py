@@ -0,0 +1,61 @@
+"""tests.browser.test_profile.py"""
+
+import base64
+
+import pytest
+from selenium.webdriver import FirefoxOptions
+
+from restr.browser.profile import BLACKHOLE, BLOCKED_HOSTS, Profile
+
+
+class TestProfile:
+    """Test Profile"""
+
+    def test_default(self):
+        """Test the default profile changes nothing"""
+
+        profile = Profile.get("default")
+        assert not profile.preferences
+        assert profile.pac() is None
+
+        options = FirefoxOptions()
+        preferences = dict(options.preferences)
+        profile.apply(options)
+        assert options.preferences == preferences
+
+    def test_lean(self):
+        """Test the lean profile"""
+
+        profile = Profile.get("lean")
+        assert profile.preferences["permissions.default.image"] == 2
+        assert profile.preferences["permissions.default.stylesheet"] == 2
+        assert profile.preferences["network.prefetch-next"] is False
+        assert profile.preferences["toolkit.telemetry.enabled"] is False
+        assert profile.blocked_hosts == BLOCKED_HOSTS
+        assert profile.page_load_timeout and profile.script_timeout
+
+        options = FirefoxOptions()
+        profile.apply(options)
+        assert options.preferences["network.proxy.type"] == 2
+
+        url = options.preferences["network.proxy.autoconfig_url"]
+        pac = base64.b64decode(url.split(",", 1)[1]).decode()
+        assert pac == profile.pac()
+        assert '"doubleclick.net"' in pac
+        assert BLACKHOLE in pac
+        assert '"DIRECT"' in pac
+
+        with pytest.raises(ValueError):
+            Profile.get("unknown")
+
+    def test_pac(self):
+        """Test pac()"""
+
+        profile = Profile(blocked_hosts=[".Ads.Example.com"], allowed_hosts=["a.com"])
+        assert profile.blocked_hosts == ("ads.example.com",)
+
+        pac = profile.pac(("127.0.0.1", 8080))
+        assert '["a.com"]' in pac
+        assert '["ads.example.com"]' in pac
+        assert '"PROXY 127.0.0.1:8080"' in pac
+        assert '"DIRECT"' not in pac
@@ -0,0 +1,45 @@
+"""tests.browser.test_ready.py"""
+
+import time
+from types import SimpleNamespace
+
+from restr.browser.ready import SCRIPT_TIMEOUT_MARGIN, wait_until_ready
+
+
+class FakeDriver:
+    """Driver whose page becomes ready after a delay"""
+
+    def __init__(self, script: float, ready_after: float):
+        self.timeouts = SimpleNamespace(script=script)
+        self.ready_at = time.monotonic() + ready_after
+        self.waits = []
+
+    def execute_async_script(self, _script, *arguments):
+        """Resolve once ready or after the wait passed in milliseconds"""
+
+        wait = arguments[-1] / 1000
+        self.waits.append(wait)
+        assert wait <= self.timeouts.script
+
+        time.sleep(max(0.0, min(wait, self.ready_at - time.monotonic())))
+        return [time.monotonic() >= self.ready_at, False]
+
+
+class TestWaitUntilReady:
+    """Test wait_until_ready()"""
+
+    def test_script_timeout(self):
+        """Test waits longer than the script timeout are split"""
+
+        driver = FakeDriver(script=SCRIPT_TIMEOUT_MARGIN + 0.1, ready_after=0.5)
+        assert wait_until_ready(driver, network_idle=0.1, timeout=5)
+        assert len(driver.waits) > 1
+
+        # Short script timeouts leave half of the timeout as margin
+        assert max(driver.waits) <= (SCRIPT_TIMEOUT_MARGIN + 0.1) / 2 + 1e-3
+
+        # Waiting stops at the timeout
+        driver = FakeDriver(script=1.0, ready_after=60)
+        start = time.monotonic()
+        assert not wait_until_ready(driver, timeout=0.3)
+        assert time.monotonic() - start < 1
@@ -0,0 +1,85 @@
+"""tests.browser.test_registry.py"""
+
+from restr.browser.registry import WindowRegistry
+from restr.browser.window import Window
+
+
+class TestWindowRegistry:
+    """Test WindowRegistry"""
+
+    def test_acquire_release(self, browser, server):
+        """Test acquire(), release() and eviction"""
+
+        urls = [server.route(f"/{index}", f"<p>{index}</p>") for index in range(4)]
+
+        registry = browser.windows
+        assert isinstance(registry, WindowRegistry)
+        registry.max_windows = 2
+
+        # The idle window is reused, then a tab is opened
+        first = browser.tab(urls[0])
+        second = browser.tab(urls[1])
+        assert registry.reuses == 1
+        assert len(browser.browser.window_handles) == 2
+
+        # Busy tabs are never evicted
+        third = browser.tab(urls[2])
+        assert len(browser.browser.window_handles) == 3
+
+        # Released tabs are evicted least recently used first
+        for window in (first, second, third):
+            browser.release(window)
+        assert len(registry) == 2
+        assert first.handle not in registry
+        assert set(registry) == set(browser.browser.window_handles)
+
+        # Idle tabs are navigated instead of opening new ones
+        fourth = browser.tab(urls[3])
+        assert fourth.handle == third.handle
+        assert browser.browser.current_url == urls[3]
+        browser.release(fourth)
+
+    def test_evict_focus(self, browser, server):
+        """Test evict() keeps the browser switched to its current tab"""
+
+        urls = [server.route(f"/{index}", f"<p>{index}</p>") for index in range(4)]
+
+        registry = browser.windows
+        registry.max_windows = 8
+
+        windows = []
+        for url in urls:
+            window = Window(browser=browser.browser)
+            window.open(url)
+            registry.add(window)
+            windows.append(window)
+
+        # More tabs than max_windows are open, the current one is not the last
+        current = windows[-2]
+        current.switch()
+        registry.max_windows = 2
+        assert registry.evict() > 0
+
+        assert len(browser.browser.window_handles) == 2
+        assert current.handle in registry
+        assert browser.browser.current_window_handle == current.handle
+
+    def test_sync_close(self, browser):
+        """Test sync() and Window.close()"""
+
+        registry = browser.windows
+        registry.max_windows = 8
+
+        window = Window(browser=browser.browser)
+        window.open("about:blank")
+        assert window.handle not in registry
+
+        registry.sync()
+        assert window.handle in registry
+
+        registry[window.handle].close()
+        assert window.handle not in registry
+        assert browser.browser.current_window_handle in registry
+
+        memory = browser.memory()
+        assert set(memory) == set(registry)
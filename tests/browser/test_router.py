@@ -0,0 +1,144 @@
+"""tests.browser.test_router.py"""
+
+import json
+from types import SimpleNamespace
+
+from restr.browser.http_browser import Response
+from restr.browser.router import RenderRouter, RouterStats, needs_render
+
+STATIC_PAGE = (
+    "<html><body>" + '<a href="/a">A</a>' * 5 + "text " * 100 + "</body></html>"
+)
+SPA_PAGE = (
+    '<html><head><script src="/bundle.js"></script></head>'
+    '<body><div id="root"></div></body></html>'
+)
+
+
+def html_response(body: str, content_type: str = "text/html") -> Response:
+    """Build a 200 Response"""
+    return Response(
+        "https://a.test/", 200, "OK", {"content-type": content_type}, body.encode(), 0.0
+    )
+
+
+class TestNeedsRender:
+    """Test needs_render()"""
+
+    def test_static(self):
+        """Static pages and non-HTML responses do not need rendering"""
+
+        assert not needs_render(html_response(STATIC_PAGE))
+        assert not needs_render(html_response(json.dumps({"a": 1}), "application/json"))
+
+    def test_shell(self):
+        """JavaScript shells need rendering"""
+
+        assert needs_render(html_response(SPA_PAGE))
+        assert needs_render(
+            html_response('<html><body><script src="/app.js"></script></body></html>')
+        )
+        assert needs_render(
+            html_response("<html><body>" + "x " * 200 + "</body></html>")
+        )
+
+
+class TestRenderRouter:
+    """Test RenderRouter"""
+
+    def test_fetch(self, server):
+        """Static pages are served without a browser"""
+
+        for i in range(3):
+            server.route(f"/items/{i}", STATIC_PAGE)
+
+        router = RenderRouter()
+        pages = [router.open(f"{server.url}/items/{i}") for i in range(3)]
+
+        assert not any(page.rendered for page in pages)
+        assert pages[0].html == STATIC_PAGE
+        assert router.browser is None
+
+        # The decision of /items/{param} is cached
+        assert len(router.decisions) == 1
+        assert router.stats.probes == 3
+        assert router.stats.escalation_rate == 0.0
+
+        router.close()
+
+    def test_transient_error(self, server):
+        """Decisions are not cached from error responses"""
+
+        statuses = iter([503, 200])
+        body = STATIC_PAGE.encode()
+        server.route(
+            "/items/1",
+            lambda _handler: (next(statuses), {"Content-Type": "text/html"}, body),
+        )
+
+        router = RenderRouter()
+        router.open(f"{server.url}/items/1")
+        assert not router.decisions
+
+        # The endpoint is probed again once it recovers
+        router.open(f"{server.url}/items/1")
+        assert list(router.decisions.values()) == [False]
+        assert router.stats.probes == 2
+
+        router.close()
+
+    def test_escalate(self, server, browser):
+        """JavaScript shells are opened in Firefox"""
+
+        server.route("/app/1", SPA_PAGE)
+        server.route("/app/2", SPA_PAGE)
+
+        router = RenderRouter(browser=browser)
+        first = router.open(f"{server.url}/app/1")
+        second = router.open(f"{server.url}/app/2")
+
+        assert first.rendered and second.rendered
+        assert first.response is not None
+
+        # Second page skips the probe
+        assert second.response is None
+        assert router.stats.skipped_probes == 1
+        assert router.stats.escalation_rate == 1.0
+
+        router.close()
+
+    def test_time_saved(self, server):
+        """Probes of escalated pages are subtracted from the time saved"""
+
+        server.route("/app/1", SPA_PAGE)
+        server.route("/items/1", STATIC_PAGE)
+
+        # Firefox stand-in that renders the probed source
+        firefox = SimpleNamespace(page_source=SPA_PAGE, current_url="")
+        browser = SimpleNamespace(
+            open=lambda url: setattr(firefox, "current_url", url), browser=firefox
+        )
+
+        router = RenderRouter(browser=browser)
+        rendered = router.open(f"{server.url}/app/1")
+        router.open(f"{server.url}/items/1")
+
+        assert rendered.rendered
+        assert router.stats.wasted_probe_time == rendered.response.elapsed
+        assert router.stats.as_dict()["wasted_probe_time"] > 0
+
+        stats = RouterStats()
+        stats.probes = 3
+        stats.fetch_time = 3.0
+        stats.fetched_pages = 1
+        stats.escalations = 2
+        stats.render_time = 10.0
+        stats.skipped_probes = 0
+        stats.wasted_probe_time = 2.0
+
+        # One fetched page saved 5 - 1 seconds, two probes wasted 2 seconds
+        assert stats.time_saved == 2.0
+
+        # Probes cost more than the renders they avoided
+        stats.wasted_probe_time = 6.0
+        assert stats.time_saved == -2.0
@@ -0,0 +1,92 @@
+"""tests.browser.test_supervisor.py"""
+
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import psutil
+
+from restr.browser.supervisor import Supervisor
+
+# Parent that starts a child and waits, like geckodriver starting Firefox
+TREE = (
+    "import subprocess, sys, time;"
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']);"
+    "time.sleep(60)"
+)
+
+
+class TestSupervisor:
+    """Test Supervisor"""
+
+    def test_restart(self, browser, server):
+        """Test restarting after max_pages and re-opening the windows"""
+
+        url = server.route("/supervised", "<p>supervised</p>")
+        supervisor = Supervisor(max_rss=None, max_pages=2)
+        supervisor.register(browser)
+
+        browser.open(url)
+        sample = supervisor.sample(browser)
+        assert sample.rss > 0
+        assert sample.processes > 1
+
+        old = psutil.Process(browser.browser.service.process.pid)
+        assert not supervisor.page(browser)
+        assert supervisor.page(browser)
+
+        # The old tree is gone, the new session shows the same page
+        assert not old.is_running()
+        assert browser.restarts == 1
+        assert supervisor.restarts == 1
+        assert browser.browser.current_url == url
+
+        supervisor.close()
+
+    def test_reap(self):
+        """Test reaping the orphans of an exited root process"""
+
+        root = subprocess.Popen([sys.executable, "-c", TREE])
+        fake = SimpleNamespace(browser=SimpleNamespace(service=SimpleNamespace()))
+        fake.browser.service.process = root
+
+        # Unrelated processes are never touched
+        unrelated = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(60)"]
+        )
+
+        try:
+            supervisor = Supervisor(max_rss=None, max_pages=None)
+            supervisor.register(fake)
+
+            # Wait for the child to be tracked
+            deadline = time.monotonic() + 10
+            children = psutil.Process(root.pid).children()
+            while not children:
+                assert time.monotonic() < deadline, "child was never started"
+                time.sleep(0.05)
+                children = psutil.Process(root.pid).children()
+            assert supervisor.sample(fake).processes == 2
+
+            # A live tree is not reaped
+            assert supervisor.reap() == 0
+
+            # The child outlives its root, like Firefox after a geckodriver crash
+            # The crashed root is not waited on and stays a zombie
+            root.kill()
+            deadline = time.monotonic() + 10
+            while psutil.Process(root.pid).status() != psutil.STATUS_ZOMBIE:
+                assert time.monotonic() < deadline, "root never exited"
+                time.sleep(0.05)
+            assert supervisor.reap() == 1
+            assert not children[0].is_running()
+            assert unrelated.poll() is None
+
+            supervisor.close()
+            assert supervisor.reaped == 1
+
+        finally:
+            for process in (root, unrelated):
+                process.kill()
+                process.wait()
@@ -0,0 +1,73 @@
+"""tests.browser.test_template.py"""
+
+import os
+
+from restr.browser.browser_base import USER_AGENT
+from restr.browser.profile import Profile
+from restr.browser.template import MARKER, ProfileTemplate
+
+
+class TestProfileTemplate:
+    """Test ProfileTemplate"""
+
+    def test_build(self, tmp_path):
+        """Test build()"""
+
+        extension = tmp_path / "addon@example.com.xpi"
+        extension.write_bytes(b"PK\x03\x04")
+
+        template = ProfileTemplate(
+            Profile.lean(),
+            preferences={"restr.test": 1},
+            extensions=[extension],
+            directory=tmp_path / "profiles",
+        )
+        assert not template.is_built
+
+        path = template.build(launch=False)
+        assert path == template.path
+        assert template.is_built
+        assert path.joinpath(MARKER).read_text() == template.key
+
+        user_js = path.joinpath("user.js").read_text()
+        assert f'user_pref("general.useragent.override", "{USER_AGENT}");' in user_js
+        assert 'user_pref("permissions.default.image", 2);' in user_js
+        assert 'user_pref("restr.test", 1);' in user_js
+        assert path.joinpath("extensions", extension.name).exists()
+
+        # Built templates are reused, different contents use another directory
+        assert template.build(launch=False) == path
+        other = ProfileTemplate(directory=tmp_path / "profiles")
+        assert other.key != template.key
+        assert other.path != path
+
+    def test_clone(self, tmp_path):
+        """Test clone() and remove()"""
+
+        extension = tmp_path / "addon@example.com.xpi"
+        extension.write_bytes(b"PK\x03\x04")
+
+        template = ProfileTemplate(
+            extensions=[extension], directory=tmp_path / "profiles"
+        )
+        template.build(launch=False)
+        template.path.joinpath("lock").touch()
+
+        clone = template.clone()
+        assert clone != template.path
+        assert not clone.joinpath(MARKER).exists()
+        assert not clone.joinpath("lock").exists()
+
+        # Writes to the clone do not reach the template
+        clone.joinpath("user.js").write_text("")
+        assert template.path.joinpath("user.js").read_text()
+
+        # Extensions are shared
+        assert os.path.samefile(
+            clone.joinpath("extensions", extension.name),
+            template.path.joinpath("extensions", extension.name),
+        )
+
+        ProfileTemplate.remove(clone)
+        assert not clone.exists()
+        assert template.is_built
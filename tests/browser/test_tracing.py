@@ -0,0 +1,105 @@
+"""tests.browser.test_tracing.py"""
+
+import json
+import random
+
+from restr.browser.tracing import Histogram, Tracer
+
+
+class FakeDriver:
+    """Driver answering every command without a browser"""
+
+    def __init__(self) -> None:
+        self.commands: list[str] = []
+
+    def execute(self, command: str, params: dict | None = None) -> dict:
+        """Record the command"""
+
+        self.commands.append(command)
+        return {"value": None}
+
+
+class TestHistogram:
+    """Test Histogram"""
+
+    def test_percentiles(self):
+        """Test percentiles are within the bucket precision"""
+
+        rng = random.Random(0)
+        values = [rng.lognormvariate(-4, 1) for _ in range(10_000)]
+
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+
+        values.sort()
+        for percent in (50, 90, 99):
+            exact = values[int(len(values) * percent / 100) - 1]
+            assert abs(histogram.percentile(percent) - exact) / exact < 0.02
+
+        assert histogram.count == len(values)
+        assert histogram.percentile(100) == values[-1]
+
+        # Merging doubles the counts and keeps the percentiles
+        merged = Histogram()
+        merged.merge(histogram)
+        merged.merge(histogram)
+        assert merged.count == 2 * histogram.count
+        assert merged.percentile(50) == histogram.percentile(50)
+
+
+class TestTracer:
+    """Test Tracer"""
+
+    def test_spans(self, tmp_path):
+        """Test commands are timed per host and exported as nested spans"""
+
+        tracer = Tracer(tmp_path / "trace.jsonl")
+        driver = tracer.instrument(FakeDriver())
+
+        with tracer.span("job", seeds=1):
+            with tracer.span("page", url="http://a.com/"):
+                driver.execute("get", {"url": "http://a.com/"})
+                driver.execute("executeScript", {"script": "return 1"})
+            driver.execute("getWindowHandles")
+
+        tracer.close()
+
+        spans = [json.loads(line) for line in (tmp_path / "trace.jsonl").open()]
+        names = [span["name"] for span in spans]
+        assert names == ["get", "executeScript", "page", "getWindowHandles", "job"]
+
+        by_name = {span["name"]: span for span in spans}
+        assert by_name["job"]["parent_id"] is None
+        assert by_name["page"]["parent_id"] == by_name["job"]["span_id"]
+        assert by_name["executeScript"]["parent_id"] == by_name["page"]["span_id"]
+        assert by_name["getWindowHandles"]["parent_id"] == by_name["job"]["span_id"]
+        assert len({span["trace_id"] for span in spans}) == 1
+
+        summary = tracer.summary()
+        assert summary["commands"]["get"]["count"] == 1
+        assert set(summary["hosts"]["a.com"]) == {"get", "executeScript"}
+
+    def test_disabled(self, tmp_path):
+        """Test nothing is recorded while tracing is switched off"""
+
+        tracer = Tracer(tmp_path / "trace.jsonl", enabled=False)
+        driver = tracer.instrument(FakeDriver())
+
+        with tracer.span("page", url="http://a.com/") as span:
+            driver.execute("get", {"url": "http://a.com/"})
+        assert span is None
+        assert not tracer.histograms
+
+        tracer.enable()
+        driver.execute("getTitle")
+        tracer.disable()
+        driver.execute("getTitle")
+
+        assert tracer.summary()["commands"]["getTitle"]["count"] == 1
+        assert driver.execute.__wrapped__.__self__.commands == [
+            "get",
+            "getTitle",
+            "getTitle",
+        ]
+        tracer.close()
@@ -37,13 +37,15 @@ class TestWebDriver:
         # Install driver
         driver = WebDriver(install=False)
 
-        # Verify DriverManager._get_driver_path() is working
-        assert driver.driver_path
-
         # Verify driver is installed
         driver.install()
         assert Path(driver.driver_path).exists()
 
+        # Verify the installed driver is resolved from the manifest
+        cached = WebDriver(install=False)
+        assert Path(cached.driver_path) == Path(driver.driver_path).resolve()
+        assert cached._driver_manager is None  # pylint: disable=protected-access
+
     def test_uninstall(self):
         """Test Uninstall"""
 
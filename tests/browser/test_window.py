@@ -35,6 +35,33 @@ class TestWindow:
         # Verify window url is correct
         assert window.browser.current_url == "https://www.icann.org/"
 
+    def test_wait_until_ready(self, browser, server):
+        """Test wait_until_ready() and is_ready()"""
+
+        server.route("/api/items", '{"items": [1, 2]}')
+        url = server.route(
+            "/",
+            """<html><body><ul id="items"></ul><script>
+            setTimeout(() => fetch("/api/items").then((r) => r.json()).then((data) => {
+                document.getElementById("items").innerHTML =
+                    data.items.map((item) => `<li>${item}</li>`).join("");
+            }), 100);
+            </script></body></html>""",
+        )
+
+        window = browser.windows[browser.browser.current_window_handle]
+        window.switch()
+        window.navigate(url)
+
+        # Rendered after the load event, once the request finished
+        assert window.wait_until_ready(network_idle=0.2, timeout=10)
+        assert window.is_ready(network_idle=0.2)
+        assert len(browser.browser.find_elements("css selector", "#items li")) == 2
+
+        # Predicates are evaluated in the page
+        assert window.wait_until_ready(predicate="document.title === ''", timeout=5)
+        assert not window.wait_until_ready(predicate="false", timeout=0.5)
+
     def test_close(self, browser):
         """Test Close"""
 
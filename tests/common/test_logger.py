@@ -0,0 +1,113 @@
+"""tests.common.test_logger.py"""
+
+import gzip
+import logging
+
+import pytest
+
+from common import logger as logger_module
+from common.logger import (
+    Logger,
+    QueueHandler,
+    RotatingFileHandler,
+    listeners,
+    loggers,
+    stop_listeners,
+)
+
+
+@pytest.fixture(name="log_dir")
+def fixture_log_dir(tmp_path, monkeypatch):
+    """Write logs to a temporary directory"""
+
+    monkeypatch.setattr(logger_module, "LOG_DIR", tmp_path)
+    cached = set(loggers)
+
+    yield tmp_path
+
+    # Do not leave loggers writing to the temporary directory behind
+    stop_listeners()
+    for name in set(loggers) - cached:
+        logger = loggers.pop(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+
+
+class TestLogger:
+    """Test Logger"""
+
+    def test_queue(self, log_dir):
+        """Test queue-backed logging writes every record on shutdown"""
+
+        logger = Logger("test_queue", stream_handler=False, use_queue=True).get_logger()
+        assert "test_queue" in listeners
+        assert isinstance(logger.handlers[0], QueueHandler)
+
+        for index in range(1000):
+            logger.debug("record %d", index)
+
+        stop_listeners()
+
+        lines = log_dir.joinpath("test_queue.log").read_text().splitlines()
+        assert lines[-1].endswith("record 999")
+        assert sum("record" in line for line in lines) == 1000
+
+        # The stopped listener is detached, getting the logger starts a new one
+        assert "test_queue" not in listeners
+        assert not logger.handlers
+
+        logger = Logger("test_queue", stream_handler=False, use_queue=True).get_logger()
+        assert len(logger.handlers) == 1
+        logger.debug("record 1000")
+        stop_listeners()
+
+        lines = log_dir.joinpath("test_queue.log").read_text().splitlines()
+        assert lines[-1].endswith("record 1000")
+
+    def test_cached(self, log_dir):
+        """Test getting a cached logger does not log"""
+
+        Logger("test_cached", stream_handler=False).get_logger()
+        Logger("test_cached", stream_handler=False).get_logger()
+
+        text = log_dir.joinpath("test_cached.log").read_text()
+        assert "Getting logger" not in text
+        assert text.count("Creating logger") == 1
+
+
+class TestRotatingFileHandler:
+    """Test RotatingFileHandler"""
+
+    def test_size(self, tmp_path):
+        """Test rotating by size with compression"""
+
+        filename = tmp_path / "size.log"
+        handler = RotatingFileHandler(
+            filename, max_bytes=1024, backup_count=2, compress=True
+        )
+
+        record = logging.LogRecord("size", logging.INFO, "", 0, "x" * 100, None, None)
+        for _ in range(50):
+            handler.handle(record)
+        handler.close()
+
+        backups = sorted(tmp_path.glob("size.log.*"))
+        assert [path.name for path in backups] == ["size.log.1.gz", "size.log.2.gz"]
+        assert gzip.decompress(backups[0].read_bytes()).startswith(b"x" * 100)
+        assert filename.stat().st_size <= 1024
+
+    def test_interval(self, tmp_path):
+        """Test rotating by age"""
+
+        filename = tmp_path / "age.log"
+        handler = RotatingFileHandler(filename, interval=3600)
+        record = logging.LogRecord("age", logging.INFO, "", 0, "message", None, None)
+
+        handler.handle(record)
+        assert not tmp_path.joinpath("age.log.1").exists()
+
+        handler.rollover_at = 0
+        handler.handle(record)
+        handler.close()
+        assert tmp_path.joinpath("age.log.1").read_text() == "message\n"
@@ -5,6 +5,8 @@ import pytest
 # Define fixtures
 pytest_plugins = [
     "tests.fixtures.browser",
+    "tests.fixtures.server",
+    "tests.fixtures.site",
 ]
 
 
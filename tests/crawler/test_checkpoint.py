@@ -0,0 +1,124 @@
+"""tests.crawler.test_checkpoint.py"""
+
+import json
+import time
+
+from restr.browser.http_browser import HttpBrowser
+from restr.crawler.checkpoint import Checkpoint
+from restr.crawler.distributed import Coordinator, Worker
+from restr.crawler.endpoints import EndpointMap
+
+
+class TestCheckpoint:
+    """Test Checkpoint"""
+
+    def test_replay(self, tmp_path):
+        """Test the journal is replayed, torn records skipped and compacted"""
+
+        path = tmp_path / "crawl.journal"
+        checkpoint = Checkpoint(path, interval=0, min_compact=0)
+        checkpoint.seed("http://a.com/")
+        checkpoint.queue_many([("http://a.com/", 0), ("http://a.com/1", 1)])
+        checkpoint.complete("http://a.com/")
+        checkpoint.queue("http://a.com/2", 1)
+        checkpoint.close()
+
+        # A record torn by a crash is skipped
+        with open(path, "a", encoding="utf-8") as file:
+            file.write('["d", "http://a.com/1", tr')
+
+        checkpoint = Checkpoint(path, min_compact=0)
+        assert checkpoint.resumed
+        assert checkpoint.seeds == ["http://a.com/"]
+        assert checkpoint.done == {"http://a.com/": True}
+        assert checkpoint.pending == {"http://a.com/1": 1, "http://a.com/2": 1}
+
+        # Completing every URL shrinks the journal to the live state
+        checkpoint.complete("http://a.com/1")
+        checkpoint.complete("http://a.com/2", ok=False)
+        checkpoint.close()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == len(checkpoint) == 4
+        assert Checkpoint(path).done == {
+            "http://a.com/": True,
+            "http://a.com/1": True,
+            "http://a.com/2": False,
+        }
+
+    def test_maybe_flush(self, tmp_path):
+        """Test buffered records are written without waiting for the next one"""
+
+        path = tmp_path / "crawl.journal"
+        checkpoint = Checkpoint(path, interval=0.1)
+        checkpoint.seed("http://a.com/")
+        checkpoint.queue("http://a.com/1")
+
+        checkpoint.maybe_flush()
+        assert "http://a.com/1" not in path.read_text()
+
+        time.sleep(0.15)
+        checkpoint.maybe_flush()
+        assert "http://a.com/1" in path.read_text()
+
+        checkpoint.close()
+
+    def test_coordinator_wait(self, tmp_path):
+        """Test an idle Coordinator writes the buffered records while it waits"""
+
+        path = tmp_path / "crawl.journal"
+        checkpoint = Checkpoint(path, interval=0.1)
+        coordinator = Coordinator(checkpoint=checkpoint, lease_timeout=0.2)
+        coordinator.seed("http://a.com/")
+
+        assert "http://a.com/" not in path.read_text()
+        assert not coordinator.wait(timeout=0.5)
+        assert "http://a.com/" in path.read_text()
+
+        coordinator.close()
+        checkpoint.close()
+
+
+class TestResume:
+    """Test resuming a Coordinator from its checkpoint"""
+
+    # pylint: disable=protected-access
+    def test_coordinator(self, site, tmp_path):
+        """Test a resumed crawl skips crawled pages and redoes leased ones"""
+
+        path = tmp_path / "crawl.journal"
+        coordinator = Coordinator(batch_size=2, checkpoint=Checkpoint(path, interval=0))
+        coordinator.seed(site.urls[0])
+        coordinator.start()
+
+        # One page is crawled, the next batch is leased when the coordinator dies
+        worker = Worker(coordinator.url, factory=HttpBrowser, batch_size=1)
+        lease = worker._call("/lease", {"worker": "w", "count": 1})
+        links = [site.urls[index] for index in site.links(0)]
+        result = {"url": site.urls[0], "links": links, "elapsed": 0.1, "error": None}
+        worker._call("/complete", {"lease": lease["lease"], "results": [result]})
+        leased = worker._call("/lease", {"worker": "w", "count": 2})["urls"]
+        assert len(leased) == 2
+
+        # Nothing is closed or flushed
+        coordinator._httpd.shutdown()
+        coordinator._httpd.server_close()
+
+        endpoints = EndpointMap()
+        coordinator = Coordinator(checkpoint=path, endpoints=endpoints)
+        assert coordinator.status()["queued"] == len(links)
+        assert endpoints.match(site.urls[0]) is not None
+
+        requests = len(site.server.requests)
+        pages = []
+        coordinator.seed(site.urls[0])
+        coordinator.on_page = pages.append
+        coordinator.start()
+        Worker(coordinator.url, factory=HttpBrowser).run()
+        assert coordinator.wait(timeout=30)
+        coordinator.close()
+
+        crawled = [url for url in site.urls if url != site.urls[0]]
+        assert sorted(page.url for page in pages) == sorted(crawled)
+        assert ("GET", "/page/0") not in site.server.requests[requests:]
+        assert len(Checkpoint(path).done) == len(site.urls)
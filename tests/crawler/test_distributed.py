@@ -0,0 +1,135 @@
+"""tests.crawler.test_distributed.py"""
+
+import http.client
+import json
+import threading
+import time
+import urllib.request
+
+from restr.browser.http_browser import HttpBrowser
+from restr.crawler.distributed import Coordinator, Worker
+
+
+def post(url: str, document: dict) -> dict:
+    """POST JSON to the coordinator"""
+
+    request = urllib.request.Request(
+        url,
+        json.dumps(document).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+class TestCoordinator:
+    """Test Coordinator and Worker"""
+
+    def test_run(self, site):
+        """Test several workers crawl the whole site once"""
+
+        pages = []
+        coordinator = Coordinator(batch_size=2)
+        coordinator.seed(site.urls[0])
+        coordinator.on_page = pages.append
+        coordinator.start()
+
+        workers = [
+            Worker(coordinator.url, factory=HttpBrowser, name=f"worker-{index}")
+            for index in range(3)
+        ]
+        threads = [threading.Thread(target=worker.run) for worker in workers]
+        for thread in threads:
+            thread.start()
+
+        assert coordinator.wait(timeout=30)
+        for thread in threads:
+            thread.join(timeout=30)
+
+        status = coordinator.status()
+        coordinator.close()
+
+        assert sorted(page.url for page in pages) == sorted(site.urls)
+        assert status["pages"] == len(site.urls)
+        assert status["errors"] == 0
+        assert status["done"]
+        assert sum(worker.pages for worker in workers) == len(site.urls)
+
+    def test_lease_expiry(self, server):
+        """Test leases of dead workers expire and backpressure limits leases"""
+
+        urls = [server.route(f"/{index}", "<p>page</p>") for index in range(4)]
+
+        coordinator = Coordinator(batch_size=2, max_leased=2, lease_timeout=0.3)
+        coordinator.seed(urls)
+        coordinator.start()
+
+        # A worker leases a batch and dies
+        lease = post(coordinator.url + "/lease", {"worker": "dead", "count": 4})
+        assert len(lease["urls"]) == 2
+
+        # Nothing more is leased until the batch is returned or expires
+        blocked = post(coordinator.url + "/lease", {"worker": "other"})
+        assert blocked["lease"] is None
+        assert blocked["retry_after"] > 0
+        assert not blocked["done"]
+
+        time.sleep(0.4)
+        assert Worker(coordinator.url, factory=HttpBrowser).run() == 4
+
+        # The late results of the expired lease are ignored
+        results = [
+            {"url": url, "links": [], "elapsed": 0.0, "error": None}
+            for url, _ in lease["urls"]
+        ]
+        assert post(coordinator.url + "/complete", {**lease, "results": results}) == {
+            "accepted": 0
+        }
+
+        status = coordinator.status()
+        coordinator.close()
+
+        assert status["pages"] == 4
+        assert status["redispatched"] == 2
+        assert status["done"]
+
+    def test_retry(self, server):
+        """Test failed coordinator calls are retried and page errors recorded"""
+
+        urls = [server.route(f"/{index}", "<p>page</p>") for index in range(3)]
+
+        coordinator = Coordinator(batch_size=3)
+        coordinator.seed(urls)
+        coordinator.start()
+
+        class Flaky(HttpBrowser):
+            """Browser failing to parse the response of the last page"""
+
+            def open(self, url, *args, **kwargs):
+                if url == urls[-1]:
+                    raise http.client.BadStatusLine("garbage")
+                return super().open(url, *args, **kwargs)
+
+        worker = Worker(coordinator.url, factory=Flaky, backoff=0.01)
+
+        # Every call fails once, as if the coordinator dropped the connection
+        request = worker._client.request  # pylint: disable=protected-access
+        failed = set()
+
+        def flaky(method, url, *args, **kwargs):
+            if url not in failed:
+                failed.add(url)
+                raise ConnectionResetError("dropped")
+            return request(method, url, *args, **kwargs)
+
+        worker._client.request = flaky  # pylint: disable=protected-access
+
+        assert worker.run() == 3
+        assert {coordinator.url + "/lease", coordinator.url + "/complete"} <= failed
+
+        status = coordinator.status()
+        coordinator.close()
+
+        assert status["pages"] == 3
+        assert status["errors"] == 1
+        assert status["done"]
@@ -0,0 +1,89 @@
+"""tests.crawler.test_endpoints.py"""
+
+import uuid
+
+from restr.browser.http_browser import HttpBrowser
+from restr.crawler.endpoints import EndpointMap
+
+
+class TestEndpointMap:
+    """Test EndpointMap"""
+
+    def test_add(self):
+        """IDs, UUIDs and hashes are collapsed into {param}"""
+
+        endpoints = EndpointMap()
+
+        assert endpoints.add("https://api.test/users/42") == "/users/{param}"
+        assert endpoints.add(f"https://api.test/users/{uuid.uuid4()}") == (
+            "/users/{param}"
+        )
+        assert endpoints.add(
+            "https://api.test/files/d41d8cd98f00b204e9800998ecf8427e/raw?v=1",
+            method="POST",
+            status=201,
+        ) == ("/files/{param}/raw")
+        endpoints.add("https://api.test/users/me")
+        endpoints.add("https://api.test/")
+
+        templates = {endpoint.template: endpoint for endpoint in endpoints.endpoints()}
+        assert set(templates) == {
+            "/",
+            "/users/{param}",
+            "/users/me",
+            "/files/{param}/raw",
+        }
+        assert templates["/users/{param}"].count == 2
+        assert templates["/files/{param}/raw"].methods == ["POST"]
+        assert templates["/files/{param}/raw"].query_keys == ["v"]
+        assert templates["/files/{param}/raw"].statuses == {201: 1}
+
+    def test_collapse(self):
+        """High-cardinality literal segments are collapsed"""
+
+        endpoints = EndpointMap(max_children=8)
+
+        for name in ["alpha", "bravo", "charlie", "delta", "echo", "fox", "golf"]:
+            endpoints.add(f"https://shop.test/product/{name}/reviews")
+        assert len(endpoints) == 7
+
+        endpoints.add("https://shop.test/product/hotel/reviews")
+        endpoints.add("https://shop.test/product/india/reviews")
+
+        assert [endpoint.template for endpoint in endpoints.endpoints()] == [
+            "/product/{param}/reviews"
+        ]
+        assert endpoints.match("https://shop.test/product/juliet/reviews") == (
+            "/product/{param}/reviews"
+        )
+
+    def test_saturation(self):
+        """Test is_saturated() and match()"""
+
+        endpoints = EndpointMap(saturation=3)
+
+        for i in range(2):
+            endpoints.add(f"https://a.test/items/{i}")
+        assert not endpoints.is_saturated("https://a.test/items/100")
+
+        endpoints.add("https://a.test/items/2")
+        assert endpoints.is_saturated("https://a.test/items/100")
+
+        assert endpoints.match("https://a.test/items/7") == "/items/{param}"
+        assert endpoints.match("https://a.test/other") is None
+        assert endpoints.match("https://b.test/items/7") is None
+
+    def test_browser_endpoints(self, server):
+        """Backends record opened URLs"""
+
+        server.route("/api/items/1", "{}")
+
+        endpoints = EndpointMap()
+        browser = HttpBrowser(endpoints=endpoints)
+        browser.open(server.url + "/api/items/1")
+        browser.open(server.url + "/api/items/2")
+        browser.close()
+
+        (endpoint,) = endpoints.endpoints()
+        assert endpoint.template == "/api/items/{param}"
+        assert endpoint.statuses == {200: 1, 404: 1}
@@ -0,0 +1,65 @@
+"""tests.crawler.test_engine.py"""
+
+import json
+
+from restr.browser.tracing import Tracer
+from restr.crawler.engine import CrawlEngine, PageResult
+
+
+class TestCrawlEngine:
+    """Test CrawlEngine"""
+
+    def test_crawl(self, browser):
+        """Test crawl()"""
+
+        pages = []
+        engine = CrawlEngine(browser, tabs=3, max_pages=6, on_page=pages.append)
+        stats = engine.crawl("https://www.icann.org/")
+
+        # Every queued page is crawled once
+        assert stats.pages == 6
+        assert len({page.url for page in pages}) == 6
+        assert all(isinstance(page, PageResult) for page in pages)
+        assert pages[0].links
+
+        # Every tab did some work
+        assert len(stats.tabs) == 3
+        assert all(0 < value <= 1 for value in stats.utilization.values())
+        assert stats.pages_per_sec > 0
+
+        # The engine can crawl again
+        assert engine.crawl("https://www.icann.org/").pages == 6
+
+        browser.close()
+
+    def test_tracer(self, browser, site, tmp_path):
+        """Test the commands of every page are nested under its page span"""
+
+        tracer = Tracer(tmp_path / "trace.jsonl")
+        tracer.instrument(browser.browser)
+
+        engine = CrawlEngine(browser, tabs=2, max_pages=4, tracer=tracer)
+        stats = engine.crawl(site.urls[0])
+        tracer.close()
+
+        spans = [
+            json.loads(line) for line in tracer.exporter.path.read_text().splitlines()
+        ]
+        by_id = {span["span_id"]: span for span in spans}
+
+        (job,) = [span for span in spans if span["name"] == "job"]
+        assert job["attributes"]["pages"] == stats.pages == 4
+
+        pages = [span for span in spans if span["name"] == "page"]
+        assert len(pages) == 4
+        assert all(page["parent_id"] == job["span_id"] for page in pages)
+
+        # Commands sent on the browser thread keep the page of their task
+        commands = [
+            span
+            for span in spans
+            if span["parent_id"] in by_id and by_id[span["parent_id"]]["name"] == "page"
+        ]
+        assert {by_id[span["parent_id"]]["span_id"] for span in commands} == {
+            page["span_id"] for page in pages
+        }
@@ -0,0 +1,102 @@
+"""tests.crawler.test_frontier.py"""
+
+import os
+
+from restr.crawler.frontier import BloomFilter, Frontier
+
+
+class TestBloomFilter:
+    """Test BloomFilter"""
+
+    def test_add(self):
+        """Test add() and membership"""
+
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        keys = [os.urandom(16) for _ in range(10_000)]
+
+        assert all(bloom.add(key) for key in keys[:100])
+        assert not bloom.add(keys[0])
+        assert len(bloom) == 100
+
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+
+        # False positive rate stays close to the configured rate
+        false_positives = sum(os.urandom(16) in bloom for _ in range(10_000))
+        assert false_positives < 300
+
+
+class TestFrontier:
+    """Test Frontier"""
+
+    def test_dedupe(self):
+        """Trivially different URLs are only queued once"""
+
+        frontier = Frontier(capacity=1000)
+
+        assert frontier.add("https://example.com/a?x=1&y=2")
+        assert not frontier.add("HTTPS://EXAMPLE.com:443/a?y=2&x=1#section")
+        assert not frontier.add("https://example.com/a?x=1&y=2&utm_source=mail")
+        assert frontier.add("https://example.com/b")
+
+        assert len(frontier) == 2
+        assert frontier.seen == 2
+        assert "example.com/b" in frontier
+        assert "https://example.com/c" not in frontier
+
+        frontier.close()
+
+    def test_priority(self):
+        """URLs are popped shallowest first and interleaved across hosts"""
+
+        frontier = Frontier(capacity=1000)
+        frontier.add_many([f"https://a.test/{i}" for i in range(3)], depth=1)
+        frontier.add_many([f"https://b.test/{i}" for i in range(2)], depth=1)
+        frontier.add("https://c.test/", depth=0)
+
+        assert frontier.pop() == ("https://c.test/", 0)
+        hosts = [url.split("/")[2] for url, _ in frontier.pop_many(4)]
+        assert hosts == ["a.test", "b.test", "a.test", "b.test"]
+        assert frontier.pop() == ("https://a.test/2", 1)
+        assert frontier.pop() is None
+
+        # Popped URLs are still deduplicated, requeue() bypasses it
+        assert not frontier.add("https://c.test/")
+        frontier.requeue("https://c.test/")
+        assert frontier.pop() == ("https://c.test/", 0)
+
+        frontier.close()
+
+    def test_persistence(self, tmp_path):
+        """Test a frontier database is reopened with its state"""
+
+        path = tmp_path / "frontier.db"
+        frontier = Frontier(path, capacity=1000, batch_size=2)
+        frontier.add_many([f"https://example.com/{i}" for i in range(5)])
+        frontier.pop()
+        frontier.close()
+
+        frontier = Frontier(path, capacity=1000)
+        assert len(frontier) == 4
+        assert frontier.seen == 5
+        assert not frontier.add("https://example.com/0")
+        frontier.close()
+        assert path.exists()
+
+    def test_resume_fairness(self, tmp_path):
+        """Test hosts stay interleaved after a frontier database is reopened"""
+
+        path = tmp_path / "frontier.db"
+        frontier = Frontier(path, capacity=1000)
+        frontier.add_many([f"https://a.test/{i}" for i in range(3)])
+        frontier.close()
+
+        # New URLs of a queued host take their turn after the queued ones
+        frontier = Frontier(path, capacity=1000)
+        frontier.add_many([f"https://a.test/{i}" for i in range(3, 5)])
+        frontier.add_many([f"https://b.test/{i}" for i in range(2)])
+
+        hosts = [url.split("/")[2] for url, _ in frontier.pop_many(7)]
+        assert hosts == ["a.test", "b.test", "a.test", "b.test"] + ["a.test"] * 3
+        frontier.close()
@@ -0,0 +1,89 @@
+"""tests.crawler.test_ratelimit.py"""
+
+import threading
+import time
+
+from restr.browser.http_browser import HttpBrowser
+from restr.crawler.ratelimit import RateController, parse_retry_after
+
+
+class TestRateController:
+    """Test RateController"""
+
+    def test_aimd(self):
+        """Test the limit grows on success and halves on errors"""
+
+        rate = RateController(initial=2, max_limit=4)
+        url = "http://a.com/page"
+
+        slots = [rate.try_acquire(url), rate.try_acquire(url)]
+        assert rate.try_acquire(url) is None
+        assert rate.try_acquire("http://b.com/") is not None
+
+        for slot in slots:
+            rate.release(slot)
+        assert rate.limits()["a.com"]["limit"] == 2
+
+        for _ in range(20):
+            rate.release(rate.try_acquire(url))
+        assert rate.limits()["a.com"]["limit"] == 4
+
+        # A burst of errors within one round trip is one decrease
+        slots = [rate.try_acquire(url) for _ in range(4)]
+        for slot in slots:
+            slot.error = True
+            rate.release(slot)
+
+        limits = rate.limits()["a.com"]
+        assert limits["limit"] == 2
+        assert limits["errors"] == 4
+        assert limits["p50"] is not None
+
+    def test_retry_after(self):
+        """Test Retry-After values in seconds and as HTTP dates"""
+
+        assert parse_retry_after("120") == 120
+        assert parse_retry_after("Thu, 01 Jan 1970 00:02:00 GMT", now=60) == 60
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_throttled(self, server):
+        """Test a throttling host is backed off and its Retry-After honored"""
+
+        lock = threading.Lock()
+        state = {"inflight": 0, "max_inflight": 0, "throttled": False}
+
+        def throttle(handler):
+            with lock:
+                state["inflight"] += 1
+                state["max_inflight"] = max(state["max_inflight"], state["inflight"])
+                throttle = not state["throttled"]
+                state["throttled"] = True
+            try:
+                if throttle:
+                    return 429, {"Retry-After": "1"}, b""
+                time.sleep(0.01)
+                return 200, {"Content-Type": "text/plain"}, b"ok"
+            finally:
+                with lock:
+                    state["inflight"] -= 1
+
+        url = server.route("/limited", throttle)
+
+        rate = RateController(initial=2, max_limit=2)
+        browser = HttpBrowser(rate=rate, max_workers=8)
+
+        start = time.perf_counter()
+        assert browser.open(url).status == 429
+        responses = browser.open_many([url] * 6)
+        elapsed = time.perf_counter() - start
+        browser.close()
+
+        assert all(response.status == 200 for response in responses)
+        assert elapsed >= 0.9
+        assert state["max_inflight"] <= 2
+
+        limits = rate.limits()[rate.host(url)]
+        assert limits["throttled"] == 1
+        assert limits["requests"] == 7
+        assert limits["inflight"] == 0
@@ -0,0 +1,89 @@
+"""tests.crawler.test_recrawl.py"""
+
+from restr.crawler.recrawl import PageState, Recrawler
+
+
+class TestRecrawler:
+    """Test Recrawler"""
+
+    def test_run(self, server, tmp_path):
+        """Test later runs only visit new, changed and due pages"""
+
+        pages = {"/b": "<p>b</p>"}
+
+        def etag_route(handler):
+            if handler.headers.get("If-None-Match") == '"a"':
+                return 304, {"ETag": '"a"'}, b""
+            return 200, {"Content-Type": "text/html", "ETag": '"a"'}, b"<p>a</p>"
+
+        root = server.route("/", '<a href="/a">a</a><a href="/b">b</a>')
+        server.route("/a", etag_route)
+        server.route("/b", lambda handler: (200, {}, pages["/b"].encode()))
+        server.route("/c", "<p>c</p>")
+
+        recrawler = Recrawler(tmp_path / "recrawl.db", min_interval=3600)
+
+        # The first run visits every page
+        stats = recrawler.run(root, now=0)
+        assert (stats.new, stats.visited) == (3, 3)
+        assert len(recrawler) == 3
+
+        # Nothing is due, only the seed is checked
+        stats = recrawler.run(root, now=10)
+        assert (stats.unchanged, stats.visited, stats.skipped) == (1, 1, 2)
+
+        # A changed page is parsed and leads to the new page
+        pages["/b"] = '<p>b</p><a href="/c">c</a>'
+        server.requests.clear()
+        stats = recrawler.run(root, now=4000)
+        assert (stats.changed, stats.unchanged, stats.new) == (1, 2, 1)
+        assert ("GET", "/c") in server.requests
+
+        # The page with an ETag was revalidated, unchanged pages back off,
+        # changed pages are checked again soon
+        state = recrawler.get(root + "a")
+        assert (state.checks, state.changes, state.etag) == (1, 0, '"a"')
+        assert recrawler.interval(state) == 8000
+        assert set(recrawler.due(now=4000 + 3600)) == {root + "b", root + "c"}
+
+        recrawler.close()
+
+    def test_backoff_error(self, server, tmp_path):
+        """Test unchanged pages double their interval and errors keep the state"""
+
+        status = {"code": 200}
+        url = server.route(
+            "/page", lambda handler: (status["code"], {}, b"<p>page</p>")
+        )
+
+        recrawler = Recrawler(tmp_path / "recrawl.db", min_interval=3600)
+        recrawler.run(url, now=0)
+        recrawler.run(url, now=4000)
+        recrawler.run(url, now=12000)
+
+        state = recrawler.get(url)
+        assert (state.checks, state.last_interval) == (2, 8000)
+        assert recrawler.interval(state) == 16000
+
+        # An error response is not hashed as the content of the page
+        status["code"] = 500
+        stats = recrawler.run(url, now=28000)
+        assert (stats.errors, stats.changed, stats.unchanged) == (1, 0, 0)
+
+        errored = recrawler.get(url)
+        assert (errored.digest, errored.checks) == (state.digest, state.checks)
+        assert recrawler.due(now=28000) == [url]
+
+        recrawler.close()
+
+    def test_change_rate(self):
+        """Test the change rate estimate"""
+
+        assert PageState("u", "d").change_rate == 0
+
+        # Changes at every check are underestimated by the interval alone
+        state = PageState("u", "d", checks=10, changes=10, observed=10 * 3600)
+        assert state.change_rate > 1 / 3600
+
+        state = PageState("u", "d", checks=10, changes=1, observed=10 * 3600)
+        assert state.change_rate < 1 / 3600
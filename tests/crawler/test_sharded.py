@@ -0,0 +1,83 @@
+"""tests.crawler.test_sharded.py"""
+
+import pytest
+
+from restr.browser.http_browser import HttpBrowser
+from restr.crawler.sharded import ShardedCrawler, shard_for
+
+
+class BrokenBrowser(HttpBrowser):
+    """HttpBrowser failing on pages ending in /broken, like a parser error"""
+
+    def open(self, url, *args, **kwargs):
+        if url.endswith("/broken"):
+            raise ValueError("unparsable page")
+        return super().open(url, *args, **kwargs)
+
+
+def no_browser() -> HttpBrowser:
+    """Factory failing to start a browser"""
+
+    raise OSError("no browser")
+
+
+class TestShardFor:
+    """Test shard_for()"""
+
+    def test_host_locality(self):
+        """URLs of the same host map to the same shard"""
+
+        shard = shard_for("https://www.icann.org/", 8)
+        assert 0 <= shard < 8
+        assert shard_for("https://www.icann.org/resources/pages", 8) == shard
+        assert shard_for("https://WWW.ICANN.ORG/?q=1", 8) == shard
+
+    def test_distribution(self):
+        """Hosts are spread across shards"""
+
+        shards = {shard_for(f"https://host-{i}.test/", 4) for i in range(100)}
+        assert shards == {0, 1, 2, 3}
+
+
+class TestShardedCrawler:
+    """Test ShardedCrawler"""
+
+    def test_run(self):
+        """Test run() and shutdown()"""
+
+        pages = []
+        crawler = ShardedCrawler(workers=2, max_pages=4)
+        stats = crawler.run(
+            ["https://www.icann.org/", "https://www.iana.org/"], on_page=pages.append
+        )
+
+        assert stats.pages == 4
+        assert len({page.url for page in pages}) == 4
+
+        # Workers are gone
+        assert not crawler._processes  # pylint: disable=protected-access
+
+    def test_page_error(self, server):
+        """Test any error of a page is reported as its result"""
+
+        root = server.route("/", '<a href="/broken">b</a><a href="/ok">o</a>')
+        server.route("/broken", "<p>broken</p>")
+        server.route("/ok", "<p>ok</p>")
+
+        crawler = ShardedCrawler(
+            workers=1, browsers_per_worker=2, factory=BrokenBrowser
+        )
+        stats = crawler.run(root)
+
+        assert (stats.pages, stats.errors) == (3, 1)
+
+    def test_thread_failure(self, server):
+        """Test a failed browser thread ends the crawl instead of hanging it"""
+
+        root = server.route("/", "<p>root</p>")
+
+        crawler = ShardedCrawler(workers=1, browsers_per_worker=2, factory=no_browser)
+        with pytest.raises(RuntimeError, match="no browser"):
+            crawler.run(root)
+
+        assert not crawler._processes  # pylint: disable=protected-access
@@ -20,9 +20,6 @@ def browser():
     if not __BROWSER or __BROWSER.browser.service.process is None:
         __BROWSER = Browser(headless=True)
 
-        # Wait 3s for browser to open
-        __BROWSER.browser.implicitly_wait(3)
-
     return __BROWSER
 
 
@@ -0,0 +1,152 @@
+"""Local HTTP server test fixtures"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import pytest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the routes of the LocalServer"""
+
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately, Nagle would delay the body
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.local.connections += 1
+
+    # pylint: disable=invalid-name
+    # Method names are defined by BaseHTTPRequestHandler
+    def do_GET(self) -> None:
+        """Serve GET"""
+        self._serve()
+
+    def do_HEAD(self) -> None:
+        """Serve HEAD"""
+        self._serve()
+
+    def do_POST(self) -> None:
+        """Serve POST"""
+        self._serve()
+
+    def do_PUT(self) -> None:
+        """Serve PUT"""
+        self._serve()
+
+    def do_DELETE(self) -> None:
+        """Serve DELETE"""
+        self._serve()
+
+    def _serve(self) -> None:
+        local = self.server.local
+        local.requests.append((self.command, self.path))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+
+        route = local.routes.get(self.path.split("?")[0])
+        if route is None:
+            status, headers, body = 404, {"Content-Type": "text/plain"}, b"Not Found"
+        elif callable(route):
+            status, headers, body = route(self)
+        else:
+            status, headers, body = route
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """Do not log requests to stderr"""
+
+
+class LocalServer:
+    """
+    HTTP/1.1 keep-alive server on 127.0.0.1 serving registered routes
+    """
+
+    def __init__(self) -> None:
+        """Start the server on a free port"""
+
+        self.routes: dict[str, tuple | Callable] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.connections: int = 0
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.local = self
+
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def route(
+        self,
+        path: str,
+        body: bytes | str | Callable = b"",
+        status: int = 200,
+        headers: dict[str, str] | None = None,
+    ) -> str:
+        """
+        Register a route
+
+        Parameters
+        ----------
+        path : str
+            Request path without query
+
+        body : bytes | str | Callable
+            Response body, or a callable taking the request handler and
+            returning (status, headers, body).
+
+        status : int, optional
+            Response status, by default 200.
+
+        headers : dict[str, str], optional
+            Response headers, by default text/html.
+
+        Returns
+        -------
+        str : Absolute URL of the route
+        """
+
+        if callable(body):
+            self.routes[path] = body
+        else:
+            self.routes[path] = (
+                status,
+                headers or {"Content-Type": "text/html; charset=utf-8"},
+                body.encode() if isinstance(body, str) else body,
+            )
+
+        return self.url + path
+
+    def close(self) -> None:
+        """Stop the server"""
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    """Create LocalServer fixture"""
+
+    local = LocalServer()
+    yield local
+    local.close()
@@ -0,0 +1,209 @@
+"""Synthetic site test fixtures"""
+
+import json
+import time
+
+import pytest
+
+from tests.fixtures.server import LocalServer
+
+# Host the third-party assets are served under, same server as the site
+THIRD_PARTY_HOST = "localhost"
+
+
+class SyntheticSite:
+    """
+    Linked HTML pages with images, stylesheets, fonts, media and third-party
+    scripts, served by a LocalServer on 127.0.0.1
+
+    Third-party assets are served by the same server under THIRD_PARTY_HOST,
+    a different host from the page's point of view.
+
+    The site is deterministic: page i links to the `fanout` pages after it,
+    fetches the JSON endpoint i % `api` and renders `rendered` sections with
+    links to further pages from JavaScript after `render_delay` seconds.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        server: LocalServer,
+        pages: int = 10,
+        images: int = 8,
+        asset_size: int = 32 * 1024,
+        delay: float = 0.02,
+        fanout: int = 3,
+        api: int = 0,
+        latency: float = 0.0,
+        rendered: int = 0,
+        render_delay: float = 0.0,
+    ) -> None:
+        """
+        Register the pages and assets of the site
+
+        Parameters
+        ----------
+        server : LocalServer
+            Server to register the routes on
+
+        pages : int, optional
+            Number of pages, by default 10.
+
+        images : int, optional
+            Images per page, by default 8.
+
+        asset_size : int, optional
+            Bytes of every asset, by default 32 KiB.
+
+        delay : float, optional
+            Seconds every asset takes to be served, by default 0.02.
+
+        fanout : int, optional
+            Links per page, by default 3.
+
+        api : int, optional
+            Number of JSON endpoints, by default 0.
+
+        latency : float, optional
+            Seconds every page and JSON response takes to be served,
+            by default 0.0.
+
+        rendered : int, optional
+            Sections per page rendered by JavaScript, by default 0.
+
+        render_delay : float, optional
+            Seconds after load the sections are rendered, by default 0.0.
+        """
+
+        self.server: LocalServer = server
+        self.third_party: str = server.url.replace("127.0.0.1", THIRD_PARTY_HOST)
+        self.pages: int = pages
+        self.fanout: int = fanout
+        self.api: int = api
+        self.rendered: int = rendered
+        self.render_delay: float = render_delay
+
+        def asset(content_type: str):
+            body = b"\0" * asset_size
+
+            def serve(_handler):
+                time.sleep(delay)
+                return 200, {"Content-Type": content_type}, body
+
+            return serve
+
+        def slow(content_type: str, body: str):
+            body = body.encode()
+
+            def serve(_handler):
+                time.sleep(latency)
+                return 200, {"Content-Type": content_type}, body
+
+            return serve
+
+        server.route("/static/site.css", asset("text/css"))
+        server.route("/static/site.woff2", asset("font/woff2"))
+        server.route("/static/intro.mp4", asset("video/mp4"))
+        server.route("/static/tracker.js", asset("application/javascript"))
+        for index in range(images):
+            server.route(f"/static/{index}.png", asset("image/png"))
+
+        self.api_urls: list[str] = [
+            server.route(
+                f"/api/{index}",
+                slow("application/json", json.dumps(self._data(index))),
+            )
+            for index in range(api)
+        ]
+
+        self.urls: list[str] = [
+            server.route(
+                f"/page/{index}",
+                slow("text/html; charset=utf-8", self._page(index, images)),
+            )
+            for index in range(pages)
+        ]
+
+    def links(self, index: int) -> list[int]:
+        """
+        Get the pages a page links to
+
+        Parameters
+        ----------
+        index : int
+            Page index
+
+        Returns
+        -------
+        list[int] : Indexes of the linked pages, rendered sections last
+        """
+
+        return [
+            (index + step) % self.pages
+            for step in range(1, self.fanout + self.rendered + 1)
+        ]
+
+    def _data(self, index: int) -> dict:
+        """Body of a JSON endpoint"""
+
+        return {
+            "id": index,
+            "items": [{"id": item, "name": f"Item {item}"} for item in range(10)],
+        }
+
+    def _page(self, index: int, images: int) -> str:
+        """HTML of a page"""
+
+        linked = self.links(index)
+
+        links = "".join(
+            f'<li><a href="/page/{page}">Page</a></li>'
+            for page in linked[: self.fanout]
+        )
+        pictures = "".join(
+            f'<img src="/static/{image}.png">' for image in range(images)
+        )
+
+        script = ""
+        if self.api:
+            script += f"fetch('/api/{index % self.api}').then(r => r.json());"
+        if self.rendered:
+            sections = json.dumps(
+                [
+                    f'<a href="/page/{page}">Rendered</a>'
+                    for page in linked[self.fanout :]
+                ]
+            )
+            script += (
+                "window.addEventListener('load', () => setTimeout(() => {"
+                f"for (const html of {sections}) {{"
+                "const section = document.createElement('section');"
+                "section.innerHTML = html;"
+                "document.body.appendChild(section);"
+                f"}}}}, {int(self.render_delay * 1000)}));"
+            )
+
+        return f"""<!DOCTYPE html>
+<html>
+<head>
+<title>Page {index}</title>
+<link rel="stylesheet" href="/static/site.css">
+<link rel="preload" href="/static/site.woff2" as="font" crossorigin>
+<script src="{self.third_party}/static/tracker.js"></script>
+</head>
+<body>
+<h1>Page {index}</h1>
+<ul>{links}</ul>
+{pictures}
+<video src="/static/intro.mp4" autoplay muted></video>
+<form action="/search" method="get"><input name="q"></form>
+<script>{script}</script>
+</body>
+</html>"""
+
+
+@pytest.fixture
+def site(server):
+    """Create SyntheticSite fixture"""
+
+    return SyntheticSite(server)
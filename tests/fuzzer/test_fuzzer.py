@@ -0,0 +1,121 @@
+"""tests.fuzzer.test_fuzzer.py"""
+
+import html
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+
+from restr.browser.extract import Form
+from restr.crawler.endpoints import EndpointMap
+from restr.fuzzer.engine import Fuzzer, Target
+from restr.fuzzer.payloads import PROBES, chain, default, infer_type, words
+
+
+class TestPayloads:
+    """Test the payload generators"""
+
+    def test_generators(self, tmp_path):
+        """Test payloads are typed, lazy and read from wordlists"""
+
+        assert infer_type("42") == "number"
+        assert infer_type("a@b.com") == "email"
+        assert infer_type("", "checkbox") == "boolean"
+
+        number = list(default("5", "number"))
+        assert "4" in number and "6" in number
+        assert set(PROBES) <= set(number)
+
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_text("# comment\nadmin\n\nroot\nguest\n")
+        payloads = chain(words(wordlist, limit=2), words(["x"]))
+        assert list(payloads("", "string")) == ["admin", "root", "x"]
+
+        # Generators are consumed lazily
+        assert next(default("a", "string")) == "aa"
+
+
+class TestTarget:
+    """Test building targets and requests"""
+
+    def test_sources(self):
+        """Test targets from URLs, forms and endpoint maps"""
+
+        target = Target.from_url("http://a.com/item/{param}?q=1&s=x")
+        assert [param.location for param in target.params] == ["path", "query", "query"]
+
+        method, url, body, _ = target.request("q", "a b")
+        assert method == "GET" and body is None
+        assert url == "http://a.com/item/1?q=a+b&s=x"
+        assert target.request("path0", "../x")[1].startswith(
+            "http://a.com/item/..%2Fx?"
+        )
+
+        form = Form("http://a.com/login", "post", [("user", "email"), ("go", "submit")])
+        method, url, body, headers = Target.from_form(form).request("user", "'")
+        assert (method, url, body) == ("POST", "http://a.com/login", b"user=%27")
+        assert headers["Content-Type"] == "application/x-www-form-urlencoded"
+
+        endpoints = EndpointMap()
+        endpoints.add("http://a.com/user/1?id=2", "GET")
+        endpoints.add("http://a.com/user/2", "GET")
+        targets = list(Target.from_endpoints(endpoints, scheme="http"))
+        assert [target.url for target in targets] == ["http://a.com/user/{param}"]
+
+
+class TestFuzzer:
+    """Test Fuzzer"""
+
+    def test_findings(self, server):
+        """Test deviating responses are recorded once and normal ones are not"""
+
+        def search(handler):
+            query = parse_qs(urlsplit(handler.path).query).get("q", [""])[0]
+            if "'" in query and "<" not in query:
+                return 500, {"Content-Type": "text/html"}, b"SQL syntax error near '"
+            if "<" in query:
+                return 200, {"Content-Type": "text/html"}, f"<p>{query}</p>".encode()
+            body = f"<p>{html.escape(query)}</p>"
+            return 200, {"Content-Type": "text/html"}, body.encode()
+
+        url = server.route("/search", search)
+        found = []
+        fuzzer = Fuzzer(on_finding=found.append, concurrency=4, batch_size=8)
+        stats = fuzzer.run(Target.from_url(f"{url}?q=restr"))
+        fuzzer.close()
+
+        payloads = list(default("restr", "string"))
+        assert stats.requests == len(payloads) + fuzzer.baseline
+        assert stats.errors == 0
+        assert stats.findings == len(fuzzer.findings) == len(found)
+
+        reasons = {reason for finding in found for reason in finding.reasons}
+        assert {"server error", "error", "reflection"} <= reasons
+        assert all(finding.param == "q" for finding in found)
+
+        # Probes without quotes or markup only cause the long payloads to deviate
+        flagged = {finding.payload for finding in found}
+        assert "restrrestr" not in flagged and "RESTR" not in flagged
+
+        # Several payloads with the same deviation are counted on one finding
+        fuzzer = Fuzzer(payloads=lambda _value, _kind: ["' OR 1", "' OR 2", "' OR 3"])
+        fuzzer.run(Target.from_url(f"{url}?q=restr"))
+        fuzzer.close()
+        assert [finding.count for finding in fuzzer.findings.values()] == [3]
+
+    def test_batches(self, server):
+        """Test requests are batched over pooled connections with bounded memory"""
+
+        url = server.route("/", "<p>ok</p>")
+        fuzzer = Fuzzer(
+            payloads=lambda _value, _kind: (str(i) for i in range(500)),
+            concurrency=4,
+            batch_size=16,
+        )
+        targets = (Target.from_url(f"{url}?id={i}") for i in range(3))
+        stats = fuzzer.run(targets)
+        fuzzer.close()
+
+        assert stats.requests == 3 * (500 + fuzzer.baseline)
+        assert stats.findings == 0
+        assert server.connections <= 4
+        assert stats.requests_per_sec > 0
+        assert list(islice(fuzzer.findings, 1)) == []
@@ -0,0 +1,45 @@
+"""tests.test_imports.py"""
+
+import subprocess
+import sys
+
+
+def test_lazy_import():
+    """Test importing the packages does not load the browser dependencies"""
+
+    code = (
+        "import sys, restr.browser, restr.crawler, restr.crawler.sharded;"
+        "from restr.browser import HttpBrowser;"
+        "print(sorted(set(sys.modules)"
+        " & {'selenium.webdriver', 'webdriver_manager', 'dotenv'}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_attributes():
+    """Test lazy attributes are listed, cached and unknown names still fail"""
+
+    code = (
+        "import restr.crawler as crawler;"
+        "assert 'CrawlEngine' in dir(crawler);"
+        "assert 'CrawlEngine' not in vars(crawler);"
+        "engine = crawler.CrawlEngine;"
+        "assert vars(crawler)['CrawlEngine'] is engine;"
+        "from restr.fuzzer import Fuzzer;"
+        "print(hasattr(crawler, 'Missing'))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,63 @@
+"""tests.test_site.py"""
+
+import json
+import time
+import urllib.request
+
+from restr.browser.extract import parse_html
+from tests.fixtures.site import SyntheticSite
+
+
+def fetch(url: str) -> tuple[bytes, float]:
+    """Get a body and the seconds it took"""
+
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        return response.read(), time.perf_counter() - start
+
+
+class TestSyntheticSite:
+    """Test the SyntheticSite fixture"""
+
+    def test_defaults(self, site):
+        """Test the default site has static links and no scripts"""
+
+        assert len(site.urls) == 10
+        assert site.api_urls == []
+
+        body, _ = fetch(site.urls[0])
+        data = parse_html(body.decode(), site.urls[0])
+        assert set(data.links) == {site.urls[index] for index in (1, 2, 3)}
+        assert b"fetch(" not in body
+        assert b"setTimeout" not in body
+
+    def test_options(self, server):
+        """Test fanout, api, latency, rendered and render_delay"""
+
+        site = SyntheticSite(
+            server,
+            pages=6,
+            images=0,
+            fanout=2,
+            api=2,
+            latency=0.05,
+            rendered=2,
+            render_delay=0.25,
+        )
+
+        # Static links first, the rendered ones are added by the script
+        assert site.links(5) == [0, 1, 2, 3]
+        body, elapsed = fetch(site.urls[5])
+        assert elapsed >= 0.05
+
+        data = parse_html(body.decode(), site.urls[5])
+        assert set(data.links) == {site.urls[0], site.urls[1]}
+        assert b'<a href=\\"/page/2\\">Rendered</a>' in body
+        assert b'<a href=\\"/page/3\\">Rendered</a>' in body
+        assert b"}, 250));" in body
+
+        # Page i fetches the JSON endpoint i % api
+        assert b"fetch('/api/1')" in body
+        body, elapsed = fetch(site.api_urls[1])
+        assert json.loads(body)["id"] == 1
+        assert elapsed >= 0.05
@@ -0,0 +1,55 @@
+"""tests.test_urls.py"""
+
+from restr.urls import canonicalize, host_template, is_param_segment, path_template
+
+
+class TestPathTemplate:
+    """Test path templates"""
+
+    def test_is_param_segment(self):
+        """Test is_param_segment()"""
+
+        assert is_param_segment("42")
+        assert is_param_segment("3f2504e0-4f89-11d3-9a0c-0305e82c3301")
+        assert is_param_segment("d41d8cd98f00b204e9800998ecf8427e")
+        assert is_param_segment("eyJhbGciOiJIUzI1NiJ9abc123")
+
+        assert not is_param_segment("users")
+        assert not is_param_segment("v2")
+        assert not is_param_segment("")
+
+    def test_path_template(self):
+        """Test path_template() and host_template()"""
+
+        assert path_template("/users/42/posts/7") == "/users/{param}/posts/{param}"
+        assert path_template("/") == "/"
+
+        assert host_template("https://API.example.com/items/12?x=1") == (
+            "api.example.com",
+            "/items/{param}",
+        )
+
+
+class TestCanonicalize:
+    """Test canonicalize()"""
+
+    def test_canonicalize(self):
+        """Test scheme, host, port, path, query and fragment normalization"""
+
+        assert (
+            canonicalize("HTTPS://Example.COM:443/a/./b/../c?b=2&a=1#top")
+            == "https://example.com/a/c?a=1&b=2"
+        )
+        assert canonicalize("example.com") == "https://example.com/"
+        assert canonicalize("http://example.com:80") == "http://example.com/"
+        assert canonicalize("http://example.com:8080/") == "http://example.com:8080/"
+        assert canonicalize("http://[::1]:80/x") == "http://[::1]/x"
+
+    def test_drop_params(self):
+        """Test tracking parameters are dropped"""
+
+        url = "https://example.com/?id=1&utm_source=a&UTM_MEDIUM=b&fbclid=c"
+        assert canonicalize(url) == "https://example.com/?id=1"
+        assert canonicalize(url, drop_params=["id"]) == (
+            "https://example.com/?UTM_MEDIUM=b&fbclid=c&utm_source=a"
+        )